@@ -0,0 +1,199 @@
+"""
+Téléchargement partagé des sources de prix (KML DRIHL, API Pays Basque).
+
+- Session HTTP unique (keep-alive) et requêtes en parallèle bornées
+- Nouvel essai avec backoff exponentiel sur erreur réseau, 429 et 5xx
+- Cache disque des réponses, clé = méthode + URL + corps : un import
+  relancé (ou la CI) relit les réponses sans réseau, à l'identique
+- Réponses en cache périmées après max_age secondes (grilles republiées en
+  cours d'année) ; refresh=True ignore le cache et le réécrit. En mode hors
+  ligne, le cache est toujours servi, quel que soit son âge
+
+Usage:
+    fetcher = SourceFetcher(cache_dir="/tmp/hestia-rent-sources", max_age=86400)
+    content = fetcher.fetch("GET", url)
+    results = fetcher.fetch_many([("GET", url, None), ("POST", url2, data)])
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "hestia-rent-sources"
+
+# Statuts pour lesquels un nouvel essai a du sens
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SourceUnavailable(Exception):
+    """Réponse absente du cache en mode hors ligne, ou essais épuisés."""
+
+
+class SourceFetcher:
+    """
+    Client HTTP des importeurs de prix, avec cache disque.
+
+    Args:
+        cache_dir: Répertoire du cache (None : pas de cache)
+        max_workers: Requêtes simultanées (et taille du pool de connexions)
+        retries: Nouveaux essais après le premier échec
+        backoff: Attente (s) avant le premier nouvel essai, doublée ensuite
+        timeout: Timeout (s) de chaque requête
+        offline: Ne jamais appeler le réseau (cache uniquement)
+        max_age: Âge (s) au-delà duquel une réponse en cache est retéléchargée
+                 (None : jamais)
+        refresh: Retélécharger toutes les réponses, puis les remettre en cache
+    """
+
+    def __init__(
+        self,
+        cache_dir=DEFAULT_CACHE_DIR,
+        max_workers=8,
+        retries=3,
+        backoff=0.5,
+        timeout=30,
+        offline=False,
+        max_age=None,
+        refresh=False,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.offline = offline
+        self.max_age = max_age
+        self.refresh = refresh
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    # ============================================
+    # CACHE DISQUE
+    # ============================================
+
+    def _cache_path(self, method, url, data):
+        body = json.dumps(data, sort_keys=True) if data is not None else ""
+        digest = hashlib.sha256(f"{method} {url}\n{body}".encode()).hexdigest()
+        return self.cache_dir / digest[:2] / digest
+
+    def _read_cache(self, path):
+        """Réponse en cache, None si absente ou périmée (hors ligne : jamais périmée)."""
+        try:
+            if (
+                not self.offline
+                and self.max_age is not None
+                and time.time() - path.stat().st_mtime > self.max_age
+            ):
+                return None
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write_cache(self, path, content):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Écriture atomique : un import interrompu ne laisse pas de réponse tronquée
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(content)
+        os.replace(tmp_path, path)
+
+    # ============================================
+    # REQUÊTES
+    # ============================================
+
+    def _request(self, method, url, data):
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.request(
+                    method, url, data=data, timeout=self.timeout
+                )
+            except requests.RequestException as e:
+                error = e
+            else:
+                if response.status_code not in RETRYABLE_STATUSES:
+                    response.raise_for_status()
+                    return response.content
+                error = requests.HTTPError(
+                    f"{response.status_code} pour {url}", response=response
+                )
+
+            if attempt < self.retries:
+                delay = self.backoff * 2**attempt
+                logger.warning(f"⚠️ {url} : {error}, nouvel essai dans {delay:.1f}s")
+                time.sleep(delay)
+
+        raise SourceUnavailable(f"{url} : {error}") from error
+
+    def fetch(self, method, url, data=None):
+        """
+        Contenu d'une URL, depuis le cache disque si la réponse y est déjà
+        (et n'a pas plus de max_age secondes).
+
+        Args:
+            method: "GET" ou "POST"
+            url: URL complète (query string comprise)
+            data: Corps de formulaire (POST), inclus dans la clé du cache
+
+        Returns:
+            bytes: Corps de la réponse (statut 2xx uniquement)
+
+        Raises:
+            SourceUnavailable: Hors ligne sans cache, ou essais épuisés
+            requests.HTTPError: Erreur 4xx (non retentée)
+        """
+        path = self._cache_path(method, url, data) if self.cache_dir else None
+        if path and not (self.refresh and not self.offline):
+            content = self._read_cache(path)
+            if content is not None:
+                return content
+
+        if self.offline:
+            raise SourceUnavailable(f"{url} : absent du cache (mode hors ligne)")
+
+        content = self._request(method, url, data)
+        if path:
+            self._write_cache(path, content)
+        return content
+
+    def fetch_many(self, specs):
+        """
+        Exécute des requêtes en parallèle (max_workers à la fois).
+
+        Args:
+            specs: Itérable de (method, url, data)
+
+        Returns:
+            list: Pour chaque requête, dans l'ordre, le contenu (bytes) ou
+            l'exception levée
+        """
+
+        def fetch_one(request):
+            try:
+                return self.fetch(*request)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(fetch_one, specs))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -2,9 +2,10 @@
 # https://www.data.gouv.fr/fr/datasets/encadrement-des-loyers-de-plaine-commune/
 # https://www.data.gouv.fr/fr/datasets/r/de5c9cb9-6215-4e88-aef7-ea0041984d1d
 
+import io
 import xml.etree.ElementTree as ET
 
-import requests
+from algo.encadrement_loyer.fetch import SourceFetcher
 
 
 def build_url(region, logement_type, pieces, epoque, meuble, date):
@@ -32,74 +33,88 @@ def build_url(region, logement_type, pieces, epoque, meuble, date):
     return url
 
 
-def extract_data_from_kml(url):
+def _local_name(tag):
+    """Nom d'une balise sans namespace (KML 2.1 ou 2.2)."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_kml(source):
     """
-    Récupère et analyse le contenu KML depuis une URL.
+    Analyse un KML DRIHL de façon incrémentale (iterparse).
+
+    Chaque Placemark est libéré dès qu'il est lu : la mémoire ne dépend pas
+    du nombre de zones. Le namespace (KML 2.1 ou 2.2) est ignoré.
 
     Args:
-        url (str): URL du fichier KML
+        source: Contenu (bytes) ou chemin du fichier KML
 
     Returns:
         dict: Dictionnaire avec idZone comme clé
     """
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-
-        content = response.content
-
-        # Détecter le namespace utilisé dans le fichier
-        if b'xmlns="http://earth.google.com/kml/2.1"' in content:
-            ns = {"kml": "http://earth.google.com/kml/2.1"}
-        elif b'xmlns="http://www.opengis.net/kml/2.2"' in content:
-            ns = {"kml": "http://www.opengis.net/kml/2.2"}
-        else:
-            # Fallback: essayer sans namespace spécifique
-            ns = {}
-
-        # Analyser le contenu XML
-        root = ET.fromstring(content)
-
-        # Extraire toutes les balises Placemark qui contiennent les données
-        placemarks = root.findall(".//kml:Placemark", ns)
-
-        # Dictionnaire pour stocker les résultats
-        results = {}
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    results = {}
+    for _, elem in ET.iterparse(source, events=("end",)):
+        if _local_name(elem.tag) != "Placemark":
+            continue
+
+        # Données étendues : <Data name="..."><value>...</value></Data>
+        place_data = {}
+        for data in elem.iter():
+            if _local_name(data.tag) != "Data":
+                continue
+            for value_elem in data:
+                if _local_name(value_elem.tag) == "value":
+                    place_data[data.get("name")] = value_elem.text
+                    break
 
-        for placemark in placemarks:
-            # Extraire les données étendues
-            extended_data = placemark.find(".//kml:ExtendedData", ns)
+        # Ajouter au dictionnaire de résultats si un ID de zone a été trouvé
+        if place_data.get("idZone"):
+            results[place_data["idZone"]] = place_data
+        elem.clear()
 
-            if extended_data is None:
-                continue
+    return results
 
-            # Créer un dictionnaire pour stocker les données de ce Placemark
-            place_data = {}
 
-            # Extraire l'ID de la zone
-            id_zone = None
+def extract_data_from_kml(url, fetcher=None):
+    """
+    Récupère et analyse le contenu KML depuis une URL.
 
-            # Analyser toutes les balises Data
-            for data in extended_data.findall(".//kml:Data", ns):
-                name = data.get("name")
-                value_elem = data.find(".//kml:value", ns)
+    Args:
+        url (str): URL du fichier KML
+        fetcher (SourceFetcher): Client partagé (cache disque, nouveaux essais),
+            sans cache disque par défaut (cf. build_source_fetcher)
 
-                if value_elem is not None:
-                    value = value_elem.text
+    Returns:
+        dict: Dictionnaire avec idZone comme clé
 
-                    # Stocker l'ID de la zone pour l'utiliser comme clé
-                    if name == "idZone":
-                        id_zone = value
+    Raises:
+        SourceUnavailable: Si le KML ne peut pas être téléchargé
+    """
+    fetcher = fetcher or SourceFetcher(cache_dir=None)
+    return parse_kml(fetcher.fetch("GET", url))
 
-                    # Stocker toutes les valeurs dans le dictionnaire
-                    place_data[name] = value
 
-            # Ajouter au dictionnaire de résultats si un ID de zone a été trouvé
-            if id_zone:
-                results[id_zone] = place_data
+def extract_many_kml(urls, fetcher=None):
+    """
+    Télécharge plusieurs KML en parallèle puis les analyse.
 
-        return results
+    Args:
+        urls: URLs des fichiers KML
+        fetcher (SourceFetcher): Client partagé, sans cache disque par défaut
 
-    except Exception as e:
-        print(f"Erreur lors de l'extraction des données: {e}")
-        return {}
+    Returns:
+        list: Pour chaque URL, dans l'ordre, le dict de parse_kml ou l'exception
+    """
+    fetcher = fetcher or SourceFetcher(cache_dir=None)
+    results = []
+    for content in fetcher.fetch_many([("GET", url, None) for url in urls]):
+        if isinstance(content, Exception):
+            results.append(content)
+            continue
+        try:
+            results.append(parse_kml(content))
+        except ET.ParseError as e:
+            results.append(e)
+    return results
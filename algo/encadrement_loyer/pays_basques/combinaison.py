@@ -1,7 +1,7 @@
 import itertools
 import json
 
-import requests
+from algo.encadrement_loyer.fetch import SourceFetcher, SourceUnavailable
 
 # URL cible
 url = "https://geobasque.communaute-paysbasque.fr/adws/app/dad90ce2-8b10-11ef-b6f8-3d530512f88c/services/aas/v1/statistics/f6bf144a-8b10-11ef-b6f8-3d530512f88c/execute"
@@ -28,9 +28,82 @@ filter_ids = {
 }
 
 
-def get_prices_pays_basque():
-    """Récupérer les prix pour le Pays Basque"""
-    # Effectuer la requête pour récupérer les prix
+def build_form_data(combo):
+    """FormData de la requête de statistiques pour une combinaison."""
+    (
+        zone,
+        type_de_bien,
+        nombre_de_pieces,
+        epoque_de_construction,
+        type_de_location,
+    ) = combo
+
+    # Construire les filtres de la requête
+    filters = {
+        "filterInputs": [
+            {
+                "id": filter_ids["zone"],
+                "index": 0,
+                "label": zone,
+                "values": [zone],
+                "fromSuggestion": False,
+            },
+            {
+                "id": filter_ids["type_de_bien"],
+                "index": 0,
+                "label": type_de_bien,
+                "values": [type_de_bien],
+                "fromSuggestion": False,
+            },
+            {
+                "id": filter_ids["nombre_de_pieces"],
+                "index": 0,
+                "label": nombre_de_pieces,
+                "values": [nombre_de_pieces],
+                "fromSuggestion": False,
+            },
+            {
+                "id": filter_ids["epoque_de_construction"],
+                "index": 0,
+                "label": epoque_de_construction,
+                "values": [epoque_de_construction],
+                "fromSuggestion": False,
+            },
+            {
+                "id": filter_ids["type_de_location"],
+                "index": 0,
+                "label": type_de_location,
+                "values": [type_de_location],
+                "fromSuggestion": False,
+            },
+        ],
+        "featureSelectionFilter": {"features": [], "selectionCrs": "EPSG:3857"},
+    }
+
+    # FormData à envoyer
+    data = {
+        "filters": json.dumps(filters),
+        "limit": "1",
+        "contextId": "0",
+        "appId": "dad90ce2-8b10-11ef-b6f8-3d530512f88c",
+        "lang": "fr",
+    }
+    return data
+
+
+def get_prices_pays_basque(fetcher=None, errors=None):
+    """
+    Récupérer les prix pour le Pays Basque
+
+    Args:
+        fetcher (SourceFetcher): Client partagé, sans cache disque par défaut
+            (cf. build_source_fetcher)
+        errors (list): Reçoit les combinaisons en échec ; si None, le premier
+            échec lève SourceUnavailable
+
+    Returns:
+        dict: combinaison → [référence, min, max]
+    """
     # Générer toutes les combinaisons
     combinations = list(
         itertools.product(
@@ -42,86 +115,35 @@ def get_prices_pays_basque():
         )
     )
 
+    # Requêtes en parallèle (session partagée, nouveaux essais)
+    fetcher = fetcher or SourceFetcher(cache_dir=None)
+    responses = fetcher.fetch_many(
+        [("POST", url, build_form_data(combo)) for combo in combinations]
+    )
+
     # Stockage des résultats
     results_dict = {}
-
-    # Effectuer les requêtes pour chaque combinaison
-    for combo in combinations:
-        (
-            zone,
-            type_de_bien,
-            nombre_de_pieces,
-            epoque_de_construction,
-            type_de_location,
-        ) = combo
-
-        # Construire les filtres de la requête
-        filters = {
-            "filterInputs": [
-                {
-                    "id": filter_ids["zone"],
-                    "index": 0,
-                    "label": zone,
-                    "values": [zone],
-                    "fromSuggestion": False,
-                },
-                {
-                    "id": filter_ids["type_de_bien"],
-                    "index": 0,
-                    "label": type_de_bien,
-                    "values": [type_de_bien],
-                    "fromSuggestion": False,
-                },
-                {
-                    "id": filter_ids["nombre_de_pieces"],
-                    "index": 0,
-                    "label": nombre_de_pieces,
-                    "values": [nombre_de_pieces],
-                    "fromSuggestion": False,
-                },
-                {
-                    "id": filter_ids["epoque_de_construction"],
-                    "index": 0,
-                    "label": epoque_de_construction,
-                    "values": [epoque_de_construction],
-                    "fromSuggestion": False,
-                },
-                {
-                    "id": filter_ids["type_de_location"],
-                    "index": 0,
-                    "label": type_de_location,
-                    "values": [type_de_location],
-                    "fromSuggestion": False,
-                },
-            ],
-            "featureSelectionFilter": {"features": [], "selectionCrs": "EPSG:3857"},
-        }
-
-        # FormData à envoyer
-        data = {
-            "filters": json.dumps(filters),
-            "limit": "1",
-            "contextId": "0",
-            "appId": "dad90ce2-8b10-11ef-b6f8-3d530512f88c",
-            "lang": "fr",
-        }
-
-        # Exécution de la requête
-        response = requests.post(url, data=data)
-
-        if response.status_code == 200:
+    for combo, content in zip(combinations, responses):
+        try:
+            if isinstance(content, Exception):
+                raise SourceUnavailable(f"Requête échouée ({content}) pour {combo}")
             try:
-                json_response = response.json()
-                # Extraire les valeurs des cellules si disponibles
-                cells = json_response.get("samples", [{}])[0].get("cells", [])
-                values = [cell.get("value", None) for cell in cells]
-
-                # Stocker les valeurs dans le dictionnaire
-                results_dict[combo] = values
-            except json.JSONDecodeError:
-                print(f"Erreur de décodage JSON pour {combo}")
-        else:
-            print(f"Requête échouée ({response.status_code}) pour {combo}")
+                json_response = json.loads(content)
+            except json.JSONDecodeError as e:
+                raise SourceUnavailable(
+                    f"Erreur de décodage JSON pour {combo} : {e}"
+                ) from e
+        except SourceUnavailable as e:
+            # Même traitement que les KML IDF : combinaison signalée à l'appelant
+            if errors is None:
+                raise
+            errors.append(str(e))
+            continue
+
+        # Extraire les valeurs des cellules si disponibles
+        cells = json_response.get("samples", [{}])[0].get("cells", [])
+        results_dict[combo] = [cell.get("value", None) for cell in cells]
+
     return results_dict
 
 
@@ -1,5 +1,7 @@
 import io
+import os
 import platform
+import re
 
 import fitz  # PyMuPDF
 from PIL import Image, ImageDraw, ImageFont
@@ -24,45 +26,107 @@ def get_signature_field_name(person: Personne):
     return slugify(f"{person.id}-{person.full_name}")
 
 
-def get_named_dest_coordinates(pdf_path, person: Personne, target_type=None):
-    field_name = get_signature_field_name(person)
+# Marqueurs invisibles posés par les templates (signature_fields.html)
+SIGNATURE_MARKER_PREFIXES = {
+    "mandataire": "ID_SIGNATURE_MANDATAIRE_",
+    "bailleur": "ID_SIGNATURE_BAILLEUR_",
+    "locataire": "ID_SIGNATURE_LOC_",
+}
+SIGNATURE_MARKER_RE = re.compile(r"ID_SIGNATURE_[\w-]+")
 
-    if target_type == "mandataire":
-        target_marker = f"ID_SIGNATURE_MANDATAIRE_{person.id}"
-    elif target_type == "bailleur":
-        target_marker = f"ID_SIGNATURE_BAILLEUR_{person.id}"
-    elif target_type == "locataire":
-        target_marker = f"ID_SIGNATURE_LOC_{person.id}"
-    else:
-        # Fallback pour d'autres types si nécessaire
-        target_marker = f"ID_SIGNATURE_{person.id}"
 
+def get_signature_marker(person: Personne, target_type=None):
+    # Fallback pour d'autres types si nécessaire : ID_SIGNATURE_<id>
+    prefix = SIGNATURE_MARKER_PREFIXES.get(target_type, "ID_SIGNATURE_")
+    return f"{prefix}{person.id}"
+
+
+def open_pdf_document(pdf):
+    """Ouvre un PDF PyMuPDF depuis un chemin ou depuis son contenu en mémoire."""
+    if isinstance(pdf, (str, os.PathLike)):
+        return fitz.open(pdf)
+    if isinstance(pdf, io.BytesIO):
+        # Pas de getbuffer() : PyMuPDF garde la vue, le buffer ne pourrait plus grandir
+        pdf = pdf.getvalue()
+    return fitz.open(stream=pdf, filetype="pdf")
+
+
+def find_signature_markers(pdf):
+    """
+    Localise tous les marqueurs ID_SIGNATURE_* du PDF en une passe : une
+    ouverture du document, une extraction du texte par page.
+
+    Args:
+        pdf: Chemin du PDF, ou son contenu (bytes, memoryview, BytesIO)
+
+    Returns:
+        dict: marqueur → (numéro de page, fitz.Rect du marqueur, hauteur de page)
+              (première page où le marqueur apparaît)
+
+    Raises:
+        ValueError: Si un marqueur apparaît plusieurs fois sur la même page
+    """
+    markers = {}
+    with open_pdf_document(pdf) as doc:
+        for page_number, page in enumerate(doc):
+            found_on_page = []
+            for x0, y0, x1, y1, word, *_ in page.get_text("words"):
+                match = SIGNATURE_MARKER_RE.search(word)
+                if not match:
+                    continue
+                marker = match.group(0)
+                if match.start() == 0:
+                    found_on_page.append((marker, fitz.Rect(x0, y0, x1, y1)))
+                else:
+                    # Marqueur collé à un autre texte : position exacte du marqueur
+                    found_on_page.extend(
+                        (marker, rect) for rect in page.search_for(marker)
+                    )
+
+            page_markers = [marker for marker, _ in found_on_page]
+            if len(page_markers) != len(set(page_markers)):
+                raise ValueError(
+                    "Plusieurs marqueurs de signature trouvés sur la même page."
+                )
+            for marker, rect in found_on_page:
+                markers.setdefault(marker, (page_number, rect, page.rect.height))
+
+    return markers
+
+
+def get_signature_field_coordinates(markers, person: Personne, target_type=None):
+    """
+    Emplacement du champ de signature d'une personne.
+
+    Args:
+        markers: Résultat de find_signature_markers()
+
+    Returns:
+        tuple: (page, fitz.Rect, field_name), page et rect à None si absent
+    """
+    field_name = get_signature_field_name(person)
+    found = markers.get(get_signature_marker(person, target_type))
+    if found is None:
+        return None, None, field_name
+
+    page_number, anchor, page_height = found
     box_width_pt = px_to_pt(TAMPON_WIDTH_PX)
     box_height_pt = px_to_pt(TAMPON_HEIGHT_PX)
 
-    doc = fitz.open(pdf_path)
+    # Décalage Y avec inversion du repère (origine en haut)
+    x0 = anchor.x0
+    y0 = page_height - anchor.y0 - box_height_pt
+    x1 = x0 + box_width_pt
+    y1 = y0 + box_height_pt
 
-    for page_number in range(len(doc)):
-        page = doc[page_number]
-        match = page.search_for(target_marker)
-        if len(match) > 1:
-            raise ValueError(
-                "Plusieurs marqueurs de signature trouvés sur la même page."
-            )
-        if match:
-            anchor = match[0]
-            # Récupérer la hauteur de la page
-            page_height = page.rect.height
+    return page_number, fitz.Rect(x0, y0, x1, y1), field_name
 
-            # Décalage Y avec inversion du repère (origine en haut)
-            x0 = anchor.x0
-            y0 = page_height - anchor.y0 - box_height_pt
-            x1 = x0 + box_width_pt
-            y1 = y0 + box_height_pt
 
-            return page_number, fitz.Rect(x0, y0, x1, y1), field_name
-
-    return None, None, field_name
+def get_named_dest_coordinates(pdf_path, person: Personne, target_type=None):
+    """Emplacement pour une seule personne (préférer find_signature_markers)."""
+    return get_signature_field_coordinates(
+        find_signature_markers(pdf_path), person, target_type
+    )
 
 
 def get_default_font_path():
@@ -171,6 +235,39 @@ def compose_signature_stamp(signature_bytes, user, signature_timestamp):
     return final_img, output
 
 
+def _append_signature_fields(writer, fields):
+    for field in fields:
+        append_signature_field(
+            writer,
+            SigFieldSpec(
+                sig_field_name=field["field_name"],
+                box=field["rect"],
+                on_page=field["page"],
+            ),
+        )
+
+
+def add_signature_fields_to_buffer(pdf, fields):
+    """
+    Ajoute les champs de signature à un PDF en mémoire (mise à jour incrémentale).
+
+    Args:
+        pdf: Contenu du PDF (bytes, memoryview ou BytesIO)
+        fields: Liste de dicts avec 'field_name', 'rect' et 'page'
+
+    Returns:
+        io.BytesIO: PDF avec les champs, position remise au début
+    """
+    buffer = pdf if isinstance(pdf, io.BytesIO) else io.BytesIO(pdf)
+    buffer.seek(0)
+    w = IncrementalPdfFileWriter(buffer)
+    _append_signature_fields(w, fields)
+    # La révision incrémentale est ajoutée à la fin du buffer, sans copie
+    w.write_in_place()
+    buffer.seek(0)
+    return buffer
+
+
 def add_signature_fields_dynamic(pdf_path, fields):
     """
     Add signature fields to a PDF document.
@@ -181,17 +278,7 @@ def add_signature_fields_dynamic(pdf_path, fields):
     """
     with open(pdf_path, "rb+") as doc:
         w = IncrementalPdfFileWriter(doc)
-
-        for field in fields:
-            append_signature_field(
-                w,
-                SigFieldSpec(
-                    sig_field_name=field["field_name"],
-                    box=field["rect"],
-                    on_page=field["page"],
-                ),
-            )
-
+        _append_signature_fields(w, fields)
         w.write_in_place()
 
 
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("assurances", "0003_alter_insurancepolicy_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="insurancequotation",
+            name="pdf_fingerprint",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="SHA-256 du rendu ayant produit pdf (réutilisé si inchangé)",
+                max_length=64,
+                verbose_name="Empreinte du rendu PDF",
+            ),
+        ),
+    ]
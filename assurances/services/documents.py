@@ -16,8 +16,8 @@ from typing import TYPE_CHECKING, Any
 from dateutil.relativedelta import relativedelta
 from django.core.files.base import ContentFile
 from django.template.loader import render_to_string
-from weasyprint import HTML
 
+from backend.pdf_rendering import render_pdf
 from backend.pdf_utils import (
     get_hestia_signature_base64_data_uri,
     get_logo_pdf_base64_data_uri,
@@ -178,7 +178,7 @@ class InsuranceDocumentService:
             f"pdf/assurances/{quotation.product.lower()}/conditions_particulieres.html"
         )
         html = render_to_string(template, context)
-        return HTML(string=html).write_pdf()
+        return render_pdf(html)
 
     def generate_attestation(self, policy: "InsurancePolicy") -> bytes:
         """
@@ -228,7 +228,7 @@ class InsuranceDocumentService:
         # Template selon le produit
         template = f"pdf/assurances/{quotation.product.lower()}/attestation.html"
         html = render_to_string(template, context)
-        return HTML(string=html).write_pdf()
+        return render_pdf(html)
 
     def generate_conditions_generales(self, product: str = "MRH") -> bytes:
         """
@@ -256,7 +256,7 @@ class InsuranceDocumentService:
 
         template = f"pdf/assurances/{product.lower()}/conditions_generales.html"
         html = render_to_string(template, context)
-        return HTML(string=html).write_pdf()
+        return render_pdf(html)
 
     def generate_der(self) -> bytes:
         """
@@ -272,7 +272,7 @@ class InsuranceDocumentService:
         }
 
         html = render_to_string("pdf/assurances/der.html", context)
-        return HTML(string=html).write_pdf()
+        return render_pdf(html)
 
     def generate_static_document(self, document_type: str) -> bytes:
         """
@@ -379,7 +379,7 @@ class InsuranceDocumentService:
         product = quotation_data.get("product", "MRH").lower()
         template = f"pdf/assurances/{product}/conditions_particulieres.html"
         html = render_to_string(template, context)
-        return HTML(string=html).write_pdf()
+        return render_pdf(html)
 
     def generate_devis(
         self,
@@ -427,7 +427,7 @@ class InsuranceDocumentService:
         product = quotation_data.get("product", "MRH").lower()
         template = f"pdf/assurances/{product}/devis.html"
         html = render_to_string(template, context)
-        return HTML(string=html).write_pdf()
+        return render_pdf(html)
 
     def generate_all_documents(self, policy: "InsurancePolicy") -> None:
         """
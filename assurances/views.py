@@ -15,8 +15,6 @@ Endpoints:
 """
 
 import logging
-import os
-import uuid
 from datetime import date
 
 from django.core.files.base import ContentFile
@@ -30,7 +28,7 @@ from rest_framework.response import Response
 
 from location.models import Location
 from location.services.access_utils import get_user_info_for_location
-from signature.pdf_processing import prepare_pdf_with_signature_fields_generic
+from signature.pdf_processing import add_signature_fields_for_document
 from signature.views import (
     confirm_signature_generic,
     get_signature_request_generic,
@@ -336,44 +334,26 @@ def select_formula(request: Request) -> Response:
             locataire=user_info.locataire,
         )
 
-        # 3. Ajouter les champs de signature au PDF
-
-        tmp_pdf_path = f"/tmp/cp_{uuid.uuid4()}.pdf"
-        with open(tmp_pdf_path, "wb") as f:
-            f.write(cp_pdf_bytes)
-
-        # Ajouter les champs de signature basés sur les marqueurs dans le PDF
-        prepare_pdf_with_signature_fields_generic(tmp_pdf_path, quotation)
+        # 3. Ajouter les champs de signature (marqueurs du PDF), en mémoire
+        cp_buffer = add_signature_fields_for_document(cp_pdf_bytes, quotation)
 
         # 4. Optionnel: Certifier avec Hestia
         try:
-            from signature.certification_flow import certify_document_hestia
+            from signature.certification_flow import certify_pdf_buffer
 
-            certified_pdf_path = f"/tmp/cp_{uuid.uuid4()}_certified.pdf"
-            certify_document_hestia(tmp_pdf_path, certified_pdf_path, quotation)
-            final_pdf_path = certified_pdf_path
+            cp_buffer = certify_pdf_buffer(cp_buffer, quotation)
             logger.info("✅ CP certifié avec Hestia")
         except Exception as cert_error:
             logger.warning(f"⚠️ Certification Hestia optionnelle échouée: {cert_error}")
-            final_pdf_path = tmp_pdf_path
 
         # Stocker les CP dans pdf ET latest_pdf
         # - pdf : garde l'original (champs de signature vides)
         # - latest_pdf : utilisé pour la signature (sera modifié par process_signature_generic)
         # Ainsi, après annulation (suppression de latest_pdf), on repart du pdf propre
         cp_filename = f"cp_{quotation.product}_{quotation.id}_{formula_code}.pdf"
-        with open(final_pdf_path, "rb") as f:
-            content = f.read()
-            quotation.pdf.save(cp_filename, ContentFile(content), save=False)
-            quotation.latest_pdf.save(cp_filename, ContentFile(content), save=False)
-
-        # Nettoyer les fichiers temporaires
-        try:
-            os.remove(tmp_pdf_path)
-            if final_pdf_path != tmp_pdf_path:
-                os.remove(final_pdf_path)
-        except OSError:
-            pass
+        content = cp_buffer.getvalue()
+        quotation.pdf.save(cp_filename, ContentFile(content), save=False)
+        quotation.latest_pdf.save(cp_filename, ContentFile(content), save=False)
 
         quotation.save()
 
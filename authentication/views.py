@@ -22,16 +22,15 @@ from authentication.utils import (
     verify_google_token,
     verify_otp_only_and_generate_token,
 )
-from bail.models import Bail
-from location.models import Bailleur, Bien, Locataire, Location, Mandataire
+from location.models import Bailleur, Locataire, Mandataire
 from location.services.access_utils import (
-    get_user_mandataires,
     user_has_mandataire_role,
 )
-from location.services.serialization_utils import (
-    serialize_bien_with_stats,
+from location.services.profile_stats import (
+    get_bailleur_biens_stats,
+    get_locataire_locations_stats,
+    get_mandataire_stats,
 )
-from signature.document_status import DocumentStatus
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -367,30 +366,16 @@ def get_user_profile_stats(request):
     Vue pour récupérer les statistiques et données détaillées du profil.
 
     Endpoint plus lourd avec comptage de biens, locations, et statistiques mandataire.
-    À appeler après get_user_profile pour lazy-loading.
+    À appeler après get_user_profile pour lazy-loading. Nombre de requêtes
+    constant quel que soit le portefeuille (voir location/services/profile_stats.py).
     """
     user = request.user
     stats_data = {}
 
     # Statistiques Bailleur : Liste des biens avec comptages
     try:
-        bailleurs = Bailleur.objects.filter(
-            models.Q(personne__email=user.email)
-            | models.Q(signataire__email=user.email)
-        ).distinct()
-
-        if bailleurs.exists():
-            biens = []
-            for bailleur in bailleurs:
-                for bien in Bien.objects.filter(bailleurs=bailleur):
-                    # Utiliser le helper de sérialisation
-                    bien_data = serialize_bien_with_stats(bien)
-                    # Ajouter compatibilité avec ancien format
-                    bien_data["nombre_baux"] = bien_data["nombre_baux"]
-                    # Éviter les doublons
-                    if not any(b["id"] == bien_data["id"] for b in biens):
-                        biens.append(bien_data)
-
+        biens = get_bailleur_biens_stats(user.email)
+        if biens is not None:
             stats_data["biens"] = biens
 
     except Exception as e:
@@ -400,75 +385,8 @@ def get_user_profile_stats(request):
 
     # Statistiques Locataire : Liste des locations avec bails
     try:
-        locataires = Locataire.objects.filter(email=user.email)
-
-        if locataires.exists():
-            locations = []
-            for locataire in locataires:
-                for location in Location.objects.filter(locataires=locataire):
-                    # Récupérer le bail actif (SIGNING ou SIGNED)
-                    bail = (
-                        Bail.objects.filter(
-                            location=location,
-                            status__in=[DocumentStatus.SIGNING, DocumentStatus.SIGNED],
-                        )
-                        .order_by("-created_at")
-                        .first()
-                    )
-
-                    date_fin = (
-                        location.date_fin.isoformat() if location.date_fin else None
-                    )
-
-                    # Si un bail existe, récupérer ses infos
-                    signatures_completes = True
-                    pdf_url = None
-                    latest_pdf_url = None
-                    status = "draft"
-
-                    if bail:
-                        signatures_completes = not bail.signature_requests.filter(
-                            signed=False
-                        ).exists()
-                        pdf_url = bail.pdf.url if bail.pdf else None
-                        latest_pdf_url = (
-                            bail.latest_pdf.url if bail.latest_pdf else None
-                        )
-                        status = bail.status
-
-                    # Récupérer les montants depuis RentTerms
-                    montant_loyer = 0
-                    montant_charges = 0
-                    if hasattr(location, "rent_terms"):
-                        montant_loyer = float(location.rent_terms.montant_loyer or 0)
-                        montant_charges = float(
-                            location.rent_terms.montant_charges or 0
-                        )
-
-                    location_data = {
-                        "id": str(location.id),
-                        "bien_adresse": str(location.bien.adresse) if location.bien.adresse else "",
-                        "bien_type": location.bien.get_type_bien_display(),
-                        "date_debut": location.date_debut.isoformat()
-                        if location.date_debut
-                        else None,
-                        "date_fin": date_fin,
-                        "montant_loyer": montant_loyer,
-                        "montant_charges": montant_charges,
-                        "status": status,
-                        "signatures_completes": signatures_completes,
-                        "pdf_url": pdf_url,
-                        "latest_pdf_url": latest_pdf_url,
-                        "created_at": (
-                            bail.date_signature.isoformat()
-                            if bail and bail.date_signature
-                            else None
-                        ),
-                    }
-                    # Éviter les doublons
-                    if not any(loc["id"] == location_data["id"] for loc in locations):
-                        locations.append(location_data)
-
+        locations = get_locataire_locations_stats(user.email)
+        if locations is not None:
             stats_data["locations"] = locations
 
     except Exception as e:
@@ -478,27 +396,9 @@ def get_user_profile_stats(request):
 
     # Statistiques Mandataire : Nombre de biens/bailleurs gérés
     try:
-        mandataires = get_user_mandataires(user.email)
-
-        if mandataires.exists():
-            # Compter les biens gérés via les locations
-            nombre_biens_geres = (
-                Bien.objects.filter(locations__mandataire__in=mandataires)
-                .distinct()
-                .count()
-            )
-
-            # Compter les bailleurs uniques gérés
-            nombre_bailleurs_geres = (
-                Bailleur.objects.filter(bien__locations__mandataire__in=mandataires)
-                .distinct()
-                .count()
-            )
-
-            stats_data["mandataire_stats"] = {
-                "nombre_biens_geres": nombre_biens_geres,
-                "nombre_bailleurs_geres": nombre_bailleurs_geres,
-            }
+        mandataire_stats = get_mandataire_stats(user.email)
+        if mandataire_stats is not None:
+            stats_data["mandataire_stats"] = mandataire_stats
 
     except Exception as e:
         error_msg = f"Erreur stats mandataire pour {user.email}: {e}"
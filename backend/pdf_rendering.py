@@ -0,0 +1,254 @@
+"""
+Rendu WeasyPrint partagé par tous les PDF générés (bail, avenant, état des
+lieux, quittance, documents assurance).
+
+Auparavant chaque HTML(...).write_pdf() repartait de zéro : nouvelle
+FontConfiguration (fontconfig + pango), retéléchargement de la feuille Google
+Fonts importée par les templates puis du fichier de police, et les ressources
+relatives à base_url étaient récupérées en HTTP auprès de l'application
+elle-même.
+
+Ici, une fois par process (worker gunicorn ou worker pdf_jobs) :
+- une FontConfiguration partagée : chaque @font-face n'est chargée qu'une fois
+- les feuilles communes (templates/base/pdf_fonts.css) sont compilées une fois
+  et passées à chaque rendu
+- les ressources externes listées dans PDF_RENDER_CACHED_URL_PREFIXES (Google
+  Fonts) sont mémorisées
+- les ressources sous STATIC_URL ou MEDIA_URL de base_url sont lues sur
+  disque (STATIC_ROOT, MEDIA_ROOT), sans boucle HTTP vers l'application
+
+Le rendu est préchauffé après le fork des workers (gunicorn.conf.py,
+run_pdf_workers).
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+from django.conf import settings
+from weasyprint import CSS, HTML, default_url_fetcher
+from weasyprint.text.fonts import FontConfiguration
+
+from backend.pdf_utils import (
+    get_hestia_signature_base64_data_uri,
+    get_logo_pdf_base64_data_uri,
+    get_mila_signature_base64_data_uri,
+)
+
+logger = logging.getLogger(__name__)
+
+STYLESHEETS = [Path(settings.BASE_DIR) / "templates" / "base" / "pdf_fonts.css"]
+
+WARM_UP_HTML = (
+    "<p style=\"font-family: 'Playfair Display', Georgia, serif; font-style: italic\">"
+    "Hestia</p><p>Hestia</p>"
+)
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _local_file(roots, relative_path):
+    for root in roots:
+        if not root:
+            continue
+        root = Path(root).resolve()
+        path = (root / relative_path).resolve()
+        # Pas de sortie du répertoire (../)
+        if path.is_relative_to(root) and path.is_file():
+            return path
+    return None
+
+
+def local_static_path(relative_path):
+    """
+    Fichier statique correspondant à un chemin relatif à STATIC_URL.
+
+    Returns:
+        Path | None: Chemin sur disque (STATIC_ROOT puis static/), None si absent
+    """
+    return _local_file(
+        (settings.STATIC_ROOT, Path(settings.BASE_DIR) / "static"), relative_path
+    )
+
+
+def local_media_path(relative_path):
+    """
+    Fichier uploadé correspondant à un chemin relatif à MEDIA_URL.
+
+    Returns:
+        Path | None: Chemin sur disque (MEDIA_ROOT), None si absent
+    """
+    return _local_file((settings.MEDIA_ROOT,), relative_path)
+
+
+class ResourceCache:
+    """Réponses mémorisées des ressources externes (LRU borné)."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, url):
+        with self._lock:
+            response = self._entries.get(url)
+            if response is not None:
+                self._entries.move_to_end(url)
+            return response
+
+    def put(self, url, response):
+        with self._lock:
+            self._entries[url] = response
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class PdfResourceFetcher:
+    """
+    url_fetcher WeasyPrint d'un rendu.
+
+    Args:
+        base_url: URL de base du document (None pour les documents assurance)
+        cache: ResourceCache du process
+        fallback: url_fetcher pour le reste (ex: PhotoRenditions.url_fetcher)
+    """
+
+    def __init__(self, base_url, cache, fallback=None):
+        self.origin = _origin(base_url) if base_url else None
+        self.static_url = urljoin(base_url, settings.STATIC_URL) if base_url else None
+        # MEDIA_URL absolue (S3) : autre origine, jamais lue sur disque
+        self.media_url = urljoin(base_url, settings.MEDIA_URL) if base_url else None
+        self.cache = cache
+        self.fallback = fallback or default_url_fetcher
+
+    def __call__(self, url, timeout=10, ssl_context=None):
+        if self.origin and _origin(url) == self.origin:
+            response = self.fetch_local(url)
+            if response is not None:
+                return response
+
+        if url.startswith(tuple(settings.PDF_RENDER_CACHED_URL_PREFIXES)):
+            response = self.cache.get(url)
+            if response is None:
+                response = self._read(self.fallback(url, timeout=timeout, ssl_context=ssl_context))
+                self.cache.put(url, response)
+            return dict(response)
+
+        return self.fallback(url, timeout=timeout, ssl_context=ssl_context)
+
+    def fetch_local(self, url):
+        """
+        Ressource de l'application sous STATIC_URL/MEDIA_URL : lue sur disque
+        (une requête HTTP vers soi-même occupe un worker de plus).
+
+        Returns:
+            dict | None: Réponse WeasyPrint, None si l'URL ne correspond à
+            aucun fichier local (servie alors par le fallback)
+        """
+        path = urlsplit(url).path
+        prefixes = [(self.static_url, local_static_path)]
+        if _origin(self.media_url) == self.origin:
+            prefixes.append((self.media_url, local_media_path))
+        for prefix_url, resolve in prefixes:
+            prefix = urlsplit(prefix_url).path
+            if path.startswith(prefix):
+                local_path = resolve(path[len(prefix) :])
+                if local_path is not None:
+                    return {
+                        "string": local_path.read_bytes(),
+                        "filename": local_path.name,
+                    }
+        return None
+
+    @staticmethod
+    def _read(response):
+        """Matérialise le corps (file_obj) pour pouvoir le resservir."""
+        response = dict(response)
+        file_obj = response.pop("file_obj", None)
+        if file_obj is not None:
+            try:
+                response["string"] = file_obj.read()
+            finally:
+                file_obj.close()
+        return response
+
+
+class PdfRenderer:
+    """Configuration WeasyPrint d'un process : polices, feuilles, cache."""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.font_config = FontConfiguration()
+        self.cache = ResourceCache(settings.PDF_RENDER_CACHE_MAX_ENTRIES)
+        fetcher = PdfResourceFetcher(None, self.cache)
+        self.stylesheets = [
+            CSS(filename=str(path), font_config=self.font_config, url_fetcher=fetcher)
+            for path in STYLESHEETS
+        ]
+
+    def render(self, html, base_url=None, url_fetcher=None):
+        """
+        Args:
+            html: HTML rendu par le template
+            base_url: URL de base des ressources relatives
+            url_fetcher: url_fetcher spécifique au document (photos EDL...)
+
+        Returns:
+            bytes: Contenu du PDF
+        """
+        fetcher = PdfResourceFetcher(base_url, self.cache, url_fetcher)
+        return HTML(string=html, base_url=base_url, url_fetcher=fetcher).write_pdf(
+            stylesheets=self.stylesheets, font_config=self.font_config
+        )
+
+
+_local = threading.local()
+
+
+def get_pdf_renderer():
+    """Renderer du thread courant, recréé après un fork."""
+    renderer = getattr(_local, "renderer", None)
+    # Nouveau process (fork) : fontconfig/pango ne se partagent pas avec le parent
+    if renderer is None or renderer.pid != os.getpid():
+        renderer = _local.renderer = PdfRenderer()
+    return renderer
+
+
+def reset_pdf_renderer():
+    """Oublie le renderer et les data URIs (mesure d'un rendu à froid)."""
+    _local.renderer = None
+    for data_uri in (
+        get_logo_pdf_base64_data_uri,
+        get_mila_signature_base64_data_uri,
+        get_hestia_signature_base64_data_uri,
+    ):
+        data_uri.cache_clear()
+
+
+def render_pdf(html, base_url=None, url_fetcher=None):
+    """Convertit un HTML en PDF avec le renderer partagé du process."""
+    return get_pdf_renderer().render(html, base_url=base_url, url_fetcher=url_fetcher)
+
+
+def warm_up_pdf_renderer():
+    """Charge polices, feuilles et data URIs au démarrage du worker."""
+    try:
+        get_logo_pdf_base64_data_uri()
+        get_mila_signature_base64_data_uri()
+        get_hestia_signature_base64_data_uri()
+        render_pdf(WARM_UP_HTML)
+    except Exception as e:
+        logger.error(f"❌ Préchauffage du rendu PDF impossible : {e}")
+        return False
+    logger.info("✅ Rendu PDF préchauffé (polices, feuilles, data URIs)")
+    return True
@@ -1,13 +1,17 @@
 import base64
+import re
+from functools import cache
 from pathlib import Path
 from django.conf import settings
 from django.urls import reverse
 
 
+@cache
 def get_logo_pdf_base64_data_uri():
     """
     Génère l'URI data en base64 du logo Hestia pour l'utiliser dans les CSS @page.
     Crée une version réduite du SVG (12px) avec alignement vertical centré.
+    Calculée une fois par process (fichier statique, livré avec le code).
 
     Returns:
         str: URI data complète (data:image/svg+xml;base64,...)
@@ -17,8 +21,6 @@ def get_logo_pdf_base64_data_uri():
     with open(logo_path, "rb") as f:
         svg_content = f.read().decode("utf-8")
 
-    import re
-
     # Remplacer width et height pour 13px
     svg_content = re.sub(r'width="[^"]*"', 'width="13"', svg_content, count=1)
     svg_content = re.sub(r'height="[^"]*"', 'height="13"', svg_content, count=1)
@@ -49,6 +51,7 @@ def get_logo_pdf_base64_data_uri():
     return f"data:image/svg+xml;base64,{base64_encoded}"
 
 
+@cache
 def get_mila_signature_base64_data_uri():
     """
     Génère l'URI data en base64 de la signature Mila pour les PDF assurance.
@@ -65,6 +68,7 @@ def get_mila_signature_base64_data_uri():
     return f"data:image/png;base64,{base64_encoded}"
 
 
+@cache
 def get_hestia_signature_base64_data_uri():
     """
     Génère l'URI data en base64 de la signature Hestia pour les PDF assurance.
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -63,6 +64,8 @@ INSTALLED_APPS = [
     "tsa",  # Time Stamping Authority
     "partenaires",  # Partenaires externes (assurances, services, etc.)
     "assurances",  # Assurances: MRH, PNO, GLI (via Mila)
+    "pdf_jobs",  # Génération PDF asynchrone (bail, EDL, quittance)
+    "email_outbox",  # Envoi d'emails asynchrone par lots
 ]
 
 MIDDLEWARE = [
@@ -235,6 +238,25 @@ STORAGES = {
     },
 }
 
+# Accès streaming au stockage (backend.storage_utils)
+# - copies par blocs de STORAGE_COPY_BUFFER_SIZE
+# - GET parallèles par plages au-delà de STORAGE_RANGED_GET_THRESHOLD
+# - cache disque LRU par worker (nom + ETag), 0 pour le désactiver
+STORAGE_COPY_BUFFER_SIZE = int(os.getenv("STORAGE_COPY_BUFFER_SIZE", str(1024 * 1024)))
+STORAGE_RANGED_GET_THRESHOLD = int(
+    os.getenv("STORAGE_RANGED_GET_THRESHOLD", str(16 * 1024 * 1024))
+)
+STORAGE_RANGED_GET_CHUNK_SIZE = int(
+    os.getenv("STORAGE_RANGED_GET_CHUNK_SIZE", str(8 * 1024 * 1024))
+)
+STORAGE_RANGED_GET_WORKERS = int(os.getenv("STORAGE_RANGED_GET_WORKERS", "4"))
+STORAGE_LOCAL_CACHE_DIR = os.getenv(
+    "STORAGE_LOCAL_CACHE_DIR", "/tmp/hestia-storage-cache"
+)
+STORAGE_LOCAL_CACHE_MAX_BYTES = int(
+    os.getenv("STORAGE_LOCAL_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+
 # Media URL configuration
 if AWS_S3_CUSTOM_DOMAIN:
     MEDIA_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/"
@@ -252,8 +274,13 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Permettre de surcharger via variables d'environnement pour les tests
 USE_MAILHOG = os.environ.get("USE_MAILHOG", "").lower() == "true"
+# Un fichier .eml par email (tests, développement sans MailHog)
+EMAIL_FILE_PATH = os.environ.get("EMAIL_FILE_PATH", "")
 
-if USE_MAILHOG:
+if EMAIL_FILE_PATH:
+    EMAIL_BACKEND = "email_outbox.backends.EmlFileBackend"
+    DEFAULT_FROM_EMAIL = "Hestia - Test <contact@hestia.software>"
+elif USE_MAILHOG:
     # Mode test avec MailHog (prioritaire sur DEBUG)
     EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
     EMAIL_HOST = os.environ.get("EMAIL_HOST", "localhost")
@@ -346,6 +373,37 @@ CACHES = {
 }
 
 
+# Encadrement des loyers : index STRtree des zones en mémoire (voir rent_control/spatial_index.py)
+RENT_CONTROL_INDEX_ENABLED = os.getenv("RENT_CONTROL_INDEX_ENABLED", "True") == "True"
+# Intervalle (s) de relecture de la version de l'index en cache (invalidation)
+RENT_CONTROL_INDEX_CHECK_INTERVAL = int(
+    os.getenv("RENT_CONTROL_INDEX_CHECK_INTERVAL", "30")
+)
+
+# Statut zone tendue / permis de louer : commune résolue localement (voir
+# rent_control/zone_status.py), API BAN utilisée seulement en fallback
+ZONE_STATUS_BAN_FALLBACK = os.getenv("ZONE_STATUS_BAN_FALLBACK", "True") == "True"
+
+# Vérification de zones par lot (voir rent_control/zone_batch.py) : budget en
+# nombre de points par utilisateur et par fenêtre, plutôt qu'une limite par point
+ZONE_BATCH_MAX_POINTS = int(os.getenv("ZONE_BATCH_MAX_POINTS", "1000"))
+ZONE_BATCH_POINTS_BUDGET = int(os.getenv("ZONE_BATCH_POINTS_BUDGET", "5000"))
+ZONE_BATCH_BUDGET_WINDOW = int(os.getenv("ZONE_BATCH_BUDGET_WINDOW", "3600"))
+# Taille des paquets résolus ensemble (une jointure spatiale par paquet)
+ZONE_BATCH_CHUNK_SIZE = int(os.getenv("ZONE_BATCH_CHUNK_SIZE", "200"))
+# Appels BAN (séquentiels, 10 s de timeout chacun) par paquet pour les points
+# hors référentiel communes ; au-delà, l'item est renvoyé en erreur
+ZONE_BATCH_BAN_FALLBACK_MAX = int(os.getenv("ZONE_BATCH_BAN_FALLBACK_MAX", "10"))
+
+# Tuiles des zones d'encadrement (voir rent_control/tiles.py)
+RENT_CONTROL_TILE_MAX_ZOOM = int(os.getenv("RENT_CONTROL_TILE_MAX_ZOOM", "18"))
+# Cache serveur : clé versionnée, invalidée à chaque import des zones
+RENT_CONTROL_TILE_CACHE_TIMEOUT = int(
+    os.getenv("RENT_CONTROL_TILE_CACHE_TIMEOUT", str(7 * 24 * 3600))
+)
+# Cache navigateur (Cache-Control max-age), revalidé ensuite par ETag
+RENT_CONTROL_TILE_MAX_AGE = int(os.getenv("RENT_CONTROL_TILE_MAX_AGE", "3600"))
+
 # 👉 Très important pour Railway ou tout proxy HTTPS
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
@@ -360,16 +418,106 @@ SIRENE_API_KEY = os.getenv("SIRENE_API_KEY")
 CA_CERT_PATH = str(BASE_DIR / "certificates" / "hestia_certificate_authority.pem")
 CA_KEY_PATH = str(BASE_DIR / "certificates" / "hestia_certificate_authority.key")
 PASSWORD_CERT_CA = os.getenv("PASSWORD_CERT_CA")
+# Clés RSA utilisateurs pré-générées par process (voir signature/user_signer_pool.py)
+USER_SIGNER_KEY_POOL_SIZE = int(os.getenv("USER_SIGNER_KEY_POOL_SIZE", "4"))
 
 # Time Stamping Authority (TSA) Hestia - Timestamps PDF signatures
 TSA_CERT_PATH = str(BASE_DIR / "certificates" / "hestia_tsa.pem")
 TSA_KEY_PATH = str(BASE_DIR / "certificates" / "hestia_tsa.key")
 PASSWORD_CERT_TSA = os.getenv("PASSWORD_CERT_TSA")
+# Moteur TSA : "native" (signature en process) ou "openssl" (sous-process historique)
+TSA_ENGINE = os.getenv("TSA_ENGINE", "native")
+# Nombre de serials TSA réservés par INSERT (voir TsaSerial.allocate_block)
+TSA_SERIAL_BLOCK_SIZE = int(os.getenv("TSA_SERIAL_BLOCK_SIZE", "50"))
 
 # Server Certificate - Main signature certificate
 # Test: hestia_server.pfx (self-signed)
 # Production: hestia_server.pfx (CertEurope qualified certificate)
+SERVER_CERT_PATH = str(BASE_DIR / "certificates" / "hestia_server.pfx")
 PASSWORD_CERT_SERVER = os.getenv("PASSWORD_CERT_SERVER")
+# Intervalle (s) entre deux vérifications des certificats sur disque (hot reload)
+SIGNING_CONTEXT_RELOAD_INTERVAL = int(
+    os.getenv("SIGNING_CONTEXT_RELOAD_INTERVAL", "10")
+)
+
+
+# ============================================================================
+# PDF Jobs (génération asynchrone, voir pdf_jobs/)
+# ============================================================================
+PDF_JOBS_WORKERS = int(os.getenv("PDF_JOBS_WORKERS", "2"))
+PDF_JOBS_MAX_ATTEMPTS = int(os.getenv("PDF_JOBS_MAX_ATTEMPTS", "5"))
+PDF_JOBS_POLL_INTERVAL = float(os.getenv("PDF_JOBS_POLL_INTERVAL", "1"))
+# Backoff exponentiel (secondes) sur erreurs de stockage transitoires
+PDF_JOBS_RETRY_BASE_DELAY = int(os.getenv("PDF_JOBS_RETRY_BASE_DELAY", "10"))
+PDF_JOBS_RETRY_MAX_DELAY = int(os.getenv("PDF_JOBS_RETRY_MAX_DELAY", "300"))
+# Un job RUNNING sans nouvelles depuis ce délai est remis en file
+PDF_JOBS_STALE_TIMEOUT = int(os.getenv("PDF_JOBS_STALE_TIMEOUT", "600"))
+
+
+# ============================================================================
+# Email outbox (envoi asynchrone par lots, voir email_outbox/)
+# ============================================================================
+# Désactivé : EmailService.send() envoie pendant la requête (sans worker).
+# N'activer qu'avec un process "python manage.py run_email_workers" déployé à
+# côté de gunicorn (le Dockerfile ne lance que gunicorn) : sinon rien ne part
+EMAIL_OUTBOX_ENABLED = os.getenv("EMAIL_OUTBOX_ENABLED", "false").lower() == "true"
+EMAIL_OUTBOX_WORKERS = int(os.getenv("EMAIL_OUTBOX_WORKERS", "1"))
+# Emails envoyés sur une même connexion SMTP
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+EMAIL_OUTBOX_POLL_INTERVAL = float(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", "1"))
+# Backoff exponentiel (secondes) sur erreurs SMTP transitoires (4xx, réseau)
+EMAIL_OUTBOX_RETRY_BASE_DELAY = int(os.getenv("EMAIL_OUTBOX_RETRY_BASE_DELAY", "30"))
+EMAIL_OUTBOX_RETRY_MAX_DELAY = int(os.getenv("EMAIL_OUTBOX_RETRY_MAX_DELAY", "1800"))
+# Un email SENDING sans nouvelles depuis ce délai est remis en file
+EMAIL_OUTBOX_STALE_TIMEOUT = int(os.getenv("EMAIL_OUTBOX_STALE_TIMEOUT", "300"))
+
+# Photos d'état des lieux dans les PDF (voir etat_lieux/photo_renditions.py)
+EDL_PHOTO_FETCH_WORKERS = int(os.getenv("EDL_PHOTO_FETCH_WORKERS", "8"))
+# Grand côté max (px) : vignettes de 200×150 px CSS imprimées à ~300 dpi
+EDL_PHOTO_RENDITION_MAX_PX = int(os.getenv("EDL_PHOTO_RENDITION_MAX_PX", "640"))
+EDL_PHOTO_RENDITION_QUALITY = int(os.getenv("EDL_PHOTO_RENDITION_QUALITY", "80"))
+EDL_PHOTO_RENDITION_CACHE_TIMEOUT = int(
+    os.getenv("EDL_PHOTO_RENDITION_CACHE_TIMEOUT", str(30 * 24 * 3600))
+)
+# Dérivation à l'upload (voir etat_lieux/photo_derivation.py)
+EDL_PHOTO_DERIVATION_WORKERS = int(os.getenv("EDL_PHOTO_DERIVATION_WORKERS", "2"))
+EDL_PHOTO_PREVIEW_MAX_PX = int(os.getenv("EDL_PHOTO_PREVIEW_MAX_PX", "320"))
+EDL_PHOTO_PREVIEW_QUALITY = int(os.getenv("EDL_PHOTO_PREVIEW_QUALITY", "70"))
+
+# Liste des documents d'une location (voir location/services/document_index.py)
+# Doit rester bien inférieur à AWS_QUERYSTRING_EXPIRE (URLs signées en cache)
+LOCATION_DOCUMENTS_CACHE_TIMEOUT = int(
+    os.getenv("LOCATION_DOCUMENTS_CACHE_TIMEOUT", "3600")
+)
+
+# Sources des prix de l'encadrement (voir algo/encadrement_loyer/fetch.py)
+# Cache disque des réponses KML / API : imports relancés et CI sans réseau.
+# Hors de l'arborescence du code ; réponses retéléchargées après MAX_AGE
+# secondes (import_prices --refresh pour tout retélécharger)
+RENT_SOURCES_CACHE_DIR = os.getenv(
+    "RENT_SOURCES_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "hestia-rent-sources"),
+)
+RENT_SOURCES_CACHE_MAX_AGE = int(
+    os.getenv("RENT_SOURCES_CACHE_MAX_AGE", str(7 * 24 * 3600))
+)
+RENT_SOURCES_FETCH_WORKERS = int(os.getenv("RENT_SOURCES_FETCH_WORKERS", "8"))
+RENT_SOURCES_FETCH_RETRIES = int(os.getenv("RENT_SOURCES_FETCH_RETRIES", "3"))
+# Cache uniquement : une réponse absente fait échouer la combinaison
+RENT_SOURCES_OFFLINE = os.getenv("RENT_SOURCES_OFFLINE", "False") == "True"
+
+# Rendu WeasyPrint partagé par process (voir backend/pdf_rendering.py)
+# Ressources externes mémorisées par worker (feuilles et fichiers de police)
+PDF_RENDER_CACHED_URL_PREFIXES = [
+    prefix.strip()
+    for prefix in os.getenv(
+        "PDF_RENDER_CACHED_URL_PREFIXES",
+        "https://fonts.googleapis.com/,https://fonts.gstatic.com/",
+    ).split(",")
+    if prefix.strip()
+]
+PDF_RENDER_CACHE_MAX_ENTRIES = int(os.getenv("PDF_RENDER_CACHE_MAX_ENTRIES", "64"))
 
 
 # ============================================================================
@@ -395,6 +543,12 @@ GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY", "")
 MILA_API_URL = os.getenv("MILA_API_URL")
 MILA_API_USERNAME = os.getenv("MILA_API_USERNAME")
 MILA_API_PASSWORD = os.getenv("MILA_API_PASSWORD")
+# Connexions keep-alive par process (voir partenaires/services/mila/http.py)
+MILA_HTTP_POOL_SIZE = int(os.getenv("MILA_HTTP_POOL_SIZE", "10"))
+# Token partagé via CACHES : durée max (s) du refresh par un seul worker
+MILA_TOKEN_REFRESH_LOCK_TIMEOUT = int(
+    os.getenv("MILA_TOKEN_REFRESH_LOCK_TIMEOUT", "10")
+)
 
 # =============================================================================
 # Stripe API (Paiements et abonnements)
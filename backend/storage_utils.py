@@ -4,16 +4,30 @@ Utilities for handling file storage operations with S3-compatible storage
 This module provides helpers to download/upload files from/to S3 storage
 (Cloudflare R2 in production, MinIO in development).
 
-Particularly useful for processing PDFs with pyhanko which requires local files.
+Transfers are streamed (STORAGE_COPY_BUFFER_SIZE chunks, parallel ranged GETs
+for big objects) through a hashing tee, so the SHA-256 of a document is known
+as soon as it has been downloaded or uploaded. Recently used objects are kept
+in a per-worker LRU disk cache keyed by storage name + ETag: signing the same
+document again only costs a HEAD request.
 """
 
+import hashlib
+import io
 import logging
 import os
+import shutil
 import tempfile
+import threading
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
 from typing import Optional
 
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotoConnectionError
+from django.conf import settings
 from django.core.files.base import File
 from django.db.models.fields.files import FieldFile
 
@@ -61,13 +75,419 @@ def truncate_filename(filename: str, max_length: int = 200) -> str:
     return truncated_stem + suffix
 
 
+class HashingTee:
+    """
+    File-like wrapper computing the SHA-256 of the bytes flowing through it.
+
+    Reads and writes are forwarded to the wrapped stream, which must be at its
+    start. Only the first pass over each byte is hashed: storage backends that
+    rewind the stream (checksums, retries) don't corrupt the digest.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self._sha256 = hashlib.sha256()
+        self._position = 0
+        self._hashed = 0
+        self.complete = True
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    def _update(self, data):
+        end = self._position + len(data)
+        if self._position <= self._hashed < end:
+            self._sha256.update(memoryview(data)[self._hashed - self._position :])
+            self._hashed = end
+        elif self._position > self._hashed:
+            # Bytes skipped by a forward seek: the digest can't be trusted
+            self.complete = False
+        self._position = end
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self._update(data)
+        return data
+
+    def write(self, data):
+        written = self.file.write(data)
+        self._update(data)
+        return written
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        self._position = self.file.seek(offset, whence)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def hexdigest(self) -> str:
+        if not self.complete:
+            raise ValueError("Stream was not read sequentially, SHA-256 unavailable")
+        return self._sha256.hexdigest()
+
+
+def copy_stream(source, destination, buffer_size: Optional[int] = None) -> int:
+    """
+    Copy a binary stream in STORAGE_COPY_BUFFER_SIZE chunks.
+
+    Returns:
+        int: Number of bytes copied
+    """
+    buffer_size = buffer_size or settings.STORAGE_COPY_BUFFER_SIZE
+    copied = 0
+    while chunk := source.read(buffer_size):
+        destination.write(chunk)
+        copied += len(chunk)
+    return copied
+
+
+def hash_stream(source, buffer_size: Optional[int] = None) -> str:
+    """SHA-256 (hex) of a binary stream, read in STORAGE_COPY_BUFFER_SIZE chunks."""
+    buffer_size = buffer_size or settings.STORAGE_COPY_BUFFER_SIZE
+    sha256 = hashlib.sha256()
+    while chunk := source.read(buffer_size):
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _s3_location(storage, name):
+    """(client, bucket, key) for django-storages S3 backends, None otherwise."""
+    bucket_name = getattr(storage, "bucket_name", None)
+    if not bucket_name or not hasattr(storage, "connection"):
+        return None
+
+    from storages.utils import clean_name
+
+    return (
+        storage.connection.meta.client,
+        bucket_name,
+        storage._normalize_name(clean_name(name)),
+    )
+
+
+def _ranged_download(client, bucket, key, size, etag, destination):
+    """
+    Download an object with parallel ranged GETs, written in order.
+
+    At most 2 × STORAGE_RANGED_GET_WORKERS parts are held in memory. The ETag
+    is checked on every part (If-Match) so a concurrent overwrite fails the
+    download instead of mixing two versions.
+    """
+    chunk_size = settings.STORAGE_RANGED_GET_CHUNK_SIZE
+    workers = settings.STORAGE_RANGED_GET_WORKERS
+    ranges = (
+        (start, min(start + chunk_size, size) - 1)
+        for start in range(0, size, chunk_size)
+    )
+
+    def fetch(byte_range):
+        params = {"Bucket": bucket, "Key": key, "Range": "bytes={}-{}".format(*byte_range)}
+        if etag:
+            params["IfMatch"] = f'"{etag}"'
+        body = client.get_object(**params)["Body"]
+        try:
+            return body.read()
+        finally:
+            body.close()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="storage-get") as executor:
+        pending = deque(executor.submit(fetch, r) for r in islice(ranges, workers * 2))
+        while pending:
+            destination.write(pending.popleft().result())
+            next_range = next(ranges, None)
+            if next_range is not None:
+                pending.append(executor.submit(fetch, next_range))
+
+
+def stat_storage_object(storage, name):
+    """
+    Size and ETag of an S3 object (one HEAD request).
+
+    Returns:
+        tuple: (size, etag), or None for non-S3 storages
+    """
+    location = _s3_location(storage, name)
+    if location is None:
+        return None
+
+    client, bucket, key = location
+    head = client.head_object(Bucket=bucket, Key=key)
+    return head["ContentLength"], head["ETag"].strip('"')
+
+
+def download_storage_object(storage, name, destination, size=None, etag=None) -> str:
+    """
+    Stream a storage object into `destination`, hashing it on the way.
+
+    Objects above STORAGE_RANGED_GET_THRESHOLD are fetched with parallel
+    ranged GETs (S3 backends only, size required).
+
+    Returns:
+        str: SHA-256 of the content (hex)
+    """
+    tee = HashingTee(destination)
+    location = _s3_location(storage, name)
+
+    if location and size and size >= settings.STORAGE_RANGED_GET_THRESHOLD:
+        logger.info(f"Ranged download of {name} ({size // 1024} KB)")
+        _ranged_download(*location, size, etag, tee)
+    else:
+        with storage.open(name, "rb") as f:
+            copy_stream(f, tee)
+
+    return tee.hexdigest()
+
+
+CachedObject = namedtuple("CachedObject", ["path", "size", "sha256"])
+
+
+class LocalObjectCache:
+    """
+    LRU cache of storage objects on local disk, private to the current process.
+
+    Each worker owns a directory (<root>/<pid>), recreated after fork;
+    directories of dead workers are purged when a new one is created.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._pid = None
+        self._directory = None
+        self._entries = OrderedDict()
+        self._size = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _ensure_directory(self):
+        # Appelé sous self._lock
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._entries = OrderedDict()
+            self._size = 0
+            self._directory = os.path.join(self.root, str(self._pid))
+            shutil.rmtree(self._directory, ignore_errors=True)
+            os.makedirs(self._directory, exist_ok=True)
+            self._purge_dead_workers()
+        return self._directory
+
+    def _purge_dead_workers(self):
+        for entry in os.listdir(self.root):
+            if not entry.isdigit() or int(entry) == self._pid:
+                continue
+            try:
+                os.kill(int(entry), 0)
+            except ProcessLookupError:
+                shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
+            except OSError:
+                pass
+
+    @staticmethod
+    def make_key(storage, name, etag):
+        storage_id = f"{type(storage).__module__}.{type(storage).__name__}"
+        return hashlib.sha256(f"{storage_id}:{name}:{etag}".encode()).hexdigest()
+
+    def get(self, key) -> Optional[CachedObject]:
+        with self._lock:
+            self._ensure_directory()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not os.path.exists(entry.path):
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def temporary_path(self) -> str:
+        """Download target inside the cache directory (same filesystem as entries)."""
+        with self._lock:
+            directory = self._ensure_directory()
+        fd, path = tempfile.mkstemp(dir=directory, suffix=".part")
+        os.close(fd)
+        return path
+
+    def put(self, key, temporary_path, size, sha256) -> CachedObject:
+        """Move a downloaded file into the cache, evicting least recently used entries."""
+        with self._lock:
+            path = os.path.join(self._ensure_directory(), key)
+            os.replace(temporary_path, path)
+            if key in self._entries:
+                self._discard(key, remove_file=False)
+            entry = CachedObject(path, size, sha256)
+            self._entries[key] = entry
+            self._size += size
+
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+            return entry
+
+    def _discard(self, key, remove_file=True):
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+        if remove_file:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+_local_cache = LocalObjectCache(
+    settings.STORAGE_LOCAL_CACHE_DIR, settings.STORAGE_LOCAL_CACHE_MAX_BYTES
+)
+
+
+def _cached_storage_object(storage, name) -> Optional[CachedObject]:
+    """
+    Local copy of an S3 object, downloaded at most once per ETag.
+
+    Returns None when caching does not apply (cache disabled, non-S3 storage,
+    object bigger than the cache) or the local disk fails.
+    """
+    if not _local_cache.enabled:
+        return None
+
+    stat = stat_storage_object(storage, name)
+    if stat is None:
+        return None
+    size, etag = stat
+    if size > _local_cache.max_bytes:
+        return None
+
+    key = LocalObjectCache.make_key(storage, name, etag)
+    entry = _local_cache.get(key)
+    if entry is not None:
+        logger.info(f"Local cache hit: {name}")
+        return entry
+
+    try:
+        temporary_path = _local_cache.temporary_path()
+    except OSError as e:
+        logger.warning(f"Local storage cache unavailable: {e}")
+        return None
+
+    try:
+        with open(temporary_path, "wb") as f:
+            sha256 = download_storage_object(storage, name, f, size=size, etag=etag)
+        return _local_cache.put(key, temporary_path, size, sha256)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+def copy_storage_object(field_file: FieldFile, destination) -> str:
+    """
+    Write the content of a stored file into `destination`, from the local
+    cache when possible.
+
+    Returns:
+        str: SHA-256 of the content (hex)
+    """
+    storage, name = field_file.storage, field_file.name
+    entry = _cached_storage_object(storage, name)
+    if entry is not None:
+        try:
+            with open(entry.path, "rb") as f:
+                copy_stream(f, destination)
+            return entry.sha256
+        except FileNotFoundError:
+            # Evicted by another thread in the meantime
+            pass
+
+    return download_storage_object(storage, name, destination)
+
+
+def read_storage_object(field_file: FieldFile):
+    """
+    Load a stored file in memory.
+
+    Returns:
+        tuple: (io.BytesIO positioned at 0, SHA-256 hex)
+    """
+    buffer = io.BytesIO()
+    sha256 = copy_storage_object(field_file, buffer)
+    buffer.seek(0)
+    return buffer, sha256
+
+
+def save_stream_to_storage(
+    field_file: FieldFile,
+    filename: str,
+    source,
+    save: bool = True,
+    cache_locally: bool = False,
+) -> str:
+    """
+    Upload a seekable binary stream, hashing it on the way.
+
+    Args:
+        field_file: Django FieldFile instance to save to
+        filename: Name given to the stored file
+        source: Seekable binary stream (BytesIO, open file...)
+        save: Whether to call save() on the model (default: True)
+        cache_locally: Also keep the uploaded content in the local cache
+            (documents read back soon, e.g. the next signature)
+
+    Returns:
+        str: SHA-256 of the uploaded content (hex)
+    """
+    source.seek(0)
+    tee = HashingTee(source)
+    field_file.save(filename, File(tee), save=save)
+
+    if tee.complete:
+        sha256 = tee.hexdigest()
+    else:
+        # Backend skipped through the stream: hash it again
+        source.seek(0)
+        sha256 = hash_stream(source)
+
+    if cache_locally:
+        try:
+            _cache_uploaded_object(field_file, source, sha256)
+        except Exception as e:
+            logger.warning(f"Uploaded file not cached locally: {e}")
+
+    return sha256
+
+
+def _cache_uploaded_object(field_file, source, sha256):
+    if not _local_cache.enabled:
+        return
+    stat = stat_storage_object(field_file.storage, field_file.name)
+    if stat is None or stat[0] > _local_cache.max_bytes:
+        return
+
+    size, etag = stat
+    temporary_path = _local_cache.temporary_path()
+    try:
+        source.seek(0)
+        with open(temporary_path, "wb") as f:
+            copy_stream(source, f)
+        _local_cache.put(
+            LocalObjectCache.make_key(field_file.storage, field_file.name, etag),
+            temporary_path,
+            size,
+            sha256,
+        )
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
 @contextmanager
 def get_local_file_path(field_file: FieldFile, suffix: str = ".pdf"):
     """
     Context manager to download a file from S3 to a temporary local path.
 
-    Downloads the file from S3-compatible storage (R2/MinIO) to /tmp/,
-    yields the local path for processing, then cleans up automatically.
+    Streams the file from S3-compatible storage (R2/MinIO), or from the local
+    object cache, to /tmp/, yields the local path for processing, then cleans
+    up automatically. The temporary copy is private to the caller.
 
     Usage:
         with get_local_file_path(document.pdf) as local_path:
@@ -84,15 +504,16 @@ def get_local_file_path(field_file: FieldFile, suffix: str = ".pdf"):
     if not field_file:
         raise ValueError("FieldFile is empty or None")
 
-    # Download from S3 to temporary file
     logger.info(f"Downloading file from S3: {field_file.name}")
 
     with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-        # Read from S3 and write to temp file
-        field_file.open("rb")
-        tmp.write(field_file.read())
-        field_file.close()
         tmp_path = tmp.name
+        try:
+            copy_storage_object(field_file, tmp)
+        except BaseException:
+            tmp.close()
+            os.remove(tmp_path)
+            raise
 
     logger.info(f"Downloaded to temporary file: {tmp_path}")
 
@@ -132,7 +553,7 @@ def save_file_to_storage(
     logger.info(f"Saving file to storage: {filename}")
 
     with open(local_path, "rb") as f:
-        field_file.save(filename, File(f), save=save)
+        save_stream_to_storage(field_file, filename, f, save=save)
 
     logger.info(f"File saved successfully: {filename}")
 
@@ -190,3 +611,41 @@ def process_pdf_with_storage(
                 logger.info(f"Cleaned up output file: {output_path}")
         except OSError as e:
             logger.warning(f"Failed to remove output file {output_path}: {e}")
+
+
+# S3 error codes worth retrying (throttling / temporary unavailability)
+TRANSIENT_S3_ERROR_CODES = {
+    "InternalError",
+    "RequestTimeout",
+    "RequestTimeTooSkewed",
+    "ServiceUnavailable",
+    "SlowDown",
+    "Throttling",
+}
+
+
+def is_transient_storage_error(exc: BaseException) -> bool:
+    """
+    Tell whether a storage error (R2/MinIO/S3) is transient and worth retrying.
+
+    Network failures, timeouts and 5xx/throttling responses are transient;
+    missing files, permission errors and invalid requests are not.
+
+    Args:
+        exc: Exception raised while talking to the storage backend
+
+    Returns:
+        bool: True if the operation can be retried later
+    """
+    if isinstance(exc, (BotoConnectionError, HTTPClientError)):
+        return True
+
+    if isinstance(exc, ClientError):
+        error = exc.response.get("Error", {})
+        status_code = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        return error.get("Code") in TRANSIENT_S3_ERROR_CODES or (
+            status_code is not None and status_code >= 500
+        )
+
+    # Built-in network errors (socket reset, timeout...) but not FileNotFoundError & co
+    return isinstance(exc, (ConnectionError, TimeoutError))
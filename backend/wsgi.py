@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 
 application = get_wsgi_application()
+
+# Charge les certificats Hestia (signer AATL, trust roots, TSA) dès le boot du worker
+from signature.signing_context import warm_up_signing_context  # noqa: E402
+
+warm_up_signing_context()
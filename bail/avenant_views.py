@@ -6,21 +6,20 @@ import json
 import logging
 from datetime import date
 
-from django.core.files.base import ContentFile
 from django.http import HttpResponse, QueryDict
 from django.template.loader import render_to_string
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from weasyprint import HTML
 
+from backend.storage_utils import read_storage_object
 from location.serializers import FranceAvenantSerializer
 from location.services.form_handlers.form_orchestrator import FormOrchestrator
 from location.types.form_state import ExtendFormState
-from signature.certification_flow import certify_document_hestia
 from signature.document_status import DocumentStatus
 from signature.document_types import SignableDocumentType
+from signature.pdf_processing import render_signable_pdf
 
 from .models import (
     Avenant,
@@ -217,11 +216,6 @@ def generate_avenant_pdf(request, avenant_id):
 
     GET /api/avenant/{avenant_id}/pdf/
     """
-    import os
-    import uuid
-
-    from signature.pdf_processing import prepare_pdf_with_signature_fields_generic
-
     # 1. Valider accès
     avenant, error = get_avenant_with_access_check(avenant_id, request.user.email)
     if error:
@@ -267,64 +261,21 @@ def generate_avenant_pdf(request, avenant_id):
         "date_generation": date.today(),
     }
 
-    # 3. Générer le PDF HTML
+    # 3. Générer le HTML
     html_content = render_to_string("pdf/bail/avenant.html", context)
-    pdf_bytes = HTML(
-        string=html_content, base_url=request.build_absolute_uri()
-    ).write_pdf()
-
-    # 4. Ajouter les champs de signature et sauvegarder
-    base_filename = f"avenant_{avenant.id}_{uuid.uuid4().hex}"
-    pdf_filename = f"{base_filename}.pdf"
-    tmp_pdf_path = f"/tmp/{pdf_filename}"
-
-    try:
-        # Sauver temporairement
-        with open(tmp_pdf_path, "wb") as f:
-            f.write(pdf_bytes)
-
-        # Ajouter les champs de signature
-        prepare_pdf_with_signature_fields_generic(tmp_pdf_path, avenant)
 
-        # Certifier avec Hestia (optionnel)
-        try:
-            certified_pdf_path = tmp_pdf_path.replace(".pdf", "_certified.pdf")
-            certify_document_hestia(
-                source_path=tmp_pdf_path,
-                output_path=certified_pdf_path,
-                document_type=SignableDocumentType.AVENANT.value,
-            )
-            tmp_pdf_path = certified_pdf_path
-            logger.info(f"✅ Avenant {avenant.id} certifié Hestia avec succès")
-        except FileNotFoundError as e:
-            logger.warning(f"⚠️ Certificat Hestia AATL manquant (mode dev) : {e}")
-        except ValueError as e:
-            logger.warning(f"⚠️ PASSWORD_CERT_SERVER manquant : {e}")
-        except Exception as e:
-            logger.error(f"❌ Erreur certification Hestia : {e}")
-
-        # Recharger le PDF final
-        with open(tmp_pdf_path, "rb") as f:
-            final_pdf_content = f.read()
-
-        # Sauvegarder dans avenant.pdf
-        avenant.pdf.save(
-            f"avenant_{avenant.id}_{avenant.numero}.pdf",
-            ContentFile(final_pdf_content),
-            save=True,
-        )
-
-    finally:
-        # Nettoyer les fichiers temporaires
-        for temp_file in [
-            tmp_pdf_path,
-            tmp_pdf_path.replace("_certified.pdf", ".pdf"),
-        ]:
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-            except Exception as e:
-                logger.warning(f"Impossible de supprimer {temp_file}: {e}")
+    # 4. PDF, champs de signature, certification et sauvegarde dans avenant.pdf
+    # (PDF existant réutilisé si l'avenant n'a pas changé)
+    final_pdf_content = render_signable_pdf(
+        avenant,
+        SignableDocumentType.AVENANT.value,
+        html_content,
+        f"avenant_{avenant.id}_{avenant.numero}.pdf",
+        base_url=request.build_absolute_uri(),
+    )
+    if final_pdf_content is None:
+        pdf_buffer, _ = read_storage_object(avenant.pdf)
+        final_pdf_content = pdf_buffer.getvalue()
 
     response = HttpResponse(final_pdf_content, content_type="application/pdf")
     response["Content-Disposition"] = f'inline; filename="avenant_{avenant.numero}.pdf"'
@@ -0,0 +1,141 @@
+"""
+Management command pour mesurer la latence de bout en bout de la génération
+d'un bail : rendu WeasyPrint → champs de signature → certification → upload.
+
+Compare l'ancien pipeline par fichiers /tmp (écriture, réécriture pour les
+champs, second fichier certifié, relecture complète) au pipeline en mémoire
+(finalize_generated_pdf). Les PDF sont envoyés sous benchmarks/ dans le
+stockage par défaut puis supprimés : le bail n'est pas modifié.
+
+Usage:
+    python manage.py benchmark_bail_pdf --bail=<uuid>
+    python manage.py benchmark_bail_pdf --bail=<uuid> --count=20 --skip-upload
+"""
+
+import os
+import statistics
+import time
+import uuid
+
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+
+from backend.pdf_rendering import render_pdf
+from bail.models import Bail
+from bail.views import build_bail_pdf_context
+from signature.certification_flow import certify_document_hestia, certify_pdf_buffer
+from signature.document_types import SignableDocumentType
+from signature.pdf_processing import (
+    add_signature_fields_for_document,
+    prepare_pdf_with_signature_fields_generic,
+)
+
+DOCUMENT_TYPE = SignableDocumentType.BAIL.value
+
+
+def _percentile(values, ratio):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+class Command(BaseCommand):
+    help = "Benchmark génération de bail : pipeline fichiers /tmp vs en mémoire"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bail", required=True, help="UUID du bail à générer")
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=10,
+            help="Nombre de générations par pipeline (default: 10)",
+        )
+        parser.add_argument(
+            "--base-url",
+            default="http://localhost:8000/",
+            help="URL de base pour les ressources du template",
+        )
+        parser.add_argument(
+            "--skip-upload",
+            action="store_true",
+            help="Ne pas mesurer l'envoi au stockage",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            bail = Bail.objects.select_related("location__bien").get(id=options["bail"])
+        except (Bail.DoesNotExist, ValueError):
+            raise CommandError(f"Bail introuvable : {options['bail']}")
+
+        self.base_url = options["base_url"]
+        self.upload = not options["skip_upload"]
+        self.certified = True
+
+        # Échauffement (templates, polices, contexte de signature)
+        self.run_in_memory(bail)
+
+        results = {}
+        for label, pipeline in (
+            ("Fichiers /tmp", self.run_with_files),
+            ("En mémoire", self.run_in_memory),
+        ):
+            timings = []
+            for _ in range(options["count"]):
+                start = time.perf_counter()
+                pipeline(bail)
+                timings.append((time.perf_counter() - start) * 1000)
+            results[label] = timings
+            self.stdout.write(
+                f"⏱️ {label:14} : médiane {statistics.median(timings):7.1f} ms, "
+                f"p95 {_percentile(timings, 0.95):7.1f} ms"
+            )
+
+        before = statistics.median(results["Fichiers /tmp"])
+        after = statistics.median(results["En mémoire"])
+        self.stdout.write(f"📈 Gain médian : {before - after:.1f} ms (×{before / after:.2f})")
+        if not self.certified:
+            self.stdout.write(
+                self.style.WARNING("⚠️ Certificat Hestia indisponible : étape ignorée")
+            )
+
+    def render(self, bail):
+        html = render_to_string("pdf/bail/bail.html", build_bail_pdf_context(bail))
+        return render_pdf(html, base_url=self.base_url)
+
+    def store(self, content):
+        if not self.upload:
+            return
+        name = default_storage.save(f"benchmarks/bail_{uuid.uuid4().hex}.pdf", content)
+        default_storage.delete(name)
+
+    def run_with_files(self, bail):
+        """Ancien pipeline : deux fichiers /tmp et une relecture complète."""
+        pdf_bytes = self.render(bail)
+        tmp_pdf_path = f"/tmp/bail_{bail.id}_{uuid.uuid4().hex}.pdf"
+        certified_pdf_path = tmp_pdf_path.replace(".pdf", "_certified.pdf")
+        final_pdf_path = tmp_pdf_path
+        try:
+            with open(tmp_pdf_path, "wb") as f:
+                f.write(pdf_bytes)
+            prepare_pdf_with_signature_fields_generic(tmp_pdf_path, bail)
+            try:
+                certify_document_hestia(tmp_pdf_path, certified_pdf_path, DOCUMENT_TYPE)
+                final_pdf_path = certified_pdf_path
+            except Exception:
+                self.certified = False
+            with open(final_pdf_path, "rb") as f:
+                self.store(ContentFile(f.read()))
+        finally:
+            for temp_file in (tmp_pdf_path, certified_pdf_path):
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+
+    def run_in_memory(self, bail):
+        """Pipeline actuel : révisions incrémentales dans un BytesIO."""
+        pdf_buffer = add_signature_fields_for_document(self.render(bail), bail)
+        try:
+            pdf_buffer = certify_pdf_buffer(pdf_buffer, DOCUMENT_TYPE)
+        except Exception:
+            self.certified = False
+        self.store(File(pdf_buffer))
@@ -0,0 +1,54 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bail", "0014_alter_document_type_document"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="avenant",
+            name="pdf_fingerprint",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="SHA-256 du rendu ayant produit pdf (réutilisé si inchangé)",
+                max_length=64,
+                verbose_name="Empreinte du rendu PDF",
+            ),
+        ),
+        migrations.AddField(
+            model_name="bail",
+            name="pdf_fingerprint",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="SHA-256 du rendu ayant produit pdf (réutilisé si inchangé)",
+                max_length=64,
+                verbose_name="Empreinte du rendu PDF",
+            ),
+        ),
+        migrations.AddField(
+            model_name="historicalavenant",
+            name="pdf_fingerprint",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="SHA-256 du rendu ayant produit pdf (réutilisé si inchangé)",
+                max_length=64,
+                verbose_name="Empreinte du rendu PDF",
+            ),
+        ),
+        migrations.AddField(
+            model_name="historicalbail",
+            name="pdf_fingerprint",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="SHA-256 du rendu ayant produit pdf (réutilisé si inchangé)",
+                max_length=64,
+                verbose_name="Empreinte du rendu PDF",
+            ),
+        ),
+    ]
@@ -1,18 +1,15 @@
 import json
 import logging
-import os
 import uuid
 
 import requests
 from django.conf import settings
-from django.core.files.base import ContentFile
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.template.loader import render_to_string
 from pyproj import Transformer
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from weasyprint import HTML
 
 from backend.pdf_utils import (
     get_logo_pdf_base64_data_uri,
@@ -41,7 +38,7 @@ from location.services.access_utils import user_has_bien_access
 from rent_control.utils import get_rent_price_for_bien
 from signature.document_status import DocumentStatus
 from signature.document_types import SignableDocumentType
-from signature.pdf_processing import prepare_pdf_with_signature_fields_generic
+from signature.pdf_processing import render_signable_pdf
 from signature.views import (
     cancel_signature_generic,
     confirm_signature_generic,
@@ -57,9 +54,197 @@ _lambert_to_wgs84 = Transformer.from_crs("EPSG:2154", "EPSG:4326", always_xy=Tru
 INDICE_IRL = 145.78
 
 
+def build_bail_pdf_context(bail):
+    """
+    Construit le contexte du template pdf/bail/bail.html.
+
+    Args:
+        bail: Instance de Bail
+
+    Returns:
+        dict: Contexte complet pour render_to_string
+    """
+    # Vérifier si les documents annexes sont uploadés
+    has_reglement_copropriete_uploaded = Document.objects.filter(
+        bail=bail, type_document=DocumentType.REGLEMENT_COPROPRIETE
+    ).exists()
+    has_permis_de_louer_uploaded = Document.objects.filter(
+        bail=bail, type_document=DocumentType.PERMIS_DE_LOUER
+    ).exists()
+    has_diagnostic_uploaded = Document.objects.filter(
+        bail=bail, type_document=DocumentType.DIAGNOSTIC
+    ).exists()
+
+    # Vérifier si au moins un locataire a une caution requise
+    acte_de_cautionnement = bail.location.locataires.filter(
+        caution_requise=True
+    ).exists()
+
+    # Calculer une seule fois les données d'encadrement des loyers
+    encadrement_data = BailMapping.get_encadrement_loyers_data(bail)
+    zone_tendue_avec_loyer_encadre = bool(encadrement_data["prix_reference"])
+    # Récupérer les données du dernier loyer si disponibles
+    dernier_montant_loyer = None
+    dernier_loyer_periode_formatted = None
+    display_precedent_loyer = False
+    if hasattr(bail.location, "rent_terms") and bail.location.rent_terms:
+        rent_terms: RentTerms = bail.location.rent_terms
+        dernier_montant_loyer = rent_terms.dernier_montant_loyer
+        dernier_loyer_periode = rent_terms.dernier_loyer_periode
+        display_precedent_loyer = (
+            rent_terms.zone_tendue
+            and not rent_terms.premiere_mise_en_location
+            and rent_terms.locataire_derniers_18_mois
+            and dernier_montant_loyer
+            and dernier_loyer_periode
+        )
+
+        # Formater la période (YYYY-MM -> "Mois Année")
+        if dernier_loyer_periode:
+            from datetime import datetime
+
+            try:
+                date_obj = datetime.strptime(dernier_loyer_periode, "%Y-%m")
+                # Formater en français: "janvier 2024", "février 2024", etc.
+                mois_fr = [
+                    "janvier",
+                    "février",
+                    "mars",
+                    "avril",
+                    "mai",
+                    "juin",
+                    "juillet",
+                    "août",
+                    "septembre",
+                    "octobre",
+                    "novembre",
+                    "décembre",
+                ]
+                dernier_loyer_periode_formatted = (
+                    f"{mois_fr[date_obj.month - 1]} {date_obj.year}"
+                )
+            except ValueError:
+                # Si le format n'est pas valide, garder la valeur originale
+                dernier_loyer_periode_formatted = dernier_loyer_periode
+
+    # Calculer les honoraires du mandataire
+    honoraires_data = BailMapping.get_honoraires_mandataire_data(bail)
+
+    return {
+        "bail": bail,
+        "acte_de_cautionnement": acte_de_cautionnement,
+        "title_bail": BailMapping.title_bail(bail.location.bien),
+        "subtitle_bail": BailMapping.subtitle_bail(bail.location.bien),
+        "article_objet_du_contrat": BailMapping.article_objet_du_contrat(
+            bail.location.bien
+        ),
+        "article_duree_contrat": BailMapping.article_duree_contrat(
+            bail.location.bien
+        ),
+        "pieces_info": BailMapping.pieces_info(bail.location.bien),
+        "annexes_privatives_info": BailMapping.annexes_privatives_info(
+            bail.location.bien
+        ),
+        "annexes_collectives_info": BailMapping.annexes_collectives_info(
+            bail.location.bien
+        ),
+        "information_info": BailMapping.information_info(bail.location.bien),
+        "energy_info": BailMapping.energy_info(bail.location.bien),
+        "indice_irl": INDICE_IRL,
+        "display_precedent_loyer": display_precedent_loyer,
+        "zone_tendue_avec_loyer_encadre": zone_tendue_avec_loyer_encadre,
+        "prix_reference": encadrement_data["prix_reference"],
+        "prix_majore": encadrement_data["prix_majore"],
+        "complement_loyer": encadrement_data["complement_loyer"],
+        "justificatif_complement_loyer": bail.location.rent_terms.justificatif_complement_loyer
+        if hasattr(bail.location, "rent_terms")
+        else None,
+        "dernier_montant_loyer": dernier_montant_loyer,
+        "dernier_loyer_periode": dernier_loyer_periode_formatted,
+        "is_copropriete": BailMapping.is_copropriete(bail),
+        "potentiel_permis_de_louer": BailMapping.potentiel_permis_de_louer(bail),
+        "logo_base64_uri": get_logo_pdf_base64_data_uri(),
+        "honoraires_mandataire": honoraires_data,
+        "has_reglement_copropriete_uploaded": has_reglement_copropriete_uploaded,
+        "has_permis_de_louer_uploaded": has_permis_de_louer_uploaded,
+        "has_diagnostic_uploaded": has_diagnostic_uploaded,
+    }
+
+
+def get_existing_bail_pdf_data(bail):
+    """
+    IDEMPOTENCE: Si le bail est déjà SIGNING ou SIGNED, retourne les données
+    existantes (évite de recréer des signature requests en cas de refresh).
+
+    Returns:
+        dict | None: Données de réponse, ou None si le PDF doit être généré
+    """
+    if bail.status not in [DocumentStatus.SIGNING, DocumentStatus.SIGNED]:
+        return None
+
+    # Récupérer le linkToken du premier signataire non-signé (ou None si tous ont signé)
+    first_unsigned_req = (
+        bail.signature_requests.filter(signed=False).order_by("order").first()
+    )
+    link_token = str(first_unsigned_req.link_token) if first_unsigned_req else None
+
+    return {
+        "bailId": str(bail.id),
+        "pdfUrl": bail.pdf.url if bail.pdf else None,
+        "linkTokenFirstSigner": link_token,
+        "status": bail.status,
+        "alreadySigning": bail.status == DocumentStatus.SIGNING,
+        "alreadySigned": bail.status == DocumentStatus.SIGNED,
+    }
+
+
+def generate_and_store_bail_pdf(bail, base_url, user):
+    """
+    Rendu WeasyPrint → champs de signature → certification Hestia → upload,
+    puis création des demandes de signature. Un brouillon régénéré sans
+    modification garde son PDF (voir render_signable_pdf).
+
+    Appelé par la vue (mode synchrone) et par les workers pdf_jobs.
+
+    Args:
+        bail: Instance de Bail
+        base_url: URL de base pour la résolution des ressources du template
+        user: Utilisateur à l'origine de la génération
+
+    Returns:
+        dict: Données de réponse (bailId, pdfUrl, linkTokenFirstSigner)
+    """
+    # Générer le PDF depuis le template HTML
+    html = render_to_string("pdf/bail/bail.html", build_bail_pdf_context(bail))
+
+    pdf_filename = f"bail_{bail.id}_{uuid.uuid4().hex}.pdf"
+    render_signable_pdf(
+        bail, SignableDocumentType.BAIL.value, html, pdf_filename, base_url=base_url
+    )
+
+    create_signature_requests(bail, user=user)
+
+    first_sign_req = bail.signature_requests.order_by("order").first()
+
+    return {
+        "bailId": str(bail.id),
+        "pdfUrl": bail.pdf.url,
+        "linkTokenFirstSigner": str(first_sign_req.link_token),
+    }
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def generate_bail_pdf(request):
+    """
+    Génère le PDF du bail.
+
+    Body:
+        - bail_id: UUID du bail
+        - async: (optionnel) si true, la génération est confiée aux workers
+          pdf_jobs et la vue répond 202 avec un jobId à interroger via
+          GET /api/pdf_jobs/<job_id>/
+    """
     try:
         form_data = json.loads(request.body)
         bail_id = form_data.get("bail_id")
@@ -71,210 +256,34 @@ def generate_bail_pdf(request):
 
         bail = get_object_or_404(Bail, id=bail_id)
 
-        # IDEMPOTENCE: Si le bail est déjà SIGNING ou SIGNED, retourner les données existantes
-        # Cela évite de recréer des signature requests en cas de refresh de page
-        if bail.status in [DocumentStatus.SIGNING, DocumentStatus.SIGNED]:
-            # Récupérer le linkToken du premier signataire non-signé (ou None si tous ont signé)
-            first_unsigned_req = (
-                bail.signature_requests.filter(signed=False).order_by("order").first()
-            )
-            link_token = (
-                str(first_unsigned_req.link_token) if first_unsigned_req else None
-            )
+        existing_data = get_existing_bail_pdf_data(bail)
+        if existing_data:
+            return JsonResponse({"success": True, **existing_data})
+
+        if form_data.get("async"):
+            from pdf_jobs.broker import enqueue_pdf_job
 
+            job, created = enqueue_pdf_job(
+                document_type=SignableDocumentType.BAIL.value,
+                document_id=bail.id,
+                base_url=request.build_absolute_uri(),
+                user=request.user,
+            )
             return JsonResponse(
                 {
                     "success": True,
                     "bailId": str(bail.id),
-                    "pdfUrl": bail.pdf.url if bail.pdf else None,
-                    "linkTokenFirstSigner": link_token,
-                    "status": bail.status,
-                    "alreadySigning": bail.status == DocumentStatus.SIGNING,
-                    "alreadySigned": bail.status == DocumentStatus.SIGNED,
-                }
-            )
-
-        # Vérifier si les documents annexes sont uploadés
-        has_reglement_copropriete_uploaded = Document.objects.filter(
-            bail=bail, type_document=DocumentType.REGLEMENT_COPROPRIETE
-        ).exists()
-        has_permis_de_louer_uploaded = Document.objects.filter(
-            bail=bail, type_document=DocumentType.PERMIS_DE_LOUER
-        ).exists()
-        has_diagnostic_uploaded = Document.objects.filter(
-            bail=bail, type_document=DocumentType.DIAGNOSTIC
-        ).exists()
-
-        # Vérifier si au moins un locataire a une caution requise
-        acte_de_cautionnement = bail.location.locataires.filter(
-            caution_requise=True
-        ).exists()
-
-        # Calculer une seule fois les données d'encadrement des loyers
-        encadrement_data = BailMapping.get_encadrement_loyers_data(bail)
-        zone_tendue_avec_loyer_encadre = bool(encadrement_data["prix_reference"])
-        # Récupérer les données du dernier loyer si disponibles
-        dernier_montant_loyer = None
-        dernier_loyer_periode_formatted = None
-        display_precedent_loyer = False
-        if hasattr(bail.location, "rent_terms") and bail.location.rent_terms:
-            rent_terms: RentTerms = bail.location.rent_terms
-            dernier_montant_loyer = rent_terms.dernier_montant_loyer
-            dernier_loyer_periode = rent_terms.dernier_loyer_periode
-            display_precedent_loyer = (
-                rent_terms.zone_tendue
-                and not rent_terms.premiere_mise_en_location
-                and rent_terms.locataire_derniers_18_mois
-                and dernier_montant_loyer
-                and dernier_loyer_periode
+                    "jobId": str(job.id),
+                    "jobStatus": job.status,
+                    "alreadyQueued": not created,
+                },
+                status=202,
             )
 
-            # Formater la période (YYYY-MM -> "Mois Année")
-            if dernier_loyer_periode:
-                from datetime import datetime
-
-                try:
-                    date_obj = datetime.strptime(dernier_loyer_periode, "%Y-%m")
-                    # Formater en français: "janvier 2024", "février 2024", etc.
-                    mois_fr = [
-                        "janvier",
-                        "février",
-                        "mars",
-                        "avril",
-                        "mai",
-                        "juin",
-                        "juillet",
-                        "août",
-                        "septembre",
-                        "octobre",
-                        "novembre",
-                        "décembre",
-                    ]
-                    dernier_loyer_periode_formatted = (
-                        f"{mois_fr[date_obj.month - 1]} {date_obj.year}"
-                    )
-                except ValueError:
-                    # Si le format n'est pas valide, garder la valeur originale
-                    dernier_loyer_periode_formatted = dernier_loyer_periode
-
-        # Calculer les honoraires du mandataire
-        honoraires_data = BailMapping.get_honoraires_mandataire_data(bail)
-
-        # Générer le PDF depuis le template HTML
-        html = render_to_string(
-            "pdf/bail/bail.html",
-            {
-                "bail": bail,
-                "acte_de_cautionnement": acte_de_cautionnement,
-                "title_bail": BailMapping.title_bail(bail.location.bien),
-                "subtitle_bail": BailMapping.subtitle_bail(bail.location.bien),
-                "article_objet_du_contrat": BailMapping.article_objet_du_contrat(
-                    bail.location.bien
-                ),
-                "article_duree_contrat": BailMapping.article_duree_contrat(
-                    bail.location.bien
-                ),
-                "pieces_info": BailMapping.pieces_info(bail.location.bien),
-                "annexes_privatives_info": BailMapping.annexes_privatives_info(
-                    bail.location.bien
-                ),
-                "annexes_collectives_info": BailMapping.annexes_collectives_info(
-                    bail.location.bien
-                ),
-                "information_info": BailMapping.information_info(bail.location.bien),
-                "energy_info": BailMapping.energy_info(bail.location.bien),
-                "indice_irl": INDICE_IRL,
-                "display_precedent_loyer": display_precedent_loyer,
-                "zone_tendue_avec_loyer_encadre": zone_tendue_avec_loyer_encadre,
-                "prix_reference": encadrement_data["prix_reference"],
-                "prix_majore": encadrement_data["prix_majore"],
-                "complement_loyer": encadrement_data["complement_loyer"],
-                "justificatif_complement_loyer": bail.location.rent_terms.justificatif_complement_loyer
-                if hasattr(bail.location, "rent_terms")
-                else None,
-                "dernier_montant_loyer": dernier_montant_loyer,
-                "dernier_loyer_periode": dernier_loyer_periode_formatted,
-                "is_copropriete": BailMapping.is_copropriete(bail),
-                "potentiel_permis_de_louer": BailMapping.potentiel_permis_de_louer(
-                    bail
-                ),
-                "logo_base64_uri": get_logo_pdf_base64_data_uri(),
-                "honoraires_mandataire": honoraires_data,
-                "has_reglement_copropriete_uploaded": has_reglement_copropriete_uploaded,
-                "has_permis_de_louer_uploaded": has_permis_de_louer_uploaded,
-                "has_diagnostic_uploaded": has_diagnostic_uploaded,
-            },
-        )
-        pdf_bytes = HTML(
-            string=html,
-            base_url=request.build_absolute_uri(),
-        ).write_pdf()
-
-        # Noms de fichiers
-        base_filename = f"bail_{bail.id}_{uuid.uuid4().hex}"
-        pdf_filename = f"{base_filename}.pdf"
-        tmp_pdf_path = f"/tmp/{pdf_filename}"
-        try:
-            # 1. Sauver temporairement
-            with open(tmp_pdf_path, "wb") as f:
-                f.write(pdf_bytes)
-
-            # 2. Ajouter les champs de signature
-            # La fonction gère automatiquement le téléchargement depuis R2 si nécessaire
-            prepare_pdf_with_signature_fields_generic(tmp_pdf_path, bail)
-
-            # 3. ✅ NOUVEAU : Certifier avec Hestia (certify=True + DocMDP)
-            try:
-                from signature.certification_flow import certify_document_hestia
-
-                certified_pdf_path = tmp_pdf_path.replace(".pdf", "_certified.pdf")
-                certify_document_hestia(
-                    source_path=tmp_pdf_path,
-                    output_path=certified_pdf_path,
-                    document_type=SignableDocumentType.BAIL.value,
-                )
-
-                # Utiliser le PDF certifié au lieu du PDF vierge
-                tmp_pdf_path = certified_pdf_path
-                logger.info(f"✅ Bail {bail.id} certifié Hestia avec succès")
-            except FileNotFoundError as e:
-                logger.warning(f"⚠️ Certificat Hestia AATL manquant (mode dev) : {e}")
-                logger.warning("⚠️ PDF non certifié, continuons quand même")
-            except ValueError as e:
-                logger.warning(f"⚠️ PASSWORD_CERT_SERVER manquant : {e}")
-                logger.warning("⚠️ PDF non certifié, continuons quand même")
-            except Exception as e:
-                logger.error(f"❌ Erreur certification Hestia : {e}")
-                logger.error("⚠️ PDF non certifié, continuons quand même")
-
-            # 4. Recharger dans bail.pdf
-            with open(tmp_pdf_path, "rb") as f:
-                bail.pdf.save(pdf_filename, ContentFile(f.read()), save=True)
-
-        finally:
-            # 5. Supprimer les fichiers temporaires
-            for temp_file in [
-                tmp_pdf_path,
-                tmp_pdf_path.replace("_certified.pdf", ".pdf"),
-            ]:
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                except Exception as e:
-                    logger.warning(f"Impossible de supprimer {temp_file}: {e}")
-
-        create_signature_requests(bail, user=request.user)
-
-        first_sign_req = bail.signature_requests.order_by("order").first()
-
-        return JsonResponse(
-            {
-                "success": True,
-                "bailId": bail.id,
-                "pdfUrl": bail.pdf.url,
-                "linkTokenFirstSigner": str(first_sign_req.link_token),
-            }
+        data = generate_and_store_bail_pdf(
+            bail, request.build_absolute_uri(), request.user
         )
+        return JsonResponse({"success": True, **data})
 
     except Exception as e:
         logger.exception("Erreur lors de la génération du bail PDF")
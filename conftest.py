@@ -6,6 +6,8 @@ Ce fichier définit des fixtures réutilisables pour tous les tests.
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
 from rest_framework.test import APIClient
 from location.factories import (
     BienFactory,
@@ -45,6 +47,26 @@ def db_access(db):
     return db
 
 
+@pytest.fixture
+def locmem_cache():
+    """
+    Cache locmem vide à la place du cache Redis des settings.
+
+    Usage:
+        @pytest.mark.usefixtures("locmem_cache")
+        class TestSomething: ...
+    """
+    # override_settings ne décore que les SimpleTestCase : utilisé en contexte
+    with override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+    ):
+        # Le stockage locmem est partagé par process : vidé entre les tests
+        cache.clear()
+        yield cache
+
+
 # ==============================
 # FIXTURES API CLIENT
 # ==============================
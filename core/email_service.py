@@ -2,7 +2,11 @@
 Service centralisé d'envoi d'emails avec templates MJML.
 
 Utilise mrml (Rust port de MJML) pour compiler les templates en HTML
-compatible avec tous les clients mail (Gmail, Outlook, etc.).
+compatible avec tous les clients mail (Gmail, Outlook, etc.). Les squelettes
+compilés sont mis en cache par template (voir core/mjml_cache.py).
+
+Avec EMAIL_OUTBOX_ENABLED, les emails sont enregistrés dans l'outbox (dans la
+transaction en cours) et envoyés par les workers (voir email_outbox/).
 """
 
 import logging
@@ -13,6 +17,9 @@ from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 
+from core.mjml_cache import get_mjml_skeleton
+from email_outbox.broker import enqueue_email
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,6 +43,11 @@ class EmailService:
         context.setdefault("logo_url", "https://hestia.software/icons/logo-hestia-whatsapp.png")
         context.setdefault("current_year", "2025")
 
+        # Squelette MJML déjà compilé : seules les variables sont rendues
+        skeleton = get_mjml_skeleton(template_path)
+        if skeleton is not None:
+            return skeleton.render(context)
+
         # Render le template Django (avec variables)
         mjml_content = render_to_string(template_path, context)
 
@@ -77,7 +89,7 @@ class EmailService:
             reply_to: Liste des emails pour réponse
 
         Returns:
-            True si envoyé avec succès, False sinon
+            True si envoyé (ou mis en file) avec succès, False sinon
         """
         if isinstance(to, str):
             to = [to]
@@ -86,11 +98,27 @@ class EmailService:
 
         try:
             html_content = EmailService.render_mjml(template_path, context)
+            text_content = EmailService._html_to_text(html_content)
+
+            if settings.EMAIL_OUTBOX_ENABLED:
+                # Envoi par les workers, après validation de la transaction
+                enqueue_email(
+                    to=to,
+                    subject=subject,
+                    text_body=text_content,
+                    html_body=html_content,
+                    from_email=from_email,
+                    cc=cc,
+                    bcc=bcc,
+                    reply_to=reply_to,
+                    template=template,
+                )
+                return True
 
             # Créer l'email avec version texte et HTML
             email = EmailMultiAlternatives(
                 subject=subject,
-                body=EmailService._html_to_text(html_content),
+                body=text_content,
                 from_email=from_email or settings.DEFAULT_FROM_EMAIL,
                 to=to,
                 cc=cc,
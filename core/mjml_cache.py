@@ -0,0 +1,138 @@
+"""
+Cache des squelettes MJML compilés.
+
+Compiler le MJML (mrml) à chaque envoi coûte plus cher que le rendu Django
+lui-même, alors que seules les variables changent d'un email à l'autre. On
+compile donc une fois par template et par process un "squelette" : les
+includes sont inlinés, chaque balise Django ({% %}, {{ }}, {# #}) est
+remplacée par un marqueur opaque le temps de la compilation mrml, puis
+restaurée. Le HTML obtenu est un template Django qu'il suffit de rendre.
+
+Le squelette est recompilé quand la date de modification d'un des fichiers
+sources (template et includes) change : pas de redémarrage après une
+modification de template.
+
+Les templates dont la structure ne s'y prête pas (extends/block, include
+dynamique, balise déplacée ou supprimée par mrml) retombent sur le rendu
+puis compilation à chaque envoi.
+"""
+
+import logging
+import os
+import re
+from collections import Counter
+
+import mrml
+from django.template import engines
+
+logger = logging.getLogger(__name__)
+
+INCLUDE_RE = re.compile(r'{%\s*include\s+"([^"]+)"\s*%}')
+LOAD_RE = re.compile(r"{%\s*load\s+[^%]+%}")
+DJANGO_TAG_RE = re.compile(r"{%.*?%}|{{.*?}}|{#.*?#}", re.S)
+UNSUPPORTED_TAG_RE = re.compile(r"{%\s*(extends|block|include)\b")
+PLACEHOLDER_RE = re.compile(r"DJTAG(\d{4})X")
+
+
+# template_path -> (fichiers sources, leurs mtimes, Template | None)
+_skeletons = {}
+
+
+def _template_file(template_path):
+    return engines["django"].get_template(template_path).origin.name
+
+
+def _template_source(template_path, files=None):
+    """
+    Source du template, relue sur disque : le loader Django en cache
+    renverrait l'ancienne version après une modification.
+    """
+    path = _template_file(template_path)
+    if files is not None:
+        files.append(path)
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _inline_includes(template_path, depth=0, files=None):
+    """Source du template avec les {% include "..." %} statiques inlinés."""
+    if depth > 10:
+        raise ValueError(f"Includes trop imbriqués dans {template_path}")
+    return INCLUDE_RE.sub(
+        lambda m: _inline_includes(m.group(1), depth + 1, files),
+        _template_source(template_path, files),
+    )
+
+
+def _mtimes(files):
+    try:
+        return tuple(os.stat(path).st_mtime_ns for path in files)
+    except OSError:
+        return None
+
+
+def compile_mjml_skeleton(template_path, files=None):
+    """
+    Compile le squelette MJML d'un template.
+
+    Args:
+        files: Liste complétée avec les fichiers sources lus (template, includes)
+
+    Returns:
+        str | None: Source du template Django HTML, ou None si le template
+        ne peut pas être précompilé
+    """
+    source = _inline_includes(template_path, files=files)
+    if UNSUPPORTED_TAG_RE.search(source):
+        return None
+
+    # {% load %} doit précéder les balises des bibliothèques chargées
+    loads = "".join(dict.fromkeys(LOAD_RE.findall(source)))
+    source = LOAD_RE.sub("", source)
+
+    tags = []
+
+    def protect(match):
+        tags.append(match.group(0))
+        return f"DJTAG{len(tags) - 1:04d}X"
+
+    result = mrml.to_html(DJANGO_TAG_RE.sub(protect, source))
+    for warning in result.warnings:
+        logger.warning(f"MJML warning ({template_path}): {warning}")
+
+    # Chaque balise doit ressortir, et seules les variables peuvent être
+    # dupliquées (mj-title est recopié dans <title>) : un {% if %} en double
+    # ou perdu changerait le rendu
+    found = Counter(int(index) for index in PLACEHOLDER_RE.findall(result.content))
+    if set(found) != set(range(len(tags))) or any(
+        count > 1 and not tags[index].startswith("{{")
+        for index, count in found.items()
+    ):
+        logger.warning(f"Squelette MJML non précompilable : {template_path}")
+        return None
+
+    return loads + PLACEHOLDER_RE.sub(lambda m: tags[int(m.group(1))], result.content)
+
+
+def get_mjml_skeleton(template_path):
+    """
+    Template Django du squelette compilé (mis en cache par process, recompilé
+    si un fichier source a été modifié).
+
+    Returns:
+        Template | None: None si le template doit être rendu puis compilé
+    """
+    cached = _skeletons.get(template_path)
+    if cached is not None and _mtimes(cached[0]) == cached[1]:
+        return cached[2]
+
+    files = []
+    try:
+        skeleton = compile_mjml_skeleton(template_path, files)
+    except Exception as e:
+        logger.warning(f"Squelette MJML indisponible pour {template_path}: {e}")
+        return None
+
+    template = engines["django"].from_string(skeleton) if skeleton else None
+    _skeletons[template_path] = (files, _mtimes(files), template)
+    return template
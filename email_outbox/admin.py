@@ -0,0 +1,38 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import OutboxEmail, OutboxEmailStatus
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "subject",
+        "template",
+        "status",
+        "attempts",
+        "locked_by",
+        "created_at",
+        "sent_at",
+    ]
+
+    list_filter = ["status", "template", "created_at"]
+
+    search_fields = ["subject", "to"]
+
+    readonly_fields = ["created_at", "updated_at", "sent_at", "error"]
+
+    list_per_page = 50
+
+    actions = ["retry_emails"]
+
+    def retry_emails(self, request, queryset):
+        updated = queryset.filter(status=OutboxEmailStatus.FAILED).update(
+            status=OutboxEmailStatus.PENDING,
+            attempts=0,
+            available_at=timezone.now(),
+        )
+        self.message_user(request, f"{updated} email(s) remis en file.")
+
+    retry_emails.short_description = "Relancer les emails en échec"
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class EmailOutboxConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "email_outbox"
+    verbose_name = "Envoi d'emails asynchrone"
@@ -0,0 +1,33 @@
+"""
+Backend email fichier pour les tests et le développement local.
+
+Chaque message est écrit dans son propre fichier .eml de EMAIL_FILE_PATH,
+lisible avec email.message_from_bytes() ou un client mail, contrairement au
+backend filebased de Django qui concatène les messages d'une connexion.
+
+Usage (settings ou variable d'environnement EMAIL_FILE_PATH):
+    EMAIL_BACKEND = "email_outbox.backends.EmlFileBackend"
+    EMAIL_FILE_PATH = "/tmp/hestia-emails"
+"""
+
+import os
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+
+
+class EmlFileBackend(BaseEmailBackend):
+    def __init__(self, *args, file_path=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.file_path = os.path.abspath(file_path or settings.EMAIL_FILE_PATH)
+        os.makedirs(self.file_path, exist_ok=True)
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            path = os.path.join(self.file_path, f"{timestamp}-{uuid.uuid4().hex[:8]}.eml")
+            with open(path, "wb") as f:
+                f.write(message.message().as_bytes())
+        return len(email_messages)
@@ -0,0 +1,197 @@
+"""
+Broker en base de données pour l'outbox email.
+
+Même principe que pdf_jobs/broker.py : PostgreSQL sert de file d'attente
+(SELECT ... FOR UPDATE SKIP LOCKED), mais les emails sont réservés par lots
+pour être envoyés sur une seule connexion SMTP.
+"""
+
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEmail, OutboxEmailStatus
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(
+    to,
+    subject,
+    text_body,
+    html_body="",
+    from_email=None,
+    cc=None,
+    bcc=None,
+    reply_to=None,
+    template="",
+):
+    """
+    Enregistre un email rendu dans l'outbox.
+
+    Pas de transaction propre : dans une vue ATOMIC ou un bloc
+    transaction.atomic(), l'email n'existe (et ne part) que si la
+    transaction de l'appelant est validée.
+
+    Returns:
+        OutboxEmail: Email en attente d'envoi
+    """
+    email = OutboxEmail.objects.create(
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        cc=list(cc or []),
+        bcc=list(bcc or []),
+        reply_to=list(reply_to or []),
+        subject=subject,
+        text_body=text_body,
+        html_body=html_body,
+        template=template,
+        available_at=timezone.now(),
+        max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    )
+    logger.info(f"📥 Email {email.id} en file : '{subject}' → {email.to}")
+    return email
+
+
+def claim_batch(worker_id, size=None):
+    """
+    Réserve un lot d'emails disponibles pour un worker.
+
+    Args:
+        worker_id: Identifiant du worker (stocké dans OutboxEmail.locked_by)
+        size: Taille max du lot (défaut: settings.EMAIL_OUTBOX_BATCH_SIZE)
+
+    Returns:
+        list[OutboxEmail]: Emails passés en SENDING (liste vide si file vide)
+    """
+    size = size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmailStatus.PENDING, available_at__lte=now)
+            .order_by("available_at", "created_at")[:size]
+        )
+        if not emails:
+            return []
+
+        OutboxEmail.objects.filter(id__in=[email.id for email in emails]).update(
+            status=OutboxEmailStatus.SENDING,
+            attempts=F("attempts") + 1,
+            locked_at=now,
+            locked_by=worker_id,
+            updated_at=now,
+        )
+
+    for email in emails:
+        email.status = OutboxEmailStatus.SENDING
+        email.attempts += 1
+        email.locked_at = now
+        email.locked_by = worker_id
+    return emails
+
+
+def mark_emails_sent(emails):
+    """Enregistre l'envoi d'un lot d'emails (une seule requête UPDATE)."""
+    if not emails:
+        return
+    now = timezone.now()
+    OutboxEmail.objects.filter(id__in=[email.id for email in emails]).update(
+        status=OutboxEmailStatus.SENT,
+        error="",
+        sent_at=now,
+        locked_at=None,
+        locked_by="",
+        updated_at=now,
+    )
+
+
+def is_transient_smtp_error(error):
+    """
+    Indique si une erreur d'envoi mérite un nouvel essai.
+
+    Les réponses SMTP 4xx (greylisting, quota) et les erreurs réseau sont
+    transitoires ; les 5xx (destinataire inconnu, message refusé) ne le sont pas.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPException, OSError))
+
+
+def get_retry_delay(attempts):
+    """Backoff exponentiel plafonné : base, 2×base, 4×base... ≤ max."""
+    delay = settings.EMAIL_OUTBOX_RETRY_BASE_DELAY * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_RETRY_MAX_DELAY))
+
+
+def mark_email_failed(email, error, retryable=False):
+    """
+    Enregistre l'échec d'un email et le replanifie si l'erreur est transitoire.
+
+    Returns:
+        bool: True si l'email a été replanifié, False s'il est définitivement en échec
+    """
+    email.error = str(error)
+    email.locked_at = None
+    email.locked_by = ""
+
+    if retryable and email.attempts < email.max_attempts:
+        email.status = OutboxEmailStatus.PENDING
+        email.available_at = timezone.now() + get_retry_delay(email.attempts)
+        email.save(
+            update_fields=[
+                "status",
+                "error",
+                "available_at",
+                "locked_at",
+                "locked_by",
+                "updated_at",
+            ]
+        )
+        logger.warning(
+            f"🔁 Email {email.id} replanifié (tentative {email.attempts}/{email.max_attempts}) : {error}"
+        )
+        return True
+
+    email.status = OutboxEmailStatus.FAILED
+    email.save(
+        update_fields=["status", "error", "locked_at", "locked_by", "updated_at"]
+    )
+    logger.error(f"❌ Email {email.id} '{email.subject}' en échec définitif : {error}")
+    return False
+
+
+def requeue_stale_emails(timeout=None):
+    """
+    Remet en file les emails SENDING dont le worker a disparu.
+
+    Un email peut alors partir deux fois si le worker est mort entre l'envoi
+    SMTP et l'enregistrement : on préfère un doublon à un email perdu.
+
+    Returns:
+        int: Nombre d'emails remis en file ou passés en échec
+    """
+    timeout = timeout if timeout is not None else settings.EMAIL_OUTBOX_STALE_TIMEOUT
+    limit = timezone.now() - timedelta(seconds=timeout)
+    count = 0
+
+    with transaction.atomic():
+        stale_emails = OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+            status=OutboxEmailStatus.SENDING, locked_at__lt=limit
+        )
+        for email in stale_emails:
+            mark_email_failed(
+                email,
+                f"Worker {email.locked_by} sans réponse depuis {timeout}s",
+                retryable=True,
+            )
+            count += 1
+
+    return count
@@ -0,0 +1,171 @@
+"""
+Management command pour mesurer le débit de l'envoi d'emails.
+
+Deux mesures :
+- rendu d'un template MJML : rendu Django + compilation mrml à chaque email
+  (ancien EmailService.render_mjml) vs squelette compilé en cache ;
+- envoi de --count emails : une connexion par email (ancien
+  EmailService.send) vs outbox (mise en file puis envoi par lots sur une
+  connexion). Les emails de la mesure outbox sont annulés (rollback).
+
+Sans --backend, le backend configuré est utilisé : lancer avec MailHog
+(USE_MAILHOG=true) pour mesurer le coût réel des connexions SMTP.
+
+Usage:
+    python manage.py benchmark_email_outbox
+    python manage.py benchmark_email_outbox --count=500 --batch-size=100
+    python manage.py benchmark_email_outbox --template=locataire/quittance/nouvelle
+    python manage.py benchmark_email_outbox --backend=django.core.mail.backends.locmem.EmailBackend
+"""
+
+import time
+
+import mrml
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.loader import render_to_string
+
+from core.email_service import EmailService
+from core.mjml_cache import get_mjml_skeleton
+from email_outbox.broker import enqueue_email
+from email_outbox.worker import deliver_batch
+
+SAMPLE_CONTEXT = {
+    "prenom": "Camille",
+    "document_type": "bail",
+    "adresse": "12 rue des Lilas, 75011 Paris",
+    "role": "locataire",
+    "otp": "123456",
+    "signature_url": "https://hestia.software/signature/abc",
+    "lien_espace": "https://hestia.software/mon-compte",
+    "lien_services": "https://hestia.software/me-notifier",
+    "mois": "Janvier",
+    "annee": 2026,
+    "montant_total": "850.00",
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark rendu MJML et envoi d'emails : synchrone vs outbox par lots"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=200,
+            help="Nombre d'emails envoyés par mode (default: 200)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help=f"Emails par connexion (default: {settings.EMAIL_OUTBOX_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--template",
+            default="common/post_signature",
+            help="Template MJML rendu (default: common/post_signature)",
+        )
+        parser.add_argument(
+            "--to",
+            default="benchmark@hestia.software",
+            help="Destinataire des emails de test",
+        )
+        parser.add_argument(
+            "--backend",
+            help="Backend email (default: settings.EMAIL_BACKEND)",
+        )
+
+    def handle(self, *args, **options):
+        count = max(1, options["count"])
+        template_path = f"emails/{options['template']}.mjml"
+
+        self.benchmark_render(template_path, count)
+
+        backend = options["backend"] or settings.EMAIL_BACKEND
+        self.stdout.write(f"📮 Backend : {backend}")
+        html = EmailService.render_mjml(template_path, dict(SAMPLE_CONTEXT))
+        text = EmailService._html_to_text(html)
+
+        # Ancien comportement : une connexion par email, pendant la requête
+        start = time.perf_counter()
+        for i in range(count):
+            message = EmailMultiAlternatives(
+                subject=f"Benchmark {i}",
+                body=text,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[options["to"]],
+                connection=get_connection(backend),
+            )
+            message.attach_alternative(html, "text/html")
+            message.send()
+        sync_elapsed = time.perf_counter() - start
+        self.report("Synchrone", count, sync_elapsed)
+
+        with transaction.atomic():
+            start = time.perf_counter()
+            emails = [
+                enqueue_email(
+                    to=[options["to"]],
+                    subject=f"Benchmark {i}",
+                    text_body=text,
+                    html_body=html,
+                    template=options["template"],
+                )
+                for i in range(count)
+            ]
+            enqueue_elapsed = time.perf_counter() - start
+
+            # Lots formés directement : claim_batch() réserverait aussi les
+            # vrais emails en attente
+            batch_size = max(1, options["batch_size"])
+            start = time.perf_counter()
+            sent = 0
+            for i in range(0, count, batch_size):
+                sent += deliver_batch(
+                    emails[i : i + batch_size], get_connection(backend)
+                )
+            outbox_elapsed = time.perf_counter() - start
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"📥 Mise en file : {enqueue_elapsed / count * 1000:.2f} ms/email "
+            f"(coût restant dans la requête)"
+        )
+        self.report(f"Outbox (lots de {batch_size})", sent, outbox_elapsed)
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Débit ×{sync_elapsed / outbox_elapsed:.2f}")
+        )
+
+    def benchmark_render(self, template_path, count):
+        context = dict(SAMPLE_CONTEXT)
+        EmailService.render_mjml(template_path, context)  # defaults du contexte
+
+        start = time.perf_counter()
+        for _ in range(count):
+            mrml.to_html(render_to_string(template_path, context))
+        compile_ms = (time.perf_counter() - start) / count * 1000
+
+        skeleton = get_mjml_skeleton(template_path)
+        if skeleton is None:
+            self.stdout.write(f"⚠️ {template_path} : squelette non précompilable")
+            return
+
+        start = time.perf_counter()
+        for _ in range(count):
+            skeleton.render(context)
+        skeleton_ms = (time.perf_counter() - start) / count * 1000
+
+        self.stdout.write(
+            f"⏱️ Rendu {template_path} : compilation {compile_ms:.2f} ms, "
+            f"squelette {skeleton_ms:.2f} ms, ×{compile_ms / skeleton_ms:.2f}"
+        )
+
+    def report(self, label, count, elapsed):
+        self.stdout.write(
+            f"📨 {label:24} : {count} emails en {elapsed:.2f}s, "
+            f"{count / elapsed:.0f} emails/s"
+        )
@@ -0,0 +1,119 @@
+"""
+Management command pour lancer les workers d'envoi d'emails (outbox).
+
+Usage:
+    python manage.py run_email_workers
+    python manage.py run_email_workers --workers=2 --batch-size=100
+    python manage.py run_email_workers --once   # vide la file puis s'arrête
+"""
+
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from email_outbox.broker import requeue_stale_emails
+from email_outbox.worker import run_worker
+
+
+def _worker_main(index, batch_size, exit_when_empty):
+    """Point d'entrée d'un process worker (après fork)."""
+    stop = {"requested": False}
+
+    def handle_stop(signum, frame):
+        # Arrêt propre : on termine le lot en cours avant de sortir
+        stop["requested"] = True
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    run_worker(
+        worker_id,
+        should_stop=lambda: stop["requested"],
+        batch_size=batch_size,
+        exit_when_empty=exit_when_empty,
+    )
+
+
+class Command(BaseCommand):
+    help = "Lance les workers d'envoi des emails en file (outbox)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.EMAIL_OUTBOX_WORKERS,
+            help=f"Nombre de process workers (default: {settings.EMAIL_OUTBOX_WORKERS})",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help=f"Emails envoyés par connexion SMTP (default: {settings.EMAIL_OUTBOX_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Envoyer les emails disponibles puis s'arrêter",
+        )
+
+    def handle(self, *args, **options):
+        num_workers = max(1, options["workers"])
+        batch_size = max(1, options["batch_size"])
+        exit_when_empty = options["once"]
+
+        requeued = requeue_stale_emails()
+        if requeued:
+            self.stdout.write(f"🔁 {requeued} email(s) abandonné(s) remis en file")
+
+        # Les connexions DB ne doivent pas être partagées entre process
+        connections.close_all()
+
+        ctx = multiprocessing.get_context("fork")
+        processes = [
+            ctx.Process(
+                target=_worker_main,
+                args=(i, batch_size, exit_when_empty),
+                daemon=False,
+            )
+            for i in range(num_workers)
+        ]
+        for process in processes:
+            process.start()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ {num_workers} worker(s) email démarré(s)")
+        )
+
+        stop = {"requested": False}
+
+        def handle_stop(signum, frame):
+            stop["requested"] = True
+
+        signal.signal(signal.SIGTERM, handle_stop)
+        signal.signal(signal.SIGINT, handle_stop)
+
+        last_requeue = time.monotonic()
+        while any(p.is_alive() for p in processes):
+            if stop["requested"]:
+                for process in processes:
+                    if process.is_alive():
+                        process.terminate()  # SIGTERM → fin du lot en cours
+                break
+
+            if time.monotonic() - last_requeue > settings.EMAIL_OUTBOX_STALE_TIMEOUT / 2:
+                requeue_stale_emails()
+                last_requeue = time.monotonic()
+
+            time.sleep(1)
+
+        for process in processes:
+            process.join()
+
+        self.stdout.write("👋 Workers email arrêtés")
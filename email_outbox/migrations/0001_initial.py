@@ -0,0 +1,83 @@
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxEmail",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("from_email", models.CharField(max_length=255)),
+                ("to", models.JSONField(default=list)),
+                ("cc", models.JSONField(blank=True, default=list)),
+                ("bcc", models.JSONField(blank=True, default=list)),
+                ("reply_to", models.JSONField(blank=True, default=list)),
+                ("subject", models.CharField(max_length=500)),
+                ("text_body", models.TextField()),
+                ("html_body", models.TextField(blank=True)),
+                (
+                    "template",
+                    models.CharField(
+                        blank=True,
+                        help_text="Template MJML (ex: bailleur/relance_j1)",
+                        max_length=200,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "En attente"),
+                            ("sending", "En cours d'envoi"),
+                            ("sent", "Envoyé"),
+                            ("failed", "Échec"),
+                        ],
+                        db_index=True,
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("max_attempts", models.PositiveIntegerField(default=5)),
+                (
+                    "available_at",
+                    models.DateTimeField(
+                        help_text=(
+                            "L'email ne peut pas être réservé "
+                            "avant cette date (backoff)"
+                        )
+                    ),
+                ),
+                ("locked_at", models.DateTimeField(blank=True, null=True)),
+                ("locked_by", models.CharField(blank=True, max_length=100)),
+                ("error", models.TextField(blank=True)),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Email en file",
+                "verbose_name_plural": "Emails en file",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "available_at"],
+                        name="email_outbo_status_ab9e11_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,86 @@
+"""
+Modèles pour l'envoi asynchrone des emails (outbox).
+
+EmailService.send() enregistre l'email déjà rendu dans la table OutboxEmail,
+dans la transaction de la requête : un email n'est envoyé que si la
+transaction est validée. Les workers réservent les emails par lots via
+SELECT ... FOR UPDATE SKIP LOCKED et les envoient sur une seule connexion SMTP.
+"""
+
+from django.core.mail import EmailMultiAlternatives
+from django.db import models
+
+from location.models import BaseModel
+
+
+class OutboxEmailStatus(models.TextChoices):
+    PENDING = "pending", "En attente"
+    SENDING = "sending", "En cours d'envoi"
+    SENT = "sent", "Envoyé"
+    FAILED = "failed", "Échec"
+
+
+class OutboxEmail(BaseModel):
+    """Email rendu (HTML + texte) en attente d'envoi par un worker."""
+
+    # Message
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    subject = models.CharField(max_length=500)
+    text_body = models.TextField()
+    html_body = models.TextField(blank=True)
+    template = models.CharField(
+        max_length=200, blank=True, help_text="Template MJML (ex: bailleur/relance_j1)"
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=OutboxEmailStatus.choices,
+        default=OutboxEmailStatus.PENDING,
+        db_index=True,
+    )
+
+    # Retry (erreurs SMTP transitoires)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    available_at = models.DateTimeField(
+        help_text="L'email ne peut pas être réservé avant cette date (backoff)"
+    )
+
+    # Réservation par un worker
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+
+    # Résultat
+    error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Email en file"
+        verbose_name_plural = "Emails en file"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+        ]
+
+    def __str__(self):
+        return f"OutboxEmail '{self.subject}' → {', '.join(self.to)} ({self.status})"
+
+    def build_message(self, connection=None):
+        """Construit le message Django (texte + alternative HTML)."""
+        message = EmailMultiAlternatives(
+            subject=self.subject,
+            body=self.text_body,
+            from_email=self.from_email,
+            to=self.to,
+            cc=self.cc,
+            bcc=self.bcc,
+            reply_to=self.reply_to,
+            connection=connection,
+        )
+        if self.html_body:
+            message.attach_alternative(self.html_body, "text/html")
+        return message
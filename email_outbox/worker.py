@@ -0,0 +1,114 @@
+"""
+Boucle des workers email : réserve un lot, l'envoie sur une seule connexion
+SMTP, enregistre les envois et replanifie les échecs transitoires.
+"""
+
+import logging
+import smtplib
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import close_old_connections
+
+from .broker import (
+    claim_batch,
+    is_transient_smtp_error,
+    mark_email_failed,
+    mark_emails_sent,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _is_connection_lost(error):
+    """Erreur réseau ou déconnexion (SMTPException hérite aussi d'OSError)."""
+    return isinstance(error, smtplib.SMTPServerDisconnected) or (
+        isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+    )
+
+
+def deliver_batch(emails, connection=None):
+    """
+    Envoie un lot d'emails réservés en réutilisant une seule connexion.
+
+    Un échec n'interrompt pas le lot : l'email concerné est replanifié (ou
+    passé en échec) et les suivants partent normalement. Si le serveur coupe
+    la connexion, elle est rouverte pour l'email suivant.
+
+    Args:
+        emails: Emails réservés (claim_batch)
+        connection: Backend email déjà construit (défaut: settings.EMAIL_BACKEND)
+
+    Returns:
+        int: Nombre d'emails envoyés
+    """
+    connection = connection or get_connection(fail_silently=False)
+    sent = []
+
+    try:
+        for index, email in enumerate(emails):
+            try:
+                connection.open()
+            except Exception as e:
+                # Serveur injoignable : inutile d'essayer le reste du lot
+                logger.error(f"Connexion SMTP impossible : {e}")
+                for pending in emails[index:]:
+                    mark_email_failed(pending, e, retryable=is_transient_smtp_error(e))
+                break
+
+            try:
+                connection.send_messages([email.build_message(connection)])
+            except Exception as e:
+                logger.exception(f"Erreur lors de l'envoi de l'email {email.id}")
+                mark_email_failed(email, e, retryable=is_transient_smtp_error(e))
+                if _is_connection_lost(e):
+                    connection.close()
+                continue
+
+            sent.append(email)
+    finally:
+        connection.close()
+        mark_emails_sent(sent)
+
+    if sent:
+        logger.info(f"✅ {len(sent)}/{len(emails)} email(s) envoyé(s)")
+    return len(sent)
+
+
+def run_worker(
+    worker_id, should_stop, poll_interval=None, batch_size=None, exit_when_empty=False
+):
+    """
+    Dépile les emails par lots jusqu'à ce que should_stop() retourne True.
+
+    Args:
+        worker_id: Identifiant du worker (stocké dans OutboxEmail.locked_by)
+        should_stop: Callable sans argument, vérifié entre deux lots
+        poll_interval: Attente (secondes) quand la file est vide
+        batch_size: Nombre max d'emails par connexion SMTP
+        exit_when_empty: Sortir dès que la file est vide (mode --once)
+
+    Returns:
+        int: Nombre d'emails envoyés
+    """
+    poll_interval = (
+        poll_interval
+        if poll_interval is not None
+        else settings.EMAIL_OUTBOX_POLL_INTERVAL
+    )
+    sent = 0
+
+    while not should_stop():
+        close_old_connections()
+
+        emails = claim_batch(worker_id, batch_size)
+        if not emails:
+            if exit_when_empty:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        sent += deliver_batch(emails)
+
+    return sent
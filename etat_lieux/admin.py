@@ -394,11 +394,33 @@ class EtatLieuxPhotoAdmin(admin.ModelAdmin):
         "created_at",
         "updated_at",
         "image_preview",
+        "width",
+        "height",
+        "original_size",
+        "print_size",
+        "preview_size",
+        "derived_at",
     )
 
     fieldsets = (
         (None, {"fields": ("equipment", "photo_index")}),
         ("Fichier", {"fields": ("image", "image_preview", "nom_original")}),
+        (
+            "Renditions",
+            {
+                "fields": (
+                    "print_image",
+                    "preview_image",
+                    "width",
+                    "height",
+                    "original_size",
+                    "print_size",
+                    "preview_size",
+                    "derived_at",
+                ),
+                "classes": ("collapse",),
+            },
+        ),
         (
             "Métadonnées",
             {
@@ -421,7 +443,7 @@ class EtatLieuxPhotoAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="max-width: 200px; max-height: 200px;" />',
-                obj.image.url,
+                obj.preview_url,
             )
         return "Pas d'image"
 
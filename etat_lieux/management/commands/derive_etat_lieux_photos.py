@@ -0,0 +1,93 @@
+"""
+Management command pour dériver les renditions (impression + miniature) des
+photos d'état des lieux existantes, par lots traités en parallèle.
+
+Usage:
+    python manage.py derive_etat_lieux_photos
+    python manage.py derive_etat_lieux_photos --batch-size=200 --workers=8
+    python manage.py derive_etat_lieux_photos --force   # tout redériver
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from etat_lieux.models import EtatLieuxPhoto
+from etat_lieux.photo_derivation import derive_photo
+
+
+def _derive(photo, force):
+    try:
+        return derive_photo(photo, force=force), None
+    except Exception as e:
+        return False, e
+    finally:
+        # Connexion propre au thread du pool
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Dérive les renditions des photos d'état des lieux existantes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Nombre de photos chargées par lot (default: 100)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Photos traitées en parallèle (default: 8)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Redériver aussi les photos déjà traitées",
+        )
+
+    def handle(self, *args, **options):
+        force = options["force"]
+        photos = EtatLieuxPhoto.objects.exclude(image="").order_by("id")
+        if not force:
+            photos = photos.filter(derived_at__isnull=True)
+
+        total = photos.count()
+        self.stdout.write(f"📷 {total} photos à traiter")
+
+        start = time.perf_counter()
+        derived = failed = 0
+        last_id = None
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            while True:
+                # Pagination par id : les photos dérivées sortent du filtre
+                batch_qs = photos if last_id is None else photos.filter(id__gt=last_id)
+                batch = list(batch_qs[: options["batch_size"]])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+
+                for photo, (done, error) in zip(
+                    batch, executor.map(lambda p: _derive(p, force), batch)
+                ):
+                    if error is not None:
+                        failed += 1
+                        self.stdout.write(
+                            self.style.ERROR(f"❌ Photo {photo.id} : {error}")
+                        )
+                    elif done:
+                        derived += 1
+
+                self.stdout.write(f"  {derived + failed}/{total} traitées")
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {derived} photos dérivées, {failed} échecs en {elapsed:.1f}s"
+            )
+        )
@@ -0,0 +1,76 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("etat_lieux", "0008_alter_etatlieuxsignaturerequest_unique_together_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="etatlieuxphoto",
+            name="print_image",
+            field=models.ImageField(
+                blank=True,
+                help_text="Rendition d'impression (PDF)",
+                upload_to="etat_lieux_photos/print/",
+            ),
+        ),
+        migrations.AddField(
+            model_name="etatlieuxphoto",
+            name="preview_image",
+            field=models.ImageField(
+                blank=True,
+                help_text="Miniature pour les listes",
+                upload_to="etat_lieux_photos/preview/",
+            ),
+        ),
+        migrations.AddField(
+            model_name="etatlieuxphoto",
+            name="width",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Largeur de l'original (après orientation EXIF)",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="etatlieuxphoto",
+            name="height",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Hauteur de l'original (après orientation EXIF)",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="etatlieuxphoto",
+            name="original_size",
+            field=models.PositiveIntegerField(
+                blank=True, help_text="Taille de l'original (octets)", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="etatlieuxphoto",
+            name="print_size",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Taille de la rendition d'impression (octets)",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="etatlieuxphoto",
+            name="preview_size",
+            field=models.PositiveIntegerField(
+                blank=True, help_text="Taille de la miniature (octets)", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="etatlieuxphoto",
+            name="derived_at",
+            field=models.DateTimeField(
+                blank=True, help_text="Date de dérivation des renditions", null=True
+            ),
+        ),
+    ]
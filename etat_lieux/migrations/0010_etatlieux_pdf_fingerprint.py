@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("etat_lieux", "0009_etatlieuxphoto_renditions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="etatlieux",
+            name="pdf_fingerprint",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="SHA-256 du rendu ayant produit pdf (réutilisé si inchangé)",
+                max_length=64,
+                verbose_name="Empreinte du rendu PDF",
+            ),
+        ),
+        migrations.AddField(
+            model_name="historicaletatlieux",
+            name="pdf_fingerprint",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="SHA-256 du rendu ayant produit pdf (réutilisé si inchangé)",
+                max_length=64,
+                verbose_name="Empreinte du rendu PDF",
+            ),
+        ),
+    ]
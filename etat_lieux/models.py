@@ -131,16 +131,25 @@ class EtatLieux(DocumentAvecMandataireMixin, SignableDocumentMixin, BaseModel):
 
         return get_static_pdf_iframe_url(request, "bails/grille_vetuste.pdf")
 
-    def _format_equipment_data(self, equipment, include_date_entretien=False):
-        """Méthode commune pour formater les données d'un équipement"""
+    def _format_equipment_data(
+        self, equipment, include_date_entretien=False, photo_renditions=None
+    ):
+        """
+        Méthode commune pour formater les données d'un équipement.
+
+        photo_renditions (PhotoRenditions) : URLs edl-photo:// pour le rendu
+        PDF ; à défaut les photos sont converties en Base64.
+        """
         from etat_lieux.utils import StateEquipmentUtils
         from etat_lieux.views import image_to_base64_data_url
 
-        # Récupérer les photos de l'équipement et convertir en Base64 pour WeasyPrint
         photos = []
         for photo in equipment.photos.all():
             if photo.image:
-                photo_data_url = image_to_base64_data_url(photo.image)
+                if photo_renditions is not None:
+                    photo_data_url = photo_renditions.url(photo)
+                else:
+                    photo_data_url = image_to_base64_data_url(photo.image)
                 if photo_data_url:
                     photos.append(photo_data_url)
 
@@ -169,7 +178,7 @@ class EtatLieux(DocumentAvecMandataireMixin, SignableDocumentMixin, BaseModel):
 
         return formatted
 
-    def get_equipements_chauffage_formatted(self):
+    def get_equipements_chauffage_formatted(self, photo_renditions=None):
         """Prépare les données des équipements de chauffage pour l'affichage dans le PDF"""
         chaudieres = []
         chauffe_eaux = []
@@ -179,7 +188,9 @@ class EtatLieux(DocumentAvecMandataireMixin, SignableDocumentMixin, BaseModel):
             equipment_type=EquipmentType.CHAUFFAGE
         ):
             formatted = self._format_equipment_data(
-                equipment, include_date_entretien=True
+                equipment,
+                include_date_entretien=True,
+                photo_renditions=photo_renditions,
             )
 
             if equipment.equipment_key == "chaudiere":
@@ -193,14 +204,16 @@ class EtatLieux(DocumentAvecMandataireMixin, SignableDocumentMixin, BaseModel):
 
         return {"chaudieres": chaudieres, "chauffe_eaux": chauffe_eaux}
 
-    def get_annexes_privatives_formatted(self):
+    def get_annexes_privatives_formatted(self, photo_renditions=None):
         """Prépare les données des annexes privatives pour l'affichage dans le PDF"""
         formatted_annexes = {}
 
         # Récupérer tous les équipements d'annexes
         for equipment in self.equipements.filter(equipment_type=EquipmentType.ANNEXE):
             # Utiliser la méthode commune pour formater les données
-            formatted = self._format_equipment_data(equipment)
+            formatted = self._format_equipment_data(
+                equipment, photo_renditions=photo_renditions
+            )
 
             # Adapter le format pour les annexes (garder la compatibilité avec le template)
             formatted_annexes[equipment.equipment_key] = formatted
@@ -333,12 +346,47 @@ class EtatLieuxPhoto(BaseModel):
     # Métadonnées
     nom_original = models.CharField(max_length=255, help_text="Nom original du fichier")
 
+    # Renditions dérivées après l'upload (voir etat_lieux/photo_derivation.py)
+    print_image = models.ImageField(
+        upload_to="etat_lieux_photos/print/",
+        blank=True,
+        help_text="Rendition d'impression (PDF)",
+    )
+    preview_image = models.ImageField(
+        upload_to="etat_lieux_photos/preview/",
+        blank=True,
+        help_text="Miniature pour les listes",
+    )
+    width = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Largeur de l'original (après orientation EXIF)"
+    )
+    height = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Hauteur de l'original (après orientation EXIF)"
+    )
+    original_size = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Taille de l'original (octets)"
+    )
+    print_size = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Taille de la rendition d'impression (octets)"
+    )
+    preview_size = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Taille de la miniature (octets)"
+    )
+    derived_at = models.DateTimeField(
+        null=True, blank=True, help_text="Date de dérivation des renditions"
+    )
+
     class Meta:
         verbose_name = "Photo état des lieux"
         verbose_name_plural = "Photos état des lieux"
         ordering = ["equipment", "photo_index"]
         db_table = "etat_lieux_photo"
 
+    @property
+    def preview_url(self):
+        """Miniature si elle a été dérivée, sinon l'original."""
+        return self.preview_image.url if self.preview_image else self.image.url
+
     def __str__(self):
         if self.equipment:
             return (
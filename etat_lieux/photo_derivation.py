@@ -0,0 +1,174 @@
+"""
+Dérivation des photos d'état des lieux après l'upload.
+
+L'upload stocke la photo brute du téléphone (souvent 4 à 12 Mo) et chaque
+rendu PDF ou liste la retéléchargeait. Après l'upload, un pool de threads
+(hors du thread de requête) :
+- applique l'orientation EXIF
+- produit une rendition d'impression (JPEG, EDL_PHOTO_RENDITION_MAX_PX) et une
+  miniature (WebP, EDL_PHOTO_PREVIEW_MAX_PX)
+- enregistre dimensions et tailles sur EtatLieuxPhoto
+
+Les photos non dérivées (pool perdu au redémarrage, échec) restent
+utilisables : le rendu PDF retombe sur l'original. La commande
+derive_etat_lieux_photos rattrape l'existant.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from etat_lieux.photo_renditions import encode_rendition, open_oriented
+
+logger = logging.getLogger(__name__)
+
+try:
+    # Photos HEIC (iPhone) décodables si pillow-heif est installé
+    from pillow_heif import register_heif_opener
+
+    register_heif_opener()
+except ImportError:
+    pass
+
+
+def derive_photo_files(data):
+    """
+    Calcule les renditions d'une photo.
+
+    Args:
+        data: Contenu de l'original
+
+    Returns:
+        dict: width, height, print (bytes JPEG), preview (bytes WebP)
+    """
+    with open_oriented(data) as image:
+        return {
+            "width": image.width,
+            "height": image.height,
+            "print": encode_rendition(
+                image,
+                settings.EDL_PHOTO_RENDITION_MAX_PX,
+                quality=settings.EDL_PHOTO_RENDITION_QUALITY,
+            ),
+            "preview": encode_rendition(
+                image,
+                settings.EDL_PHOTO_PREVIEW_MAX_PX,
+                image_format="WEBP",
+                quality=settings.EDL_PHOTO_PREVIEW_QUALITY,
+            ),
+        }
+
+
+def derive_photo(photo, force=False):
+    """
+    Dérive et enregistre les renditions d'une photo.
+
+    Returns:
+        bool: True si la photo a été traitée
+    """
+    if not photo.image or (photo.derived_at and not force):
+        return False
+
+    with photo.image.storage.open(photo.image.name, "rb") as f:
+        data = f.read()
+    derived = derive_photo_files(data)
+
+    stem = os.path.splitext(os.path.basename(photo.image.name))[0]
+    old_files = [f for f in (photo.print_image, photo.preview_image) if f]
+
+    photo.print_image.save(f"{stem}.jpg", ContentFile(derived["print"]), save=False)
+    photo.preview_image.save(
+        f"{stem}.webp", ContentFile(derived["preview"]), save=False
+    )
+    photo.width = derived["width"]
+    photo.height = derived["height"]
+    photo.original_size = len(data)
+    photo.print_size = len(derived["print"])
+    photo.preview_size = len(derived["preview"])
+    photo.derived_at = timezone.now()
+    photo.save(
+        update_fields=[
+            "print_image",
+            "preview_image",
+            "width",
+            "height",
+            "original_size",
+            "print_size",
+            "preview_size",
+            "derived_at",
+            "updated_at",
+        ]
+    )
+
+    # Renditions précédentes (--force) : les nouveaux fichiers ont un autre nom
+    for old_file in old_files:
+        try:
+            old_file.storage.delete(old_file.name)
+        except Exception as e:
+            logger.warning(f"Impossible de supprimer {old_file.name}: {e}")
+
+    logger.info(
+        f"📷 Photo {photo.id} dérivée : {len(data) // 1024} Ko → "
+        f"{photo.print_size // 1024} Ko (impression), "
+        f"{photo.preview_size // 1024} Ko (miniature)"
+    )
+    return True
+
+
+def delete_photo_renditions(photo):
+    """Supprime les fichiers dérivés (avant suppression de la photo)."""
+    for field in (photo.print_image, photo.preview_image):
+        if field:
+            try:
+                field.delete(save=False)
+            except Exception as e:
+                logger.warning(f"Impossible de supprimer le fichier {field.name}: {e}")
+
+
+def _derive_photo_by_id(photo_id):
+    from etat_lieux.models import EtatLieuxPhoto
+
+    close_old_connections()
+    try:
+        photo = EtatLieuxPhoto.objects.filter(id=photo_id).first()
+        if photo is not None:
+            derive_photo(photo)
+    except Exception as e:
+        logger.warning(f"⚠️ Dérivation de la photo {photo_id} impossible : {e}")
+    finally:
+        # Connexion propre à ce thread du pool
+        connection.close()
+
+
+class PhotoDerivationPool:
+    """Pool de dérivation du process courant (recréé après fork)."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+
+    def submit(self, photo_id):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Threads du pool perdus au fork
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="edl-photo"
+                )
+            return self._executor.submit(_derive_photo_by_id, photo_id)
+
+
+_pool = PhotoDerivationPool(settings.EDL_PHOTO_DERIVATION_WORKERS)
+
+
+def schedule_photo_derivation(photo_id):
+    """Planifie la dérivation après le commit de la transaction courante."""
+    transaction.on_commit(lambda: _pool.submit(photo_id))
@@ -0,0 +1,184 @@
+"""
+Photos d'état des lieux pour le rendu PDF.
+
+Auparavant chaque photo était téléchargée en série depuis R2 (fichier
+temporaire) puis inlinée en Base64 en pleine résolution dans le HTML : 60
+photos = 60 allers-retours S3 séquentiels et un HTML de plusieurs dizaines de
+Mo pour WeasyPrint.
+
+Ici :
+- les photos sont téléchargées en parallèle (pool de EDL_PHOTO_FETCH_WORKERS
+  threads)
+- chacune est réduite à la résolution d'impression du template (les vignettes
+  font au plus 200×150 px CSS, soit ~625 px à 300 dpi) et recompressée en JPEG
+- la rendition est mise en cache par photo (id + nom du fichier), une
+  régénération du PDF ne retélécharge rien
+- le HTML ne référence que des URLs edl-photo://<id>, servies à WeasyPrint par
+  un url_fetcher dédié
+"""
+
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from PIL import Image, ImageOps
+from weasyprint import default_url_fetcher
+
+logger = logging.getLogger(__name__)
+
+URL_SCHEME = "edl-photo://"
+RENDITION_CACHE_KEY = "etat_lieux:photo_rendition:{}:{}:{}"
+
+
+def rendition_cache_key(photo):
+    # Le nom du fichier change si l'image est remplacée : la rendition aussi
+    return RENDITION_CACHE_KEY.format(
+        photo.pk, photo.image.name, settings.EDL_PHOTO_RENDITION_MAX_PX
+    )
+
+
+def open_oriented(data):
+    """Ouvre une image en appliquant son orientation EXIF (photos de téléphone)."""
+    image = Image.open(io.BytesIO(data))
+    return ImageOps.exif_transpose(image)
+
+
+def encode_rendition(image, max_px, image_format="JPEG", quality=80):
+    """
+    Réduit une image (déjà orientée) et la réencode.
+
+    Returns:
+        bytes: Image de max_px px maximum sur le grand côté
+    """
+    image = image.copy()
+    image.thumbnail((max_px, max_px), Image.Resampling.LANCZOS)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    output = io.BytesIO()
+    if image_format == "JPEG":
+        image.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(output, format=image_format, quality=quality)
+    return output.getvalue()
+
+
+def make_rendition(data):
+    """
+    Réduit une image à la résolution d'impression et la recompresse en JPEG.
+
+    Args:
+        data: Contenu de l'image originale
+
+    Returns:
+        bytes: JPEG de EDL_PHOTO_RENDITION_MAX_PX px maximum sur le grand côté
+    """
+    with open_oriented(data) as image:
+        return encode_rendition(
+            image,
+            settings.EDL_PHOTO_RENDITION_MAX_PX,
+            quality=settings.EDL_PHOTO_RENDITION_QUALITY,
+        )
+
+
+def fetch_rendition(photo):
+    """Rendition d'impression d'une photo, dérivée à l'upload si disponible."""
+    print_image = getattr(photo, "print_image", None)
+    if print_image:
+        # Déjà à la résolution d'impression (etat_lieux.photo_derivation)
+        with print_image.storage.open(print_image.name, "rb") as f:
+            return f.read()
+
+    # storage.open() plutôt que photo.image.open() : pas d'état partagé entre threads
+    with photo.image.storage.open(photo.image.name, "rb") as f:
+        data = f.read()
+    return make_rendition(data)
+
+
+class PhotoRenditions:
+    """Renditions des photos d'un document, servies à WeasyPrint."""
+
+    def __init__(self, renditions):
+        # Clé = id de la photo tel qu'il apparaît dans l'URL
+        self.renditions = {str(pk): data for pk, data in renditions.items()}
+
+    def __len__(self):
+        return len(self.renditions)
+
+    def digest(self):
+        """Empreinte de l'ensemble des renditions (le HTML ne contient que les ids)."""
+        digest = hashlib.sha256()
+        for pk in sorted(self.renditions):
+            digest.update(f"{pk}:".encode())
+            digest.update(hashlib.sha256(self.renditions[pk]).digest())
+        return digest.hexdigest()
+
+    def url(self, photo):
+        """URL à mettre dans le HTML, None si la photo n'a pas pu être traitée."""
+        if str(photo.pk) not in self.renditions:
+            return None
+        return f"{URL_SCHEME}{photo.pk}"
+
+    def url_fetcher(self, url, timeout=10, ssl_context=None):
+        if url.startswith(URL_SCHEME):
+            try:
+                data = self.renditions[url[len(URL_SCHEME) :]]
+            except KeyError:
+                raise ValueError(f"Photo inconnue : {url}")
+            return {"string": data, "mime_type": "image/jpeg"}
+        return default_url_fetcher(url, timeout=timeout, ssl_context=ssl_context)
+
+
+def load_photo_renditions(photos):
+    """
+    Renditions d'un ensemble de photos : cache d'abord (un seul get_many),
+    puis téléchargement parallèle des manquantes.
+
+    Args:
+        photos: Itérable d'instances ayant un ImageField `image`
+
+    Returns:
+        PhotoRenditions
+    """
+    photos = [photo for photo in photos if photo.image and photo.image.name]
+    if not photos:
+        return PhotoRenditions({})
+
+    keys = {rendition_cache_key(photo): photo for photo in photos}
+    try:
+        cached = cache.get_many(keys)
+    except Exception as e:
+        logger.warning(f"⚠️ Cache des photos illisible : {e}")
+        cached = {}
+
+    renditions = {keys[key].pk: data for key, data in cached.items()}
+    missing = [photo for photo in photos if photo.pk not in renditions]
+
+    if missing:
+        with ThreadPoolExecutor(
+            max_workers=min(settings.EDL_PHOTO_FETCH_WORKERS, len(missing))
+        ) as executor:
+            futures = {photo: executor.submit(fetch_rendition, photo) for photo in missing}
+
+        fetched = {}
+        for photo, future in futures.items():
+            try:
+                renditions[photo.pk] = future.result()
+            except Exception as e:
+                logger.warning(f"Impossible de traiter la photo {photo.image.name}: {e}")
+                continue
+            fetched[rendition_cache_key(photo)] = renditions[photo.pk]
+
+        try:
+            cache.set_many(fetched, timeout=settings.EDL_PHOTO_RENDITION_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"⚠️ Renditions de photos non mises en cache : {e}")
+
+    logger.info(
+        f"📷 {len(renditions)}/{len(photos)} photos prêtes "
+        f"({len(photos) - len(missing)} depuis le cache)"
+    )
+    return PhotoRenditions(renditions)
@@ -2,32 +2,38 @@ import base64
 import json
 import logging
 import mimetypes
-import os
 import uuid
+from collections import defaultdict
+from urllib.parse import urljoin
 
-from django.core.files.base import ContentFile
 from django.http import JsonResponse
 from django.template.loader import render_to_string
+from django.urls import reverse
 from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from weasyprint import HTML
 
 from backend.pdf_utils import get_logo_pdf_base64_data_uri, get_static_pdf_iframe_url
-from backend.storage_utils import get_local_file_path, truncate_filename
+from backend.storage_utils import read_storage_object, truncate_filename
 from etat_lieux.mapping import EtatDesLieuxMapping
 from etat_lieux.models import (
     EtatLieux,
     EtatLieuxEquipement,
+    EtatLieuxPhoto,
     EtatLieuxSignatureRequest,
 )
+from etat_lieux.photo_derivation import (
+    delete_photo_renditions,
+    schedule_photo_derivation,
+)
+from etat_lieux.photo_renditions import load_photo_renditions
 from etat_lieux.utils import (
     create_etat_lieux_from_form_data,
     create_etat_lieux_signature_requests,
 )
 from location.models import Bailleur, Bien, Locataire, Location
 from signature.document_types import SignableDocumentType
-from signature.pdf_processing import prepare_pdf_with_signature_fields_generic
+from signature.pdf_processing import render_signable_pdf
 from signature.views import (
     cancel_signature_generic,
     confirm_signature_generic,
@@ -87,22 +93,19 @@ def image_to_base64_data_url(image_field):
         return None
 
     try:
-        # Utiliser le helper pour gérer R2/local storage
-        with get_local_file_path(image_field) as local_path:
-            # Lire le contenu du fichier
-            with open(local_path, "rb") as img_file:
-                img_data = img_file.read()
+        # Lecture en mémoire depuis R2 (ou le cache local), sans fichier temporaire
+        img_data, _ = read_storage_object(image_field)
 
-            # Déterminer le type MIME
-            content_type, _ = mimetypes.guess_type(image_field.name)
-            if not content_type:
-                content_type = "image/jpeg"  # Fallback
+        # Déterminer le type MIME
+        content_type, _ = mimetypes.guess_type(image_field.name)
+        if not content_type:
+            content_type = "image/jpeg"  # Fallback
 
-            # Encoder en Base64
-            img_base64 = base64.b64encode(img_data).decode("utf-8")
+        # Encoder en Base64
+        img_base64 = base64.b64encode(img_data.getbuffer()).decode("utf-8")
 
-            # Retourner la data URL complète
-            return f"data:{content_type};base64,{img_base64}"
+        # Retourner la data URL complète
+        return f"data:{content_type};base64,{img_base64}"
 
     except Exception as e:
         logger.warning(
@@ -299,74 +302,10 @@ def update_or_create_etat_lieux(location_id, form_data, uploaded_photos, user):
     return etat_lieux
 
 
-def add_signature_fields_to_pdf(pdf_bytes, etat_lieux):
-    """
-    Ajoute les champs de signature à un PDF d'état des lieux.
-
-    Args:
-        pdf_bytes: Le contenu du PDF en bytes
-        etat_lieux: L'instance EtatLieux
-
-    Returns:
-        None (sauvegarde directement dans etat_lieux.pdf)
-    """
-    # Noms de fichiers
-    base_filename = f"etat_lieux_{etat_lieux.id}_{uuid.uuid4().hex}"
-    pdf_filename = f"{base_filename}.pdf"
-    tmp_pdf_path = f"/tmp/{pdf_filename}"
-
-    try:
-        # 1. Sauver temporairement
-        with open(tmp_pdf_path, "wb") as f:
-            f.write(pdf_bytes)
-
-        # 2. Ajouter champs de signature
-        prepare_pdf_with_signature_fields_generic(tmp_pdf_path, etat_lieux)
-
-        # 3. ✅ NOUVEAU : Certifier avec Hestia (certify=True + DocMDP)
-        try:
-            from signature.certification_flow import certify_document_hestia
-
-            certified_pdf_path = tmp_pdf_path.replace(".pdf", "_certified.pdf")
-            certify_document_hestia(
-                source_path=tmp_pdf_path,
-                output_path=certified_pdf_path,
-                document_type=SignableDocumentType.ETAT_LIEUX.value,
-            )
-
-            # Utiliser le PDF certifié au lieu du PDF vierge
-            tmp_pdf_path = certified_pdf_path
-            logger.info(
-                f"✅ État des lieux {etat_lieux.id} certifié Hestia avec succès"
-            )
-        except FileNotFoundError as e:
-            logger.warning(f"⚠️ Certificat Hestia AATL manquant (mode dev) : {e}")
-            logger.warning("⚠️ PDF non certifié, continuons quand même")
-        except ValueError as e:
-            logger.warning(f"⚠️ PASSWORD_CERT_SERVER manquant : {e}")
-            logger.warning("⚠️ PDF non certifié, continuons quand même")
-        except Exception as e:
-            logger.error(f"❌ Erreur certification Hestia : {e}")
-            logger.error("⚠️ PDF non certifié, continuons quand même")
-
-        # 4. Recharger dans etat_lieux.pdf
-        with open(tmp_pdf_path, "rb") as f:
-            etat_lieux.pdf.save(pdf_filename, ContentFile(f.read()), save=True)
-
-    finally:
-        # 5. Supprimer les fichiers temporaires
-        for temp_file in [tmp_pdf_path, tmp_pdf_path.replace("_certified.pdf", ".pdf")]:
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-            except Exception as e:
-                logger.warning(f"Impossible de supprimer {temp_file}: {e}")
-
-
 def prepare_etat_lieux_data_for_pdf(etat_lieux: EtatLieux):
     """
     Prépare et enrichit les données de l'état des lieux pour la génération PDF.
-    Convertit les photos en Base64 et structure les données.
+    Prépare les renditions des photos et structure les données.
 
     Utilise la nouvelle architecture avec EtatLieuxEquipment.
 
@@ -385,6 +324,15 @@ def prepare_etat_lieux_data_for_pdf(etat_lieux: EtatLieux):
     # Calculer le nombre total de radiateurs
     total_radiateurs = 0
 
+    # Toutes les photos du document : téléchargées en parallèle et réduites
+    # à la résolution d'impression (cache par photo), servies par url_fetcher
+    photos_by_equipment = defaultdict(list)
+    for photo in EtatLieuxPhoto.objects.filter(equipment__etat_lieux=etat_lieux):
+        photos_by_equipment[photo.equipment_id].append(photo)
+    photo_renditions = load_photo_renditions(
+        photo for photos in photos_by_equipment.values() for photo in photos
+    )
+
     # Nouvelle architecture : parcourir les pièces
     for piece in etat_lieux.pieces.all():
         # Récupérer les équipements de cette pièce
@@ -399,15 +347,15 @@ def prepare_etat_lieux_data_for_pdf(etat_lieux: EtatLieux):
                 total_radiateurs += equipment.quantity
             # Récupérer les photos de cet équipement
             photos_enrichies = []
-            for photo in equipment.photos.all():
-                # Convertir l'image en Base64 pour WeasyPrint
-                photo_data_url = image_to_base64_data_url(photo.image)
+            for photo in photos_by_equipment.get(equipment.id, []):
+                # URL edl-photo:// résolue par photo_renditions.url_fetcher
+                photo_data_url = photo_renditions.url(photo)
                 if photo_data_url:
                     photos_enrichies.append(
                         {
                             "id": photo.id,
                             "nom_original": photo.nom_original,
-                            "data_url": photo_data_url,  # Base64 data URL
+                            "data_url": photo_data_url,  # Rendition d'impression
                             "url": photo.image.url,  # URL originale (pour debug)
                         }
                     )
@@ -507,12 +455,78 @@ def prepare_etat_lieux_data_for_pdf(etat_lieux: EtatLieux):
         "bailleurs": bailleurs,
         "locataires": locataires,
         "pieces_enrichies": pieces_enrichies,
+        "equipements_chauffage": etat_lieux.get_equipements_chauffage_formatted(
+            photo_renditions
+        ),
+        "annexes_privatives": etat_lieux.get_annexes_privatives_formatted(
+            photo_renditions
+        ),
+        "photo_renditions": photo_renditions,
         "total_radiateurs": total_radiateurs,
         "honoraires_mandataire": honoraires_mandataire,
         "logo_base64_uri": get_logo_pdf_base64_data_uri(),
     }
 
 
+def generate_and_store_etat_lieux_pdf(etat_lieux, base_url, user):
+    """
+    Rendu WeasyPrint → champs de signature → certification Hestia → upload,
+    puis création des demandes de signature. Un brouillon régénéré sans
+    modification garde son PDF (voir render_signable_pdf).
+
+    Appelé par la vue (mode synchrone) et par les workers pdf_jobs.
+
+    Args:
+        etat_lieux: L'instance EtatLieux
+        base_url: URL absolue de la requête d'origine (ressources + liens)
+        user: Utilisateur à l'origine de la génération
+
+    Returns:
+        dict: Données de réponse (etatLieuxId, pdfUrl, linkTokenFirstSigner...)
+    """
+    # Générer le PDF
+    context = prepare_etat_lieux_data_for_pdf(etat_lieux)
+
+    # Générer le HTML, le convertir en PDF, ajouter les champs de signature
+    html = render_to_string("pdf/etat_lieux/etat_lieux.html", context)
+    photo_renditions = context["photo_renditions"]
+    render_signable_pdf(
+        etat_lieux,
+        SignableDocumentType.ETAT_LIEUX.value,
+        html,
+        f"etat_lieux_{etat_lieux.id}_{uuid.uuid4().hex}.pdf",
+        base_url=base_url,
+        url_fetcher=photo_renditions.url_fetcher,
+        # Les photos ne sont référencées que par id dans le HTML
+        resources=[photo_renditions.digest()],
+    )
+
+    # Créer les demandes de signature
+    create_etat_lieux_signature_requests(etat_lieux, user=user)
+
+    # Récupérer le token du premier signataire
+    first_sign_req = etat_lieux.signature_requests.order_by("order").first()
+
+    # Même URL que get_static_pdf_iframe_url, sans dépendre de la requête
+    grille_vetuste_url = urljoin(
+        base_url,
+        reverse(
+            "serve_static_pdf_iframe",
+            kwargs={"file_path": "bails/grille_vetuste.pdf"},
+        ),
+    )
+
+    return {
+        "etatLieuxId": str(etat_lieux.id),
+        "pdfUrl": etat_lieux.pdf.url,
+        "linkTokenFirstSigner": (
+            str(first_sign_req.link_token) if first_sign_req else None
+        ),
+        "grilleVetustUrl": grille_vetuste_url,
+        "type": etat_lieux.type_etat_lieux,
+    }
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def generate_etat_lieux_pdf(request):
@@ -522,6 +536,8 @@ def generate_etat_lieux_pdf(request):
 
     Attend:
     - etat_lieux_id: ID de l'état des lieux (obligatoire)
+    - async: (optionnel) si true, la génération est confiée aux workers pdf_jobs
+      et la vue répond 202 avec un jobId à interroger via GET /api/pdf_jobs/<job_id>/
     """
     try:
         etat_lieux_id = request.data.get("etat_lieux_id")
@@ -544,40 +560,30 @@ def generate_etat_lieux_pdf(request):
                 status=404,
             )
 
-        # Générer le PDF
-        context = prepare_etat_lieux_data_for_pdf(etat_lieux)
-
-        # Générer le HTML et le convertir en PDF
-        html = render_to_string("pdf/etat_lieux/etat_lieux.html", context)
-        pdf_bytes = HTML(
-            string=html,
-            base_url=request.build_absolute_uri(),
-        ).write_pdf()
+        if request.data.get("async"):
+            from pdf_jobs.broker import enqueue_pdf_job
 
-        # Ajouter les champs de signature et sauvegarder le PDF
-        add_signature_fields_to_pdf(pdf_bytes, etat_lieux)
-
-        # Créer les demandes de signature
-        create_etat_lieux_signature_requests(etat_lieux, user=request.user)
-
-        # Récupérer le token du premier signataire
-        first_sign_req = etat_lieux.signature_requests.order_by("order").first()
+            job, created = enqueue_pdf_job(
+                document_type=SignableDocumentType.ETAT_LIEUX.value,
+                document_id=etat_lieux.id,
+                base_url=request.build_absolute_uri(),
+                user=request.user,
+            )
+            return JsonResponse(
+                {
+                    "success": True,
+                    "etatLieuxId": str(etat_lieux.id),
+                    "jobId": str(job.id),
+                    "jobStatus": job.status,
+                    "alreadyQueued": not created,
+                },
+                status=202,
+            )
 
-        # Retourner la réponse
-        return JsonResponse(
-            {
-                "success": True,
-                "etatLieuxId": str(etat_lieux.id),
-                "pdfUrl": etat_lieux.pdf.url,
-                "linkTokenFirstSigner": (
-                    str(first_sign_req.link_token) if first_sign_req else None
-                ),
-                "grilleVetustUrl": get_static_pdf_iframe_url(
-                    request, "bails/grille_vetuste.pdf"
-                ),
-                "type": etat_lieux.type_etat_lieux,
-            }
+        data = generate_and_store_etat_lieux_pdf(
+            etat_lieux, request.build_absolute_uri(), request.user
         )
+        return JsonResponse({"success": True, **data})
 
     except Exception as e:
         logger.exception("Erreur lors de la génération de l'état des lieux PDF")
@@ -685,6 +691,9 @@ def upload_etat_lieux_photo(request):
             f"Photo standalone créée : {photo.id} par {request.user.email}"
         )
 
+        # Renditions impression + miniature calculées hors du thread de requête
+        schedule_photo_derivation(photo.id)
+
         return JsonResponse(
             {
                 "success": True,
@@ -768,7 +777,8 @@ def delete_etat_lieux_photo(request, photo_id):
                 f"(EDL {etat_lieux.id}) par {user_email}"
             )
 
-        # Supprimer le fichier image (R2/MinIO)
+        # Supprimer les renditions puis le fichier image (R2/MinIO)
+        delete_photo_renditions(photo)
         if photo.image:
             try:
                 photo.image.delete(save=False)
@@ -0,0 +1,20 @@
+"""
+Configuration gunicorn (chargée automatiquement depuis le répertoire courant).
+
+Les options de lancement (bind, workers, timeout) restent dans le Dockerfile.
+"""
+
+import os
+
+
+def post_fork(server, worker):
+    """Préchauffe le rendu PDF dans chaque worker, avant la première requête."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+    from backend.pdf_rendering import warm_up_pdf_renderer
+
+    warm_up_pdf_renderer()
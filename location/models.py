@@ -1109,8 +1109,8 @@ class RentTerms(BaseModel):
 
     def get_rent_price(self):
         """
-        Récupère le RentPrice correspondant aux caractéristiques du bien.
-        Utilise rent_price_id comme area_id si disponible.
+        Récupère le prix de référence (IndexedRentPrice) correspondant aux
+        caractéristiques du bien. Utilise rent_price_id comme area_id si disponible.
         """
         from rent_control.utils import get_rent_price_for_bien
 
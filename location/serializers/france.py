@@ -20,6 +20,7 @@ from .composed import (
     ModalitesZoneTendueSerializer,
     PersonneSerializer,
 )
+from .step_registry import compile_step_registry
 
 # ========================================
 # STEPS CONFIGURATION
@@ -740,6 +741,23 @@ class BaseLocationSerializer(serializers.Serializer):
     # Type de document source
     source = serializers.CharField(required=True)
 
+    # Registre compilé à la création de chaque sous-classe (voir step_registry.py)
+    _step_registry = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if hasattr(cls, "get_step_config"):
+            cls._step_registry = compile_step_registry(cls.get_step_config())
+
+    @classmethod
+    def get_step_registry(cls):
+        """
+        Steps et index compilés une fois pour la classe (lecture seule).
+
+        Returns: StepRegistry, None si le serializer ne définit pas de steps
+        """
+        return cls._step_registry
+
     @classmethod
     def get_all_field_mappings(cls):
         """
@@ -747,17 +765,7 @@ class BaseLocationSerializer(serializers.Serializer):
 
         Returns: Dict[str, Field] mapping field_path -> Django Field object
         """
-        mappings = {}
-
-        # Utiliser get_step_config() du serializer
-        all_steps = cls.get_step_config()
-
-        for step in all_steps:
-            fields = step.get("fields", {})
-            for field_path, field_obj in fields.items():
-                mappings[field_path] = field_obj
-
-        return mappings
+        return dict(cls.get_step_registry().field_mappings)
 
     @classmethod
     def get_field_to_step_mapping(cls, model_class):
@@ -767,16 +775,7 @@ class BaseLocationSerializer(serializers.Serializer):
             model_class: Classe du modèle (Bien, RentTerms, Location)
         Returns: Dict[str, str] mapping field_name -> field_path
         """
-        mappings = cls.get_all_field_mappings()
-        result = {}
-
-        for field_path, field_obj in mappings.items():
-            if field_obj and hasattr(field_obj, "field"):
-                if field_obj.field.model == model_class:
-                    field_name = field_obj.field.name
-                    result[field_name] = field_path
-
-        return result
+        return cls.get_step_registry().get_field_to_step_mapping(model_class)
 
     @classmethod
     def extract_model_data(cls, model_class, form_data):
@@ -787,17 +786,15 @@ class BaseLocationSerializer(serializers.Serializer):
             form_data: Données du formulaire
         Returns: Dict avec les champs du modèle
         """
-        mappings = cls.get_all_field_mappings()
         result = {}
 
-        for field_path, field_obj in mappings.items():
-            if field_obj and hasattr(field_obj, "field"):
-                if field_obj.field.model == model_class:
-                    # Utiliser field_path pour extraire la valeur
-                    value = cls._get_nested_value(form_data, field_path)
-                    if value is not None:
-                        field_name = field_obj.field.name
-                        result[field_name] = value
+        for field_path, field_name in cls.get_step_registry().model_fields.get(
+            model_class, []
+        ):
+            # Utiliser field_path pour extraire la valeur
+            value = cls._get_nested_value(form_data, field_path)
+            if value is not None:
+                result[field_name] = value
 
         return result
 
@@ -828,14 +825,17 @@ class BaseLocationSerializer(serializers.Serializer):
 
         Returns: La configuration de la step ou None si non trouvée
         """
-        # Utiliser get_step_config() du serializer
-        all_steps = cls.get_step_config()
+        return cls.get_step_registry().by_id.get(step_id)
 
-        for step in all_steps:
-            if step.get("id") == step_id:
-                return step
+    @classmethod
+    def get_step_payload(cls, step_id):
+        """
+        Step sérialisable pour le frontend (sans les objets Field Django,
+        avec mapped_fields). Copie modifiable par l'appelant.
 
-        return None
+        Returns: Dict ou None si la step n'existe pas
+        """
+        return cls.get_step_registry().get_step_payload(step_id)
 
     @classmethod
     def get_ready_check_fields(cls):
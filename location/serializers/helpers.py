@@ -14,6 +14,9 @@ from location.models import (
     Societe,
 )
 
+# Valeur par défaut de area_id : zone résolue depuis le GPS de l'adresse
+AREA_ID_FROM_GPS = object()
+
 
 # ============================================
 # HELPERS ATOMIQUES (Personne, Société, Locataire)
@@ -243,6 +246,7 @@ def restructure_bien_to_nested_format(
     bien_data: Dict[str, Any],
     calculate_zone_from_gps: bool = False,
     zone_reglementaire_override: Optional[Dict[str, Any]] = None,
+    area_id: Any = AREA_ID_FROM_GPS,
 ) -> Dict[str, Any]:
     """
     Convertit les données plates de BienReadSerializer en format nested.
@@ -252,6 +256,8 @@ def restructure_bien_to_nested_format(
         calculate_zone_from_gps: Si True, calcule zone_reglementaire via GPS
         zone_reglementaire_override: Si fourni, utilise ces valeurs
                                       (depuis RentTerms d'une Location)
+        area_id: Zone d'encadrement déjà résolue (None compris), pour les
+                 listes résolues par lot (find_rent_control_areas)
 
     Returns:
         Dict avec structure nested:
@@ -272,7 +278,8 @@ def restructure_bien_to_nested_format(
         - zone_reglementaire vient soit de override (Location existante),
           soit de GPS (nouveau bail depuis bien)
     """
-    from rent_control.views import check_zone_status_via_ban, get_rent_control_info
+    from rent_control.views import get_rent_control_info
+    from rent_control.zone_status import get_zone_status
 
     # Extraire l'adresse structurée (depuis AdresseReadSerializer)
     # bien_data["adresse"] est un dict avec {id, numero, voie, latitude, longitude...}
@@ -281,11 +288,12 @@ def restructure_bien_to_nested_format(
     longitude = adresse_data.get("longitude") if adresse_data else None
 
     # Calcul de area_id (depuis GPS de l'adresse)
-    area_id = None
-    if latitude and longitude:
-        _, area = get_rent_control_info(latitude, longitude)
-        if area:
-            area_id = area.id
+    if area_id is AREA_ID_FROM_GPS:
+        area_id = None
+        if latitude and longitude:
+            _, area = get_rent_control_info(latitude, longitude)
+            if area:
+                area_id = area.id
 
     # Calcul zone_reglementaire selon le contexte
     zone_reglementaire = {}
@@ -294,7 +302,7 @@ def restructure_bien_to_nested_format(
         zone_reglementaire = zone_reglementaire_override
     elif calculate_zone_from_gps and latitude and longitude:
         # Cas 2 : Calculé depuis GPS (Prefill nouveau bail)
-        zone_status = check_zone_status_via_ban(latitude, longitude)
+        zone_status = get_zone_status(latitude, longitude)
         if zone_status:
             zone_reglementaire = {
                 "zone_tendue": zone_status.get("is_zone_tendue", False),
@@ -0,0 +1,95 @@
+"""
+Registre compilé des steps d'un serializer de formulaire adaptatif.
+
+get_step_config() reconstruisait la liste des steps (une vingtaine de extend)
+à chaque appel, get_step_config_by_id() la parcourait, et FormStepFilter
+l'appelait pour chaque step : O(steps²) par requête /requirements/. Les
+mappings champ → modèle étaient eux aussi recalculés à chaque sauvegarde.
+
+Le registre est compilé une fois par classe, à l'import (voir
+BaseLocationSerializer.__init_subclass__), et partagé en lecture seule :
+ne jamais modifier les steps ou les index qu'il expose.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+
+@dataclass(frozen=True)
+class StepRegistry:
+    # Steps dans l'ordre du formulaire (dicts d'origine, avec les fields Django)
+    steps: Tuple[Dict[str, Any], ...]
+    # step_id -> step (première occurrence, comme l'ancien parcours linéaire)
+    by_id: Dict[str, Dict[str, Any]]
+    # field_path -> Field Django (dernière occurrence, comme l'ancien dict)
+    field_mappings: Dict[str, Any]
+    # field_path -> step_id
+    step_id_by_field: Dict[str, str]
+    # Modèle -> [(field_path, field_name)] dans l'ordre de field_mappings
+    model_fields: Dict[type, List[Tuple[str, str]]]
+    # step_id -> step sans les fields (JSON), avec mapped_fields
+    payloads: Dict[str, Dict[str, Any]]
+    # Steps verrouillées quand leur document est signé (hors always_unlocked)
+    lockable_step_ids: FrozenSet[str]
+
+    def get_step_payload(self, step_id):
+        """Copie de la step prête pour le frontend (modifiable par l'appelant)."""
+        payload = self.payloads.get(step_id)
+        return dict(payload) if payload is not None else None
+
+    def get_field_to_step_mapping(self, model_class):
+        """field_name -> field_path pour un modèle (dernier chemin mappé)."""
+        return {
+            field_name: field_path
+            for field_path, field_name in self.model_fields.get(model_class, [])
+        }
+
+
+def _step_payload(step):
+    payload = {key: value for key, value in step.items() if key != "fields"}
+    fields = step.get("fields", {})
+    if fields:
+        payload["mapped_fields"] = list(fields.keys())
+    return payload
+
+
+def compile_step_registry(steps):
+    """
+    Construit les index d'une liste de steps.
+
+    Args:
+        steps: Liste ordonnée renvoyée par get_step_config()
+
+    Returns:
+        StepRegistry
+    """
+    by_id = {}
+    field_mappings = {}
+    step_id_by_field = {}
+    lockable_step_ids = set()
+
+    for step in steps:
+        step_id = step.get("id")
+        by_id.setdefault(step_id, step)
+        if not step.get("always_unlocked", False):
+            lockable_step_ids.add(step_id)
+        for field_path, field_obj in step.get("fields", {}).items():
+            field_mappings[field_path] = field_obj
+            step_id_by_field[field_path] = step_id
+
+    model_fields = {}
+    for field_path, field_obj in field_mappings.items():
+        if field_obj and hasattr(field_obj, "field"):
+            model_fields.setdefault(field_obj.field.model, []).append(
+                (field_path, field_obj.field.name)
+            )
+
+    return StepRegistry(
+        steps=tuple(steps),
+        by_id=by_id,
+        field_mappings=field_mappings,
+        step_id_by_field=step_id_by_field,
+        model_fields=model_fields,
+        payloads={step_id: _step_payload(step) for step_id, step in by_id.items()},
+        lockable_step_ids=frozenset(lockable_step_ids),
+    )
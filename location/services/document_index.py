@@ -0,0 +1,224 @@
+"""
+Index des documents d'une ou plusieurs locations (page documents).
+
+Tous les types de documents (baux et annexes, avenants, documents des
+locataires, quittances, états des lieux) sont chargés en un nombre fixe de
+requêtes quel que soit le nombre de baux, puis la liste est construite en
+mémoire avec les helpers par type de signature.document_list_service.
+
+La liste sérialisée est mise en cache, avec pour clé la date de dernière
+modification de la location et de ses documents (et leur nombre, pour
+qu'une suppression invalide aussi le cache).
+"""
+
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, OuterRef, Subquery
+
+from bail.models import Avenant, Bail, Document
+from etat_lieux.models import EtatLieux
+from location.models import Locataire, Location
+from quittance.models import Quittance
+from signature.document_list_service import (
+    DocumentIndex,
+    list_bail_entries,
+    list_etat_lieux_entries,
+)
+from signature.models_base import annotate_date_signature
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "location_documents"
+
+# (modèle, chemin vers la location) des lignes qui composent la liste
+LISTING_SOURCES = {
+    "bails": (Bail, "location"),
+    "avenants": (Avenant, "bail__location"),
+    "bail_documents": (Document, "bail__location"),
+    "avenant_documents": (Document, "avenant__bail__location"),
+    "locataire_documents": (Document, "locataire__locations"),
+    "locataires": (Locataire, "locations"),
+    "quittances": (Quittance, "location"),
+    "etats_lieux": (EtatLieux, "location"),
+}
+
+
+def _per_location(model, path, aggregate):
+    """Sous-requête agrégée d'un modèle pour la location courante (OuterRef)."""
+    return Subquery(
+        model.objects.filter(**{path: OuterRef("pk")})
+        .order_by()
+        .values(path)
+        .annotate(value=aggregate)
+        .values("value")[:1]
+    )
+
+
+def get_listing_versions(location_ids) -> Dict[Any, str]:
+    """
+    Version de la liste de documents de chaque location, en une requête :
+    dernière modification (location et documents) + nombre de lignes.
+    """
+    annotations = {}
+    for name, (model, path) in LISTING_SOURCES.items():
+        annotations[f"{name}_modified"] = _per_location(model, path, Max("updated_at"))
+        annotations[f"{name}_count"] = _per_location(model, path, Count("pk"))
+
+    versions = {}
+    for row in Location.objects.filter(id__in=location_ids).values(
+        "id", "updated_at", **annotations
+    ):
+        last_modified = max(
+            value
+            for key, value in row.items()
+            if (key == "updated_at" or key.endswith("_modified")) and value
+        )
+        counts = "-".join(str(row[f"{name}_count"] or 0) for name in LISTING_SOURCES)
+        versions[row["id"]] = f"{last_modified.timestamp():.6f}:{counts}"
+    return versions
+
+
+class LocationDocumentIndex:
+    """Documents de plusieurs locations, chargés en six requêtes."""
+
+    def __init__(self, location_ids):
+        location_ids = list(location_ids)
+
+        self.locataires = defaultdict(list)
+        through = Location.locataires.through.objects.filter(
+            location_id__in=location_ids
+        ).select_related("locataire")
+        for link in through:
+            self.locataires[link.location_id].append(link.locataire)
+
+        self.baux = defaultdict(list)
+        # Date de signature annotée : la property date_signature coûte trois
+        # requêtes par bail
+        for bail in annotate_date_signature(
+            Bail.objects.filter(location_id__in=location_ids)
+        ).order_by("-created_at"):
+            self.baux[bail.location_id].append(bail)
+
+        self.avenants = defaultdict(list)
+        for avenant in Avenant.objects.filter(
+            bail__location_id__in=location_ids
+        ).order_by("numero"):
+            self.avenants[avenant.bail_id].append(avenant)
+
+        self.documents = DocumentIndex.load(
+            bail_ids=[bail.id for baux in self.baux.values() for bail in baux],
+            avenant_ids=[
+                avenant.id for avenants in self.avenants.values() for avenant in avenants
+            ],
+            locataire_ids={
+                locataire.id
+                for locataires in self.locataires.values()
+                for locataire in locataires
+            },
+        )
+
+        self.quittances = defaultdict(list)
+        for quittance in Quittance.objects.filter(
+            location_id__in=location_ids
+        ).order_by("-annee", "-mois"):
+            self.quittances[quittance.location_id].append(quittance)
+
+        self.etats_lieux = defaultdict(list)
+        for etat in EtatLieux.objects.filter(location_id__in=location_ids).order_by(
+            "-date_etat_lieux"
+        ):
+            self.etats_lieux[etat.location_id].append(etat)
+
+    def list_documents(self, location_id, request, is_locataire) -> List[Dict[str, Any]]:
+        """Baux (avec annexes et avenants), quittances puis états des lieux."""
+        documents = []
+
+        locataires = self.locataires.get(location_id, [])
+        for bail in self.baux.get(location_id, []):
+            documents.extend(
+                list_bail_entries(
+                    bail,
+                    request,
+                    self.documents,
+                    locataires,
+                    self.avenants.get(bail.id, []),
+                    is_locataire,
+                )
+            )
+
+        for quittance in self.quittances.get(location_id, []):
+            if quittance.pdf:
+                documents.append(
+                    {
+                        "id": f"quittance-{quittance.id}",
+                        "type": "quittance",
+                        "nom": f"Quittance - {quittance.mois} {quittance.annee}",
+                        "date": quittance.date_paiement.isoformat()
+                        if quittance.date_paiement
+                        else quittance.created_at.isoformat(),
+                        "url": quittance.pdf.url,
+                        "status": quittance.get_status_display(),
+                        "periode": f"{quittance.mois} {quittance.annee}",
+                        "quittance_id": str(quittance.id),
+                    }
+                )
+
+        for etat in self.etats_lieux.get(location_id, []):
+            documents.extend(list_etat_lieux_entries(etat, request, is_locataire))
+
+        return documents
+
+
+def get_locations_documents(location_ids, request, is_locataire) -> Dict[Any, List]:
+    """
+    Liste des documents de plusieurs locations (cache, sinon un seul index
+    pour toutes les locations absentes du cache).
+
+    Les URLs des fichiers sont signées (AWS_QUERYSTRING_EXPIRE) : la durée du
+    cache (LOCATION_DOCUMENTS_CACHE_TIMEOUT) doit rester bien inférieure.
+    """
+    versions = get_listing_versions(location_ids)
+    # URLs absolues des documents statiques : dépendent de l'hôte de la requête
+    origin = request.build_absolute_uri("/")
+    keys = {
+        location_id: f"{CACHE_KEY_PREFIX}:{location_id}:{int(is_locataire)}:{origin}:{version}"
+        for location_id, version in versions.items()
+    }
+
+    try:
+        cached = cache.get_many(list(keys.values()))
+    except Exception as e:
+        logger.warning(f"⚠️ Cache des documents de location indisponible : {e}")
+        cached = {}
+
+    listings = {
+        location_id: cached[key] for location_id, key in keys.items() if key in cached
+    }
+    missing = [location_id for location_id in keys if location_id not in listings]
+    if missing:
+        index = LocationDocumentIndex(missing)
+        fresh = {
+            location_id: index.list_documents(location_id, request, is_locataire)
+            for location_id in missing
+        }
+        listings.update(fresh)
+        try:
+            cache.set_many(
+                {keys[location_id]: documents for location_id, documents in fresh.items()},
+                timeout=settings.LOCATION_DOCUMENTS_CACHE_TIMEOUT,
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Cache des documents de location indisponible : {e}")
+
+    return listings
+
+
+def get_location_documents_list(location, request, is_locataire) -> List[Dict[str, Any]]:
+    """Liste des documents d'une location (voir get_locations_documents)."""
+    return get_locations_documents([location.id], request, is_locataire).get(
+        location.id, []
+    )
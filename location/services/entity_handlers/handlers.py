@@ -24,7 +24,7 @@ from location.services.document_utils import (
     determine_mandataire_fait_edl,
 )
 from location.services.form_handlers.field_locking import FieldLockingService
-from rent_control.views import check_zone_status_via_ban
+from rent_control.zone_status import get_zone_status
 from signature.document_status import DocumentStatus
 
 logger = logging.getLogger(__name__)
@@ -743,19 +743,19 @@ def _extract_rent_terms_data(data, location: Location, serializer_class):
         and adresse.latitude
         and adresse.longitude
     ):
-        ban_result = check_zone_status_via_ban(adresse.latitude, adresse.longitude)
+        zone_status = get_zone_status(adresse.latitude, adresse.longitude)
 
         # Ajouter seulement si pas déjà présent
         if "zone_tendue" not in rent_terms_data:
-            rent_terms_data["zone_tendue"] = ban_result.get("is_zone_tendue")
+            rent_terms_data["zone_tendue"] = zone_status.get("is_zone_tendue")
         if "zone_tres_tendue" not in rent_terms_data:
-            rent_terms_data["zone_tres_tendue"] = ban_result.get("is_zone_tres_tendue")
+            rent_terms_data["zone_tres_tendue"] = zone_status.get("is_zone_tres_tendue")
         if "zone_tendue_touristique" not in rent_terms_data:
-            rent_terms_data["zone_tendue_touristique"] = ban_result.get(
+            rent_terms_data["zone_tendue_touristique"] = zone_status.get(
                 "is_zone_tendue_touristique"
             )
         if "permis_de_louer" not in rent_terms_data:
-            rent_terms_data["permis_de_louer"] = ban_result.get("is_permis_de_louer")
+            rent_terms_data["permis_de_louer"] = zone_status.get("is_permis_de_louer")
 
     return rent_terms_data
 
@@ -92,8 +92,9 @@ class FieldLockingService:
             logger.warning(f"Location {location_id} not found for field locking")
             return set()
 
+        # Steps verrouillables (hors always_unlocked) précompilées par serializer
+        # (voir location/serializers/step_registry.py)
         locked_steps = set()
-        steps_to_check = []  # Collecter toutes les steps à vérifier
 
         # Vérifier le bail (chercher un bail SIGNING ou SIGNED)
         bail = location.bails.filter(
@@ -103,10 +104,11 @@ class FieldLockingService:
         if bail:
             bail_serializer = cls._get_serializer_class("bail", country)
             if bail_serializer:
-                bail_steps = bail_serializer.get_step_config()
-                steps_to_check.extend(bail_steps)
+                bail_registry = bail_serializer.get_step_registry()
+                locked_steps |= bail_registry.lockable_step_ids
                 logger.info(
-                    f"Bail {bail.id} is {bail.status}, adding {len(bail_steps)} steps to check"
+                    f"Bail {bail.id} is {bail.status}, "
+                    f"adding {len(bail_registry.steps)} steps to check"
                 )
 
         # Vérifier l'état des lieux d'entrée
@@ -117,11 +119,11 @@ class FieldLockingService:
         ]:
             etat_serializer = cls._get_serializer_class("etat_lieux", country)
             if etat_serializer:
-                etat_steps = etat_serializer.get_step_config()
-                steps_to_check.extend(etat_steps)
+                etat_registry = etat_serializer.get_step_registry()
+                locked_steps |= etat_registry.lockable_step_ids
                 logger.info(
                     f"État des lieux entrée {etat_entree.id} is {etat_entree.status}, "
-                    f"adding {len(etat_steps)} steps to check"
+                    f"adding {len(etat_registry.steps)} steps to check"
                 )
 
         # Vérifier l'état des lieux de sortie
@@ -132,11 +134,11 @@ class FieldLockingService:
         ]:
             etat_serializer = cls._get_serializer_class("etat_lieux", country)
             if etat_serializer:
-                etat_steps = etat_serializer.get_step_config()
-                steps_to_check.extend(etat_steps)
+                etat_registry = etat_serializer.get_step_registry()
+                locked_steps |= etat_registry.lockable_step_ids
                 logger.info(
                     f"État des lieux sortie {etat_sortie.id} is {etat_sortie.status}, "
-                    f"adding {len(etat_steps)} steps to check"
+                    f"adding {len(etat_registry.steps)} steps to check"
                 )
 
         # Vérifier les quittances
@@ -146,19 +148,13 @@ class FieldLockingService:
         if quittance_signing:
             serializer_class = cls._get_serializer_class("quittance", country)
             if serializer_class:
-                quittance_steps = serializer_class.get_step_config()
-                steps_to_check.extend(quittance_steps)
+                quittance_registry = serializer_class.get_step_registry()
+                locked_steps |= quittance_registry.lockable_step_ids
                 logger.info(
                     f"Quittance is {quittance_signing.status}, "
-                    f"adding {len(quittance_steps)} steps to check"
+                    f"adding {len(quittance_registry.steps)} steps to check"
                 )
 
-        # Appliquer la logique always_unlocked une seule fois sur toutes les steps
-        for step in steps_to_check:
-            # Ne verrouiller que les steps qui ne sont pas marquées always_unlocked
-            if not step.get("always_unlocked", False):
-                locked_steps.add(step["id"])
-
         if locked_steps:
             logger.info(
                 f"Total locked steps for location {location_id}: {len(locked_steps)}"
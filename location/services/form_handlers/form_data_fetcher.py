@@ -268,6 +268,7 @@ class FormDataFetcher:
                             photo_data = {
                                 "id": str(photo.id),
                                 "url": photo.image.url,
+                                "preview_url": photo.preview_url,
                                 "name": photo.nom_original,
                             }
                             equipement_data["photos"].append(photo_data)
@@ -308,6 +309,7 @@ class FormDataFetcher:
                         photo_data = {
                             "id": str(photo.id),
                             "url": photo.image.url,
+                            "preview_url": photo.preview_url,
                             "name": photo.nom_original,
                         }
                         equipement_data["photos"].append(photo_data)
@@ -332,6 +334,7 @@ class FormDataFetcher:
                             {
                                 "id": str(photo.id),
                                 "url": photo.image.url,
+                                "preview_url": photo.preview_url,
                                 "name": photo.nom_original,
                             }
                             for photo in equipement.photos.all()
@@ -375,7 +375,7 @@ class FormOrchestrator:
         self, serializer_class, form_type: str
     ) -> List[Dict[str, Any]]:
         """
-        Obtient la configuration des steps depuis le serializer.
+        Obtient la configuration des steps depuis le registre compilé du serializer.
         Retourne maintenant une liste ordonnée au lieu d'un dict.
         """
         if not hasattr(serializer_class, "get_step_config"):
@@ -383,7 +383,7 @@ class FormOrchestrator:
                 f"Le serializer {serializer_class.__name__} doit implémenter get_step_config()"
             )
 
-        return serializer_class.get_step_config()
+        return list(serializer_class.get_step_registry().steps)
 
     def _get_contextual_prefill(
         self,
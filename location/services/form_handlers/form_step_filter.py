@@ -39,28 +39,12 @@ class FormStepFilter:
             if step_id in locked_steps:
                 continue
 
-            # Copier la step SANS les fields (contiennent des objets Django non sérialisables)
-            step_copy = {k: v for k, v in step.items() if k != "fields"}
-
-            # Enrichir avec les métadonnées du serializer
-            step_full_config = serializer_class.get_step_config_by_id(step_id)
-            if step_full_config:
-                # Business rules
-                if "business_rules" in step_full_config:
-                    step_copy["business_rules"] = step_full_config["business_rules"]
-
-                # Always unlocked flag
-                if "always_unlocked" in step_full_config:
-                    step_copy["always_unlocked"] = step_full_config["always_unlocked"]
-
-                # Required fields
-                if "required_fields" in step_full_config:
-                    step_copy["required_fields"] = step_full_config["required_fields"]
-
-                # Mapped fields (pour info seulement)
-                fields = step_full_config.get("fields", {})
-                if fields:
-                    step_copy["mapped_fields"] = list(fields.keys())
+            # Step précompilée SANS les fields (objets Django non sérialisables),
+            # enrichie des métadonnées du serializer (business_rules,
+            # always_unlocked, required_fields, mapped_fields)
+            step_copy = serializer_class.get_step_payload(step_id)
+            if step_copy is None:
+                step_copy = {k: v for k, v in step.items() if k != "fields"}
 
             # Ajouter valeur par défaut si définie et pas de données existantes
             if "default" in step and not self._field_has_value(step_id, existing_data):
@@ -0,0 +1,174 @@
+"""
+Requêtes ensemblistes des statistiques de profil (authentication.views.get_user_profile_stats).
+
+Chaque section du profil est chargée en un nombre fixe de requêtes, quelle
+que soit la taille du portefeuille : comptages annotés (Count/Exists),
+prefetch des baux avec leur date de signature annotée (annotate_date_signature)
+et zones d'encadrement résolues par lot.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from django.db.models import Exists, OuterRef, Prefetch, Q
+
+from bail.models import Bail, BailSignatureRequest
+from location.models import Bailleur, Bien, Locataire, Location
+from location.services.access_utils import get_user_mandataires
+from location.services.serialization_utils import (
+    serialize_bien_with_stats,
+    with_bien_stats,
+)
+from rent_control.management.commands.constants import DEFAULT_YEAR
+from rent_control.spatial_index import find_rent_control_areas
+from signature.document_status import DocumentStatus
+from signature.models_base import annotate_date_signature
+
+
+def resolve_bien_area_ids(biens) -> Dict[Any, Optional[int]]:
+    """Zone d'encadrement de chaque bien géolocalisé, résolue en un seul lot."""
+    located = [
+        bien
+        for bien in biens
+        if bien.adresse and bien.adresse.latitude and bien.adresse.longitude
+    ]
+    areas = find_rent_control_areas(
+        [(bien.adresse.longitude, bien.adresse.latitude) for bien in located],
+        DEFAULT_YEAR,
+    )
+    return {
+        bien.id: area.id if area else None for bien, area in zip(located, areas)
+    }
+
+
+def get_bailleur_biens_stats(email: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Biens des bailleurs de l'utilisateur avec leurs statistiques.
+
+    Returns:
+        Liste des biens sérialisés, ou None si l'utilisateur n'est pas bailleur
+    """
+    bailleurs = Bailleur.objects.filter(
+        Q(personne__email=email) | Q(signataire__email=email)
+    )
+    if not bailleurs.exists():
+        return None
+
+    # Sous-requête : un bien partagé par plusieurs bailleurs n'apparaît qu'une fois
+    biens = list(
+        with_bien_stats(
+            Bien.objects.filter(
+                id__in=Bien.objects.filter(bailleurs__in=bailleurs).values("id")
+            )
+        ).order_by("created_at")
+    )
+    area_ids = resolve_bien_area_ids(biens)
+
+    return [
+        serialize_bien_with_stats(bien, area_id=area_ids.get(bien.id)) for bien in biens
+    ]
+
+
+def get_locataire_locations_stats(email: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Locations du locataire avec l'état de leur bail actif (SIGNING ou SIGNED).
+
+    Returns:
+        Liste des locations sérialisées, ou None si l'utilisateur n'est pas locataire
+    """
+    if not Locataire.objects.filter(email=email).exists():
+        return None
+
+    locations = (
+        Location.objects.filter(
+            id__in=Location.objects.filter(locataires__email=email).values("id")
+        )
+        .select_related("bien__adresse", "rent_terms")
+        .prefetch_related(
+            Prefetch(
+                "bails",
+                queryset=annotate_date_signature(
+                    Bail.objects.filter(
+                        status__in=[DocumentStatus.SIGNING, DocumentStatus.SIGNED]
+                    )
+                )
+                .annotate(
+                    has_unsigned_requests=Exists(
+                        BailSignatureRequest.objects.filter(
+                            bail=OuterRef("pk"), signed=False
+                        )
+                    )
+                )
+                .order_by("-created_at"),
+                to_attr="active_bails",
+            )
+        )
+    )
+    return [serialize_location_stats(location) for location in locations]
+
+
+def serialize_location_stats(location: Location) -> Dict[str, Any]:
+    """Sérialise une location préchargée par get_locataire_locations_stats."""
+    bail = location.active_bails[0] if location.active_bails else None
+
+    # Si un bail existe, récupérer ses infos
+    signatures_completes = True
+    pdf_url = None
+    latest_pdf_url = None
+    status = "draft"
+
+    if bail:
+        signatures_completes = not bail.has_unsigned_requests
+        pdf_url = bail.pdf.url if bail.pdf else None
+        latest_pdf_url = bail.latest_pdf.url if bail.latest_pdf else None
+        status = bail.status
+
+    # Récupérer les montants depuis RentTerms
+    montant_loyer = 0
+    montant_charges = 0
+    if hasattr(location, "rent_terms"):
+        montant_loyer = float(location.rent_terms.montant_loyer or 0)
+        montant_charges = float(location.rent_terms.montant_charges or 0)
+
+    return {
+        "id": str(location.id),
+        "bien_adresse": str(location.bien.adresse) if location.bien.adresse else "",
+        "bien_type": location.bien.get_type_bien_display(),
+        "date_debut": location.date_debut.isoformat() if location.date_debut else None,
+        "date_fin": location.date_fin.isoformat() if location.date_fin else None,
+        "montant_loyer": montant_loyer,
+        "montant_charges": montant_charges,
+        "status": status,
+        "signatures_completes": signatures_completes,
+        "pdf_url": pdf_url,
+        "latest_pdf_url": latest_pdf_url,
+        "created_at": (
+            bail.annotated_date_signature.isoformat()
+            if bail and bail.annotated_date_signature
+            else None
+        ),
+    }
+
+
+def get_mandataire_stats(email: str) -> Optional[Dict[str, int]]:
+    """
+    Nombre de biens et de bailleurs gérés par les mandataires de l'utilisateur.
+
+    Returns:
+        Dict des compteurs, ou None si l'utilisateur n'est pas mandataire
+    """
+    mandataires = get_user_mandataires(email)
+    if not mandataires.exists():
+        return None
+
+    return {
+        "nombre_biens_geres": Bien.objects.filter(
+            locations__mandataire__in=mandataires
+        )
+        .distinct()
+        .count(),
+        "nombre_bailleurs_geres": Bailleur.objects.filter(
+            biens__locations__mandataire__in=mandataires
+        )
+        .distinct()
+        .count(),
+    }
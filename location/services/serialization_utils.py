@@ -6,8 +6,11 @@ IMPORTANT: Utilise les serializers READ pour retourner format PREFILL/WRITE nest
 
 from typing import Any, Dict
 
+from django.db.models import Count, Q
+
 from bail.models import Bail
 from location.models import Bien, Location
+from location.serializers.helpers import AREA_ID_FROM_GPS
 from signature.document_status import DocumentStatus
 
 
@@ -58,14 +61,32 @@ def serialize_location_with_bail(
     return data
 
 
-def serialize_bien_with_stats(bien: Bien) -> Dict[str, Any]:
+def with_bien_stats(queryset):
+    """
+    Annote un queryset de Bien avec les statistiques de serialize_bien_with_stats
+    (une seule requête pour toute la liste au lieu de deux COUNT par bien).
+    """
+    return queryset.select_related("adresse").annotate(
+        nombre_baux_count=Count("locations", distinct=True),
+        baux_actifs_count=Count(
+            "locations__bails",
+            filter=Q(locations__bails__status=DocumentStatus.SIGNED),
+            distinct=True,
+        ),
+    )
+
+
+def serialize_bien_with_stats(
+    bien: Bien, area_id: Any = AREA_ID_FROM_GPS
+) -> Dict[str, Any]:
     """
     Sérialise un bien avec ses statistiques en format PREFILL/WRITE nested.
 
     Utilise BienReadSerializer + restructure_bien_to_nested_format.
 
     Args:
-        bien: Instance de Bien
+        bien: Instance de Bien (annotée par with_bien_stats pour éviter les COUNT)
+        area_id: Zone d'encadrement déjà résolue (défaut: calculée depuis le GPS)
 
     Returns:
         Dict avec structure nested (localisation, caracteristiques, etc.) + stats
@@ -76,14 +97,21 @@ def serialize_bien_with_stats(bien: Bien) -> Dict[str, Any]:
     # Sérialiser le bien en format nested
     serializer = BienReadSerializer(bien)
     bien_data = restructure_bien_to_nested_format(
-        serializer.data, calculate_zone_from_gps=False
+        serializer.data, calculate_zone_from_gps=False, area_id=area_id
     )
 
-    # Ajouter statistiques
-    bien_data["nombre_baux"] = Location.objects.filter(bien=bien).count()
-    bien_data["baux_actifs"] = Bail.objects.filter(
-        location__bien=bien, status=DocumentStatus.SIGNED
-    ).count()
+    # Ajouter statistiques (annotations de with_bien_stats si disponibles)
+    nombre_baux = getattr(bien, "nombre_baux_count", None)
+    if nombre_baux is None:
+        nombre_baux = Location.objects.filter(bien=bien).count()
+    baux_actifs = getattr(bien, "baux_actifs_count", None)
+    if baux_actifs is None:
+        baux_actifs = Bail.objects.filter(
+            location__bien=bien, status=DocumentStatus.SIGNED
+        ).count()
+
+    bien_data["nombre_baux"] = nombre_baux
+    bien_data["baux_actifs"] = baux_actifs
 
     return bien_data
 
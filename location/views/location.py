@@ -39,6 +39,7 @@ from location.services.access_utils import (
     user_has_bien_access,
     user_has_location_access,
 )
+from location.services.document_index import get_location_documents_list
 from location.services.entity_handlers.handlers import (
     create_new_location,
     get_or_create_bail_for_location,
@@ -474,278 +475,12 @@ def get_location_documents(request, location_id):
         user_info = get_user_info_for_location(location, user_email)
         is_locataire = user_info.is_locataire
 
-        documents = []
-
-        # 1. Récupérer les baux associés à cette location
-        baux = Bail.objects.filter(location=location).order_by("-created_at")
-
-        for bail in baux:
-            # Filtrer les brouillons pour les locataires
-            if is_locataire and bail.status == DocumentStatus.DRAFT:
-                continue
-
-            # Utiliser le label de l'enum directement (source unique de vérité)
-            status = bail.get_status_display()
-
-            # Date du bail pour les annexes
-            bail_date = (
-                bail.date_signature.isoformat()
-                if bail.date_signature
-                else bail.created_at.isoformat()
-            )
-
-            # 1. Ajouter le bail principal
-            locataires_names = ", ".join(
-                [f"{loc.firstName} {loc.lastName}" for loc in location.locataires.all()]
-            )
-
-            # URL du PDF (None si DRAFT sans PDF)
-            pdf_url = None
-            if bail.latest_pdf:
-                pdf_url = bail.latest_pdf.url
-            elif bail.pdf:
-                pdf_url = bail.pdf.url
-
-            documents.append(
-                {
-                    "id": f"bail-{bail.id}",
-                    "type": "bail",
-                    "nom": f"Bail - {locataires_names}",
-                    "date": bail_date,
-                    "url": pdf_url,
-                    "status": status,
-                    "location_id": str(location.id),
-                    "bail_id": str(bail.id),  # Pour reprendre le DRAFT
-                }
-            )
-
-            # 2. Ajouter les annexes seulement si le bail est SIGNING ou SIGNED
-            if bail.is_locked:
-                # Notice d'information (toujours statique, via méthode du modèle)
-                documents.append(
-                    {
-                        "id": f"notice-{bail.id}",
-                        "type": "annexe_bail",
-                        "nom": "Notice d'information",
-                        "date": bail_date,
-                        "url": bail.get_notice_information_url(request),
-                        "status": "Annexe - Bail",
-                    }
-                )
-
-                # Documents annexes du bail (diagnostics, permis de louer)
-                documents_bail = (
-                    Document.objects.filter(bail=bail)
-                    .exclude(
-                        type_document__in=[
-                            DocumentType.ATTESTATION_MRH,
-                            DocumentType.CAUTION_SOLIDAIRE,
-                        ]
-                    )
-                    .order_by("type_document")
-                )
-
-                # Compter les diagnostics techniques pour la numérotation
-                diagnostic_count = documents_bail.filter(
-                    type_document=DocumentType.DIAGNOSTIC
-                ).count()
-                diagnostic_index = 1
-
-                for doc in documents_bail:
-                    doc_nom = doc.get_type_document_display()
-
-                    # Si diagnostics techniques et plusieurs, ajouter numérotation
-                    if (
-                        doc.type_document == DocumentType.DIAGNOSTIC
-                        and diagnostic_count > 1
-                    ):
-                        doc_nom = f"{doc_nom} - {diagnostic_index}"
-                        diagnostic_index += 1
-
-                    documents.append(
-                        {
-                            "id": f"doc-{doc.id}",
-                            "type": "annexe_bail",
-                            "nom": doc_nom,
-                            "date": bail_date,
-                            "url": doc.file.url,
-                            "status": "Annexe - Bail",
-                        }
-                    )
-
-                # Documents des locataires (MRH, caution)
-                for locataire in location.locataires.all():
-                    documents_locataire = Document.objects.filter(
-                        locataire=locataire,
-                        type_document__in=[
-                            DocumentType.ATTESTATION_MRH,
-                            DocumentType.CAUTION_SOLIDAIRE,
-                        ],
-                    ).order_by("type_document")
-                    for doc in documents_locataire:
-                        # Nom avec prénom/nom du locataire
-                        doc_nom = (
-                            f"{doc.get_type_document_display()} - "
-                            f"{locataire.firstName} {locataire.lastName}"
-                        )
-
-                        # Type et statut selon le type de document
-                        if doc.type_document == DocumentType.ATTESTATION_MRH:
-                            doc_type = "assurance_bail"
-                            doc_status = "Assurance"
-                        else:  # CAUTION_SOLIDAIRE
-                            doc_type = "caution_bail"
-                            doc_status = "Caution - Bail"
-
-                        documents.append(
-                            {
-                                "id": f"loc-doc-{doc.id}",
-                                "type": doc_type,
-                                "nom": doc_nom,
-                                "date": bail_date,
-                                "url": doc.file.url,
-                                "status": doc_status,
-                            }
-                        )
-
-                # Avenants au bail
-                avenants = bail.avenants.order_by("numero")
-                for avenant in avenants:
-                    # Filtrer les brouillons pour les locataires
-                    if is_locataire and avenant.status == DocumentStatus.DRAFT:
-                        continue
-
-                    avenant_date = avenant.created_at.isoformat()
-                    pdf_url = None
-                    if avenant.latest_pdf:
-                        pdf_url = avenant.latest_pdf.url
-                    elif avenant.pdf:
-                        pdf_url = avenant.pdf.url
-
-                    documents.append(
-                        {
-                            "id": f"avenant-{avenant.id}",
-                            "type": "avenant",
-                            "nom": f"Avenant n°{avenant.numero}",
-                            "date": avenant_date,
-                            "url": pdf_url,
-                            "status": avenant.get_status_display(),
-                            "avenant_id": str(avenant.id),
-                            "bail_id": str(bail.id),
-                        }
-                    )
-
-                    # Ajouter les annexes de l'avenant si SIGNING ou SIGNED
-                    if avenant.is_locked:
-                        # Documents annexes de l'avenant (diagnostics, permis de louer)
-                        documents_avenant = Document.objects.filter(
-                            avenant=avenant
-                        ).order_by("type_document")
-
-                        for doc in documents_avenant:
-                            doc_nom = doc.get_type_document_display()
-
-                            documents.append(
-                                {
-                                    "id": f"avenant-doc-{doc.id}",
-                                    "type": "annexe_bail",
-                                    "nom": doc_nom,
-                                    "date": avenant_date,
-                                    "url": doc.file.url,
-                                    "status": f"Annexe - Avenant n°{avenant.numero}",
-                                }
-                            )
-
-        # 2. Récupérer les quittances
-        quittances = Quittance.objects.filter(location=location).order_by(
-            "-annee", "-mois"
+        # Baux (annexes, avenants), quittances et EDL : index en requêtes groupées,
+        # liste mise en cache jusqu'à la prochaine modification de la location
+        documents = list(
+            get_location_documents_list(location, request, is_locataire)
         )
 
-        for quittance in quittances:
-            if quittance.pdf:
-                documents.append(
-                    {
-                        "id": f"quittance-{quittance.id}",
-                        "type": "quittance",
-                        "nom": f"Quittance - {quittance.mois} {quittance.annee}",
-                        "date": quittance.date_paiement.isoformat()
-                        if quittance.date_paiement
-                        else quittance.created_at.isoformat(),
-                        "url": quittance.pdf.url,
-                        "status": quittance.get_status_display(),
-                        "periode": f"{quittance.mois} {quittance.annee}",
-                        "quittance_id": str(quittance.id),
-                    }
-                )
-
-        # 3. Récupérer les états des lieux
-        etats_lieux = EtatLieux.objects.filter(location=location).order_by(
-            "-date_etat_lieux"
-        )
-
-        for etat in etats_lieux:
-            # Filtrer les brouillons pour les locataires
-            if is_locataire and etat.status == DocumentStatus.DRAFT:
-                continue
-
-            type_doc = (
-                "etat_lieux_entree"
-                if etat.type_etat_lieux == "entree"
-                else "etat_lieux_sortie"
-            )
-            type_label = "d'entrée" if etat.type_etat_lieux == "entree" else "de sortie"
-            nom = f"État des lieux {type_label}"
-
-            # Utiliser le label de l'enum directement (source unique de vérité)
-            status = etat.get_status_display()
-
-            # Date de l'EDL pour les annexes
-            edl_date = (
-                etat.date_etat_lieux.isoformat()
-                if etat.date_etat_lieux
-                else etat.created_at.isoformat()
-            )
-
-            # URL du PDF (None si DRAFT sans PDF)
-            pdf_url = None
-            if etat.latest_pdf:
-                pdf_url = etat.latest_pdf.url
-            elif etat.pdf:
-                pdf_url = etat.pdf.url
-
-            # 1. Ajouter l'EDL principal
-            documents.append(
-                {
-                    "id": f"etat-{etat.id}",
-                    "type": type_doc,
-                    "nom": nom,
-                    "date": edl_date,
-                    "url": pdf_url,
-                    "status": status,
-                    "location_id": str(location.id),  # Pour reprendre le DRAFT
-                    "etat_lieux_id": str(etat.id),  # Pour édition directe
-                }
-            )
-
-            # 2. Ajouter les annexes seulement si l'EDL est SIGNING ou SIGNED
-            if etat.is_locked:
-                # Type d'EDL pour le statut de l'annexe
-                edl_type_status = (
-                    "Entrée" if etat.type_etat_lieux == "entree" else "Sortie"
-                )
-
-                # Grille de vétusté (toujours statique, via méthode du modèle)
-                documents.append(
-                    {
-                        "id": f"grille-edl-{etat.id}",
-                        "type": "annexe_edl",
-                        "nom": "Grille de vétusté",
-                        "date": edl_date,
-                        "url": etat.get_grille_vetuste_url(request),
-                        "status": f"Annexe - EDL {edl_type_status}",
-                    }
-                )
-
         # 4. Documents d'assurance pour le locataire souscripteur
         # Seul le locataire qui a souscrit voit ses documents contractuels
         if is_locataire:
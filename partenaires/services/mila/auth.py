@@ -1,18 +1,28 @@
 """
 Client d'authentification pour l'API Mila.
 
-Gère l'obtention et le refresh automatique des tokens JWT.
+Gère l'obtention et le refresh automatique des tokens JWT. Le token est
+partagé par tous les workers via le cache Redis (settings.CACHES) : un seul
+worker le renouvelle à la fois, les autres attendent sa publication.
 """
 
+import hashlib
 import logging
 import time
+import uuid
 from dataclasses import dataclass
 
 import requests
 from django.conf import settings
+from django.core.cache import cache
+
+from .http import get_mila_session
 
 logger = logging.getLogger(__name__)
 
+# Attente entre deux lectures du cache pendant le refresh d'un autre worker
+TOKEN_REFRESH_POLL_INTERVAL = 0.05
+
 
 class MilaAuthError(Exception):
     """Erreur d'authentification Mila."""
@@ -43,7 +53,8 @@ class MilaAuthClient:
     """
     Client d'authentification pour l'API Mila.
 
-    Gère automatiquement le refresh des tokens JWT.
+    Gère automatiquement le refresh des tokens JWT, partagés entre workers
+    par le cache (une seule requête de login par expiration).
 
     Usage:
         auth = MilaAuthClient()
@@ -72,7 +83,10 @@ class MilaAuthClient:
         self.password = password or settings.MILA_API_PASSWORD
 
         self._token: MilaToken | None = None
-        self._session: requests.Session | None = None
+
+        account = hashlib.sha256(f"{self.base_url}|{self.username}".encode())
+        self._cache_key = f"mila:token:{account.hexdigest()[:16]}"
+        self._lock_key = f"{self._cache_key}:refresh"
 
     def _validate_config(self) -> None:
         """Valide que la configuration est complète."""
@@ -91,11 +105,8 @@ class MilaAuthClient:
 
     @property
     def session(self) -> requests.Session:
-        """Session HTTP réutilisable."""
-        if self._session is None:
-            self._session = requests.Session()
-            self._session.headers.update({"Content-Type": "application/json"})
-        return self._session
+        """Session HTTP partagée du process (pool keep-alive)."""
+        return get_mila_session()
 
     def _fetch_token(self) -> MilaToken:
         """Récupère un nouveau token depuis l'API."""
@@ -133,11 +144,92 @@ class MilaAuthClient:
             expires_at=time.time() + expiration_delay,
         )
 
+    def _read_shared_token(self) -> MilaToken | None:
+        """Token publié dans le cache par un worker, s'il est encore valide."""
+        try:
+            token = cache.get(self._cache_key)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache du token Mila indisponible : {e}")
+            return None
+        if token is None or token.is_expired:
+            return None
+        return token
+
+    def _publish_token(self, token: MilaToken) -> None:
+        """Partage le token avec les autres workers jusqu'à son expiration."""
+        timeout = int(token.expires_at - time.time() - 60)
+        if timeout <= 0:
+            return
+        try:
+            cache.set(self._cache_key, token, timeout=timeout)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache du token Mila indisponible : {e}")
+
+    def _acquire_refresh_lock(self) -> str | None:
+        """
+        Verrou de refresh (cache.add atomique) : retourne son identifiant.
+
+        Sans cache, chaque worker renouvelle son token comme avant.
+        """
+        owner = uuid.uuid4().hex
+        try:
+            acquired = cache.add(
+                self._lock_key,
+                owner,
+                timeout=settings.MILA_TOKEN_REFRESH_LOCK_TIMEOUT,
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Cache du token Mila indisponible : {e}")
+            return owner
+        return owner if acquired else None
+
+    def _release_refresh_lock(self, owner: str) -> None:
+        try:
+            if cache.get(self._lock_key) == owner:
+                cache.delete(self._lock_key)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache du token Mila indisponible : {e}")
+
+    def _get_shared_token(self) -> MilaToken:
+        """
+        Token du cache, ou refresh en single-flight : le worker qui obtient le
+        verrou appelle l'API, les autres relisent le cache jusqu'à publication.
+        """
+        token = self._read_shared_token()
+        if token:
+            return token
+
+        deadline = time.monotonic() + settings.MILA_TOKEN_REFRESH_LOCK_TIMEOUT
+        while True:
+            owner = self._acquire_refresh_lock()
+            if owner:
+                try:
+                    # Publié entre la lecture et la prise du verrou
+                    token = self._read_shared_token()
+                    if token:
+                        return token
+                    token = self._fetch_token()
+                    self._publish_token(token)
+                    return token
+                finally:
+                    self._release_refresh_lock(owner)
+
+            if time.monotonic() >= deadline:
+                # Le détenteur du verrou ne répond plus : ne pas bloquer l'appel
+                logger.warning("⚠️ Refresh du token Mila trop long, login direct")
+                return self._fetch_token()
+
+            time.sleep(TOKEN_REFRESH_POLL_INTERVAL)
+            token = self._read_shared_token()
+            if token:
+                return token
+
     def get_token(self) -> str:
         """
         Retourne un token JWT valide.
 
-        Le token est mis en cache et renouvelé automatiquement avant expiration.
+        Le token est mis en cache (mémoire puis cache partagé) et renouvelé
+        automatiquement avant expiration, par un seul worker à la fois.
 
         Returns:
             Token JWT valide
@@ -147,7 +239,7 @@ class MilaAuthClient:
             MilaConfigurationError: Si les credentials sont manquants
         """
         if self._token is None or self._token.is_expired:
-            self._token = self._fetch_token()
+            self._token = self._get_shared_token()
             logger.debug("Mila token refreshed")
 
         return self._token.jwt_token
@@ -157,14 +249,23 @@ class MilaAuthClient:
         return {"Authorization": f"Bearer {self.get_token()}"}
 
     def invalidate_token(self) -> None:
-        """Force le refresh du token au prochain appel."""
+        """Force le refresh du token au prochain appel (token refusé par l'API)."""
+        rejected = self._token
         self._token = None
+        if rejected is None:
+            return
+
+        # Retirer le token partagé s'il s'agit du même (pas un token plus récent)
+        shared = self._read_shared_token()
+        if shared and shared.jwt_token == rejected.jwt_token:
+            try:
+                cache.delete(self._cache_key)
+            except Exception as e:
+                logger.warning(f"⚠️ Cache du token Mila indisponible : {e}")
 
     def close(self) -> None:
-        """Ferme la session HTTP."""
-        if self._session:
-            self._session.close()
-            self._session = None
+        """La session est partagée par le process : rien à fermer ici."""
+        self._token = None
 
     def __enter__(self) -> "MilaAuthClient":
         return self
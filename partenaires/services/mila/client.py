@@ -19,6 +19,7 @@ from django.conf import settings
 
 from .adapters import AdresseToMilaAdapter, BienToMilaAdapter
 from .auth import MilaAuthClient
+from .http import get_mila_session
 from .types import (
     Deductible,
     MilaAddress,
@@ -77,7 +78,6 @@ class MilaMRHClient:
             auth_client: Client d'authentification (créé automatiquement si None)
         """
         self._auth = auth_client or MilaAuthClient()
-        self._session: requests.Session | None = None
 
     @property
     def base_url(self) -> str:
@@ -85,11 +85,8 @@ class MilaMRHClient:
 
     @property
     def session(self) -> requests.Session:
-        """Session HTTP réutilisable."""
-        if self._session is None:
-            self._session = requests.Session()
-            self._session.headers.update({"Content-Type": "application/json"})
-        return self._session
+        """Session HTTP partagée du process (pool keep-alive)."""
+        return get_mila_session()
 
     def get_quotation(
         self,
@@ -217,6 +214,15 @@ class MilaMRHClient:
                 headers=self._auth.get_auth_headers(),
                 timeout=30,
             )
+            if response.status_code == 401:
+                # Token partagé révoqué côté Mila : un seul nouvel essai
+                self._auth.invalidate_token()
+                response = self.session.post(
+                    url,
+                    json=payload,
+                    headers=self._auth.get_auth_headers(),
+                    timeout=30,
+                )
             response.raise_for_status()
         except requests.HTTPError as e:
             logger.error(
@@ -241,10 +247,7 @@ class MilaMRHClient:
         return MRHQuotationResult(formulas=formulas, request=request)
 
     def close(self) -> None:
-        """Ferme les sessions HTTP."""
-        if self._session:
-            self._session.close()
-            self._session = None
+        """La session est partagée par le process : seul le token local est oublié."""
         self._auth.close()
 
     def __enter__(self) -> "MilaMRHClient":
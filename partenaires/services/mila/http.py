@@ -0,0 +1,55 @@
+"""
+Session HTTP partagée par tous les clients Mila du process.
+
+Les connexions (TLS compris) restent ouvertes entre deux appels : un devis
+ne paie plus la poignée de main TLS. La session est recréée après un fork
+(workers gunicorn / jobs), les sockets du parent ne se partagent pas.
+"""
+
+import os
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+_lock = threading.Lock()
+_session: requests.Session | None = None
+_session_pid: int | None = None
+
+
+def _build_session() -> requests.Session:
+    """Session keep-alive avec un pool de MILA_HTTP_POOL_SIZE connexions."""
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.MILA_HTTP_POOL_SIZE,
+        # Au-delà du pool, les threads attendent une connexion libre
+        pool_block=True,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_mila_session() -> requests.Session:
+    """Session HTTP du process courant (thread-safe, recréée après un fork)."""
+    global _session, _session_pid
+
+    with _lock:
+        if _session is None or _session_pid != os.getpid():
+            _session = _build_session()
+            _session_pid = os.getpid()
+        return _session
+
+
+def reset_mila_session() -> None:
+    """Ferme les connexions du pool (tests, changement de configuration)."""
+    global _session, _session_pid
+
+    with _lock:
+        if _session is not None and _session_pid == os.getpid():
+            _session.close()
+        _session = None
+        _session_pid = None
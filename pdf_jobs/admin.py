@@ -0,0 +1,44 @@
+from django.contrib import admin, messages
+
+from .broker import retry_failed_jobs
+from .models import PdfJob
+
+
+@admin.register(PdfJob)
+class PdfJobAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "document_type",
+        "document_id",
+        "status",
+        "attempts",
+        "locked_by",
+        "created_at",
+        "finished_at",
+    ]
+
+    list_filter = ["status", "document_type", "created_at"]
+
+    search_fields = ["document_id", "requested_by__email"]
+
+    readonly_fields = ["created_at", "updated_at", "finished_at", "result", "error"]
+
+    list_per_page = 50
+
+    actions = ["retry_jobs"]
+
+    def retry_jobs(self, request, queryset):
+        requeued, conflicts = retry_failed_jobs(queryset)
+        self.message_user(request, f"{requeued} job(s) remis en file.")
+        if conflicts:
+            documents = ", ".join(
+                f"{job.document_type} {job.document_id}" for job in conflicts
+            )
+            self.message_user(
+                request,
+                f"{len(conflicts)} job(s) ignoré(s), un job est déjà actif pour : "
+                f"{documents}",
+                level=messages.WARNING,
+            )
+
+    retry_jobs.short_description = "Relancer les jobs en échec"
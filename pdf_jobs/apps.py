@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class PdfJobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "pdf_jobs"
+    verbose_name = "Génération PDF asynchrone"
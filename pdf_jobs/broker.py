@@ -0,0 +1,233 @@
+"""
+Broker en base de données pour les jobs PDF.
+
+PostgreSQL sert de file d'attente (SELECT ... FOR UPDATE SKIP LOCKED) :
+aucun service externe à déployer, et les tests tournent sur la base de test.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import ACTIVE_JOB_STATUSES, PdfJob, PdfJobStatus
+
+logger = logging.getLogger(__name__)
+
+
+def get_active_job(document_type, document_id):
+    """Retourne le job pending/running d'un document, ou None."""
+    return PdfJob.objects.filter(
+        document_type=document_type,
+        document_id=document_id,
+        status__in=ACTIVE_JOB_STATUSES,
+    ).first()
+
+
+def enqueue_pdf_job(document_type, document_id, base_url, user=None):
+    """
+    Met en file la génération PDF d'un document (dédoublonnée par document).
+
+    Args:
+        document_type: Valeur de SignableDocumentType
+        document_id: UUID du document
+        base_url: URL absolue de la requête d'origine
+        user: Utilisateur à l'origine de la demande
+
+    Returns:
+        tuple[PdfJob, bool]: (job, created) - created=False si un job actif
+        existait déjà pour ce document
+    """
+    existing = get_active_job(document_type, document_id)
+    if existing:
+        logger.info(f"♻️ Job PDF déjà en file pour {document_type} {document_id}")
+        return existing, False
+
+    try:
+        with transaction.atomic():
+            job = PdfJob.objects.create(
+                document_type=document_type,
+                document_id=document_id,
+                base_url=base_url,
+                requested_by=user if user and user.is_authenticated else None,
+                available_at=timezone.now(),
+                max_attempts=settings.PDF_JOBS_MAX_ATTEMPTS,
+            )
+    except IntegrityError:
+        # Course avec une requête concurrente : la contrainte unique partielle
+        # garantit un seul job actif, on renvoie celui qui a gagné
+        existing = get_active_job(document_type, document_id)
+        if existing is None:
+            raise
+        return existing, False
+
+    logger.info(f"📥 Job PDF {job.id} en file ({document_type} {document_id})")
+    return job, True
+
+
+def claim_next_job(worker_id):
+    """
+    Réserve le prochain job disponible pour un worker.
+
+    SKIP LOCKED permet à plusieurs workers de dépiler en parallèle sans
+    se bloquer mutuellement ni traiter deux fois le même job.
+
+    Returns:
+        PdfJob | None: Job passé en RUNNING, ou None si la file est vide
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            PdfJob.objects.select_for_update(skip_locked=True)
+            .filter(status=PdfJobStatus.PENDING, available_at__lte=now)
+            .order_by("available_at", "created_at")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = PdfJobStatus.RUNNING
+        job.attempts += 1
+        job.locked_at = now
+        job.locked_by = worker_id
+        job.save(
+            update_fields=["status", "attempts", "locked_at", "locked_by", "updated_at"]
+        )
+
+    return job
+
+
+def mark_job_succeeded(job, result):
+    """Enregistre le résultat d'un job terminé."""
+    job.status = PdfJobStatus.SUCCEEDED
+    job.result = result
+    job.error = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "result", "error", "finished_at", "updated_at"])
+
+
+def get_retry_delay(attempts):
+    """Backoff exponentiel plafonné : base, 2×base, 4×base... ≤ max."""
+    delay = settings.PDF_JOBS_RETRY_BASE_DELAY * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(delay, settings.PDF_JOBS_RETRY_MAX_DELAY))
+
+
+def mark_job_failed(job, error, retryable=False):
+    """
+    Enregistre l'échec d'un job et le replanifie si l'erreur est transitoire.
+
+    Args:
+        job: PdfJob en cours
+        error: Exception (ou message) à l'origine de l'échec
+        retryable: True pour une erreur transitoire (stockage indisponible...)
+
+    Returns:
+        bool: True si le job a été replanifié, False s'il est définitivement en échec
+    """
+    job.error = str(error)
+    job.locked_at = None
+    job.locked_by = ""
+
+    if retryable and job.attempts < job.max_attempts:
+        job.status = PdfJobStatus.PENDING
+        job.available_at = timezone.now() + get_retry_delay(job.attempts)
+        job.save(
+            update_fields=[
+                "status",
+                "error",
+                "available_at",
+                "locked_at",
+                "locked_by",
+                "updated_at",
+            ]
+        )
+        logger.warning(
+            f"🔁 Job PDF {job.id} replanifié (tentative {job.attempts}/{job.max_attempts}) : {error}"
+        )
+        return True
+
+    job.status = PdfJobStatus.FAILED
+    job.finished_at = timezone.now()
+    job.save(
+        update_fields=[
+            "status",
+            "error",
+            "finished_at",
+            "locked_at",
+            "locked_by",
+            "updated_at",
+        ]
+    )
+    logger.error(f"❌ Job PDF {job.id} en échec définitif : {error}")
+    return False
+
+
+def requeue_stale_jobs(timeout=None):
+    """
+    Remet en file les jobs RUNNING dont le worker a disparu (crash, OOM, kill -9).
+
+    Args:
+        timeout: Durée (secondes) au-delà de laquelle un job RUNNING est
+                 considéré abandonné (défaut: settings.PDF_JOBS_STALE_TIMEOUT)
+
+    Returns:
+        int: Nombre de jobs remis en file ou passés en échec
+    """
+    timeout = timeout if timeout is not None else settings.PDF_JOBS_STALE_TIMEOUT
+    limit = timezone.now() - timedelta(seconds=timeout)
+    count = 0
+
+    with transaction.atomic():
+        stale_jobs = PdfJob.objects.select_for_update(skip_locked=True).filter(
+            status=PdfJobStatus.RUNNING, locked_at__lt=limit
+        )
+        for job in stale_jobs:
+            mark_job_failed(
+                job,
+                f"Worker {job.locked_by} sans réponse depuis {timeout}s",
+                retryable=True,
+            )
+            count += 1
+
+    return count
+
+
+def retry_failed_jobs(jobs):
+    """
+    Remet en file des jobs FAILED (action admin).
+
+    Un document peut avoir reçu entre-temps un nouveau job actif : le remettre
+    en file violerait la contrainte unique partielle. Chaque job est donc
+    remis en file dans son propre savepoint, et ceux qui entrent en conflit
+    sont laissés en échec.
+
+    Args:
+        jobs: QuerySet de PdfJob (les jobs non FAILED sont ignorés)
+
+    Returns:
+        tuple[int, list[PdfJob]]: (nombre remis en file, jobs en conflit)
+    """
+    requeued = 0
+    conflicts = []
+
+    for job in jobs.filter(status=PdfJobStatus.FAILED).order_by("created_at"):
+        try:
+            with transaction.atomic():
+                PdfJob.objects.filter(pk=job.pk, status=PdfJobStatus.FAILED).update(
+                    status=PdfJobStatus.PENDING,
+                    attempts=0,
+                    available_at=timezone.now(),
+                    finished_at=None,
+                )
+        except IntegrityError:
+            conflicts.append(job)
+            continue
+        requeued += 1
+
+    if conflicts:
+        logger.warning(
+            f"⚠️ {len(conflicts)} job(s) PDF non relancés : job actif existant"
+        )
+    return requeued, conflicts
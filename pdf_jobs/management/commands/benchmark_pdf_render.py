@@ -0,0 +1,157 @@
+"""
+Management command pour mesurer le temps de rendu WeasyPrint par type de
+document, à froid (renderer et data URIs recréés à chaque rendu, comme avant
+backend/pdf_rendering.py) puis à chaud (renderer partagé du process).
+
+Seul le rendu HTML → PDF est mesuré : ni signature, ni upload. Les documents
+assurance statiques (CGV, DER) sont toujours mesurés ; bail, état des lieux
+et quittance le sont si un identifiant est fourni.
+
+Usage:
+    python manage.py benchmark_pdf_render
+    python manage.py benchmark_pdf_render --bail=<uuid> --etat-lieux=<uuid> --quittance=<uuid>
+    python manage.py benchmark_pdf_render --count=20
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+
+from assurances.services.documents import InsuranceDocumentService
+from backend.pdf_rendering import get_pdf_renderer, render_pdf, reset_pdf_renderer
+
+
+def _percentile(values, ratio):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+class Command(BaseCommand):
+    help = "Benchmark rendu PDF WeasyPrint à froid vs à chaud, par type de document"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bail", help="UUID d'un bail à rendre")
+        parser.add_argument("--etat-lieux", help="UUID d'un état des lieux à rendre")
+        parser.add_argument("--quittance", help="UUID d'une quittance à rendre")
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=5,
+            help="Nombre de rendus par type et par mode (default: 5)",
+        )
+        parser.add_argument(
+            "--base-url",
+            default="http://localhost:8000/",
+            help="URL de base pour les ressources des templates",
+        )
+
+    def handle(self, *args, **options):
+        self.base_url = options["base_url"]
+        count = max(1, options["count"])
+
+        documents = self.build_documents(options)
+        for label, render in documents:
+            cold = []
+            for _ in range(count):
+                reset_pdf_renderer()
+                start = time.perf_counter()
+                render()
+                cold.append((time.perf_counter() - start) * 1000)
+
+            # Le dernier rendu à froid a laissé un renderer prêt
+            get_pdf_renderer()
+            warm = []
+            for _ in range(count):
+                start = time.perf_counter()
+                render()
+                warm.append((time.perf_counter() - start) * 1000)
+
+            cold_median = statistics.median(cold)
+            warm_median = statistics.median(warm)
+            self.stdout.write(
+                f"⏱️ {label:16} : froid {cold_median:7.1f} ms (p95 {_percentile(cold, 0.95):7.1f}), "
+                f"chaud {warm_median:7.1f} ms (p95 {_percentile(warm, 0.95):7.1f}), "
+                f"×{cold_median / warm_median:.2f}"
+            )
+
+    def build_documents(self, options):
+        """Liste de (libellé, callable sans argument rendant le PDF)."""
+        service = InsuranceDocumentService()
+        documents = [
+            ("CGV MRH", lambda: service.generate_conditions_generales("MRH")),
+            ("DER", service.generate_der),
+        ]
+
+        if options["bail"]:
+            from bail.models import Bail
+            from bail.views import build_bail_pdf_context
+
+            bail = self.get_object(
+                Bail.objects.select_related("location__bien"), options["bail"], "Bail"
+            )
+            documents.append(
+                (
+                    "Bail",
+                    lambda: render_pdf(
+                        render_to_string(
+                            "pdf/bail/bail.html", build_bail_pdf_context(bail)
+                        ),
+                        base_url=self.base_url,
+                    ),
+                )
+            )
+
+        if options["etat_lieux"]:
+            from etat_lieux.models import EtatLieux
+            from etat_lieux.views import prepare_etat_lieux_data_for_pdf
+
+            etat_lieux = self.get_object(
+                EtatLieux.objects.all(), options["etat_lieux"], "État des lieux"
+            )
+            # Photos préparées une fois : seul le rendu est mesuré
+            context = prepare_etat_lieux_data_for_pdf(etat_lieux)
+            html = render_to_string("pdf/etat_lieux/etat_lieux.html", context)
+            documents.append(
+                (
+                    "État des lieux",
+                    lambda: render_pdf(
+                        html,
+                        base_url=self.base_url,
+                        url_fetcher=context["photo_renditions"].url_fetcher,
+                    ),
+                )
+            )
+
+        if options["quittance"]:
+            from quittance.models import Quittance
+            from quittance.views import build_quittance_pdf_context
+
+            quittance = self.get_object(
+                Quittance.objects.select_related("location__bien").prefetch_related(
+                    "location__locataires", "location__bien__bailleurs"
+                ),
+                options["quittance"],
+                "Quittance",
+            )
+            documents.append(
+                (
+                    "Quittance",
+                    lambda: render_pdf(
+                        render_to_string(
+                            "pdf/quittance/quittance.html",
+                            build_quittance_pdf_context(quittance, None),
+                        ),
+                        base_url=self.base_url,
+                    ),
+                )
+            )
+
+        return documents
+
+    def get_object(self, queryset, pk, label):
+        try:
+            return queryset.get(id=pk)
+        except (queryset.model.DoesNotExist, ValueError):
+            raise CommandError(f"{label} introuvable : {pk}")
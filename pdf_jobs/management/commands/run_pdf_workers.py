@@ -0,0 +1,113 @@
+"""
+Management command pour lancer le pool de workers PDF.
+
+Usage:
+    python manage.py run_pdf_workers
+    python manage.py run_pdf_workers --workers=4
+    python manage.py run_pdf_workers --once   # vide la file puis s'arrête
+"""
+
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from backend.pdf_rendering import warm_up_pdf_renderer
+from pdf_jobs.broker import requeue_stale_jobs
+from pdf_jobs.worker import run_worker
+from signature.signing_context import warm_up_signing_context
+
+
+def _worker_main(index, exit_when_empty):
+    """Point d'entrée d'un process worker (après fork)."""
+    stop = {"requested": False}
+
+    def handle_stop(signum, frame):
+        # Arrêt propre : on termine le job en cours avant de sortir
+        stop["requested"] = True
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    # Certificats Hestia et polices chargés une fois par worker (pas au premier job)
+    warm_up_signing_context()
+    warm_up_pdf_renderer()
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    run_worker(
+        worker_id,
+        should_stop=lambda: stop["requested"],
+        exit_when_empty=exit_when_empty,
+    )
+
+
+class Command(BaseCommand):
+    help = "Lance les workers de génération PDF (bail, état des lieux, quittance)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.PDF_JOBS_WORKERS,
+            help=f"Nombre de process workers (default: {settings.PDF_JOBS_WORKERS})",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Traiter les jobs disponibles puis s'arrêter",
+        )
+
+    def handle(self, *args, **options):
+        num_workers = max(1, options["workers"])
+        exit_when_empty = options["once"]
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"🔁 {requeued} job(s) abandonné(s) remis en file")
+
+        # Les connexions DB ne doivent pas être partagées entre process
+        connections.close_all()
+
+        ctx = multiprocessing.get_context("fork")
+        processes = [
+            ctx.Process(target=_worker_main, args=(i, exit_when_empty), daemon=False)
+            for i in range(num_workers)
+        ]
+        for process in processes:
+            process.start()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ {num_workers} worker(s) PDF démarré(s)")
+        )
+
+        stop = {"requested": False}
+
+        def handle_stop(signum, frame):
+            stop["requested"] = True
+
+        signal.signal(signal.SIGTERM, handle_stop)
+        signal.signal(signal.SIGINT, handle_stop)
+
+        last_requeue = time.monotonic()
+        while any(p.is_alive() for p in processes):
+            if stop["requested"]:
+                for process in processes:
+                    if process.is_alive():
+                        process.terminate()  # SIGTERM → fin du job en cours
+                break
+
+            if time.monotonic() - last_requeue > settings.PDF_JOBS_STALE_TIMEOUT / 2:
+                requeue_stale_jobs()
+                last_requeue = time.monotonic()
+
+            time.sleep(1)
+
+        for process in processes:
+            process.join()
+
+        self.stdout.write("👋 Workers PDF arrêtés")
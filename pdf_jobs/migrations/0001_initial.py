@@ -0,0 +1,123 @@
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PdfJob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "document_type",
+                    models.CharField(
+                        choices=[
+                            ("bail", "Contrat de bail"),
+                            ("etat_lieux", "État des lieux"),
+                            ("quittance", "Quittance de loyer"),
+                            ("avenant", "Avenant au bail"),
+                            ("assurance", "Assurance"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "document_id",
+                    models.UUIDField(help_text="ID du Bail / EtatLieux / Quittance"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "En attente"),
+                            ("running", "En cours"),
+                            ("succeeded", "Terminé"),
+                            ("failed", "Échec"),
+                        ],
+                        db_index=True,
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("max_attempts", models.PositiveIntegerField(default=5)),
+                (
+                    "available_at",
+                    models.DateTimeField(
+                        help_text=(
+                            "Le job ne peut pas être réservé avant cette date (backoff)"
+                        )
+                    ),
+                ),
+                ("locked_at", models.DateTimeField(blank=True, null=True)),
+                ("locked_by", models.CharField(blank=True, max_length=100)),
+                (
+                    "base_url",
+                    models.URLField(
+                        help_text="URL de base pour WeasyPrint et les liens absolus",
+                        max_length=500,
+                    ),
+                ),
+                (
+                    "result",
+                    models.JSONField(
+                        blank=True,
+                        help_text="Données de réponse (pdfUrl, linkToken...)",
+                        null=True,
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="pdf_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Job PDF",
+                "verbose_name_plural": "Jobs PDF",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "available_at"],
+                        name="pdf_jobs_pd_status_f71634_idx",
+                    ),
+                    models.Index(
+                        fields=["document_type", "document_id"],
+                        name="pdf_jobs_pd_documen_64d116_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("status__in", ["pending", "running"])),
+                        fields=("document_type", "document_id"),
+                        name="unique_active_pdf_job_per_document",
+                    )
+                ],
+            },
+        ),
+    ]
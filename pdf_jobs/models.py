@@ -0,0 +1,94 @@
+"""
+Modèles pour la génération asynchrone des PDF (bail, état des lieux, quittance).
+
+La table PdfJob sert à la fois de file d'attente (broker en base) et d'historique :
+les workers réservent les jobs via SELECT ... FOR UPDATE SKIP LOCKED.
+"""
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+
+from location.models import BaseModel
+from signature.document_types import SignableDocumentType
+
+
+class PdfJobStatus(models.TextChoices):
+    PENDING = "pending", "En attente"
+    RUNNING = "running", "En cours"
+    SUCCEEDED = "succeeded", "Terminé"
+    FAILED = "failed", "Échec"
+
+
+# Statuts pour lesquels un job est encore "vivant" (dédoublonnage par document)
+ACTIVE_JOB_STATUSES = [PdfJobStatus.PENDING, PdfJobStatus.RUNNING]
+
+
+class PdfJob(BaseModel):
+    """
+    Job de génération PDF : rendu WeasyPrint → champs de signature →
+    certification Hestia → upload.
+
+    Un seul job actif (pending/running) par document, garanti par contrainte
+    unique partielle : un double-clic ou un refresh renvoie le job existant.
+    """
+
+    document_type = models.CharField(
+        max_length=20, choices=SignableDocumentType.choices
+    )
+    document_id = models.UUIDField(help_text="ID du Bail / EtatLieux / Quittance")
+    status = models.CharField(
+        max_length=20,
+        choices=PdfJobStatus.choices,
+        default=PdfJobStatus.PENDING,
+        db_index=True,
+    )
+
+    # Retry (erreurs de stockage transitoires)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    available_at = models.DateTimeField(
+        help_text="Le job ne peut pas être réservé avant cette date (backoff)"
+    )
+
+    # Réservation par un worker
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+
+    # Contexte de la requête d'origine
+    base_url = models.URLField(
+        max_length=500, help_text="URL de base pour WeasyPrint et les liens absolus"
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="pdf_jobs",
+    )
+
+    # Résultat
+    result = models.JSONField(
+        null=True, blank=True, help_text="Données de réponse (pdfUrl, linkToken...)"
+    )
+    error = models.TextField(blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Job PDF"
+        verbose_name_plural = "Jobs PDF"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+            models.Index(fields=["document_type", "document_id"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["document_type", "document_id"],
+                condition=Q(status__in=ACTIVE_JOB_STATUSES),
+                name="unique_active_pdf_job_per_document",
+            )
+        ]
+
+    def __str__(self):
+        return f"PdfJob {self.document_type} {self.document_id} ({self.status})"
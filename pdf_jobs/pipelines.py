@@ -0,0 +1,51 @@
+"""
+Registre des pipelines de génération PDF exécutés par les workers.
+
+Chaque pipeline reçoit (document_id, base_url, user) et retourne les données
+de réponse que la vue synchrone aurait renvoyées (sans la clé "success").
+Seules les erreurs de stockage transitoires sont réessayées par le worker :
+toute autre exception (document introuvable, données invalides...) est définitive.
+"""
+
+from signature.document_types import SignableDocumentType
+
+
+def run_bail_pipeline(document_id, base_url, user):
+    from bail.models import Bail
+    from bail.views import generate_and_store_bail_pdf, get_existing_bail_pdf_data
+
+    bail = Bail.objects.get(id=document_id)
+
+    # IDEMPOTENCE: ne pas recréer les signature requests d'un bail déjà en signature
+    existing_data = get_existing_bail_pdf_data(bail)
+    if existing_data:
+        return existing_data
+
+    return generate_and_store_bail_pdf(bail, base_url, user)
+
+
+def run_etat_lieux_pipeline(document_id, base_url, user):
+    from etat_lieux.models import EtatLieux
+    from etat_lieux.views import generate_and_store_etat_lieux_pdf
+
+    etat_lieux = EtatLieux.objects.get(id=document_id)
+    return generate_and_store_etat_lieux_pdf(etat_lieux, base_url, user)
+
+
+def run_quittance_pipeline(document_id, base_url, user):
+    from quittance.models import Quittance
+    from quittance.views import generate_and_store_quittance_pdf
+
+    quittance = (
+        Quittance.objects.select_related("location__bien", "location__mandataire")
+        .prefetch_related("location__locataires", "location__bien__bailleurs")
+        .get(id=document_id)
+    )
+    return generate_and_store_quittance_pdf(quittance, base_url, user)
+
+
+PDF_JOB_PIPELINES = {
+    SignableDocumentType.BAIL.value: run_bail_pipeline,
+    SignableDocumentType.ETAT_LIEUX.value: run_etat_lieux_pipeline,
+    SignableDocumentType.QUITTANCE.value: run_quittance_pipeline,
+}
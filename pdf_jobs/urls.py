@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+app_name = "pdf_jobs"
+
+urlpatterns = [
+    path("<uuid:job_id>/", views.get_pdf_job_status, name="job_status"),
+]
@@ -0,0 +1,41 @@
+import logging
+
+from django.http import JsonResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+
+from .models import PdfJob
+
+logger = logging.getLogger(__name__)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def get_pdf_job_status(request, job_id):
+    """
+    Statut d'un job de génération PDF (polling frontend).
+
+    GET /api/pdf_jobs/{job_id}/
+
+    Quand status == "succeeded", "result" contient les mêmes données que la
+    réponse synchrone de la vue de génération (pdfUrl, linkTokenFirstSigner...).
+    """
+    try:
+        job = PdfJob.objects.get(id=job_id, requested_by=request.user)
+    except PdfJob.DoesNotExist:
+        return JsonResponse(
+            {"success": False, "error": "Job PDF non trouvé"}, status=404
+        )
+
+    return JsonResponse(
+        {
+            "success": True,
+            "jobId": str(job.id),
+            "status": job.status,
+            "documentType": job.document_type,
+            "documentId": str(job.document_id),
+            "attempts": job.attempts,
+            "result": job.result,
+            "error": job.error or None,
+        }
+    )
@@ -0,0 +1,82 @@
+"""
+Boucle des workers PDF : réserve un job, exécute son pipeline, enregistre
+le résultat ou replanifie le job en cas d'erreur de stockage transitoire.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from backend.storage_utils import is_transient_storage_error
+
+from .broker import claim_next_job, mark_job_failed, mark_job_succeeded
+from .pipelines import PDF_JOB_PIPELINES
+
+logger = logging.getLogger(__name__)
+
+
+def process_job(job):
+    """
+    Exécute le pipeline d'un job réservé.
+
+    Returns:
+        bool: True si le job a réussi
+    """
+    pipeline = PDF_JOB_PIPELINES.get(job.document_type)
+    if pipeline is None:
+        mark_job_failed(job, f"Type de document non supporté: {job.document_type}")
+        return False
+
+    logger.info(
+        f"⚙️ Job PDF {job.id} ({job.document_type} {job.document_id}) "
+        f"tentative {job.attempts}/{job.max_attempts}"
+    )
+    start = time.monotonic()
+
+    try:
+        result = pipeline(job.document_id, job.base_url, job.requested_by)
+    except Exception as e:
+        logger.exception(f"Erreur lors de l'exécution du job PDF {job.id}")
+        mark_job_failed(job, e, retryable=is_transient_storage_error(e))
+        return False
+
+    mark_job_succeeded(job, result)
+    logger.info(f"✅ Job PDF {job.id} terminé en {time.monotonic() - start:.1f}s")
+    return True
+
+
+def run_worker(worker_id, should_stop, poll_interval=None, exit_when_empty=False):
+    """
+    Dépile les jobs jusqu'à ce que should_stop() retourne True.
+
+    Args:
+        worker_id: Identifiant du worker (stocké dans PdfJob.locked_by)
+        should_stop: Callable sans argument, vérifié entre deux jobs
+        poll_interval: Attente (secondes) quand la file est vide
+        exit_when_empty: Sortir dès que la file est vide (mode --once)
+
+    Returns:
+        int: Nombre de jobs traités
+    """
+    poll_interval = (
+        poll_interval if poll_interval is not None else settings.PDF_JOBS_POLL_INTERVAL
+    )
+    processed = 0
+
+    while not should_stop():
+        # Connexions DB fermées par Postgres/PgBouncer entre deux jobs
+        close_old_connections()
+
+        job = claim_next_job(worker_id)
+        if job is None:
+            if exit_when_empty:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        process_job(job)
+        processed += 1
+
+    return processed
@@ -1,6 +1,5 @@
 import json
 import logging
-import os
 import uuid
 from datetime import datetime
 
@@ -11,8 +10,8 @@ from django.utils import timezone
 from num2words import num2words
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from weasyprint import HTML
 
+from backend.pdf_rendering import render_pdf
 from backend.pdf_utils import get_logo_pdf_base64_data_uri
 from location.models import Bailleur, Locataire
 
@@ -20,6 +19,7 @@ from location.models import Bailleur, Locataire
 from location.services.access_utils import get_user_role_for_location
 from location.services.bailleur_utils import get_primary_bailleur_for_user
 from signature.document_status import DocumentStatus
+from signature.document_types import SignableDocumentType
 
 from .email_service import send_quittance_email as send_email
 from .models import Quittance
@@ -186,11 +186,204 @@ def get_or_create_quittance_for_location(location, validated_data):
     return str(quittance.id)
 
 
+class QuittanceDataError(ValueError):
+    """Données de quittance incomplètes ou incohérentes (erreur 400, pas de retry)."""
+
+
+def build_quittance_pdf_context(quittance, user):
+    """
+    Construit le contexte du template pdf/quittance/quittance.html.
+
+    Args:
+        quittance: Instance de Quittance (relations location/bien préchargées)
+        user: Utilisateur à l'origine de la génération (priorité bailleur)
+
+    Returns:
+        dict: Contexte complet pour render_to_string
+
+    Raises:
+        QuittanceDataError: Si montant, bailleur ou locataires sont invalides
+    """
+    # Toutes les informations sont déduites de la quittance
+    location = quittance.location
+    mois = quittance.mois
+    annee = quittance.annee
+    date_paiement_obj = quittance.date_paiement
+
+    logger.info(
+        f"Montants de la quittance: loyer={quittance.montant_loyer}, charges={quittance.montant_charges}"
+    )
+
+    # Préparer les données pour le template
+    # Récupérer les montants depuis la Quittance (pas depuis RentTerms)
+    if quittance.montant_loyer is None:
+        raise QuittanceDataError(
+            "Le montant du loyer n'est pas défini pour cette quittance"
+        )
+
+    montant_loyer_hc = float(quittance.montant_loyer)
+    montant_charges = float(quittance.montant_charges or 0)
+    montant_total = montant_loyer_hc + montant_charges
+    montant_en_lettres = amount_to_words_french(montant_total)
+
+    # Récupérer le bailleur (priorité au user connecté)
+    premier_bailleur: Bailleur = get_primary_bailleur_for_user(
+        location.bien.bailleurs, user
+    )
+    logger.info(f"Bailleur pour génération PDF: {premier_bailleur}")
+
+    if not premier_bailleur:
+        logger.error("Aucun bailleur trouvé pour cette location")
+        raise QuittanceDataError("Aucun bailleur trouvé pour cette location")
+
+    # Récupérer les locataires de la quittance (toujours définis lors de la création/mise à jour)
+    locataires = list(quittance.locataires.all())
+    logger.info(f"{len(locataires)} locataire(s) pour cette quittance")
+
+    if not locataires:
+        logger.error("Aucun locataire associé à cette quittance - données incohérentes")
+        raise QuittanceDataError("Aucun locataire associé à cette quittance")
+
+    # Déterminer qui signe et le texte approprié
+    logger.info(
+        f"Bailleur personne: {premier_bailleur.personne}, societe: {premier_bailleur.societe}, signataire: {premier_bailleur.signataire}"
+    )
+    if premier_bailleur.personne:
+        # Personne physique
+        signataire_full_name = premier_bailleur.personne.full_name
+        bailleur_type = "personne_physique"
+        bailleur_adresse = premier_bailleur.personne.adresse
+        logger.info(
+            f"Bailleur type: personne_physique, signataire: {signataire_full_name}"
+        )
+    elif premier_bailleur.societe and premier_bailleur.signataire:
+        # Société avec signataire
+        signataire_full_name = premier_bailleur.signataire.full_name
+        bailleur_type = "societe"
+        bailleur_adresse = premier_bailleur.societe.adresse
+        logger.info(f"Bailleur type: societe, signataire: {signataire_full_name}")
+    else:
+        logger.error(
+            "Configuration de bailleur invalide - ni personne ni societe+signataire"
+        )
+        raise QuittanceDataError("Configuration de bailleur invalide")
+
+    # Générer la signature automatique (signataire qui signe)
+    signature_data_url = generate_text_signature(signataire_full_name)
+
+    # Formater les montants (sans décimales si entier)
+    def format_amount(amount):
+        if amount % 1 == 0:
+            return f"{int(amount)}"
+        else:
+            return f"{amount:.2f}"
+
+    return {
+        "location": location,
+        "quittance": quittance,
+        "mois": mois,
+        "annee": annee,
+        "date_paiement": date_paiement_obj,
+        "date_generation": timezone.now().date(),
+        "montant_loyer_hc": format_amount(montant_loyer_hc),
+        "montant_charges": format_amount(montant_charges),
+        "montant_total": format_amount(montant_total),
+        "montant_total_raw": montant_total,
+        "montant_en_lettres": montant_en_lettres,
+        # Informations du bailleur
+        "premier_bailleur": premier_bailleur,
+        "bailleur_type": bailleur_type,
+        "signataire_full_name": signataire_full_name,
+        "bailleur_adresse": bailleur_adresse,
+        "bailleur_signature": signature_data_url,
+        # Informations des locataires
+        "locataires": locataires,
+        "locataire_full_name": locataires[0].full_name
+        if locataires
+        else "",  # Pour compatibilité
+        "nb_locataires": len(locataires),
+        # Adresse du bien loué
+        "adresse_bien": location.bien.adresse,
+        # Logo
+        "logo_base64_uri": get_logo_pdf_base64_data_uri(),
+    }
+
+
+def generate_and_store_quittance_pdf(quittance, base_url, user):
+    """
+    Rendu WeasyPrint → upload dans quittance.pdf → statut SIGNED
+    (la quittance n'a pas besoin de signature).
+
+    Appelé par la vue (mode synchrone) et par les workers pdf_jobs.
+
+    Args:
+        quittance: Instance de Quittance
+        base_url: URL de base pour la résolution des ressources du template
+        user: Utilisateur à l'origine de la génération
+
+    Returns:
+        dict: Données de réponse (quittanceId, pdfUrl, filename, rôles...)
+
+    Raises:
+        QuittanceDataError: Si les données de la quittance sont invalides
+    """
+    location = quittance.location
+    context = build_quittance_pdf_context(quittance, user)
+
+    # Générer le HTML depuis le template (nouveau template factorisé)
+    html = render_to_string("pdf/quittance/quittance.html", context)
+
+    # Générer le PDF
+    pdf_bytes = render_pdf(html, base_url=base_url)
+
+    pdf_filename = f"quittance_{quittance.id}_{uuid.uuid4().hex}.pdf"
+
+    # 1. Sauvegarder dans quittance.pdf
+    quittance.pdf.save(pdf_filename, ContentFile(pdf_bytes), save=True)
+
+    # 2. Mettre à jour le statut vers SIGNED car la quittance n'a pas besoin de signature
+    quittance.status = DocumentStatus.SIGNED.value
+    quittance.save(update_fields=["status"])
+    logger.info(
+        f"Quittance {quittance.id} passée en status SIGNED après génération du PDF"
+    )
+
+    # Récupérer le bailleurId pour la redirection mandataire (priorité au user)
+    bailleur = get_primary_bailleur_for_user(location.bien.bailleurs, user)
+    response_data = {
+        "quittanceId": str(quittance.id),
+        "pdfUrl": quittance.pdf.url,
+        "filename": pdf_filename,
+        "bienId": str(location.bien.id),
+        "context_info": {
+            "bailleur": f"{context['signataire_full_name']}",
+            "locataire": ", ".join([loc.full_name for loc in context["locataires"]]),
+            "periode": f"{context['mois']} {context['annee']}",
+            "montant": f"{context['montant_total_raw']}€",
+        },
+    }
+
+    # Ajouter bailleurId pour la redirection mandataire vers /mon-compte/mes-mandats/{bailleurId}/biens/{bienId}
+    if bailleur:
+        response_data["bailleurId"] = str(bailleur.id)
+
+    user_roles = get_user_role_for_location(location, user.email)
+    response_data.update(user_roles)
+
+    return response_data
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def generate_quittance_pdf(request):
     """
     Génère une quittance de loyer en PDF à partir d'un quittance_id
+
+    Body:
+        - quittance_id: UUID de la quittance
+        - async: (optionnel) si true, la génération est confiée aux workers
+          pdf_jobs et la vue répond 202 avec un jobId à interroger via
+          GET /api/pdf_jobs/<job_id>/
     """
     try:
         # Récupérer les données JSON
@@ -223,197 +416,34 @@ def generate_quittance_pdf(request):
                 {"success": False, "error": "Quittance introuvable"}, status=404
             )
 
-        # Toutes les informations sont déduites de la quittance
-        location = quittance.location
-        mois = quittance.mois
-        annee = quittance.annee
-        date_paiement_obj = quittance.date_paiement
-
-        logger.info(
-            f"Montants de la quittance: loyer={quittance.montant_loyer}, charges={quittance.montant_charges}"
-        )
-
-        # Préparer les données pour le template
-        # Récupérer les montants depuis la Quittance (pas depuis RentTerms)
-        if quittance.montant_loyer is None:
-            return JsonResponse(
-                {
-                    "success": False,
-                    "error": "Le montant du loyer n'est pas défini pour cette quittance",
-                },
-                status=400,
-            )
-
-        montant_loyer_hc = float(quittance.montant_loyer)
-        montant_charges = float(quittance.montant_charges or 0)
-        montant_total = montant_loyer_hc + montant_charges
-        montant_en_lettres = amount_to_words_french(montant_total)
-
-        # Récupérer le bailleur (priorité au user connecté)
-        premier_bailleur: Bailleur = get_primary_bailleur_for_user(
-            location.bien.bailleurs, request.user
-        )
-        logger.info(f"Bailleur pour génération PDF: {premier_bailleur}")
-
-        if not premier_bailleur:
-            logger.error("Aucun bailleur trouvé pour cette location")
-            return JsonResponse(
-                {
-                    "success": False,
-                    "error": "Aucun bailleur trouvé pour cette location",
-                },
-                status=400,
-            )
-
-        # Récupérer les locataires de la quittance (toujours définis lors de la création/mise à jour)
-        locataires = list(quittance.locataires.all())
-        logger.info(f"{len(locataires)} locataire(s) pour cette quittance")
+        if data.get("async"):
+            from pdf_jobs.broker import enqueue_pdf_job
 
-        if not locataires:
-            logger.error(
-                "Aucun locataire associé à cette quittance - données incohérentes"
+            job, created = enqueue_pdf_job(
+                document_type=SignableDocumentType.QUITTANCE.value,
+                document_id=quittance.id,
+                base_url=request.build_absolute_uri(),
+                user=request.user,
             )
             return JsonResponse(
                 {
-                    "success": False,
-                    "error": "Aucun locataire associé à cette quittance",
+                    "success": True,
+                    "quittanceId": str(quittance.id),
+                    "jobId": str(job.id),
+                    "jobStatus": job.status,
+                    "alreadyQueued": not created,
                 },
-                status=400,
+                status=202,
             )
 
-        # Déterminer qui signe et le texte approprié
-        logger.info(
-            f"Bailleur personne: {premier_bailleur.personne}, societe: {premier_bailleur.societe}, signataire: {premier_bailleur.signataire}"
-        )
-        if premier_bailleur.personne:
-            # Personne physique
-            signataire_full_name = premier_bailleur.personne.full_name
-            bailleur_type = "personne_physique"
-            bailleur_adresse = premier_bailleur.personne.adresse
-            logger.info(
-                f"Bailleur type: personne_physique, signataire: {signataire_full_name}"
-            )
-        elif premier_bailleur.societe and premier_bailleur.signataire:
-            # Société avec signataire
-            signataire_full_name = premier_bailleur.signataire.full_name
-            bailleur_type = "societe"
-            bailleur_adresse = premier_bailleur.societe.adresse
-            logger.info(f"Bailleur type: societe, signataire: {signataire_full_name}")
-        else:
-            logger.error(
-                "Configuration de bailleur invalide - ni personne ni societe+signataire"
-            )
-            return JsonResponse(
-                {"success": False, "error": "Configuration de bailleur invalide"},
-                status=400,
-            )
-
-        # Pas besoin de créer la quittance, elle existe déjà
-
-        # Générer la signature automatique (signataire qui signe)
-        signature_data_url = generate_text_signature(signataire_full_name)
-
-        # Formater les montants (sans décimales si entier)
-        def format_amount(amount):
-            if amount % 1 == 0:
-                return f"{int(amount)}"
-            else:
-                return f"{amount:.2f}"
-
-        context = {
-            "location": location,
-            "quittance": quittance,
-            "mois": mois,
-            "annee": annee,
-            "date_paiement": date_paiement_obj,
-            "date_generation": timezone.now().date(),
-            "montant_loyer_hc": format_amount(montant_loyer_hc),
-            "montant_charges": format_amount(montant_charges),
-            "montant_total": format_amount(montant_total),
-            "montant_en_lettres": montant_en_lettres,
-            # Informations du bailleur
-            "premier_bailleur": premier_bailleur,
-            "bailleur_type": bailleur_type,
-            "signataire_full_name": signataire_full_name,
-            "bailleur_adresse": bailleur_adresse,
-            "bailleur_signature": signature_data_url,
-            # Informations des locataires
-            "locataires": locataires,
-            "locataire_full_name": locataires[0].full_name
-            if locataires
-            else "",  # Pour compatibilité
-            "nb_locataires": len(locataires),
-            # Adresse du bien loué
-            "adresse_bien": location.bien.adresse,
-            # Logo
-            "logo_base64_uri": get_logo_pdf_base64_data_uri(),
-        }
-
-        # Générer le HTML depuis le template (nouveau template factorisé)
-        html = render_to_string("pdf/quittance/quittance.html", context)
-
-        # Générer le PDF
-        pdf_bytes = HTML(
-            string=html,
-            base_url=request.build_absolute_uri(),
-        ).write_pdf()
-
-        # Noms de fichiers
-        base_filename = f"quittance_{quittance.id}_{uuid.uuid4().hex}"
-        pdf_filename = f"{base_filename}.pdf"
-        tmp_pdf_path = f"/tmp/{pdf_filename}"
-
         try:
-            # 1. Sauver temporairement
-            with open(tmp_pdf_path, "wb") as f:
-                f.write(pdf_bytes)
-
-            # 2. Recharger dans quittance.pdf
-            with open(tmp_pdf_path, "rb") as f:
-                quittance.pdf.save(pdf_filename, ContentFile(f.read()), save=True)
-
-            # 3. Mettre à jour le statut vers SIGNED car la quittance n'a pas besoin de signature
-            from signature.document_status import DocumentStatus
-
-            quittance.status = DocumentStatus.SIGNED.value
-            quittance.save(update_fields=["status"])
-            logger.info(
-                f"Quittance {quittance.id} passée en status SIGNED après génération du PDF"
+            response_data = generate_and_store_quittance_pdf(
+                quittance, request.build_absolute_uri(), request.user
             )
+        except QuittanceDataError as e:
+            return JsonResponse({"success": False, "error": str(e)}, status=400)
 
-        finally:
-            # 3. Supprimer le fichier temporaire
-            try:
-                os.remove(tmp_pdf_path)
-            except Exception as e:
-                logger.warning(
-                    f"Impossible de supprimer le fichier temporaire {tmp_pdf_path}: {e}"
-                )
-
-        # Récupérer le bailleurId pour la redirection mandataire (priorité au user)
-        bailleur = get_primary_bailleur_for_user(location.bien.bailleurs, request.user)
-        response_data = {
-            "success": True,
-            "quittanceId": str(quittance.id),
-            "pdfUrl": quittance.pdf.url,
-            "filename": pdf_filename,
-            "bienId": location.bien.id,
-            "context_info": {
-                "bailleur": f"{signataire_full_name}",
-                "locataire": ", ".join([loc.full_name for loc in locataires]),
-                "periode": f"{mois} {annee}",
-                "montant": f"{montant_total}€",
-            },
-        }
-
-        # Ajouter bailleurId pour la redirection mandataire vers /mon-compte/mes-mandats/{bailleurId}/biens/{bienId}
-        if bailleur:
-            response_data["bailleurId"] = str(bailleur.id)
-
-        user_roles = get_user_role_for_location(location, request.user.email)
-        response_data.update(user_roles)
-
-        return JsonResponse(response_data)
+        return JsonResponse({"success": True, **response_data})
 
     except Exception as e:
         logger.exception("Erreur lors de la génération de la quittance")
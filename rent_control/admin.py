@@ -1,15 +1,21 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.gis.admin import GISModelAdmin
+from django.contrib.gis.db.models import Extent
 from django.http import HttpResponse
 from django.shortcuts import redirect
-from django.urls import path
+from django.urls import path, reverse
+from django.utils.html import escape, format_html, json_script
 
 from rent_control.management.commands.constants import DEFAULT_YEAR
 
 from .choices import Region
 from .models import (
+    Commune,
+    CommuneZoneStatus,
     PermisDeLouer,
     RentControlArea,
+    RentDataset,
     RentMap,
     RentPrice,
     ZoneTendue,
@@ -145,7 +151,12 @@ class RentControlAreaAdmin(GISModelAdmin):
         return custom_urls + urls
 
     def region_map_view(self, request):
-        """Vue pour afficher une carte de toutes les zones par région"""
+        """
+        Vue pour afficher une carte de toutes les zones par région
+
+        Les géométries ne sont plus dans la page : la carte charge à la demande
+        les tuiles GeoJSON simplifiées de rent_control/tiles.py
+        """
         selected_region = request.GET.get("region", None)
 
         # Si aucune région sélectionnée, prendre la première disponible
@@ -162,41 +173,72 @@ class RentControlAreaAdmin(GISModelAdmin):
         # Récupérer le nom lisible de la région
         region_name = dict(regions).get(selected_region, "")
 
-        # Récupérer les zones pour cette région
-
-        zones = []
-        if selected_region:
-            zones = RentControlArea.objects.filter(
-                region=selected_region, reference_year=DEFAULT_YEAR
-            )
+        # Légende et emprise seulement : aucune géométrie chargée ici
+        zones = RentControlArea.objects.filter(
+            region=selected_region, reference_year=DEFAULT_YEAR
+        )
+        extent = zones.aggregate(extent=Extent("geometry"))["extent"]
+        zone_ids = sorted(
+            zones.exclude(zone_id="ACCEPTED")
+            .values_list("zone_id", flat=True)
+            .distinct()
+        )
 
         # Générer des couleurs pour les zone_id (exclure ACCEPTED)
         zone_colors = {}
-        unique_zone_ids = set(
-            zone.zone_id for zone in zones if zone.zone_id != "ACCEPTED"
-        )
-
-        for i, zone_id in enumerate(unique_zone_ids):
+        for i, zone_id in enumerate(zone_ids):
             hue = (i * 137) % 360  # Distribue les couleurs harmonieusement
             zone_colors[zone_id] = f"hsl({hue}, 70%, 60%)"
 
-        # Préparer le contexte pour le template
-        context = {
-            **self.admin_site.each_context(request),
-            "title": "Carte des zones par région",
-            "regions": regions,
-            "selected_region": selected_region,
-            "region_name": region_name,
-            "zones": zones,
-            "zone_colors": zone_colors,
+        # Gabarits d'URL complétés par la carte ({z}/{x}/{y}, {id}) : les
+        # convertisseurs d'URL n'acceptent pas les accolades, d'où la tuile 0/0/0
+        tile_kwargs = {"region": selected_region, "z": 0, "x": 0, "y": 0}
+        tile_url = reverse(
+            "rent_control_zone_tile", kwargs={**tile_kwargs, "fmt": "geojson"}
+        )
+        tiles_prefix = tile_url.rsplit("/", 3)[0]
+        change_url = reverse(
+            "admin:rent_control_rentcontrolarea_change", args=["__id__"]
+        )
+
+        map_config = {
+            "tileUrl": f"{tiles_prefix}/{{z}}/{{x}}/{{y}}.geojson?year={DEFAULT_YEAR}",
+            # Emprise [[sud, ouest], [nord, est]] pour fitBounds
+            "bounds": (
+                [[extent[1], extent[0]], [extent[3], extent[2]]] if extent else None
+            ),
+            "maxZoom": settings.RENT_CONTROL_TILE_MAX_ZOOM,
+            "zoneColors": zone_colors,
+            "changeUrl": change_url.replace("__id__", "{id}"),
         }
 
-        # Créer une réponse HTML directement dans la fonction
+        title = "Carte des zones par région"
+        site_title = self.admin_site.each_context(request)["site_title"]
+
+        region_options = "".join(
+            format_html(
+                '<option value="{}"{}>{}</option>',
+                region_code,
+                " selected" if region_code == selected_region else "",
+                region_label,
+            )
+            for region_code, region_label in regions
+        )
+        legend_items = "".join(
+            format_html(
+                '<div class="legend-item"><span class="color-box" '
+                'style="background: {}"></span>Zone {}</div>',
+                color,
+                zone_id,
+            )
+            for zone_id, color in zone_colors.items()
+        )
+
         html_content = f"""
         <!DOCTYPE html>
         <html>
         <head>
-            <title>{context["title"]} | {context["site_title"]}</title>
+            <title>{title} | {escape(site_title)}</title>
             <link rel="stylesheet" href="https://unpkg.com/leaflet@1.7.1/dist/leaflet.css" />
             <script src="https://unpkg.com/leaflet@1.7.1/dist/leaflet.js"></script>
             <style>
@@ -210,6 +252,8 @@ class RentControlAreaAdmin(GISModelAdmin):
                     padding: 10px;
                     border-radius: 5px;
                     box-shadow: 0 0 15px rgba(0, 0, 0, 0.2);
+                    max-height: 400px;
+                    overflow-y: auto;
                 }}
                 .legend-item {{
                     margin-bottom: 5px;
@@ -228,142 +272,126 @@ class RentControlAreaAdmin(GISModelAdmin):
             </style>
         </head>
         <body>
-            <h1>Carte des zones d'encadrement des loyers 2025</h1>
-            
+            <h1>Carte des zones d'encadrement des loyers {DEFAULT_YEAR} : {escape(region_name)}</h1>
+
             <div class="region-selector">
                 <form method="get">
                     <label for="region">Sélectionner une région:</label>
                     <select name="region" id="region" onchange="this.form.submit()">
-        """
-
-        # Ajouter les options de région
-        for region_code, region_label in regions:
-            selected = "selected" if region_code == selected_region else ""
-            html_content += (
-                f'<option value="{region_code}" {selected}>{region_label}</option>'
-            )
-
-        html_content += """
+                        {region_options}
                     </select>
                 </form>
             </div>
-            
+
             <div id="map"></div>
-            
+            <div id="legend-items" style="display: none">{legend_items}</div>
+
+            {json_script(map_config, "map-config")}
             <script>
-                document.addEventListener('DOMContentLoaded', function() {
-                    // Créer la carte
-                    var map = L.map('map').setView([48.8534, 2.3488], 10);
-                    
-                    // Ajouter les tuiles OpenStreetMap
-                    L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+                document.addEventListener('DOMContentLoaded', function() {{
+                    var config = JSON.parse(document.getElementById('map-config').textContent);
+
+                    var map = L.map('map', {{maxZoom: config.maxZoom}}).setView([48.8534, 2.3488], 10);
+                    L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
                         attribution: '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a>'
-                    }).addTo(map);
-                    
-                    // Variable pour stocker les limites
-                    var bounds = null;
-        """
+                    }}).addTo(map);
 
-        # Ajouter le code JavaScript pour chaque zone
-        # Première passe : zones normales (pas ACCEPTED)
-        for zone in zones:
-            if zone.zone_id == "ACCEPTED":
-                continue  # Skip ACCEPTED zones for now
+                    // Périmètres ACCEPTED au-dessus des zones
+                    map.createPane('accepted');
+                    map.getPane('accepted').style.zIndex = 450;
+                    map.getPane('accepted').style.pointerEvents = 'none';
 
-            color = zone_colors.get(zone.zone_id, "#ff0000")
-            style_config = f"""
-                            style: {{
+                    var zonesLayer = L.geoJSON(null, {{
+                        style: function(feature) {{
+                            return {{
                                 color: '#333',
                                 weight: 1,
-                                fillColor: "{color}",
+                                fillColor: config.zoneColors[feature.properties.zone_id] || '#ff0000',
                                 fillOpacity: 0.7
-                            }},"""
-
-            html_content += f"""
-                    try {{
-                        var geojson = {zone.geometry.geojson};
-                        
-                        var layer = L.geoJSON(geojson, {{{style_config}
-                            onEachFeature: function(feature, layer) {{
-                                layer.bindPopup(
-                                    "<strong>{zone.zone_name or "Zone " + zone.zone_id}</strong><br>" +
-                                    "ID: {zone.zone_id}<br>" +
-                                    "Année: {zone.reference_year}<br>" +
-                                    "<a href='/admin/rent_control/rentcontrolarea/{zone.id}/change/'>Modifier</a>"
-                                );
-                            }}
-                        }}).addTo(map);
-                        
-                        // Étendre les limites
-                        if (bounds === null) {{
-                            bounds = layer.getBounds();
-                        }} else {{
-                            bounds.extend(layer.getBounds());
+                            }};
+                        }},
+                        onEachFeature: function(feature, layer) {{
+                            var p = feature.properties;
+                            var popup = document.createElement('div');
+                            var name = document.createElement('strong');
+                            name.textContent = p.zone_name || ('Zone ' + p.zone_id);
+                            popup.appendChild(name);
+                            popup.appendChild(document.createElement('br'));
+                            popup.appendChild(document.createTextNode('ID: ' + p.zone_id));
+                            popup.appendChild(document.createElement('br'));
+                            popup.appendChild(document.createTextNode('Année: ' + p.reference_year));
+                            popup.appendChild(document.createElement('br'));
+                            var link = document.createElement('a');
+                            link.href = config.changeUrl.replace('{{id}}', feature.id);
+                            link.textContent = 'Modifier';
+                            popup.appendChild(link);
+                            layer.bindPopup(popup);
                         }}
-                    }} catch (e) {{
-                        console.error("Erreur avec la zone {zone.id}: " + e);
+                    }}).addTo(map);
+
+                    var acceptedLayer = L.geoJSON(null, {{
+                        pane: 'accepted',
+                        interactive: false,
+                        style: {{color: '#000', weight: 3, fillOpacity: 0}}
+                    }}).addTo(map);
+
+                    // Une zone présente sur plusieurs tuiles n'est ajoutée qu'une fois
+                    // par niveau de zoom (géométrie simplifiée pour ce zoom)
+                    var loadedZoom = null;
+                    var loadedIds = {{}};
+
+                    function resetZones() {{
+                        zonesLayer.clearLayers();
+                        acceptedLayer.clearLayers();
+                        loadedIds = {{}};
+                        loadedZoom = map.getZoom();
                     }}
-            """
-
-        # Deuxième passe : zones ACCEPTED (affichées au-dessus)
-        for zone in zones:
-            if zone.zone_id != "ACCEPTED":
-                continue  # Only process ACCEPTED zones now
-
-            style_config = """
-                            style: {
-                                color: '#000',
-                                weight: 3,
-                                fillOpacity: 0
-                            },
-                            interactive: false,"""
-
-            html_content += f"""
-                    try {{
-                        var geojson = {zone.geometry.geojson};
-                        
-                        var layer = L.geoJSON(geojson, {{{style_config}
-                        }}).addTo(map);
-                        
-                        // Étendre les limites
-                        if (bounds === null) {{
-                            bounds = layer.getBounds();
-                        }} else {{
-                            bounds.extend(layer.getBounds());
+
+                    var ZoneTiles = L.GridLayer.extend({{
+                        createTile: function(coords, done) {{
+                            var tile = document.createElement('div');
+                            var url = L.Util.template(config.tileUrl, coords);
+                            fetch(url, {{credentials: 'same-origin'}})
+                                .then(function(response) {{ return response.json(); }})
+                                .then(function(collection) {{
+                                    // Tuile d'un zoom déjà quitté : ignorée
+                                    if (coords.z !== map.getZoom()) return;
+                                    if (loadedZoom !== coords.z) resetZones();
+                                    collection.features.forEach(function(feature) {{
+                                        if (loadedIds[feature.id]) return;
+                                        loadedIds[feature.id] = true;
+                                        if (feature.properties.zone_id === 'ACCEPTED') {{
+                                            acceptedLayer.addData(feature);
+                                        }} else {{
+                                            zonesLayer.addData(feature);
+                                        }}
+                                    }});
+                                }})
+                                .catch(function(e) {{
+                                    console.error('Erreur tuile ' + url + ': ' + e);
+                                }})
+                                .then(function() {{ done(null, tile); }});
+                            return tile;
                         }}
-                    }} catch (e) {{
-                        console.error("Erreur avec la zone {zone.id}: " + e);
+                    }});
+                    new ZoneTiles({{maxZoom: config.maxZoom}}).addTo(map);
+
+                    if (config.bounds !== null) {{
+                        map.fitBounds(config.bounds);
                     }}
-            """
-
-        # Ajouter la légende et le code pour ajuster la vue
-        html_content += """
-                    // Ajuster la vue
-                    if (bounds !== null) {
-                        map.fitBounds(bounds);
-                    }
-                    
+
                     // Ajouter une légende
-                    var legend = L.control({position: 'bottomright'});
-                    legend.onAdd = function(map) {
+                    var legend = L.control({{position: 'bottomright'}});
+                    legend.onAdd = function(map) {{
                         var div = L.DomUtil.create('div', 'legend');
-                        div.innerHTML = '<h4>Légende des zones</h4>';
-        """
-
-        # Ajouter les entrées de légende (exclure ACCEPTED)
-        for zone_id, color in zone_colors.items():
-            if zone_id != "ACCEPTED":
-                html_content += f"""
-                        div.innerHTML += '<div class="legend-item"><span class="color-box" style="background: {color}"></span>Zone {zone_id}</div>';
-            """
-
-        html_content += """
+                        div.innerHTML = '<h4>Légende des zones</h4>'
+                            + document.getElementById('legend-items').innerHTML;
                         return div;
-                    };
+                    }};
                     legend.addTo(map);
-                });
+                }});
             </script>
-            
+
             <div style="margin-top: 20px;">
                 <a href="/admin/rent_control/rentcontrolarea/" class="button">Retour à la liste</a>
             </div>
@@ -371,7 +399,6 @@ class RentControlAreaAdmin(GISModelAdmin):
         </html>
         """
 
-        # Renvoyer la réponse HTTP
         return HttpResponse(html_content)
 
     def has_prices(self, obj):
@@ -678,3 +705,57 @@ class PermisDeLouerAdmin(admin.ModelAdmin):
         return response
 
     export_selected_permis.short_description = "Exporter les permis sélectionnés en CSV"  # type: ignore
+
+
+@admin.register(Commune)
+class CommuneAdmin(GISModelAdmin):
+    """Admin view for Commune (référentiel Etalab, voir import_communes)"""
+
+    list_display = ("nom", "code_insee", "departement_code")
+    list_filter = ("departement_code",)
+    search_fields = ("nom", "code_insee")
+    ordering = ("code_insee",)
+    list_per_page = 50
+
+
+@admin.register(CommuneZoneStatus)
+class CommuneZoneStatusAdmin(admin.ModelAdmin):
+    """Admin view for CommuneZoneStatus (recalculé à chaque import)"""
+
+    list_display = (
+        "commune",
+        "is_zone_tendue",
+        "is_zone_tres_tendue",
+        "is_zone_tendue_touristique",
+        "is_permis_de_louer",
+        "updated_at",
+    )
+    list_filter = (
+        "is_zone_tendue",
+        "is_zone_tres_tendue",
+        "is_zone_tendue_touristique",
+        "is_permis_de_louer",
+    )
+    search_fields = ("commune__nom", "commune__code_insee")
+    list_select_related = ("commune",)
+    list_per_page = 50
+
+
+@admin.register(RentDataset)
+class RentDatasetAdmin(admin.ModelAdmin):
+    """Admin view for RentDataset (versions chargées par migrate_rent_data)"""
+
+    list_display = (
+        "id",
+        "status",
+        "source",
+        "areas_count",
+        "prices_count",
+        "links_count",
+        "created_at",
+        "activated_at",
+    )
+    list_filter = ("status",)
+    ordering = ("-id",)
+    # Statuts modifiés uniquement par migrate_rent_data / rollback_rent_data
+    readonly_fields = [field.name for field in RentDataset._meta.fields]
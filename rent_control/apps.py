@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class RentControlConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'rent_control'
+
+    def ready(self):
+        from rent_control.signals import connect_receivers
+
+        connect_receivers()
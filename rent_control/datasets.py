@@ -0,0 +1,327 @@
+"""
+Versions des données d'encadrement (zones + prix) chargées sans interruption.
+
+L'ancienne migration vidait les tables de production (--clear-target) puis
+les remplissait par lots ORM : pendant ce temps check_zone ne trouvait
+aucune zone. Ici une nouvelle version est chargée à côté des tables
+actives, puis échangée avec elles en une transaction :
+
+1. Schéma STAGING_SCHEMA : tables créées par le schema editor Django
+   (mêmes noms de tables, contraintes et index que les tables actives)
+2. Lecture de la base source par curseur serveur, chargement par COPY,
+   index secondaires (GiST des géométries compris) construits après coup
+3. Échange : les tables actives passent dans PREVIOUS_SCHEMA, celles de
+   STAGING_SCHEMA dans le schéma public (ALTER TABLE ... SET SCHEMA ne
+   déplace que des métadonnées : verrou de quelques millisecondes)
+4. Rollback : nouvel échange avec PREVIOUS_SCHEMA
+
+Les ids de la base source sont conservés (pas de table de correspondance).
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from rent_control.models import (
+    RentControlArea,
+    RentDataset,
+    RentDatasetStatus,
+    RentPrice,
+)
+
+logger = logging.getLogger(__name__)
+
+LIVE_SCHEMA = "public"
+STAGING_SCHEMA = "rent_control_staging"
+PREVIOUS_SCHEMA = "rent_control_previous"
+SWAP_SCHEMA = "rent_control_swap"
+
+# L'échange attend au plus ce délai les lectures en cours (sinon échec, rien ne change)
+SWAP_LOCK_TIMEOUT = "5s"
+
+
+class DatasetError(Exception):
+    """Version incomplète ou échange impossible."""
+
+
+def dataset_models():
+    """Modèles chargés et échangés ensemble (la table M2M comprise)."""
+    return [RentControlArea, RentPrice, RentPrice.areas.through]
+
+
+def _columns(model):
+    return [field.column for field in model._meta.concrete_fields]
+
+
+def _qualified(connection, schema, table):
+    quote = connection.ops.quote_name
+    return f"{quote(schema)}.{quote(table)}"
+
+
+@contextmanager
+def _search_path(cursor, *schemas):
+    """search_path temporaire : les noms non qualifiés visent le premier schéma."""
+    cursor.execute("SHOW search_path")
+    previous = cursor.fetchone()[0]
+    cursor.execute(f"SET search_path TO {', '.join(schemas)}")
+    try:
+        yield
+    finally:
+        cursor.execute(f"SET search_path TO {previous}")
+
+
+# ============================================
+# CHARGEMENT (COPY)
+# ============================================
+
+
+def _copy_value(value):
+    """Valeur au format texte de COPY (NULL, booléens, échappements)."""
+    if value is None:
+        return "\\N"
+    if value is True:
+        return "t"
+    if value is False:
+        return "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class CopyStream:
+    """
+    Fichier en lecture seule alimenté par des lignes, pour copy_expert :
+    les lignes du curseur source partent vers COPY sans tout charger.
+    """
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = b""
+        self.count = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self.count += 1
+            line = "\t".join(_copy_value(value) for value in row) + "\n"
+            self._buffer += line.encode()
+
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    readline = read
+
+
+def _stream_rows(source, model, batch_size):
+    """Lignes de la table source, lues par curseur serveur (chunked_cursor)."""
+    quote = source.ops.quote_name
+    columns = ", ".join(quote(column) for column in _columns(model))
+    with source.chunked_cursor() as cursor:
+        cursor.execute(
+            f"SELECT {columns} FROM {quote(model._meta.db_table)} ORDER BY 1"
+        )
+        while rows := cursor.fetchmany(batch_size):
+            yield from rows
+
+
+def create_staging_tables(using):
+    """
+    (Re)crée STAGING_SCHEMA avec les tables du dataset, sans index secondaires.
+
+    Returns:
+        list: Définitions SQL des index retirés, à recréer après le chargement
+    """
+    connection = connections[using]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {STAGING_SCHEMA} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {STAGING_SCHEMA}")
+
+        # public reste dans le search_path pour les types PostGIS
+        with _search_path(cursor, STAGING_SCHEMA, LIVE_SCHEMA):
+            with connection.schema_editor(atomic=False) as editor:
+                editor.create_model(RentControlArea)
+                editor.create_model(RentPrice)  # crée aussi la table M2M
+
+        # Index hors contraintes (GiST, index de Meta, index des FK) : COPY
+        # plus rapide sans eux, ils sont reconstruits en une passe ensuite
+        cursor.execute(
+            """
+            SELECT pg_get_indexdef(i.indexrelid), i.indexrelid::regclass::text
+            FROM pg_index i
+            JOIN pg_class t ON t.oid = i.indrelid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            WHERE n.nspname = %s
+              AND NOT EXISTS (
+                SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid
+              )
+            """,
+            [STAGING_SCHEMA],
+        )
+        indexes = cursor.fetchall()
+        for _, index_name in indexes:
+            cursor.execute(f"DROP INDEX {index_name}")
+
+    return [definition for definition, _ in indexes]
+
+
+def copy_table(source_alias, target_alias, model, batch_size):
+    """
+    Copie une table de la base source vers STAGING_SCHEMA par COPY FROM STDIN.
+
+    Returns:
+        dict: table, rows, seconds
+    """
+    source = connections[source_alias]
+    target = connections[target_alias]
+    quote = target.ops.quote_name
+    table = _qualified(target, STAGING_SCHEMA, model._meta.db_table)
+    columns = ", ".join(quote(column) for column in _columns(model))
+
+    started = time.monotonic()
+    stream = CopyStream(_stream_rows(source, model, batch_size))
+    with target.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN", stream)
+        # Ids conservés : la séquence repart après le plus grand
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f"COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {table}",
+            [table],
+        )
+
+    return {
+        "table": model._meta.db_table,
+        "rows": stream.count,
+        "seconds": time.monotonic() - started,
+    }
+
+
+def finalize_staging_tables(using, index_definitions):
+    """Reconstruit les index retirés puis met à jour les statistiques."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for definition in index_definitions:
+            cursor.execute(definition)
+        for model in dataset_models():
+            cursor.execute(
+                f"ANALYZE {_qualified(connection, STAGING_SCHEMA, model._meta.db_table)}"
+            )
+
+
+def count_rows(using, schema):
+    """Nombre de lignes de chaque table du dataset dans un schéma."""
+    connection = connections[using]
+    counts = {}
+    with connection.cursor() as cursor:
+        for model in dataset_models():
+            table = model._meta.db_table
+            cursor.execute(f"SELECT COUNT(*) FROM {_qualified(connection, schema, table)}")
+            counts[table] = cursor.fetchone()[0]
+    return counts
+
+
+def schema_exists(using, schema):
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_namespace WHERE nspname = %s", [schema]
+        )
+        return cursor.fetchone() is not None
+
+
+# ============================================
+# ÉCHANGE ET ROLLBACK
+# ============================================
+
+
+def _exchange_with_live(cursor, connection, schema):
+    """Échange les tables du dataset entre le schéma public et `schema`."""
+    tables = [model._meta.db_table for model in dataset_models()]
+    quote = connection.ops.quote_name
+
+    cursor.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+    cursor.execute(
+        "LOCK TABLE "
+        + ", ".join(_qualified(connection, LIVE_SCHEMA, table) for table in tables)
+        + " IN ACCESS EXCLUSIVE MODE"
+    )
+    cursor.execute(f"DROP SCHEMA IF EXISTS {SWAP_SCHEMA} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {SWAP_SCHEMA}")
+    for table in tables:
+        cursor.execute(
+            f"ALTER TABLE {_qualified(connection, LIVE_SCHEMA, table)} "
+            f"SET SCHEMA {SWAP_SCHEMA}"
+        )
+    for table in tables:
+        cursor.execute(
+            f"ALTER TABLE {_qualified(connection, schema, table)} "
+            f"SET SCHEMA {quote(LIVE_SCHEMA)}"
+        )
+    cursor.execute(f"DROP SCHEMA {schema}")
+    cursor.execute(f"ALTER SCHEMA {SWAP_SCHEMA} RENAME TO {schema}")
+
+
+def activate_staging(using, dataset):
+    """
+    Rend active la version chargée dans STAGING_SCHEMA.
+
+    L'ancienne version active est conservée dans PREVIOUS_SCHEMA (rollback),
+    la précédente encore avant est supprimée.
+    """
+    connection = connections[using]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {PREVIOUS_SCHEMA} CASCADE")
+        _exchange_with_live(cursor, connection, STAGING_SCHEMA)
+        cursor.execute(f"ALTER SCHEMA {STAGING_SCHEMA} RENAME TO {PREVIOUS_SCHEMA}")
+
+        RentDataset.objects.using(using).filter(
+            status=RentDatasetStatus.PREVIOUS
+        ).update(status=RentDatasetStatus.ARCHIVED)
+        RentDataset.objects.using(using).filter(
+            status=RentDatasetStatus.ACTIVE
+        ).update(status=RentDatasetStatus.PREVIOUS)
+        dataset.status = RentDatasetStatus.ACTIVE
+        dataset.activated_at = timezone.now()
+        dataset.save(using=using, update_fields=["status", "activated_at"])
+
+    logger.info(f"🔁 {dataset} activé")
+
+
+def rollback_to_previous(using):
+    """
+    Réactive la version précédente (échange public ↔ PREVIOUS_SCHEMA).
+
+    Un second rollback revient donc à la version annulée.
+
+    Returns:
+        RentDataset | None: Version réactivée, si elle est enregistrée
+    """
+    if not schema_exists(using, PREVIOUS_SCHEMA):
+        raise DatasetError("Aucune version précédente à restaurer")
+
+    connection = connections[using]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        _exchange_with_live(cursor, connection, PREVIOUS_SCHEMA)
+
+        datasets = RentDataset.objects.using(using)
+        restored = datasets.filter(status=RentDatasetStatus.PREVIOUS).first()
+        current = datasets.filter(status=RentDatasetStatus.ACTIVE).first()
+        if current:
+            current.status = RentDatasetStatus.PREVIOUS
+            current.save(using=using, update_fields=["status"])
+        if restored:
+            restored.status = RentDatasetStatus.ACTIVE
+            restored.activated_at = timezone.now()
+            restored.save(using=using, update_fields=["status", "activated_at"])
+
+    logger.info(f"⏪ Rollback des données d'encadrement vers {restored or 'la version précédente'}")
+    return restored
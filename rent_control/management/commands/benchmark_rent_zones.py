@@ -0,0 +1,116 @@
+"""
+Management command pour comparer la résolution des zones d'encadrement :
+index STRtree en mémoire vs chemin PostGIS, sur les zones réelles en base.
+
+Les points testés sont tirés dans les zones (representative_point) et dans
+leur emprise (bbox), pour mêler points encadrés et hors zone.
+
+Usage:
+    python manage.py benchmark_rent_zones
+    python manage.py benchmark_rent_zones --count=2000 --year=2025
+"""
+
+import random
+import time
+
+import shapely
+from django.core.management.base import BaseCommand, CommandError
+
+from rent_control.management.commands.constants import DEFAULT_YEAR
+from rent_control.spatial_index import (
+    build_rent_control_index,
+    find_rent_control_area_postgis,
+)
+
+
+def _area_ids(areas):
+    return [area.id if area else None for area in areas]
+
+
+class Command(BaseCommand):
+    help = "Benchmark lookups/seconde : index STRtree vs PostGIS (zones réelles)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=1000,
+            help="Nombre de points testés (default: 1000)",
+        )
+        parser.add_argument(
+            "--year",
+            type=int,
+            default=DEFAULT_YEAR,
+            help=f"Année de référence (default: {DEFAULT_YEAR})",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        year = options["year"]
+        rng = random.Random(options["seed"])
+
+        start = time.perf_counter()
+        index = build_rent_control_index(year)
+        build_time = time.perf_counter() - start
+        if not len(index):
+            raise CommandError(f"Aucune RentControlArea pour {year}")
+        self.stdout.write(
+            f"🗺️ Index : {len(index)} zones construit en {build_time * 1000:.0f} ms"
+        )
+
+        # Points : moitié à l'intérieur d'une zone, moitié au hasard dans l'emprise
+        xmin, ymin, xmax, ymax = shapely.total_bounds(index.geometries)
+        inside = shapely.get_coordinates(
+            shapely.point_on_surface(
+                [rng.choice(index.geometries) for _ in range(count // 2)]
+            )
+        ).tolist()
+        around = [
+            (rng.uniform(xmin, xmax), rng.uniform(ymin, ymax))
+            for _ in range(count - len(inside))
+        ]
+        points = inside + around
+
+        # 1. PostGIS (référence)
+        start = time.perf_counter()
+        expected = [find_rent_control_area_postgis(lng, lat, year) for lng, lat in points]
+        postgis_rate = count / (time.perf_counter() - start)
+        self.stdout.write(f"🐘 PostGIS        : {postgis_rate:10.1f} lookups/s")
+
+        # 2. Index, un point à la fois (get_rent_control_info)
+        start = time.perf_counter()
+        single = [index.lookup(lng, lat) for lng, lat in points]
+        single_rate = count / (time.perf_counter() - start)
+        self.stdout.write(f"⚡ STRtree        : {single_rate:10.1f} lookups/s")
+
+        # 3. Index, lot vectorisé
+        start = time.perf_counter()
+        batch = index.lookup_many(points)
+        batch_rate = count / (time.perf_counter() - start)
+        self.stdout.write(f"⚡ STRtree (lot)  : {batch_rate:10.1f} lookups/s")
+
+        self.stdout.write(f"📈 Gain unitaire : x{single_rate / postgis_rate:.1f}")
+
+        # Cohérence avec PostGIS
+        expected_ids = _area_ids(expected)
+        mismatches = [
+            (point, ref_id, got_id)
+            for point, ref_id, got_id, batch_id in zip(
+                points, expected_ids, _area_ids(single), _area_ids(batch)
+            )
+            if not ref_id == got_id == batch_id
+        ]
+        matched = sum(1 for area_id in expected_ids if area_id)
+        if mismatches:
+            for point, ref_id, got_id in mismatches[:10]:
+                self.stdout.write(
+                    self.style.ERROR(f"❌ {point} : PostGIS={ref_id} index={got_id}")
+                )
+            raise CommandError(f"{len(mismatches)} divergences sur {count} points")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Résultats identiques sur {count} points ({matched} en zone encadrée)"
+            )
+        )
@@ -0,0 +1,108 @@
+"""
+Management command pour importer les contours des communes (référentiel
+Etalab) et recalculer le statut réglementaire par code INSEE.
+
+Usage:
+    python manage.py import_communes
+    python manage.py import_communes --source=/data/communes-5m.geojson.gz
+    python manage.py import_communes --status-only   # recalcul des flags seul
+"""
+
+import gzip
+import json
+
+import requests
+from django.contrib.gis.geos import GEOSGeometry, MultiPolygon
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from rent_control.models import Commune
+from rent_control.zone_status import rebuild_commune_zone_status
+
+DEFAULT_SOURCE = (
+    "https://etalab-datasets.geo.data.gouv.fr/contours-administratifs/"
+    "latest/geojson/communes-5m.geojson.gz"
+)
+
+
+class Command(BaseCommand):
+    help = "Import des contours de communes + recalcul des statuts par code INSEE"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            default=DEFAULT_SOURCE,
+            help="URL ou chemin du GeoJSON des communes (.geojson ou .geojson.gz)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Nombre de communes par INSERT (default: 500)",
+        )
+        parser.add_argument(
+            "--status-only",
+            action="store_true",
+            help="Ne pas réimporter les contours, recalculer seulement les statuts",
+        )
+
+    def handle(self, *args, **options):
+        if not options["status_only"]:
+            features = self.load_features(options["source"])
+            communes = [
+                commune
+                for commune in (self.parse_feature(f) for f in features)
+                if commune is not None
+            ]
+            if not communes:
+                raise CommandError("Aucune commune valide dans la source")
+
+            # Remplacement complet : le référentiel reste cohérent pendant l'import
+            with transaction.atomic():
+                Commune.objects.all().delete()
+                Commune.objects.bulk_create(communes, batch_size=options["batch_size"])
+            self.stdout.write(f"📍 {len(communes)} communes importées")
+
+        count = rebuild_commune_zone_status()
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Statut réglementaire recalculé pour {count} communes")
+        )
+
+    def load_features(self, source):
+        self.stdout.write(f"Lecture de {source}...")
+        try:
+            if source.startswith(("http://", "https://")):
+                response = requests.get(source, timeout=300)
+                response.raise_for_status()
+                content = response.content
+            else:
+                with open(source, "rb") as f:
+                    content = f.read()
+        except (OSError, requests.exceptions.RequestException) as e:
+            raise CommandError(f"Source illisible : {e}")
+
+        if content[:2] == b"\x1f\x8b":
+            content = gzip.decompress(content)
+        return json.loads(content).get("features", [])
+
+    def parse_feature(self, feature):
+        properties = feature.get("properties") or {}
+        code_insee = properties.get("code")
+        geometry = feature.get("geometry")
+        if not code_insee or not geometry:
+            return None
+
+        try:
+            geom = GEOSGeometry(json.dumps(geometry), srid=4326)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Géométrie invalide {code_insee}: {e}"))
+            return None
+        if geom.geom_type == "Polygon":
+            geom = MultiPolygon(geom, srid=4326)
+
+        return Commune(
+            code_insee=code_insee,
+            nom=properties.get("nom", ""),
+            departement_code=properties.get("departement") or "",
+            geometry=geom,
+        )
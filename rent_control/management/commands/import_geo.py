@@ -11,6 +11,8 @@ from algo.encadrement_loyer.montpellier.main import get_montpellier_zone_geometr
 from algo.encadrement_loyer.pays_basques.main import get_pays_basque_zone_geometries
 from rent_control.choices import Region
 from rent_control.models import RentControlArea
+from rent_control.signals import bulk_rent_data_import
+from rent_control.spatial_index import invalidate_rent_control_index
 
 from .constants import DEFAULT_YEAR
 
@@ -38,12 +40,16 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write("Importing rent control zones...")
 
-        # Clear existing data
-        RentControlArea.objects.all().delete()
+        with bulk_rent_data_import():
+            # Clear existing data
+            RentControlArea.objects.all().delete()
 
-        # Import
-        for region, url in DATA.items():
-            self.import_geojson(url, region)
+            # Import
+            for region, url in DATA.items():
+                self.import_geojson(url, region)
+
+        # Les index STRtree des process web doivent être reconstruits
+        invalidate_rent_control_index()
 
         self.stdout.write(
             self.style.SUCCESS("Successfully imported rent control zones")
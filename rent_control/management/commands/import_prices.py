@@ -1,273 +1,234 @@
-import os
+"""
+Import des prix de référence de l'encadrement des loyers (voir rent_control/price_import.py).
+
+Les sources sont lues en parallèle (un process par région), puis chaque
+région est écrite par lots dans sa propre transaction.
+
+Usage:
+    python manage.py import_prices
+    python manage.py import_prices --region PARIS --region LILLE
+    python manage.py import_prices --dry-run          # diff avec les prix chargés
+    python manage.py import_prices --check-only       # prix ambigus uniquement
+    python manage.py import_prices --refresh          # sources retéléchargées
+    python manage.py import_prices --allow-partial    # écrire une source incomplète
+
+Une région dont la source est incomplète (combinaison KML en échec) ou vide
+garde ses prix actuels, sauf avec --allow-partial.
+"""
+
+import time
 
 from django.core.management.base import BaseCommand
 
-from algo.encadrement_loyer.ile_de_france.main import (
-    build_url,
-    extract_data_from_kml,
+from rent_control.choices import Region
+from rent_control.price_import import (
+    IMPORTED_REGIONS,
+    default_workers,
+    delete_orphan_prices,
+    diff_prices,
+    load_current_prices,
+    load_zone_area_ids,
+    parse_regions,
+    split_unmatched,
+    write_region_prices,
 )
-from algo.encadrement_loyer.montpellier.ods_to_rentprice_json import (
-    extract_ods_file_to_json,
-)
-from algo.encadrement_loyer.pays_basques.combinaison import (
-    retrieve_data_from_json_for_pays_basques,
-)
-from rent_control.choices import ConstructionPeriod, PropertyType, Region, RoomCount
-from rent_control.models import RentControlArea, RentPrice
+from rent_control.price_index import find_price_conflicts, rebuild_price_index
+from rent_control.signals import bulk_rent_data_import
 
 from .constants import DEFAULT_YEAR
 
-DATA = {
-    Region.PARIS: "custom",
-    Region.EST_ENSEMBLE: "custom",
-    Region.PLAINE_COMMUNE: "custom",
-    Region.LYON: "custom",
-    Region.MONTPELLIER: "custom",
-    Region.BORDEAUX: "custom",
-    Region.PAYS_BASQUE: "custom",
-    Region.LILLE: "custom",
-    Region.GRENOBLE: "custom",
-}
+# Lignes de diff affichées par catégorie (ajouts, suppressions, modifications)
+DIFF_PREVIEW_ROWS = 10
 
 
-def set_prices_for_ods_file(self, region, file_path, property_type=None):
-    """Set prices for the ODS file"""
-    # Extraire les données du fichier ODS
-    prices_data = extract_ods_file_to_json(file_path, property_type=property_type)
-
-    # Récupérer toutes les zones correspondant à la région et l'année
-    areas = RentControlArea.objects.filter(region=region, reference_year=DEFAULT_YEAR)
+class Command(BaseCommand):
+    help = "Import rent control prices data"
 
-    # Si aucune zone, signaler une erreur et sortir
-    if not areas.exists():
-        self.stdout.write(
-            self.style.ERROR(f"No areas found for {region} {DEFAULT_YEAR}")
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check-only",
+            action="store_true",
+            help="Ne rien importer : lister les combinaisons ayant plusieurs prix",
         )
-        return
-
-    # Parcourir les données de prix extraites
-    for price_data in prices_data:
-        # Créer un nouveau prix
-        price = RentPrice.objects.create(
-            property_type=price_data["property_type"],
-            room_count=price_data["room_count"],
-            construction_period=price_data["construction_period"],
-            furnished=price_data["furnished"],
-            reference_year=DEFAULT_YEAR,
-            reference_price=price_data["reference_price"],
-            min_price=price_data["min_price"],
-            max_price=price_data["max_price"],
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Ne rien écrire : afficher le diff avec les prix actuellement chargés",
         )
-
-        # Pour chaque zone correspondant au critère de localisation du prix
-        for area in areas.filter(zone_id=price_data["zone_id"]):
-            # Associer le prix à la zone
-            price.areas.add(area)
-
-        self.stdout.write(f"Created price: {price}")
-
-
-def import_pays_basque_prices(self, region):
-    """Importe les prix du Pays Basque"""
-    self.stdout.write("Importing Pays Basque prices...")
-
-    # Récupérer les données formatées
-    prices_data = retrieve_data_from_json_for_pays_basques()
-
-    # Récupérer toutes les zones du Pays Basque
-    areas = RentControlArea.objects.filter(region=region, reference_year=DEFAULT_YEAR)
-
-    if not areas.exists():
-        self.stdout.write(
-            self.style.ERROR(f"No areas found for {region} {DEFAULT_YEAR}")
+        parser.add_argument(
+            "--region",
+            action="append",
+            choices=IMPORTED_REGIONS,
+            help="Région à importer (répétable, défaut: toutes)",
         )
-        return
-
-    # Parcourir les données et créer les prix
-    for price_data in prices_data:
-        price = RentPrice.objects.create(
-            property_type=price_data["property_type"],
-            room_count=price_data["room_count"],
-            construction_period=price_data["construction_period"],
-            furnished=price_data["furnished"],
-            reference_year=DEFAULT_YEAR,
-            reference_price=price_data["reference_price"],
-            min_price=price_data["min_price"],
-            max_price=price_data["max_price"],
+        parser.add_argument(
+            "--year",
+            type=int,
+            default=DEFAULT_YEAR,
+            help=f"Année de référence (défaut: {DEFAULT_YEAR})",
         )
-
-        # Associer à toutes les zones correspondantes
-        for area in areas.filter(zone_id=price_data["zone_id"]):
-            price.areas.add(area)
-
-        self.stdout.write(f"Created price: {price}")
-
-
-def price_ile_de_france(
-    self, region, region_uri, start_date, property_type_uri, property_type
-):
-    room_counts = {
-        1: RoomCount.ONE,
-        2: RoomCount.TWO,
-        3: RoomCount.THREE,
-        4: RoomCount.FOUR_PLUS,
-    }
-    construction_periods = {
-        "inf1946": ConstructionPeriod.BEFORE_1946,
-        "1946-1970": ConstructionPeriod.FROM_1946_TO_1970,
-        "1971-1990": ConstructionPeriod.FROM_1971_TO_1990,
-        "sup1990": ConstructionPeriod.AFTER_1990,
-    }
-    meubles = {"meuble": True, "non-meuble": False}
-
-    areas = RentControlArea.objects.filter(
-        region=region,
-        reference_year=DEFAULT_YEAR,
-    )
-    for room_count, room_count_v in room_counts.items():
-        for (
-            construction_period,
-            construction_period_v,
-        ) in construction_periods.items():
-            for meuble, furnished in meubles.items():
-                try:
-                    url = build_url(
-                        region_uri,
-                        property_type_uri,
-                        room_count,
-                        construction_period,
-                        meuble,
-                        start_date,
-                    )
-                    print(
-                        f"Extraction: {property_type_uri}, {room_count} pièces, {construction_period}, {'meublé' if furnished else 'non meublé'}"
-                    )
-
-                    data = extract_data_from_kml(url)
-
-                    for zone_id, price_data in data.items():
-                        price = RentPrice.objects.create(
-                            property_type=property_type,
-                            room_count=room_count_v,
-                            construction_period=construction_period_v,
-                            furnished=furnished,
-                            reference_year=DEFAULT_YEAR,
-                            reference_price=price_data["ref"],
-                            min_price=price_data["refmin"],
-                            max_price=price_data["refmaj"],
-                        )
-
-                        # Associer à toutes les zones correspondantes
-                        for area in areas.filter(zone_id=zone_id):
-                            price.areas.add(area)
-
-                        self.stdout.write(f"Created price: {price}")
-
-                except Exception as e:
-                    print(f"  Erreur: {e}")
-
-
-def price_est_ensemble(self, region):
-    region_uri = "est-ensemble"
-    start_date = f"{DEFAULT_YEAR}-06-01"
-    property_types = {
-        "appartement": PropertyType.APARTMENT,
-        "maison": PropertyType.HOUSE,
-    }  # Attention paris y a rien
-    for property_type_uri, property_type in property_types.items():
-        price_ile_de_france(
-            self, region, region_uri, start_date, property_type_uri, property_type
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Retélécharger les sources distantes (cache disque ignoré)",
         )
-
-
-def price_plaine_commune(self, region):
-    region_uri = "plaine-commune"
-    start_date = f"{DEFAULT_YEAR}-06-01"
-    property_types = {
-        "appartement": PropertyType.APARTMENT,
-        "maison": PropertyType.HOUSE,
-    }  # Attention paris y a rien
-    for property_type_uri, property_type in property_types.items():
-        price_ile_de_france(
-            self, region, region_uri, start_date, property_type_uri, property_type
+        parser.add_argument(
+            "--allow-partial",
+            action="store_true",
+            help=(
+                "Remplacer les prix d'une région même si certaines combinaisons "
+                "de sa source n'ont pas pu être lues"
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Process de lecture des sources (défaut: une par région, max CPU)",
         )
-
-
-def price_paris(self, region):
-    region_uri = "paris"
-    start_date = f"{DEFAULT_YEAR}-07-01"
-    price_ile_de_france(self, region, region_uri, start_date, None, None)
-
-
-class Command(BaseCommand):
-    help = "Import rent control prices data"
 
     def handle(self, *args, **options):
-        self.stdout.write("Importing rent control prices...")
-
-        # Clear existing data
-        RentPrice.objects.all().delete()
+        if options["check_only"]:
+            self.report_conflicts(find_price_conflicts())
+            return
 
-        # Import
-        for region, url in DATA.items():
-            self.import_prices(url, region)
+        regions = options["region"] or IMPORTED_REGIONS
+        year = options["year"]
+        dry_run = options["dry_run"]
+        workers = options["workers"] or default_workers(regions)
 
         self.stdout.write(
-            self.style.SUCCESS("Successfully imported rent control zones")
+            f"{'Diff' if dry_run else 'Import'} des prix {year} : "
+            f"{len(regions)} région(s), {workers} process de lecture"
         )
 
-    def import_prices(self, url, region):
-        """Import Prices data into the database"""
-        self.stdout.write(f"Importing {region} prices data")
+        started = time.monotonic()
+        failed = []
+        results = parse_regions(regions, year, workers, refresh=options["refresh"])
+        for index, result in enumerate(results, 1):
+            region = result["region"]
+            progress = f"[{index}/{len(regions)}] {Region(region).label}"
+
+            if "exception" in result:
+                failed.append(region)
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"{progress} : lecture impossible ({result['exception']}), "
+                        "prix actuels conservés"
+                    )
+                )
+                continue
 
-        try:
-            if region == Region.MONTPELLIER:
-                extract_dir = "algo/encadrement_loyer/montpellier"
-                file_path = os.path.join(extract_dir, f"{DEFAULT_YEAR}.ods")
-                set_prices_for_ods_file(self, region, file_path, property_type=None)
+            for error in result["errors"]:
+                self.stdout.write(self.style.WARNING(f"  ⚠️ {error}"))
 
-            elif region == Region.BORDEAUX:
-                extract_dir = "algo/encadrement_loyer/bordeaux"
-                # APPARTEMENT
-                file_path = os.path.join(extract_dir, f"{DEFAULT_YEAR}_appart.ods")
-                set_prices_for_ods_file(
-                    self, region, file_path, property_type=PropertyType.APARTMENT
+            area_ids = load_zone_area_ids(region, year)
+            if not area_ids:
+                failed.append(region)
+                self.stdout.write(
+                    self.style.ERROR(f"{progress} : aucune zone {region} {year}")
                 )
-                # MAISON
-                file_path = os.path.join(extract_dir, f"{DEFAULT_YEAR}_maison.ods")
-                set_prices_for_ods_file(
-                    self, region, file_path, property_type=PropertyType.HOUSE
+                continue
+
+            frame, unmatched = split_unmatched(result["frame"], area_ids)
+            self.stdout.write(
+                f"{progress} : {len(result['frame'])} prix lus en "
+                f"{result['seconds']:.1f}s"
+            )
+            if len(unmatched):
+                zones = ", ".join(sorted(unmatched["zone_id"].unique()))
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"  ⚠️ {len(unmatched)} prix ignorés, zones inconnues : {zones}"
+                    )
                 )
 
-            elif region == Region.LILLE:
-                extract_dir = "algo/encadrement_loyer/lille"
-                file_path = os.path.join(extract_dir, f"{DEFAULT_YEAR}.ods")
-                set_prices_for_ods_file(self, region, file_path, property_type=None)
-
-            elif region == Region.PAYS_BASQUE:
-                import_pays_basque_prices(self, region)
-
-            elif region == Region.LYON:
-                extract_dir = "algo/encadrement_loyer/lyon_Villeurbanne"
-                file_path = os.path.join(extract_dir, f"{DEFAULT_YEAR}.ods")
-                set_prices_for_ods_file(self, region, file_path, property_type=None)
-
-            elif region == Region.EST_ENSEMBLE:
-                price_est_ensemble(self, region)
+            if dry_run:
+                self.report_diff(diff_prices(frame, load_current_prices(region, year)))
+                continue
+
+            # write_region_prices remplace tous les prix de la région :
+            # une source incomplète effacerait les combinaisons manquantes
+            incomplete = result["errors"] and not options["allow_partial"]
+            if incomplete or not len(frame):
+                failed.append(region)
+                reason = "source incomplète" if incomplete else "aucun prix importable"
+                self.stdout.write(
+                    self.style.ERROR(f"  ❌ {reason}, prix actuels conservés")
+                )
+                continue
+
+            write_started = time.monotonic()
+            with bulk_rent_data_import():
+                stats = write_region_prices(region, frame, area_ids, year)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"  ✅ {stats['prices']} prix, {stats['links']} liens zone "
+                    f"({stats['deleted']} remplacés) en "
+                    f"{time.monotonic() - write_started:.1f}s"
+                )
+            )
 
-            elif region == Region.PLAINE_COMMUNE:
-                price_plaine_commune(self, region)
+        elapsed = time.monotonic() - started
+        if dry_run:
+            self.stdout.write(f"Diff terminé en {elapsed:.1f}s (aucune écriture)")
+            return
 
-            elif region == Region.PARIS:
-                price_paris(self, region)
+        # Import complet : retirer les prix qui ne sont plus rattachés à une zone
+        if not options["region"] and not failed:
+            with bulk_rent_data_import():
+                orphans = delete_orphan_prices(year)
+            if orphans:
+                self.stdout.write(f"{orphans} prix sans zone supprimés")
+
+        if failed:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Import terminé en {elapsed:.1f}s, régions en échec : "
+                    f"{', '.join(failed)}"
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Successfully imported rent control prices ({elapsed:.1f}s)"
+                )
+            )
 
-            elif region == Region.GRENOBLE:
-                extract_dir = "algo/encadrement_loyer/grenoble"
-                file_path = os.path.join(extract_dir, f"{DEFAULT_YEAR}.ods")
-                set_prices_for_ods_file(self, region, file_path, property_type=None)
+        # Index des prix reconstruit + ambiguïtés relevées dès l'import
+        self.report_conflicts(rebuild_price_index())
 
-            else:
-                raise ValueError(f"Unknown region: {region}")
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Error fetching data: {e}"))
+    def report_diff(self, diff):
+        """Résumé du diff d'une région, avec un aperçu de chaque catégorie."""
+        self.stdout.write(
+            f"  + {len(diff['added'])} ajoutés, - {len(diff['removed'])} supprimés, "
+            f"~ {len(diff['changed'])} modifiés, = {diff['unchanged']} inchangés"
+        )
+        for label, style, frame in (
+            ("+", self.style.SUCCESS, diff["added"]),
+            ("-", self.style.ERROR, diff["removed"]),
+            ("~", self.style.WARNING, diff["changed"]),
+        ):
+            for row in frame.head(DIFF_PREVIEW_ROWS).to_dict("records"):
+                values = " ".join(f"{key}={value}" for key, value in row.items())
+                self.stdout.write(style(f"    {label} {values}"))
+            if len(frame) > DIFF_PREVIEW_ROWS:
+                self.stdout.write(f"    … {len(frame) - DIFF_PREVIEW_ROWS} de plus")
+
+    def report_conflicts(self, conflicts):
+        """Affiche les cas qui lèveraient "Plusieurs prix trouvés" en requête."""
+        if not conflicts:
+            self.stdout.write(self.style.SUCCESS("✅ Aucun prix ambigu"))
             return
+
+        self.stdout.write(
+            self.style.WARNING(f"⚠️ {len(conflicts)} combinaisons avec plusieurs prix :")
+        )
+        for conflict in conflicts:
+            furnished, room_count, period, property_type = conflict["key"]
+            self.stdout.write(
+                self.style.ERROR(
+                    f"  {conflict['region']} zone {conflict['area_id']} - "
+                    f"meublé={furnished} pièces={room_count} période={period} "
+                    f"type={property_type or '*'} → prix {conflict['price_ids']}"
+                )
+            )
@@ -6,6 +6,8 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
 from rent_control.models import ZoneTresTendue
+from rent_control.signals import bulk_rent_data_import
+from rent_control.zone_status import rebuild_commune_zone_status
 
 
 class Command(BaseCommand):
@@ -30,6 +32,8 @@ class Command(BaseCommand):
             help="Clear existing data before import",
         )
 
+    # Statuts recalculés en une fois à la fin (rebuild_commune_zone_status)
+    @bulk_rent_data_import()
     def handle(self, *args, **options):
         file_path = options["file"]
         batch_size = options["batch_size"]
@@ -94,6 +98,10 @@ class Command(BaseCommand):
                 )
             )
 
+            # Flags par code INSEE utilisés par check_zone (voir zone_status.py)
+            count = rebuild_commune_zone_status()
+            self.stdout.write(f"Commune zone status rebuilt: {count} communes")
+
         except Exception as e:
             raise CommandError(f"Error importing data: {str(e)}")
 
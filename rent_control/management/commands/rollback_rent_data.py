@@ -0,0 +1,61 @@
+"""
+Réactive la version précédente des données rent_control (zones + prix),
+conservée par migrate_rent_data. Relancer la commande revient à la version
+annulée.
+
+Usage:
+    python manage.py rollback_rent_data
+    python manage.py rollback_rent_data --database default
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rent_control.datasets import (
+    LIVE_SCHEMA,
+    PREVIOUS_SCHEMA,
+    DatasetError,
+    count_rows,
+    rollback_to_previous,
+)
+from rent_control.price_index import rebuild_price_index
+from rent_control.spatial_index import invalidate_rent_control_index
+
+
+class Command(BaseCommand):
+    help = "Réactive la version précédente des données d'encadrement des loyers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Alias de la base (défaut: default)",
+        )
+
+    def handle(self, *args, **options):
+        using = options["database"]
+
+        try:
+            previous_counts = count_rows(using, PREVIOUS_SCHEMA)
+        except Exception:
+            raise CommandError("Aucune version précédente à restaurer")
+
+        current_counts = count_rows(using, LIVE_SCHEMA)
+        for table, count in previous_counts.items():
+            self.stdout.write(
+                f"📊 {table} : {current_counts[table]} → {count} lignes"
+            )
+
+        try:
+            restored = rollback_to_previous(using)
+        except DatasetError as e:
+            raise CommandError(str(e))
+
+        invalidate_rent_control_index()
+        rebuild_price_index()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"⏪ {restored or 'Version précédente'} réactivée "
+                "(relancer la commande pour annuler)"
+            )
+        )
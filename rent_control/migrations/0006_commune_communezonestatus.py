@@ -0,0 +1,88 @@
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rent_control", "0005_zonetenduetouristique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Commune",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "code_insee",
+                    models.CharField(
+                        max_length=5, unique=True, verbose_name="Code INSEE"
+                    ),
+                ),
+                ("nom", models.CharField(max_length=255, verbose_name="Nom")),
+                (
+                    "departement_code",
+                    models.CharField(
+                        blank=True, max_length=3, verbose_name="Code département"
+                    ),
+                ),
+                (
+                    "geometry",
+                    django.contrib.gis.db.models.fields.MultiPolygonField(srid=4326),
+                ),
+            ],
+            options={
+                "verbose_name": "Commune",
+                "verbose_name_plural": "Communes",
+            },
+        ),
+        migrations.CreateModel(
+            name="CommuneZoneStatus",
+            fields=[
+                (
+                    "commune",
+                    models.OneToOneField(
+                        db_column="code_insee",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="zone_status",
+                        serialize=False,
+                        to="rent_control.commune",
+                        to_field="code_insee",
+                        verbose_name="Commune",
+                    ),
+                ),
+                (
+                    "is_zone_tendue",
+                    models.BooleanField(default=False, verbose_name="Zone tendue"),
+                ),
+                (
+                    "is_zone_tres_tendue",
+                    models.BooleanField(default=False, verbose_name="Zone très tendue"),
+                ),
+                (
+                    "is_zone_tendue_touristique",
+                    models.BooleanField(
+                        default=False, verbose_name="Zone tendue touristique"
+                    ),
+                ),
+                (
+                    "is_permis_de_louer",
+                    models.BooleanField(default=False, verbose_name="Permis de louer"),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Statut réglementaire commune",
+                "verbose_name_plural": "Statuts réglementaires communes",
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rent_control", "0006_commune_communezonestatus"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RentDataset",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("staged", "Chargé (non actif)"),
+                            ("active", "Actif"),
+                            ("previous", "Précédent (rollback possible)"),
+                            ("archived", "Archivé"),
+                        ],
+                        default="staged",
+                        max_length=20,
+                        verbose_name="Statut",
+                    ),
+                ),
+                ("source", models.CharField(max_length=50, verbose_name="Base source")),
+                ("areas_count", models.IntegerField(default=0, verbose_name="Zones")),
+                ("prices_count", models.IntegerField(default=0, verbose_name="Prix")),
+                (
+                    "links_count",
+                    models.IntegerField(default=0, verbose_name="Liens zone-prix"),
+                ),
+                ("rows_per_second", models.FloatField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("activated_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Version des données d'encadrement",
+                "verbose_name_plural": "Versions des données d'encadrement",
+            },
+        ),
+    ]
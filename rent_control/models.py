@@ -162,3 +162,98 @@ class PermisDeLouer(models.Model):
 
     def __str__(self):
         return f"{self.villes}"
+
+
+class Commune(models.Model):
+    """
+    Contour d'une commune (référentiel Etalab), pour résoudre un point GPS en
+    code INSEE sans appel à l'API BAN.
+    """
+
+    code_insee = models.CharField(max_length=5, unique=True, verbose_name="Code INSEE")
+    nom = models.CharField(max_length=255, verbose_name="Nom")
+    departement_code = models.CharField(
+        max_length=3, blank=True, verbose_name="Code département"
+    )
+
+    # Index spatial GiST créé par défaut (spatial_index=True)
+    geometry = models.MultiPolygonField(srid=4326)
+
+    class Meta:
+        verbose_name = "Commune"
+        verbose_name_plural = "Communes"
+
+    def __str__(self):
+        return f"{self.nom} ({self.code_insee})"
+
+
+class CommuneZoneStatus(models.Model):
+    """
+    Statut réglementaire précalculé par code INSEE (zone tendue, très tendue,
+    touristique, permis de louer). Reconstruit après chaque import, recalculé
+    par commune après une modification dans l'admin (rent_control.signals).
+    """
+
+    commune = models.OneToOneField(
+        Commune,
+        on_delete=models.CASCADE,
+        to_field="code_insee",
+        db_column="code_insee",
+        primary_key=True,
+        related_name="zone_status",
+        verbose_name="Commune",
+    )
+    is_zone_tendue = models.BooleanField(default=False, verbose_name="Zone tendue")
+    is_zone_tres_tendue = models.BooleanField(
+        default=False, verbose_name="Zone très tendue"
+    )
+    is_zone_tendue_touristique = models.BooleanField(
+        default=False, verbose_name="Zone tendue touristique"
+    )
+    is_permis_de_louer = models.BooleanField(
+        default=False, verbose_name="Permis de louer"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Statut réglementaire commune"
+        verbose_name_plural = "Statuts réglementaires communes"
+
+    def __str__(self):
+        return f"Statut {self.commune_id}"
+
+
+class RentDatasetStatus(models.TextChoices):
+    STAGED = "staged", "Chargé (non actif)"
+    ACTIVE = "active", "Actif"
+    PREVIOUS = "previous", "Précédent (rollback possible)"
+    ARCHIVED = "archived", "Archivé"
+
+
+class RentDataset(models.Model):
+    """
+    Version des données d'encadrement (zones + prix) chargée par
+    migrate_rent_data. Les tables d'une version sont chargées à part puis
+    échangées avec les tables actives (voir rent_control/datasets.py).
+    """
+
+    status = models.CharField(
+        max_length=20,
+        choices=RentDatasetStatus.choices,
+        default=RentDatasetStatus.STAGED,
+        verbose_name="Statut",
+    )
+    source = models.CharField(max_length=50, verbose_name="Base source")
+    areas_count = models.IntegerField(default=0, verbose_name="Zones")
+    prices_count = models.IntegerField(default=0, verbose_name="Prix")
+    links_count = models.IntegerField(default=0, verbose_name="Liens zone-prix")
+    rows_per_second = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    activated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Version des données d'encadrement"
+        verbose_name_plural = "Versions des données d'encadrement"
+
+    def __str__(self):
+        return f"Dataset v{self.id} ({self.get_status_display()})"
@@ -0,0 +1,402 @@
+"""
+Import des prix de référence par lots (commande import_prices).
+
+L'ancien import créait chaque RentPrice avec objects.create, refiltrait les
+zones puis ajoutait les liens M2M un par un : des dizaines de milliers
+d'INSERT et d'allers-retours pour un import complet. Ici l'import se fait
+en étapes :
+
+1. Lecture : la source de chaque région (ODS, JSON, KML) est convertie en
+   DataFrame normalisé (PRICE_COLUMNS), une région par process
+2. Résolution : zone_id → ids des zones, un seul dict par région
+3. Écriture : suppression des prix de la région puis bulk_create des prix
+   et des lignes de RentPrice.areas.through, dans une transaction par région
+   (une région en échec garde ses prix actuels)
+
+diff_prices() compare une région lue avec les prix en base (mode --dry-run).
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from decimal import Decimal
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from algo.encadrement_loyer.fetch import SourceFetcher
+from algo.encadrement_loyer.ile_de_france.main import build_url, extract_many_kml
+from algo.encadrement_loyer.montpellier.ods_to_rentprice_json import (
+    extract_ods_file_to_json,
+)
+from algo.encadrement_loyer.pays_basques.combinaison import (
+    retrieve_data_from_json_for_pays_basques,
+)
+from rent_control.choices import ConstructionPeriod, PropertyType, Region, RoomCount
+from rent_control.models import RentControlArea, RentPrice
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMNS = [
+    "zone_id",
+    "property_type",
+    "room_count",
+    "construction_period",
+    "furnished",
+]
+AMOUNT_COLUMNS = ["reference_price", "min_price", "max_price"]
+PRICE_COLUMNS = KEY_COLUMNS + AMOUNT_COLUMNS
+
+BULK_BATCH_SIZE = 2000
+
+# Grilles ODS : (fichier, type de bien imposé)
+ODS_SOURCES = {
+    Region.MONTPELLIER: [("algo/encadrement_loyer/montpellier/{year}.ods", None)],
+    Region.BORDEAUX: [
+        ("algo/encadrement_loyer/bordeaux/{year}_appart.ods", PropertyType.APARTMENT),
+        ("algo/encadrement_loyer/bordeaux/{year}_maison.ods", PropertyType.HOUSE),
+    ],
+    Region.LILLE: [("algo/encadrement_loyer/lille/{year}.ods", None)],
+    Region.LYON: [("algo/encadrement_loyer/lyon_Villeurbanne/{year}.ods", None)],
+    Region.GRENOBLE: [("algo/encadrement_loyer/grenoble/{year}.ods", None)],
+}
+
+# Île-de-France (KML DRIHL) : (région dans l'URL, date d'effet, types de bien)
+IDF_SOURCES = {
+    Region.PARIS: ("paris", "07-01", {None: None}),  # Paris : grille unique
+    Region.EST_ENSEMBLE: (
+        "est-ensemble",
+        "06-01",
+        {"appartement": PropertyType.APARTMENT, "maison": PropertyType.HOUSE},
+    ),
+    Region.PLAINE_COMMUNE: (
+        "plaine-commune",
+        "06-01",
+        {"appartement": PropertyType.APARTMENT, "maison": PropertyType.HOUSE},
+    ),
+}
+IDF_ROOM_COUNTS = {
+    1: RoomCount.ONE,
+    2: RoomCount.TWO,
+    3: RoomCount.THREE,
+    4: RoomCount.FOUR_PLUS,
+}
+IDF_CONSTRUCTION_PERIODS = {
+    "inf1946": ConstructionPeriod.BEFORE_1946,
+    "1946-1970": ConstructionPeriod.FROM_1946_TO_1970,
+    "1971-1990": ConstructionPeriod.FROM_1971_TO_1990,
+    "sup1990": ConstructionPeriod.AFTER_1990,
+}
+IDF_MEUBLES = {"meuble": True, "non-meuble": False}
+
+IMPORTED_REGIONS = [*IDF_SOURCES, *ODS_SOURCES, Region.PAYS_BASQUE]
+
+
+# ============================================
+# LECTURE DES SOURCES (process enfants)
+# ============================================
+
+
+def _ods_rows(region, year):
+    rows = []
+    for path, property_type in ODS_SOURCES[region]:
+        rows.extend(
+            extract_ods_file_to_json(
+                path.format(year=year), property_type=property_type
+            )
+        )
+    return rows
+
+
+def _pays_basque_rows():
+    # Résultats de l'API Pays Basque déjà extraits (results.json)
+    return retrieve_data_from_json_for_pays_basques()
+
+
+def build_source_fetcher(refresh=False):
+    """
+    Client des sources distantes (cache disque partagé entre les imports).
+
+    Args:
+        refresh: Ignorer les réponses en cache, quel que soit leur âge
+    """
+    return SourceFetcher(
+        cache_dir=settings.RENT_SOURCES_CACHE_DIR,
+        max_workers=settings.RENT_SOURCES_FETCH_WORKERS,
+        retries=settings.RENT_SOURCES_FETCH_RETRIES,
+        offline=settings.RENT_SOURCES_OFFLINE,
+        max_age=settings.RENT_SOURCES_CACHE_MAX_AGE,
+        refresh=refresh,
+    )
+
+
+def _idf_rows(region, year, errors, refresh=False):
+    region_uri, effective_day, property_types = IDF_SOURCES[region]
+    start_date = f"{year}-{effective_day}"
+
+    combinations = []
+    for property_type_uri, property_type in property_types.items():
+        for room_count, room_count_v in IDF_ROOM_COUNTS.items():
+            for period, period_v in IDF_CONSTRUCTION_PERIODS.items():
+                for meuble, furnished in IDF_MEUBLES.items():
+                    url = build_url(
+                        region_uri,
+                        property_type_uri,
+                        room_count,
+                        period,
+                        meuble,
+                        start_date,
+                    )
+                    combinations.append(
+                        (property_type, room_count_v, period_v, furnished, url)
+                    )
+
+    # Téléchargements en parallèle, analyse incrémentale de chaque KML
+    with build_source_fetcher(refresh=refresh) as fetcher:
+        grids = extract_many_kml([combo[-1] for combo in combinations], fetcher)
+
+    rows = []
+    for (property_type, room_count, period, furnished, url), data in zip(
+        combinations, grids
+    ):
+        # Une combinaison manquante n'empêche pas le reste de la grille
+        if isinstance(data, Exception):
+            errors.append(f"{url}: {data}")
+            continue
+        if not data:
+            errors.append(f"{url}: aucune zone")
+
+        rows.extend(
+            {
+                "zone_id": zone_id,
+                "property_type": property_type,
+                "room_count": room_count,
+                "construction_period": period,
+                "furnished": furnished,
+                "reference_price": values["ref"],
+                "min_price": values["refmin"],
+                "max_price": values["refmaj"],
+            }
+            for zone_id, values in data.items()
+        )
+    return rows
+
+
+def _to_amount(value):
+    """Montant arrondi au centime, comme DecimalField(decimal_places=2)."""
+    return Decimal(str(value).replace(",", ".")).quantize(Decimal("0.01"))
+
+
+def normalize_frame(rows):
+    """Lignes de prix (dicts) → DataFrame avec des valeurs prêtes pour la base."""
+    frame = pd.DataFrame.from_records(list(rows), columns=PRICE_COLUMNS)
+    frame["zone_id"] = frame["zone_id"].map(lambda value: str(value).strip())
+    frame["room_count"] = frame["room_count"].map(str)
+    frame["construction_period"] = frame["construction_period"].map(str)
+    frame["property_type"] = frame["property_type"].map(
+        lambda value: str(value) if value and not pd.isna(value) else None
+    ).astype(object)
+    frame["furnished"] = frame["furnished"].astype(bool)
+    for column in AMOUNT_COLUMNS:
+        frame[column] = frame[column].map(_to_amount)
+    return frame
+
+
+def parse_region(region, year, refresh=False):
+    """
+    Lit et normalise la source d'une région (sans accès base).
+
+    Args:
+        refresh: Retélécharger les sources distantes (cache disque ignoré)
+
+    Returns:
+        dict: region, frame (DataFrame PRICE_COLUMNS), errors, seconds
+    """
+    started = time.monotonic()
+    errors = []
+
+    if region in ODS_SOURCES:
+        rows = _ods_rows(region, year)
+    elif region in IDF_SOURCES:
+        rows = _idf_rows(region, year, errors, refresh=refresh)
+    elif region == Region.PAYS_BASQUE:
+        rows = _pays_basque_rows()
+    else:
+        raise ValueError(f"Unknown region: {region}")
+
+    return {
+        "region": region,
+        "frame": normalize_frame(rows),
+        "errors": errors,
+        "seconds": time.monotonic() - started,
+    }
+
+
+def parse_regions(regions, year, workers, refresh=False):
+    """
+    Lit les régions en parallèle (un process par région, fork).
+
+    Yields:
+        dict: Résultat de parse_region, ou {"region", "exception"} en cas d'échec,
+        dans l'ordre de fin de lecture
+    """
+    if workers <= 1 or len(regions) <= 1:
+        for region in regions:
+            try:
+                yield parse_region(region, year, refresh)
+            except Exception as e:
+                yield {"region": region, "exception": e}
+        return
+
+    ctx = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = {
+            pool.submit(parse_region, region, year, refresh): region
+            for region in regions
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield {"region": futures[future], "exception": e}
+
+
+def default_workers(regions):
+    return max(1, min(len(regions), os.cpu_count() or 1))
+
+
+# ============================================
+# RÉSOLUTION, DIFF ET ÉCRITURE
+# ============================================
+
+
+def load_zone_area_ids(region, year):
+    """zone_id → ids des zones de la région (une seule requête)."""
+    area_ids = {}
+    for area_id, zone_id in RentControlArea.objects.filter(
+        region=region, reference_year=year
+    ).values_list("id", "zone_id"):
+        area_ids.setdefault(str(zone_id), []).append(area_id)
+    return area_ids
+
+
+def load_current_prices(region, year):
+    """Prix actuellement chargés pour la région, une ligne par (zone_id, prix)."""
+    rows = (
+        RentPrice.areas.through.objects.filter(
+            rentcontrolarea__region=region,
+            rentcontrolarea__reference_year=year,
+            rentprice__reference_year=year,
+        )
+        .annotate(
+            zone_id=F("rentcontrolarea__zone_id"),
+            property_type=F("rentprice__property_type"),
+            room_count=F("rentprice__room_count"),
+            construction_period=F("rentprice__construction_period"),
+            furnished=F("rentprice__furnished"),
+            reference_price=F("rentprice__reference_price"),
+            min_price=F("rentprice__min_price"),
+            max_price=F("rentprice__max_price"),
+        )
+        .values(*PRICE_COLUMNS)
+        .distinct()
+    )
+    return normalize_frame(rows)
+
+
+def diff_prices(frame, current):
+    """
+    Compare une région lue avec les prix en base, par clé KEY_COLUMNS.
+
+    Returns:
+        dict: added / removed / changed (DataFrames), unchanged (int)
+    """
+    new = frame.drop_duplicates(KEY_COLUMNS).set_index(KEY_COLUMNS)
+    old = current.drop_duplicates(KEY_COLUMNS).set_index(KEY_COLUMNS)
+
+    common = new.index.intersection(old.index)
+    differs = (new.loc[common, AMOUNT_COLUMNS] != old.loc[common, AMOUNT_COLUMNS]).any(
+        axis=1
+    )
+    changed_keys = common[differs.to_numpy()]
+    changed = new.loc[changed_keys, AMOUNT_COLUMNS].join(
+        old.loc[changed_keys, AMOUNT_COLUMNS], rsuffix="_actuel"
+    )
+
+    return {
+        "added": new.loc[new.index.difference(old.index)].reset_index(),
+        "removed": old.loc[old.index.difference(new.index)].reset_index(),
+        "changed": changed.reset_index(),
+        "unchanged": len(common) - len(changed_keys),
+    }
+
+
+def split_unmatched(frame, area_ids):
+    """Sépare les lignes dont la zone n'existe pas en base (non importables)."""
+    matched = frame["zone_id"].isin(area_ids.keys())
+    return frame[matched], frame[~matched]
+
+
+def write_region_prices(region, frame, area_ids, year):
+    """
+    Remplace les prix d'une région, en une transaction.
+
+    Args:
+        region: Région importée
+        frame: DataFrame normalisé (normalize_frame), zones connues uniquement
+        area_ids: zone_id → ids des zones (load_zone_area_ids)
+        year: Année de référence
+
+    Returns:
+        dict: deleted, prices, links
+    """
+    Through = RentPrice.areas.through
+
+    with transaction.atomic():
+        _, deleted_by_model = RentPrice.objects.filter(
+            id__in=Through.objects.filter(
+                rentcontrolarea__region=region,
+                rentcontrolarea__reference_year=year,
+                rentprice__reference_year=year,
+            ).values("rentprice_id")
+        ).delete()
+        deleted = deleted_by_model.get(RentPrice._meta.label, 0)
+
+        records = frame.to_dict("records")
+        prices = RentPrice.objects.bulk_create(
+            [
+                RentPrice(
+                    reference_year=year,
+                    **{column: record[column] for column in PRICE_COLUMNS[1:]},
+                )
+                for record in records
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+
+        links = Through.objects.bulk_create(
+            [
+                Through(rentprice_id=price.id, rentcontrolarea_id=area_id)
+                for price, record in zip(prices, records)
+                for area_id in area_ids[record["zone_id"]]
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+
+    logger.info(
+        f"💶 {region} : {deleted} prix supprimés, {len(prices)} prix créés, "
+        f"{len(links)} liens zone"
+    )
+    return {"deleted": deleted, "prices": len(prices), "links": len(links)}
+
+
+def delete_orphan_prices(year):
+    """Supprime les prix de l'année rattachés à aucune zone."""
+    _, deleted_by_model = RentPrice.objects.filter(
+        reference_year=year, areas__isnull=True
+    ).delete()
+    return deleted_by_model.get(RentPrice._meta.label, 0)
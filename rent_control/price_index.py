@@ -0,0 +1,301 @@
+"""
+Index dénormalisé des prix de référence, une entrée par zone d'encadrement.
+
+get_rent_price_for_bien enchaînait 4 requêtes par lookup (get de la zone,
+filtre via la table M2M, deux count(), first()) et
+get_available_options_for_area 4 requêtes DISTINCT. Ici chaque zone a une
+entrée en cache (Redis) contenant ses options et ses prix indexés par
+(meublé, pièces, période, type) : un prix ou les options d'une zone se
+lisent en un seul aller-retour cache, puis en O(1).
+
+- Reconstruction complète : rebuild_price_index(), appelée après import_prices
+- Zone absente du cache (éviction, jamais construite) : entrée recalculée
+  depuis la base puis remise en cache
+- Modification unitaire (admin) : invalidate_price_index() sur les zones
+  touchées, appelée par les receivers de rent_control.signals
+- Les combinaisons ambiguës (plusieurs prix pour la même clé, le cas
+  "Plusieurs prix trouvés") sont relevées à la reconstruction par
+  find_price_conflicts(), au lieu d'être découvertes en requête
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import F
+
+from rent_control.choices import Region
+from rent_control.models import RentControlArea, RentPrice
+
+logger = logging.getLogger(__name__)
+
+ENTRY_CACHE_KEY = "rent_control:price_index:{}"
+
+# Régions dont la grille ne distingue pas le type de bien
+REGIONS_WITHOUT_PROPERTY_TYPE = [
+    Region.PARIS,
+    Region.LILLE,
+    Region.LYON,
+    Region.MONTPELLIER,
+    Region.GRENOBLE,
+]
+
+OPTION_FIELDS = {
+    "property_types": "property_type",
+    "room_counts": "room_count",
+    "construction_periods": "construction_period",
+    "furnished_options": "furnished",
+}
+
+PRICE_FIELDS = [
+    "id",
+    "reference_year",
+    "property_type",
+    "room_count",
+    "construction_period",
+    "furnished",
+    "reference_price",
+    "min_price",
+    "max_price",
+]
+
+
+@dataclass(frozen=True)
+class IndexedRentPrice:
+    """
+    Prix de référence lu dans l'index (une ligne RentPrice, sans ses zones).
+
+    Valeur détachée de la base : pas de relation ni de save(), seulement les
+    colonnes utiles aux calculs d'encadrement.
+    """
+
+    id: int
+    reference_year: int
+    property_type: str | None
+    room_count: str
+    construction_period: str
+    furnished: bool
+    reference_price: Decimal
+    min_price: Decimal
+    max_price: Decimal
+
+
+def room_count_choice(nombre_pieces):
+    """Nombre de pièces → valeur RoomCount ("4" = 4 pièces et plus)."""
+    return str(nombre_pieces) if nombre_pieces in (1, 2, 3) else "4"
+
+
+def price_key(region, furnished, room_count, construction_period, property_type):
+    """
+    Clé de l'index ; le type de bien n'est discriminant que hors grilles uniques.
+
+    meublé=None (non renseigné) reste distinct de False : aucun prix ne
+    correspond, comme le filtre ORM furnished=None.
+    """
+    if region in REGIONS_WITHOUT_PROPERTY_TYPE:
+        property_type = None
+    if furnished is not None:
+        furnished = bool(furnished)
+    return (furnished, str(room_count), construction_period, property_type)
+
+
+def build_area_entry(region, prices):
+    """
+    Entrée de l'index pour une zone.
+
+    Args:
+        region: Région de la zone
+        prices: Lignes RentPrice de la zone (dicts PRICE_FIELDS), triées par id
+
+    Returns:
+        dict: region, options, prices (clé → ligne), conflicts (clé → ids)
+    """
+    by_key = defaultdict(list)
+    for price in prices:
+        key = price_key(
+            region,
+            price["furnished"],
+            price["room_count"],
+            price["construction_period"],
+            price["property_type"],
+        )
+        by_key[key].append(price)
+
+    return {
+        "region": region,
+        "options": {
+            option: list(dict.fromkeys(price[field] for price in prices))
+            for option, field in OPTION_FIELDS.items()
+        },
+        "prices": {key: rows[0] for key, rows in by_key.items() if len(rows) == 1},
+        "conflicts": {
+            key: [row["id"] for row in rows]
+            for key, rows in by_key.items()
+            if len(rows) > 1
+        },
+    }
+
+
+def load_area_entries(area_ids=None):
+    """
+    Calcule les entrées depuis la base (2 requêtes quel que soit le nombre de zones).
+
+    Args:
+        area_ids: Zones à charger (toutes si None)
+
+    Returns:
+        dict: area_id → entrée
+    """
+    areas = RentControlArea.objects.all()
+    prices = RentPrice.objects.all()
+    if area_ids is not None:
+        areas = areas.filter(id__in=area_ids)
+        prices = prices.filter(areas__in=area_ids)
+
+    prices_by_area = defaultdict(list)
+    rows = (
+        prices.annotate(area_id=F("areas"))
+        .values("area_id", *PRICE_FIELDS)
+        .order_by("area_id", "id")
+    )
+    for row in rows:
+        prices_by_area[row.pop("area_id")].append(row)
+
+    return {
+        area_id: build_area_entry(region, prices_by_area.get(area_id, []))
+        for area_id, region in areas.values_list("id", "region")
+    }
+
+
+def rebuild_price_index():
+    """
+    Recalcule et met en cache l'entrée de chaque zone.
+
+    Returns:
+        list: Conflits détectés (voir find_price_conflicts)
+    """
+    entries = load_area_entries()
+    cache.set_many(
+        {ENTRY_CACHE_KEY.format(area_id): entry for area_id, entry in entries.items()},
+        timeout=None,
+    )
+    conflicts = find_price_conflicts(entries)
+
+    logger.info(
+        f"💶 Index des prix reconstruit : {len(entries)} zones, "
+        f"{len(conflicts)} combinaisons ambiguës"
+    )
+    return conflicts
+
+
+def find_price_conflicts(entries=None):
+    """
+    Combinaisons (zone, meublé, pièces, période, type) ayant plusieurs prix.
+
+    Returns:
+        list: dicts area_id, region, key, price_ids
+    """
+    if entries is None:
+        entries = load_area_entries()
+    return [
+        {
+            "area_id": area_id,
+            "region": entry["region"],
+            "key": key,
+            "price_ids": price_ids,
+        }
+        for area_id, entry in sorted(entries.items())
+        for key, price_ids in entry["conflicts"].items()
+    ]
+
+
+def invalidate_price_index(area_ids):
+    """Oublie l'entrée des zones modifiées : recalculée à la prochaine lecture."""
+    keys = [ENTRY_CACHE_KEY.format(area_id) for area_id in set(area_ids)]
+    if not keys:
+        return
+    try:
+        cache.delete_many(keys)
+    except Exception as e:
+        logger.warning(f"⚠️ Index des prix non invalidé : {e}")
+
+
+def get_area_entries(area_ids):
+    """
+    Entrées de plusieurs zones : un get_many en cache, les manquantes
+    recalculées depuis la base en un seul lot.
+
+    Returns:
+        dict: area_id → entrée (zones inexistantes absentes)
+    """
+    area_ids = set(area_ids)
+    if not area_ids:
+        return {}
+
+    keys = {ENTRY_CACHE_KEY.format(area_id): area_id for area_id in area_ids}
+    try:
+        cached = cache.get_many(keys)
+    except Exception as e:
+        logger.warning(f"⚠️ Index des prix illisible en cache : {e}")
+        cached = {}
+    entries = {keys[key]: entry for key, entry in cached.items()}
+
+    missing = area_ids - entries.keys()
+    if missing:
+        loaded = load_area_entries(missing)
+        try:
+            cache.set_many(
+                {ENTRY_CACHE_KEY.format(area_id): e for area_id, e in loaded.items()},
+                timeout=None,
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Index des prix non mis en cache : {e}")
+        entries.update(loaded)
+
+    return entries
+
+
+def get_area_entry(area_id):
+    return get_area_entries([area_id]).get(area_id)
+
+
+def get_area_options(area_id):
+    """Options disponibles d'une zone (même format que get_available_options_for_area)."""
+    entry = get_area_entry(area_id)
+    if entry is None:
+        return {option: [] for option in OPTION_FIELDS}
+    return entry["options"]
+
+
+def find_price(entry, furnished, room_count, construction_period, property_type):
+    """
+    Prix de référence dans une entrée de l'index.
+
+    Returns:
+        dict: Ligne RentPrice (PRICE_FIELDS)
+
+    Raises:
+        ValueError: Si aucun ou plusieurs prix correspondent
+    """
+    key = price_key(
+        entry["region"], furnished, room_count, construction_period, property_type
+    )
+    criteria = {
+        "furnished": key[0],
+        "room_count": key[1],
+        "construction_period": key[2],
+    }
+    if key[3] is not None:
+        criteria["property_type"] = key[3]
+
+    if key in entry["conflicts"]:
+        raise ValueError(
+            f"Plusieurs prix trouvés pour les critères: {criteria} "
+            f"({len(entry['conflicts'][key])} résultats)"
+        )
+    try:
+        return entry["prices"][key]
+    except KeyError:
+        raise ValueError(f"Aucun prix trouvé pour les critères: {criteria}")
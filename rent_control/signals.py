@@ -0,0 +1,136 @@
+"""
+Invalidation des index du référentiel d'encadrement (prix, zones) et des
+statuts réglementaires des communes après une modification unitaire (admin,
+shell).
+
+Les imports reconstruisent les index en fin de commande : ils s'exécutent
+dans bulk_rent_data_import(), qui déconnecte ces receivers (sans receiver,
+les queryset.delete() de l'import gardent le chemin de suppression rapide).
+
+Les invalidations sont différées au commit : une lecture concurrente ne
+remet pas en cache l'état d'avant la transaction.
+"""
+
+from contextlib import contextmanager
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+
+from rent_control.models import RentControlArea, RentMap, RentPrice
+from rent_control.price_index import invalidate_price_index
+from rent_control.spatial_index import invalidate_rent_control_index
+from rent_control.zone_status import (
+    ZONE_COMMUNE_FIELDS,
+    refresh_commune_zone_status,
+    zone_commune_keys,
+)
+
+
+def _invalidate_price_index_on_commit(area_ids):
+    area_ids = set(area_ids)
+    if area_ids:
+        transaction.on_commit(partial(invalidate_price_index, area_ids))
+
+
+def area_changed(sender, instance, **kwargs):
+    _invalidate_price_index_on_commit([instance.pk])
+    # Géométrie, année ou règles de zone : index STRtree et tuiles périmés
+    transaction.on_commit(invalidate_rent_control_index)
+
+
+def price_saved(sender, instance, **kwargs):
+    _invalidate_price_index_on_commit(instance.areas.values_list("id", flat=True))
+
+
+def price_deleted(sender, instance, **kwargs):
+    # pre_delete : les liens M2M sont supprimés avant le post_delete
+    _invalidate_price_index_on_commit(instance.areas.values_list("id", flat=True))
+
+
+def price_areas_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # instance : la zone dont les prix changent
+        if action in ("post_add", "post_remove", "post_clear"):
+            _invalidate_price_index_on_commit([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        _invalidate_price_index_on_commit(pk_set)
+    elif action == "pre_clear":
+        _invalidate_price_index_on_commit(instance.areas.values_list("id", flat=True))
+
+
+def zone_pre_save(sender, instance, **kwargs):
+    # Communes visées avant modification : elles peuvent ne plus l'être après
+    previous = sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+    instance._previous_commune_keys = (
+        zone_commune_keys(previous) if previous else (set(), set())
+    )
+
+
+def zone_changed(sender, instance, **kwargs):
+    codes, names = zone_commune_keys(instance)
+    previous_codes, previous_names = getattr(
+        instance, "_previous_commune_keys", (set(), set())
+    )
+    transaction.on_commit(
+        partial(
+            refresh_commune_zone_status,
+            codes | previous_codes,
+            names | previous_names,
+        )
+    )
+
+
+RECEIVERS = [
+    (post_save, area_changed, RentControlArea),
+    (post_delete, area_changed, RentControlArea),
+    (post_save, area_changed, RentMap),
+    (post_delete, area_changed, RentMap),
+    (post_save, price_saved, RentPrice),
+    (pre_delete, price_deleted, RentPrice),
+    (m2m_changed, price_areas_changed, RentPrice.areas.through),
+    *[
+        receiver
+        for zone_model in ZONE_COMMUNE_FIELDS
+        for receiver in (
+            (pre_save, zone_pre_save, zone_model),
+            (post_save, zone_changed, zone_model),
+            (post_delete, zone_changed, zone_model),
+        )
+    ],
+]
+
+
+def _dispatch_uid(handler, sender):
+    return f"rent_control.{handler.__name__}.{sender._meta.label}"
+
+
+def connect_receivers():
+    for signal, handler, sender in RECEIVERS:
+        signal.connect(
+            handler, sender=sender, dispatch_uid=_dispatch_uid(handler, sender)
+        )
+
+
+def disconnect_receivers():
+    for signal, handler, sender in RECEIVERS:
+        signal.disconnect(sender=sender, dispatch_uid=_dispatch_uid(handler, sender))
+
+
+@contextmanager
+def bulk_rent_data_import():
+    """
+    Import en masse : receivers déconnectés le temps de l'import, l'appelant
+    reconstruit lui-même les index (rebuild_*, invalidate_rent_control_index).
+    """
+    disconnect_receivers()
+    try:
+        yield
+    finally:
+        connect_receivers()
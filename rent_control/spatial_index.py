@@ -0,0 +1,321 @@
+"""
+Index spatial en mémoire des zones d'encadrement des loyers.
+
+get_rent_control_info() enchaînait jusqu'à 6 requêtes PostGIS par appel
+(geometry__contains puis exists()/filter(region=...)/first() pour Grenoble et
+Montpellier). Ici, chaque process garde un STRtree shapely par année de
+référence, sur des géométries préparées : un point (ou un lot de points) est
+résolu en un seul appel vectorisé, puis les règles ACCEPTED/WHITELIST sont
+appliquées en Python.
+
+- Index froid (premier appel, après fork ou invalidation) : construit dans un
+  thread de fond, les lookups passent par PostGIS en attendant
+- Invalidation : invalidate_rent_control_index() incrémente une version en
+  cache (Redis), relue par chaque process au plus toutes les
+  RENT_CONTROL_INDEX_CHECK_INTERVAL secondes. Appelée par les imports et, pour
+  les modifications unitaires (admin), par les receivers de rent_control.signals
+"""
+
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import shapely
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.db import connections
+
+from algo.encadrement_loyer.grenoble.main import ACCEPTED_ZONE, WHITELIST_ZONES
+from algo.encadrement_loyer.montpellier.main import (
+    ACCEPTED_ZONE as ACCEPTED_ZONE_MONTPELLIER,
+)
+from algo.encadrement_loyer.montpellier.main import (
+    WHITELIST_ZONES as WHITELIST_ZONES_MONTPELLIER,
+)
+from rent_control.choices import Region
+from rent_control.models import RentControlArea
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION_CACHE_KEY = "rent_control:area_index_version"
+
+# Régions où seule une zone whitelistée compte, et seulement si le point
+# est aussi dans le périmètre ACCEPTED (ordre = priorité, comme l'ancien ORM)
+FILTERED_REGIONS = [
+    (Region.GRENOBLE, ACCEPTED_ZONE, WHITELIST_ZONES),
+    (Region.MONTPELLIER, ACCEPTED_ZONE_MONTPELLIER, WHITELIST_ZONES_MONTPELLIER),
+]
+
+
+def select_rent_control_area(candidates):
+    """
+    Choisit la zone applicable parmi celles qui contiennent le point.
+
+    Args:
+        candidates: RentControlArea contenant le point, triées par id
+                    (même ordre que QuerySet.first())
+
+    Returns:
+        RentControlArea | None
+    """
+    if not candidates:
+        return None
+
+    regions = {area.region for area in candidates}
+    for region, accepted_zone, whitelist_zones in FILTERED_REGIONS:
+        if region in regions:
+            if not any(area.zone_id == accepted_zone for area in candidates):
+                return None
+            return next(
+                (area for area in candidates if area.zone_id in whitelist_zones), None
+            )
+
+    return candidates[0]
+
+
+def find_rent_control_area_postgis(lng, lat, year):
+    """Chemin PostGIS (index froid) : une seule requête, mêmes règles."""
+    point = Point(float(lng), float(lat), srid=4326)
+    candidates = list(
+        RentControlArea.objects.filter(geometry__contains=point, reference_year=year)
+        .defer("geometry")
+        .order_by("id")
+    )
+    return select_rent_control_area(candidates)
+
+
+class RentControlAreaIndex:
+    """STRtree des zones d'une année de référence."""
+
+    def __init__(self, year, areas, geometries):
+        self.year = year
+        self.areas = areas
+        self.geometries = np.asarray(geometries, dtype=object)
+        shapely.prepare(self.geometries)
+        self.tree = shapely.STRtree(self.geometries)
+
+    def __len__(self):
+        return len(self.areas)
+
+    def lookup_many(self, coordinates):
+        """
+        Résout un lot de points en une seule requête sur l'arbre.
+
+        Args:
+            coordinates: Séquence de (lng, lat)
+
+        Returns:
+            list: RentControlArea | None pour chaque point
+        """
+        points = shapely.points(np.asarray(coordinates, dtype=float).reshape(-1, 2))
+        # predicate="within" : point strictement intérieur, comme geometry__contains
+        point_idx, area_idx = self.tree.query(points, predicate="within")
+
+        candidates = [[] for _ in range(len(points))]
+        # Tri par (point, position) : les zones sont déjà triées par id
+        for p, a in sorted(zip(point_idx.tolist(), area_idx.tolist())):
+            candidates[p].append(self.areas[a])
+
+        return [select_rent_control_area(c) for c in candidates]
+
+    def lookup(self, lng, lat):
+        return self.lookup_many([(lng, lat)])[0]
+
+
+def build_rent_control_index(year):
+    """Charge les zones d'une année depuis la base et construit l'index."""
+    start = time.perf_counter()
+
+    areas = list(
+        RentControlArea.objects.filter(reference_year=year)
+        .defer("geometry")
+        .order_by("id")
+    )
+    wkb_by_id = dict(
+        RentControlArea.objects.filter(reference_year=year).values_list(
+            "id", "geometry"
+        )
+    )
+    geometries = [shapely.from_wkb(bytes(wkb_by_id[area.id].wkb)) for area in areas]
+    index = RentControlAreaIndex(year, areas, geometries)
+
+    logger.info(
+        f"🗺️ Index zones {year} construit : {len(index)} zones en "
+        f"{(time.perf_counter() - start) * 1000:.0f} ms"
+    )
+    return index
+
+
+class RentControlIndexRegistry:
+    """Index par année pour le process courant (construction en arrière-plan)."""
+
+    def __init__(self, check_interval):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._indexes = {}
+        self._building = set()
+        self._version = None
+        self._last_check = 0.0
+
+    def get(self, year):
+        """Index de l'année, ou None s'il est froid (construction lancée)."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Threads de construction perdus au fork : on repart de zéro
+                self._reset()
+            self._check_version()
+
+            index = self._indexes.get(year)
+            if index is None and year not in self._building:
+                self._building.add(year)
+                threading.Thread(
+                    target=self._build,
+                    args=(year, self._version),
+                    name=f"rent-control-index-{year}",
+                    daemon=True,
+                ).start()
+            return index
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        try:
+            version = get_index_version()
+        except Exception as e:
+            logger.warning(f"⚠️ Version de l'index des zones illisible : {e}")
+            return
+
+        if version != self._version:
+            if self._version is not None:
+                logger.info("🔄 Zones d'encadrement modifiées, index invalidé")
+            self._indexes.clear()
+            self._version = version
+
+    def _build(self, year, version):
+        try:
+            index = build_rent_control_index(year)
+        except Exception as e:
+            logger.error(f"❌ Construction de l'index des zones {year} impossible : {e}")
+            index = None
+        finally:
+            connections.close_all()
+
+        with self._lock:
+            self._building.discard(year)
+            # Invalidé pendant la construction : on jette ce qui vient d'être construit
+            if index is not None and version == self._version:
+                self._indexes[year] = index
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+_registry = RentControlIndexRegistry(settings.RENT_CONTROL_INDEX_CHECK_INTERVAL)
+
+
+def get_rent_control_index(year):
+    return _registry.get(year)
+
+
+def find_rent_control_area(lng, lat, year):
+    """
+    Zone d'encadrement applicable à un point (index en mémoire, sinon PostGIS).
+
+    Returns:
+        RentControlArea | None: Instance sans géométrie chargée (defer)
+    """
+    index = get_rent_control_index(year) if settings.RENT_CONTROL_INDEX_ENABLED else None
+    if index is None:
+        return find_rent_control_area_postgis(lng, lat, year)
+    return index.lookup(float(lng), float(lat))
+
+
+def _new_index_version():
+    # Jamais servie auparavant : horodatage en nanosecondes, et non 0 ou 1
+    return time.time_ns()
+
+
+def get_index_version():
+    """
+    Version courante des zones (clé de l'index et des tuiles, ETag).
+
+    Clé absente (jamais posée, ou évincée par Redis) : une nouvelle version est
+    posée sans expiration. Revenir à 0 ferait resservir des tuiles et des ETags
+    calculés sur d'anciennes zones.
+
+    Raises:
+        Exception: Cache indisponible (l'appelant décide du repli)
+    """
+    version = cache.get(INDEX_VERSION_CACHE_KEY)
+    if version is None:
+        # add() : un seul process pose la version, les autres la relisent
+        cache.add(INDEX_VERSION_CACHE_KEY, _new_index_version(), timeout=None)
+        version = cache.get(INDEX_VERSION_CACHE_KEY)
+    return version
+
+
+def invalidate_rent_control_index():
+    """À appeler après tout import/modification des RentControlArea."""
+    _registry.clear()
+    try:
+        try:
+            cache.incr(INDEX_VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(INDEX_VERSION_CACHE_KEY, _new_index_version(), timeout=None)
+    except Exception as e:
+        logger.warning(f"⚠️ Invalidation de l'index des zones non propagée : {e}")
+
+
+def find_rent_control_areas_postgis(coordinates, year):
+    """
+    Chemin PostGIS pour un lot de points : une seule jointure spatiale
+    (VALUES × RentControlArea), puis les mêmes règles de sélection.
+    """
+    if not coordinates:
+        return []
+
+    values = ", ".join(["(%s, %s, %s)"] * len(coordinates))
+    params = [
+        value
+        for position, (lng, lat) in enumerate(coordinates)
+        for value in (position, float(lng), float(lat))
+    ]
+    sql = f"""
+        SELECT p.idx, a.id
+        FROM (VALUES {values}) AS p(idx, lng, lat)
+        JOIN {RentControlArea._meta.db_table} a
+          ON a.reference_year = %s
+         AND ST_Contains(a.geometry, ST_SetSRID(ST_MakePoint(p.lng, p.lat), 4326))
+        ORDER BY p.idx, a.id
+    """
+    with connections["default"].cursor() as cursor:
+        cursor.execute(sql, params + [year])
+        rows = cursor.fetchall()
+
+    areas_by_id = RentControlArea.objects.defer("geometry").in_bulk(
+        {area_id for _, area_id in rows}
+    )
+    candidates = [[] for _ in coordinates]
+    for position, area_id in rows:
+        candidates[position].append(areas_by_id[area_id])
+
+    return [select_rent_control_area(c) for c in candidates]
+
+
+def find_rent_control_areas(coordinates, year):
+    """Version lot de find_rent_control_area : coordinates = [(lng, lat), ...]."""
+    index = get_rent_control_index(year) if settings.RENT_CONTROL_INDEX_ENABLED else None
+    if index is None:
+        return find_rent_control_areas_postgis(coordinates, year)
+    return index.lookup_many(coordinates)
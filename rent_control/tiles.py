@@ -0,0 +1,205 @@
+"""
+Tuiles des zones d'encadrement (GeoJSON ou MVT), géométries simplifiées par zoom.
+
+La carte admin concaténait le GeoJSON pleine résolution de toutes les zones
+d'une région dans la page : plusieurs Mo pour Paris ou Lyon. Ici la carte
+charge des tuiles z/x/y à la demande :
+
+- Simplification ST_SimplifyPreserveTopology avec une tolérance d'environ un
+  demi-pixel au zoom demandé, coordonnées GeoJSON arrondies en conséquence
+- Tuile calculée une fois puis gardée en cache (Redis), clé versionnée par la
+  version de l'index des zones : import_geo, migrate_rent_data et
+  rollback_rent_data (invalidate_rent_control_index) invalident les tuiles
+- ETag = version + tuile : les navigateurs revalident en 304 sans recalcul
+"""
+
+import logging
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from rent_control.models import RentControlArea
+from rent_control.spatial_index import get_index_version
+
+logger = logging.getLogger(__name__)
+
+TILE_FORMATS = {
+    "geojson": "application/geo+json",
+    "mvt": "application/vnd.mapbox-vector-tile",
+}
+
+TILE_SIZE = 256
+# Résolution interne des tuiles MVT (valeur par défaut de ST_AsMVT)
+MVT_EXTENT = 4096
+# Circonférence terrestre en Web Mercator (EPSG:3857), en mètres
+WEB_MERCATOR_WIDTH = 40075016.686
+
+# Écart toléré par la simplification, en pixels écran
+SIMPLIFY_PIXELS = 0.5
+
+
+class InvalidTile(ValueError):
+    """Coordonnées z/x/y hors grille ou format inconnu."""
+
+
+def validate_tile(z, x, y, fmt):
+    if fmt not in TILE_FORMATS:
+        raise InvalidTile(f"Format inconnu : {fmt}")
+    if not 0 <= z <= settings.RENT_CONTROL_TILE_MAX_ZOOM:
+        raise InvalidTile(
+            f"Zoom {z} hors limites (0 à {settings.RENT_CONTROL_TILE_MAX_ZOOM})"
+        )
+    if not (0 <= x < 2**z and 0 <= y < 2**z):
+        raise InvalidTile(f"Tuile {z}/{x}/{y} hors grille")
+
+
+def pixel_size_degrees(z):
+    """Largeur d'un pixel au zoom z, en degrés de longitude."""
+    return 360 / (TILE_SIZE * 2**z)
+
+
+def simplify_tolerance(z, fmt):
+    """Tolérance de simplification : degrés (GeoJSON, 4326) ou mètres (MVT, 3857)."""
+    if fmt == "mvt":
+        return WEB_MERCATOR_WIDTH / (TILE_SIZE * 2**z) * SIMPLIFY_PIXELS
+    return pixel_size_degrees(z) * SIMPLIFY_PIXELS
+
+
+def geojson_precision(z):
+    """Décimales utiles des coordonnées GeoJSON (une de plus que le pixel)."""
+    digits = math.ceil(-math.log10(pixel_size_degrees(z))) + 1
+    return min(max(digits, 2), 7)
+
+
+def get_tiles_version():
+    try:
+        return get_index_version()
+    except Exception as e:
+        logger.warning(f"⚠️ Version des zones illisible : {e}")
+        return None
+
+
+def tile_etag(version, region, year, z, x, y, fmt):
+    return f'"{version}-{region}-{year}-{z}-{x}-{y}-{fmt}"'
+
+
+def _tile_cache_key(version, region, year, z, x, y, fmt):
+    return f"rent_control:tile:{version}:{fmt}:{region}:{year}:{z}:{x}:{y}"
+
+
+# ============================================
+# RENDU POSTGIS
+# ============================================
+
+
+def _render_geojson(region, year, z, x, y):
+    """
+    Zones qui touchent la tuile, entières mais simplifiées : la carte
+    dédoublonne par id les zones présentes sur plusieurs tuiles.
+    """
+    sql = f"""
+        WITH bounds AS (
+            SELECT ST_Transform(ST_TileEnvelope(%s, %s, %s), 4326) AS geom
+        )
+        SELECT COALESCE(
+            json_agg(
+                json_build_object(
+                    'type', 'Feature',
+                    'id', a.id,
+                    'geometry', ST_AsGeoJSON(
+                        ST_SimplifyPreserveTopology(a.geometry, %s), %s
+                    )::json,
+                    'properties', json_build_object(
+                        'zone_id', a.zone_id,
+                        'zone_name', a.zone_name,
+                        'reference_year', a.reference_year
+                    )
+                )
+                ORDER BY a.id
+            ),
+            '[]'::json
+        )::text
+        FROM {RentControlArea._meta.db_table} a, bounds
+        WHERE a.region = %s
+          AND a.reference_year = %s
+          AND a.geometry && bounds.geom
+    """
+    params = [
+        z,
+        x,
+        y,
+        simplify_tolerance(z, "geojson"),
+        geojson_precision(z),
+        region,
+        year,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        features = cursor.fetchone()[0]
+    return f'{{"type":"FeatureCollection","features":{features}}}'.encode()
+
+
+def _render_mvt(region, year, z, x, y):
+    """Tuile vectorielle Mapbox (couche "zones"), géométries découpées à la tuile."""
+    sql = f"""
+        WITH bounds AS (SELECT ST_TileEnvelope(%s, %s, %s) AS geom),
+        features AS (
+            SELECT
+                a.id,
+                a.zone_id,
+                a.zone_name,
+                a.reference_year,
+                ST_AsMVTGeom(
+                    ST_SimplifyPreserveTopology(ST_Transform(a.geometry, 3857), %s),
+                    bounds.geom,
+                    {MVT_EXTENT},
+                    64,
+                    true
+                ) AS geom
+            FROM {RentControlArea._meta.db_table} a, bounds
+            WHERE a.region = %s
+              AND a.reference_year = %s
+              AND a.geometry && ST_Transform(bounds.geom, 4326)
+        )
+        SELECT ST_AsMVT(features, 'zones', {MVT_EXTENT}, 'geom', 'id')
+        FROM features
+        WHERE geom IS NOT NULL
+    """
+    params = [z, x, y, simplify_tolerance(z, "mvt"), region, year]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        content = cursor.fetchone()[0]
+    return bytes(content) if content is not None else b""
+
+
+RENDERERS = {"geojson": _render_geojson, "mvt": _render_mvt}
+
+
+def get_zone_tile(region, year, z, x, y, fmt, version=None):
+    """
+    Contenu d'une tuile, depuis le cache si elle a déjà été calculée.
+
+    Args:
+        version: Version des zones déjà lue (get_tiles_version), None : relue
+
+    Returns:
+        bytes: GeoJSON (FeatureCollection) ou MVT
+    """
+    validate_tile(z, x, y, fmt)
+    if version is None:
+        version = get_tiles_version()
+
+    # Version illisible (cache indisponible) : calcul sans mise en cache
+    key = _tile_cache_key(version, region, year, z, x, y, fmt)
+    if version is not None:
+        content = cache.get(key)
+        if content is not None:
+            return content
+
+    content = RENDERERS[fmt](region, year, z, x, y)
+
+    if version is not None:
+        cache.set(key, content, timeout=settings.RENT_CONTROL_TILE_CACHE_TIMEOUT)
+    return content
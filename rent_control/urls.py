@@ -1,7 +1,13 @@
 from django.urls import path
 
-from rent_control.views import check_zone
+from rent_control.views import check_zone, check_zone_batch, zone_tile
 
 urlpatterns = [
     path("check-zone/", check_zone),
+    path("check-zone/batch/", check_zone_batch),
+    path(
+        "tiles/<str:region>/<int:z>/<int:x>/<int:y>.<str:fmt>",
+        zone_tile,
+        name="rent_control_zone_tile",
+    ),
 ]
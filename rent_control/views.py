@@ -3,29 +3,28 @@ import logging
 
 import requests
 from django.conf import settings
-from django.contrib.gis.geos import Point
-from django.db.models import Q
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
 from django_ratelimit.decorators import ratelimit
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
 
-from algo.encadrement_loyer.grenoble.main import ACCEPTED_ZONE, WHITELIST_ZONES
-from algo.encadrement_loyer.montpellier.main import (
-    ACCEPTED_ZONE as ACCEPTED_ZONE_MONTPELLIER,
-)
-from algo.encadrement_loyer.montpellier.main import (
-    WHITELIST_ZONES as WHITELIST_ZONES_MONTPELLIER,
-)
 from rent_control.choices import Region
 from rent_control.management.commands.constants import DEFAULT_YEAR
-from rent_control.models import (
-    PermisDeLouer,
-    RentControlArea,
-    RentPrice,
-    ZoneTendue,
-    ZoneTendueTouristique,
-    ZoneTresTendue,
+from rent_control.price_index import get_area_options
+from rent_control.spatial_index import find_rent_control_area
+from rent_control.tiles import (
+    TILE_FORMATS,
+    InvalidTile,
+    get_tiles_version,
+    get_zone_tile,
+    tile_etag,
+    validate_tile,
 )
+from rent_control.zone_batch import consume_zone_batch_budget, iter_zone_batch
+from rent_control.zone_status import empty_zone_status, get_zone_flags, get_zone_status
 
 logger = logging.getLogger(__name__)
 
@@ -33,25 +32,9 @@ logger = logging.getLogger(__name__)
 def get_available_options_for_area(area):
     """
     Récupère toutes les options disponibles pour une zone donnée
+    (lues dans l'index des prix, un seul aller-retour cache)
     """
-    # Filtre les prix associés à cette zone
-    area_prices = RentPrice.objects.filter(areas=area)
-
-    # Récupère les valeurs distinctes pour chaque attribut
-    return {
-        "property_types": list(
-            area_prices.values_list("property_type", flat=True).distinct()
-        ),
-        "room_counts": list(
-            area_prices.values_list("room_count", flat=True).distinct()
-        ),
-        "construction_periods": list(
-            area_prices.values_list("construction_period", flat=True).distinct()
-        ),
-        "furnished_options": list(
-            area_prices.values_list("furnished", flat=True).distinct()
-        ),
-    }
+    return get_area_options(area.id)
 
 
 def check_zone_status_via_ban(lat, lng):
@@ -84,66 +67,23 @@ def check_zone_status_via_ban(lat, lng):
             city = properties.get("city", "")
 
             if citycode or city:
-                # Vérifier si ce code INSEE ou cette commune est dans les zones tendues
-                # Recherche par code INSEE OU par nom de commune (exact, insensible)
-                zone_tendue_exists = ZoneTendue.objects.filter(
-                    Q(code_insee=citycode) | Q(communes__iexact=city)
-                ).exists()
-
-                # Vérifier si cette ville est dans les zones très tendues (Zone A bis)
-                # Recherche par nom de commune (comparaison exacte, insensible à la casse)
-                zone_tres_tendue_exists = ZoneTresTendue.objects.filter(
-                    Q(commune__iexact=city)
-                ).exists()
-
-                # Vérifier si cette ville est dans les zones tendues touristiques
-                # Recherche par code INSEE OU par nom de commune
-                zone_tendue_touristique_exists = ZoneTendueTouristique.objects.filter(
-                    Q(code_insee=citycode) | Q(commune__iexact=city)
-                ).exists()
-
-                # Vérifier si cette ville nécessite un permis de louer
-                # Recherche par nom de ville (comparaison exacte, insensible à la casse)
-                permis_louer_exists = PermisDeLouer.objects.filter(
-                    Q(villes__iexact=city)
-                ).exists()
-
+                # Flags précalculés par code INSEE (CommuneZoneStatus), sinon
+                # recherche par code INSEE OU par nom de commune
                 return {
-                    "is_zone_tendue": zone_tendue_exists,
-                    "is_zone_tres_tendue": zone_tres_tendue_exists,
-                    "is_zone_tendue_touristique": zone_tendue_touristique_exists,
-                    "is_permis_de_louer": permis_louer_exists,
+                    **get_zone_flags(citycode, city),
                     "citycode": citycode,
                     "city": city,
                     "postcode": properties.get("postcode", ""),
                 }
 
-        return {
-            "is_zone_tendue": False,
-            "is_zone_tres_tendue": False,
-            "is_zone_tendue_touristique": False,
-            "is_permis_de_louer": False,
-            "error": "Aucune commune trouvée pour ces coordonnées",
-        }
+        return empty_zone_status("Aucune commune trouvée pour ces coordonnées")
 
     except requests.exceptions.RequestException as e:
         logger.error(f"Erreur lors de l'appel à l'API BAN: {str(e)}")
-        return {
-            "is_zone_tendue": False,
-            "is_zone_tres_tendue": False,
-            "is_zone_tendue_touristique": False,
-            "is_permis_de_louer": False,
-            "error": f"Erreur API BAN: {str(e)}",
-        }
+        return empty_zone_status(f"Erreur API BAN: {str(e)}")
     except Exception as e:
         logger.error(f"Erreur lors de la vérification zone tendue/permis: {str(e)}")
-        return {
-            "is_zone_tendue": False,
-            "is_zone_tres_tendue": False,
-            "is_zone_tendue_touristique": False,
-            "is_permis_de_louer": False,
-            "error": f"Erreur: {str(e)}",
-        }
+        return empty_zone_status(f"Erreur: {str(e)}")
 
 
 def get_rent_control_info(
@@ -159,44 +99,11 @@ def get_rent_control_info(
     Trouve les informations d'encadrement des loyers pour une localisation et
     des caractéristiques de logement spécifiques.
     """
-    # Créer un point à partir des coordonnées
-    point = Point(float(lng), float(lat), srid=4326)
-
-    # D'abord trouver la zone qui contient le point
-    area_query = RentControlArea.objects.filter(
-        geometry__contains=point, reference_year=year
-    )
-
-    if not area_query.exists():
+    # Index STRtree en mémoire (fallback PostGIS si l'index est froid)
+    area = find_rent_control_area(lng, lat, year)
+    if area is None:
         return {}, None
 
-    if area_query.filter(region=Region.GRENOBLE).exists():
-        # Pour Grenoble, chercher d'abord s'il y au moins une zone ACCEPTED
-        accepted_areas = area_query.filter(zone_id=ACCEPTED_ZONE)
-        if accepted_areas.exists():
-            # S'il y a une zone ACCEPTED, prendre la première zone whitelistée
-            whitelist_areas = area_query.filter(zone_id__in=WHITELIST_ZONES)
-            if whitelist_areas.exists():
-                area = whitelist_areas.first()
-            else:
-                return {}, None
-        else:
-            return {}, None
-    elif area_query.filter(region=Region.MONTPELLIER).exists():
-        # Pour Montpellier, même logique que Grenoble
-        accepted_areas = area_query.filter(zone_id=ACCEPTED_ZONE_MONTPELLIER)
-        if accepted_areas.exists():
-            # S'il y a une zone ACCEPTED, prendre la première zone whitelistée
-            whitelist_areas = area_query.filter(zone_id__in=WHITELIST_ZONES_MONTPELLIER)
-            if whitelist_areas.exists():
-                area = whitelist_areas.first()
-            else:
-                return {}, None
-        else:
-            return {}, None
-    else:
-        area = area_query.first()
-
     # Récupérer les options disponibles si demandé
     options = get_available_options_for_area(area)
 
@@ -218,13 +125,13 @@ def check_zone(request):
             # Récupérer les options disponibles ET l'area
             options, area = get_rent_control_info(lat, lng)
 
-            # Vérifier si c'est une zone tendue et si elle nécessite un permis de louer
-            ban_result = check_zone_status_via_ban(lat, lng)
+            # Zone tendue / permis de louer : commune résolue localement (BAN en fallback)
+            zone_status = get_zone_status(lat, lng)
 
-            is_zone_tendue = ban_result["is_zone_tendue"]
-            is_zone_tres_tendue = ban_result["is_zone_tres_tendue"]
-            is_zone_tendue_touristique = ban_result["is_zone_tendue_touristique"]
-            is_permis_de_louer = ban_result["is_permis_de_louer"]
+            is_zone_tendue = zone_status["is_zone_tendue"]
+            is_zone_tres_tendue = zone_status["is_zone_tres_tendue"]
+            is_zone_tendue_touristique = zone_status["is_zone_tendue_touristique"]
+            is_permis_de_louer = zone_status["is_permis_de_louer"]
 
             return JsonResponse(
                 {
@@ -242,3 +149,110 @@ def check_zone(request):
             return JsonResponse({"message": f"Erreur: {str(e)}"}, status=500)
 
     return JsonResponse({"message": "Méthode non autorisée"}, status=405)
+
+
+def _validate_batch_items(items):
+    """Message d'erreur du premier item invalide, None si le lot est valide."""
+    if not isinstance(items, list) or not items:
+        return "items doit être une liste non vide"
+    if len(items) > settings.ZONE_BATCH_MAX_POINTS:
+        return f"{settings.ZONE_BATCH_MAX_POINTS} points maximum par lot"
+    for position, item in enumerate(items):
+        try:
+            lat = float(item["lat"])
+            lng = float(item["lng"])
+        except (TypeError, KeyError, ValueError):
+            return f"Item {position} : lat et lng numériques requis"
+        # Exclut aussi NaN (les comparaisons sont fausses)
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            return f"Item {position} : coordonnées hors limites"
+    return None
+
+
+def _parse_batch_year(value):
+    """Année de référence du lot, ValueError si elle n'est pas un entier."""
+    try:
+        return int(value or DEFAULT_YEAR)
+    except (TypeError, ValueError):
+        raise ValueError("year doit être une année (entier)")
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def check_zone_batch(request):
+    """
+    Vérification de zones pour un lot de points, réponse en NDJSON (une ligne
+    JSON par item, dans l'ordre de la requête).
+
+    Body: {"items": [{"id", "lat", "lng", "property_type", "room_count",
+                      "construction_period", "furnished"}, ...], "year"}
+    """
+    items = request.data.get("items")
+    error = _validate_batch_items(items)
+    if error:
+        return JsonResponse({"message": error}, status=400)
+    try:
+        year = _parse_batch_year(request.data.get("year"))
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+
+    # Budget par lot, débité une fois le lot validé : le coût est le nombre
+    # de points, débité en une fois
+    accepted, remaining = consume_zone_batch_budget(request.user.id, len(items))
+    if not accepted:
+        return JsonResponse(
+            {"message": "Budget de points dépassé", "remaining": remaining},
+            status=429,
+        )
+
+    def stream():
+        for result in iter_zone_batch(items, year):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    response = StreamingHttpResponse(stream(), content_type="application/x-ndjson")
+    response["X-Zone-Batch-Remaining"] = str(remaining)
+    return response
+
+
+@require_GET
+def zone_tile(request, region, z, x, y, fmt):
+    """
+    Tuile des zones d'encadrement d'une région (carte admin, carte publique).
+
+    GET /api/rent_control/tiles/<region>/<z>/<x>/<y>.<geojson|mvt>?year=2025
+    """
+    if region not in Region.values:
+        return JsonResponse({"message": f"Région inconnue : {region}"}, status=404)
+    try:
+        validate_tile(z, x, y, fmt)
+        year = int(request.GET.get("year") or DEFAULT_YEAR)
+    except (InvalidTile, ValueError) as e:
+        return JsonResponse({"message": str(e)}, status=400)
+
+    version = get_tiles_version()
+    if version is None:
+        # Version des zones inconnue : pas d'ETag, qui validerait une tuile
+        # périmée après un réimport
+        response = HttpResponse(
+            get_zone_tile(region, year, z, x, y, fmt, version=version),
+            content_type=TILE_FORMATS[fmt],
+        )
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    etag = tile_etag(version, region, year, z, x, y, fmt)
+
+    # Tuile déjà reçue par le navigateur et zones inchangées : 304 sans calcul
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is None:
+        response = HttpResponse(
+            get_zone_tile(region, year, z, x, y, fmt, version=version),
+            content_type=TILE_FORMATS[fmt],
+        )
+        response["ETag"] = etag
+    else:
+        response = not_modified
+    patch_cache_control(
+        response, public=True, max_age=settings.RENT_CONTROL_TILE_MAX_AGE
+    )
+    return response
@@ -0,0 +1,173 @@
+"""
+Vérification de zones par lot (import de portefeuille, audit d'agence).
+
+Même résultat que check_zone / get_rent_control_info pour chaque point, mais
+résolu de façon ensembliste par paquet de ZONE_BATCH_CHUNK_SIZE points :
+- zones d'encadrement : un seul lookup STRtree (ou une jointure PostGIS)
+- statut zone tendue / permis de louer : une jointure spatiale sur Commune
+- options et prix de référence : un get_many dans l'index des prix
+  (rent_control.price_index), la base seulement pour les zones absentes
+
+Le débit est limité par un budget de points par utilisateur et par fenêtre
+(ZONE_BATCH_POINTS_BUDGET / ZONE_BATCH_BUDGET_WINDOW), pas par point. Le
+fallback BAN, un appel HTTP par point, est plafonné par paquet
+(ZONE_BATCH_BAN_FALLBACK_MAX). Un item ou un paquet en échec donne une ligne
+{"id", "error"} : le flux NDJSON n'est jamais interrompu.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rent_control.management.commands.constants import DEFAULT_YEAR
+from rent_control.price_index import (
+    OPTION_FIELDS,
+    find_price,
+    get_area_entries,
+    room_count_choice,
+)
+from rent_control.spatial_index import find_rent_control_areas
+from rent_control.zone_status import get_zone_statuses
+
+logger = logging.getLogger(__name__)
+
+BUDGET_CACHE_KEY = "rent_control:zone_batch_budget:{}"
+
+
+def consume_zone_batch_budget(owner, cost):
+    """
+    Débite `cost` points du budget de `owner` sur la fenêtre courante.
+
+    Returns:
+        tuple: (accepté, points restants)
+    """
+    key = BUDGET_CACHE_KEY.format(owner)
+    budget = settings.ZONE_BATCH_POINTS_BUDGET
+    try:
+        # add() ne fait rien si la fenêtre est déjà ouverte ; incr() est atomique (Redis)
+        cache.add(key, 0, timeout=settings.ZONE_BATCH_BUDGET_WINDOW)
+        used = cache.incr(key, cost)
+        if used > budget:
+            # Lot refusé : il ne consomme rien
+            cache.decr(key, cost)
+            return False, max(budget - used + cost, 0)
+        return True, budget - used
+    except Exception as e:
+        logger.warning(f"⚠️ Budget lot de zones illisible, lot accepté : {e}")
+        return True, budget
+
+
+def match_rent_price(entry, item):
+    """
+    Prix de référence du logement décrit par `item`, si ses caractéristiques
+    sont fournies et désignent exactement une ligne (cf. get_rent_price_for_bien).
+    """
+    if any(
+        item.get(field) is None
+        for field in ("room_count", "construction_period", "furnished")
+    ):
+        return None
+
+    try:
+        price = find_price(
+            entry,
+            furnished=item["furnished"],
+            room_count=room_count_choice(int(item["room_count"])),
+            construction_period=item["construction_period"],
+            property_type=item.get("property_type"),
+        )
+    except ValueError:
+        return None
+
+    return {
+        "referencePrice": float(price["reference_price"]),
+        "minPrice": float(price["min_price"]),
+        "maxPrice": float(price["max_price"]),
+    }
+
+
+def zone_batch_error(item, message):
+    """Ligne de résultat d'un item non résolu."""
+    return {"id": item.get("id"), "error": message}
+
+
+def build_zone_batch_result(item, area, status, entries):
+    result = {
+        "id": item.get("id"),
+        "zoneTendue": status["is_zone_tendue"],
+        "zoneTresTendue": status["is_zone_tres_tendue"],
+        "zoneTendueTouristique": status["is_zone_tendue_touristique"],
+        "permisDeLouer": status["is_permis_de_louer"],
+        "options": {},
+        "areaId": None,
+        "rentPrice": None,
+    }
+    if area is not None:
+        entry = entries.get(area.id)
+        result["areaId"] = area.id
+        if entry is None:
+            result["options"] = {option: [] for option in OPTION_FIELDS}
+        else:
+            result["options"] = entry["options"]
+            result["rentPrice"] = match_rent_price(entry, item)
+    if "error" in status:
+        result["error"] = status["error"]
+    return result
+
+
+def resolve_zone_batch(items, year=DEFAULT_YEAR, max_ban_fallback=None):
+    """
+    Résout un paquet de points en requêtes ensemblistes.
+
+    Args:
+        items: Liste de dicts {lat, lng, [id], [property_type, room_count,
+               construction_period, furnished]}, coordonnées déjà validées
+        year: Année de référence des zones
+        max_ban_fallback: Appels BAN au plus (voir get_zone_statuses)
+
+    Returns:
+        list: Un dict par item, champs de check_zone + id et rentPrice
+              ({"id", "error"} pour un item aux caractéristiques invalides)
+    """
+    if not items:
+        return []
+
+    areas = find_rent_control_areas(
+        [(float(item["lng"]), float(item["lat"])) for item in items], year
+    )
+    statuses = get_zone_statuses(
+        [(float(item["lat"]), float(item["lng"])) for item in items],
+        max_ban_fallback=max_ban_fallback,
+    )
+    entries = get_area_entries({area.id for area in areas if area})
+
+    results = []
+    for item, area, status in zip(items, areas, statuses):
+        try:
+            results.append(build_zone_batch_result(item, area, status, entries))
+        except (TypeError, ValueError) as e:
+            results.append(zone_batch_error(item, f"Item invalide : {e}"))
+
+    return results
+
+
+def iter_zone_batch(items, year=DEFAULT_YEAR):
+    """Résultats au fil de l'eau, un paquet de ZONE_BATCH_CHUNK_SIZE à la fois."""
+    chunk_size = settings.ZONE_BATCH_CHUNK_SIZE
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start : start + chunk_size]
+        try:
+            results = resolve_zone_batch(
+                chunk, year, max_ban_fallback=settings.ZONE_BATCH_BAN_FALLBACK_MAX
+            )
+        except Exception as e:
+            # Réponse déjà commencée : chaque item du paquet porte l'erreur
+            logger.error(
+                f"❌ Paquet de zones {start}-{start + len(chunk)} non résolu : {e}"
+            )
+            results = [
+                zone_batch_error(item, "Vérification impossible pour ce point")
+                for item in chunk
+            ]
+        yield from results
@@ -0,0 +1,296 @@
+"""
+Statut réglementaire d'une adresse (zone tendue, très tendue, touristique,
+permis de louer) résolu localement.
+
+Un point GPS est résolu en commune par l'index spatial GiST de Commune, et
+le statut est lu dans CommuneZoneStatus (précalculé par code INSEE) : une
+seule requête, sans appel HTTP. L'API BAN ne sert plus que de fallback
+(point hors référentiel, référentiel non importé), désactivable via
+ZONE_STATUS_BAN_FALLBACK.
+"""
+
+import logging
+
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+
+from rent_control.models import (
+    Commune,
+    CommuneZoneStatus,
+    PermisDeLouer,
+    ZoneTendue,
+    ZoneTendueTouristique,
+    ZoneTresTendue,
+)
+
+logger = logging.getLogger(__name__)
+
+ZONE_FLAGS = [
+    "is_zone_tendue",
+    "is_zone_tres_tendue",
+    "is_zone_tendue_touristique",
+    "is_permis_de_louer",
+]
+
+
+def empty_zone_status(error=None):
+    status = {flag: False for flag in ZONE_FLAGS}
+    if error:
+        status["error"] = error
+    return status
+
+
+def compute_zone_flags(citycode, city):
+    """
+    Calcule les flags d'une commune à partir des tables importées
+    (code INSEE OU nom de commune, comparaison insensible à la casse).
+    """
+    return {
+        "is_zone_tendue": ZoneTendue.objects.filter(
+            Q(code_insee=citycode) | Q(communes__iexact=city)
+        ).exists(),
+        "is_zone_tres_tendue": ZoneTresTendue.objects.filter(
+            commune__iexact=city
+        ).exists(),
+        "is_zone_tendue_touristique": ZoneTendueTouristique.objects.filter(
+            Q(code_insee=citycode) | Q(commune__iexact=city)
+        ).exists(),
+        "is_permis_de_louer": PermisDeLouer.objects.filter(villes__iexact=city).exists(),
+    }
+
+
+def get_zone_flags(citycode, city):
+    """Flags précalculés si la commune est connue, sinon calculés à la volée."""
+    status = (
+        CommuneZoneStatus.objects.filter(commune_id=citycode).values(*ZONE_FLAGS).first()
+        if citycode
+        else None
+    )
+    return status or compute_zone_flags(citycode, city)
+
+
+# Champs qui rattachent une ligne importée à des communes : (code INSEE, nom)
+ZONE_COMMUNE_FIELDS = {
+    ZoneTendue: ("code_insee", "communes"),
+    ZoneTresTendue: (None, "commune"),
+    ZoneTendueTouristique: ("code_insee", "commune"),
+    PermisDeLouer: (None, "villes"),
+}
+
+
+def zone_commune_keys(instance):
+    """
+    Codes INSEE et noms de communes visés par une ligne ZoneTendue,
+    ZoneTresTendue, ZoneTendueTouristique ou PermisDeLouer.
+
+    Returns:
+        tuple: (set de codes INSEE, set de noms)
+    """
+    code_field, name_field = ZONE_COMMUNE_FIELDS[type(instance)]
+    code = getattr(instance, code_field) if code_field else None
+    name = getattr(instance, name_field)
+    return ({code} if code else set()), ({name} if name else set())
+
+
+def _zone_flag_rows(communes):
+    """(code_insee, *flags) de chaque commune (règles de compute_zone_flags), en SQL."""
+    commune_code = OuterRef("code_insee")
+    commune_name = OuterRef("nom")
+
+    return communes.annotate(
+        is_zone_tendue=Exists(
+            ZoneTendue.objects.filter(
+                Q(code_insee=commune_code) | Q(communes__iexact=commune_name)
+            )
+        ),
+        is_zone_tres_tendue=Exists(
+            ZoneTresTendue.objects.filter(commune__iexact=commune_name)
+        ),
+        is_zone_tendue_touristique=Exists(
+            ZoneTendueTouristique.objects.filter(
+                Q(code_insee=commune_code) | Q(commune__iexact=commune_name)
+            )
+        ),
+        is_permis_de_louer=Exists(
+            PermisDeLouer.objects.filter(villes__iexact=commune_name)
+        ),
+    ).values_list("code_insee", *ZONE_FLAGS)
+
+
+def rebuild_commune_zone_status():
+    """
+    Recalcule CommuneZoneStatus pour toutes les communes (mêmes règles que
+    compute_zone_flags, évaluées en une requête SQL).
+
+    Returns:
+        int: Nombre de communes traitées
+    """
+    rows = _zone_flag_rows(Commune.objects.all())
+
+    statuses = [
+        CommuneZoneStatus(commune_id=row[0], **dict(zip(ZONE_FLAGS, row[1:])))
+        for row in rows.iterator(chunk_size=2000)
+    ]
+
+    with transaction.atomic():
+        CommuneZoneStatus.objects.all().delete()
+        CommuneZoneStatus.objects.bulk_create(statuses, batch_size=2000)
+
+    logger.info(f"✅ Statut réglementaire recalculé pour {len(statuses)} communes")
+    return len(statuses)
+
+
+def refresh_commune_zone_status(codes=(), names=()):
+    """
+    Recalcule CommuneZoneStatus pour quelques communes seulement (modification
+    unitaire d'une zone dans l'admin, voir rent_control.signals).
+
+    Args:
+        codes: Codes INSEE des communes concernées
+        names: Noms des communes concernées (comparaison insensible à la casse)
+
+    Returns:
+        int: Nombre de communes recalculées
+    """
+    query = Q(code_insee__in=set(codes))
+    for name in set(names):
+        query |= Q(nom__iexact=name)
+
+    rows = list(_zone_flag_rows(Commune.objects.filter(query)))
+    with transaction.atomic():
+        for code_insee, *flags in rows:
+            CommuneZoneStatus.objects.update_or_create(
+                commune_id=code_insee, defaults=dict(zip(ZONE_FLAGS, flags))
+            )
+
+    if rows:
+        logger.info(f"🔄 Statut réglementaire recalculé pour {len(rows)} communes")
+    return len(rows)
+
+
+def find_commune(lat, lng):
+    """
+    Commune contenant le point (index GiST), avec son statut précalculé.
+
+    Returns:
+        Commune | None
+    """
+    point = Point(float(lng), float(lat), srid=4326)
+    return (
+        Commune.objects.filter(geometry__contains=point)
+        .select_related("zone_status")
+        .defer("geometry")
+        .first()
+    )
+
+
+def get_zone_status(lat, lng):
+    """
+    Statut réglementaire d'un point GPS.
+
+    Returns:
+        dict: is_zone_tendue, is_zone_tres_tendue, is_zone_tendue_touristique,
+              is_permis_de_louer, citycode, city, postcode, source
+              (+ error si la commune n'a pas pu être déterminée)
+    """
+    try:
+        commune = find_commune(lat, lng)
+    except Exception as e:
+        logger.error(f"❌ Résolution locale de la commune impossible : {e}")
+        commune = None
+
+    if commune is not None:
+        try:
+            flags = {flag: getattr(commune.zone_status, flag) for flag in ZONE_FLAGS}
+        except CommuneZoneStatus.DoesNotExist:
+            # Statut pas encore recalculé (import en cours)
+            flags = compute_zone_flags(commune.code_insee, commune.nom)
+
+        return {
+            **flags,
+            "citycode": commune.code_insee,
+            "city": commune.nom,
+            "postcode": "",
+            "source": "local",
+        }
+
+    if settings.ZONE_STATUS_BAN_FALLBACK:
+        from rent_control.views import check_zone_status_via_ban
+
+        return {**check_zone_status_via_ban(lat, lng), "source": "ban"}
+
+    return empty_zone_status("Aucune commune trouvée pour ces coordonnées")
+
+
+def get_zone_statuses(coordinates, max_ban_fallback=None):
+    """
+    Version lot de get_zone_status : une seule jointure spatiale
+    (VALUES × Commune × CommuneZoneStatus) pour tous les points.
+
+    Args:
+        coordinates: Séquence de (lat, lng)
+        max_ban_fallback: Appels BAN au plus pour les points hors référentiel
+                          (None : sans limite) ; les suivants sont en erreur
+
+    Returns:
+        list: Un dict par point, même format que get_zone_status
+    """
+    if not coordinates:
+        return []
+
+    values = ", ".join(["(%s, %s, %s)"] * len(coordinates))
+    params = [
+        value
+        for position, (lat, lng) in enumerate(coordinates)
+        for value in (position, float(lng), float(lat))
+    ]
+    flag_columns = ", ".join(f"s.{flag}" for flag in ZONE_FLAGS)
+    sql = f"""
+        SELECT DISTINCT ON (p.idx) p.idx, c.code_insee, c.nom, {flag_columns}
+        FROM (VALUES {values}) AS p(idx, lng, lat)
+        JOIN {Commune._meta.db_table} c
+          ON ST_Contains(c.geometry, ST_SetSRID(ST_MakePoint(p.lng, p.lat), 4326))
+        LEFT JOIN {CommuneZoneStatus._meta.db_table} s ON s.code_insee = c.code_insee
+        ORDER BY p.idx, c.id
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    statuses = [None] * len(coordinates)
+    for position, code_insee, nom, *flags in rows:
+        if flags[0] is None:
+            # Statut pas encore recalculé (import en cours)
+            flag_values = compute_zone_flags(code_insee, nom)
+        else:
+            flag_values = dict(zip(ZONE_FLAGS, flags))
+        statuses[position] = {
+            **flag_values,
+            "citycode": code_insee,
+            "city": nom,
+            "postcode": "",
+            "source": "local",
+        }
+
+    ban_calls = 0
+    for position, status in enumerate(statuses):
+        if status is not None:
+            continue
+        if not settings.ZONE_STATUS_BAN_FALLBACK:
+            statuses[position] = empty_zone_status(
+                "Aucune commune trouvée pour ces coordonnées"
+            )
+        elif max_ban_fallback is not None and ban_calls >= max_ban_fallback:
+            statuses[position] = empty_zone_status(
+                "Commune non résolue localement (limite d'appels BAN du lot atteinte)"
+            )
+        else:
+            from rent_control.views import check_zone_status_via_ban
+
+            ban_calls += 1
+            lat, lng = coordinates[position]
+            statuses[position] = {**check_zone_status_via_ban(lat, lng), "source": "ban"}
+
+    return statuses
@@ -53,31 +53,62 @@ Usage:
         signature_bytes, otp_metadata, request
     )
 
+    # Variantes en mémoire (BytesIO, sans fichier temporaire)
+    certified = certify_pdf_buffer(pdf_bytes, document_type)
+    signed = sign_user_pdf_buffer(certified, user, field_name, signature_bytes, ...)
+
 Références:
     - /backend/docs/signature-strategy-eidas-hybrid.md
     - Règlement eIDAS (UE 910/2014)
     - Code civil français art. 1367
 """
 
+import asyncio
 import datetime
+import io
 import json
 import logging
 import os
+from contextlib import contextmanager
 from typing import Dict, Optional
 
-from django.conf import settings
 from pyhanko import stamp
-from pyhanko.keys import load_cert_from_pemder
 from pyhanko.pdf_utils.content import BoxConstraints
 from pyhanko.pdf_utils.images import PdfImage
 from pyhanko.pdf_utils.incremental_writer import IncrementalPdfFileWriter
 from pyhanko.sign import signers
 from pyhanko.sign.fields import MDPPerm
+from pyhanko.sign.signers.pdf_cms import PdfCMSSignedAttributes
+from pyhanko.sign.signers.pdf_signer import PdfTBSDocument
 from pyhanko_certvalidator import ValidationContext
 
+from .signing_context import get_signing_context
+from .user_signer_pool import build_user_signer
+
 logger = logging.getLogger(__name__)
 
 
+@contextmanager
+def open_pdf_stream(pdf):
+    """
+    Flux binaire en lecture sur un PDF donné par son chemin ou en mémoire.
+
+    Args:
+        pdf: Chemin du PDF, ou son contenu (bytes, memoryview, BytesIO)
+    """
+    if isinstance(pdf, (str, os.PathLike)):
+        with open(pdf, "rb") as f:
+            yield f
+        return
+
+    stream = pdf if isinstance(pdf, io.BytesIO) else io.BytesIO(pdf)
+    stream.seek(0)
+    try:
+        yield stream
+    finally:
+        stream.seek(0)
+
+
 def get_client_ip(request) -> str:
     """
     Récupère l'IP réelle du client en tenant compte des reverse proxies.
@@ -139,56 +170,9 @@ def get_hestia_validation_context() -> ValidationContext:
         - Certificat AATL Hestia (certification)
         - CA Hestia (signatures utilisateurs)
         - TSA Hestia (timestamps)
+        Ils sont parsés une fois par process (voir signing_context).
     """
-    trust_roots = []
-
-    def load_certificate(cert_path: str, cert_name: str):
-        """Charge un certificat PEM/DER avec PyHanko."""
-        try:
-            cert = load_cert_from_pemder(cert_path)
-            trust_roots.append(cert)
-            logger.info(f"✅ {cert_name} ajouté au ValidationContext")
-            return True
-        except Exception as e:
-            logger.warning(f"⚠️ Impossible de charger {cert_name}: {e}")
-            return False
-
-    # 1. Certificat AATL Hestia (certification)
-    cert_path = os.path.join(settings.BASE_DIR, "certificates", "hestia_server.pfx")
-    if not os.path.exists(cert_path):
-        # Fallback : certificat serveur auto-signé (test)
-        cert_path = os.path.join(settings.BASE_DIR, "certificates", "hestia_server.pfx")
-
-    cert_pem_path = cert_path.replace(".pfx", ".pem")
-    if os.path.exists(cert_pem_path):
-        load_certificate(cert_pem_path, "Certificat AATL Hestia")
-
-    # 2. CA Hestia (signatures utilisateurs)
-    ca_cert_path = os.path.join(
-        settings.BASE_DIR, "certificates", "hestia_certificate_authority.pem"
-    )
-    if os.path.exists(ca_cert_path):
-        load_certificate(ca_cert_path, "CA Hestia")
-
-    # 3. TSA Hestia (timestamps)
-    tsa_cert_path = os.path.join(settings.BASE_DIR, "certificates", "hestia_tsa.pem")
-    if os.path.exists(tsa_cert_path):
-        load_certificate(tsa_cert_path, "Certificat TSA Hestia")
-
-    if not trust_roots:
-        logger.warning("⚠️ Aucun certificat trouvé pour ValidationContext")
-        logger.warning("⚠️ PAdES B-LT désactivé, utilisation de PAdES B-T")
-        return None
-
-    # Créer le ValidationContext
-    # allow_fetching=False car certificats auto-signés (pas de CRL/OCSP externes)
-    validation_context = ValidationContext(
-        trust_roots=trust_roots,
-        allow_fetching=False,  # Pas de fetch CRL/OCSP (auto-signés)
-    )
-
-    logger.info(f"✅ ValidationContext créé avec {len(trust_roots)} trust roots")
-    return validation_context
+    return get_signing_context().build_validation_context()
 
 
 def certify_document_hestia(
@@ -227,40 +211,43 @@ def certify_document_hestia(
         - Un document ne peut avoir qu'UNE SEULE certification
         - Les signatures utilisateurs héritent de la protection DocMDP
     """
-    logger.info(f"🔐 Début de la certification Hestia pour {document_type}")
+    with open(source_path, "rb") as inf:
+        with open(output_path, "wb") as outf:
+            _certify_stream(inf, outf, document_type)
 
-    # Certificat eIDAS AATL (CertEurope en production)
-    cert_path = os.path.join(settings.BASE_DIR, "certificates", "hestia_server.pfx")
-
-    if not os.path.exists(cert_path):
-        # Fallback : certificat serveur auto-signé (test)
-        cert_path = os.path.join(settings.BASE_DIR, "certificates", "hestia_server.pfx")
-        logger.warning(f"⚠️ Utilisation du certificat de TEST : {cert_path}")
-        logger.warning("⚠️ Adobe affichera 'Validity UNKNOWN'")
-        logger.warning("⚠️ En production : utiliser hestia_server.pfx de CertEurope")
-
-    if not os.path.exists(cert_path):
-        raise FileNotFoundError(
-            f"Certificat Hestia AATL introuvable : {cert_path}\n"
-            "Générez un certificat de test avec : bash scripts/generate_test_seal_cert.sh\n"
-            "Ou installez le certificat CertEurope eIDAS (350€/an) en production."
-        )
+    logger.info(f"✅ Certification Hestia réussie : {output_path}")
+    return output_path
 
-    # Mot de passe du certificat (depuis settings ou env var)
-    password = settings.PASSWORD_CERT_SERVER
 
-    if not password:
-        raise ValueError(
-            "Variable d'environnement PASSWORD_CERT_SERVER non définie.\n"
-            "Pour test : PASSWORD_CERT_SERVER=XXXX!\n"
-            "Pour prod : Utiliser le mot de passe du certificat CertEurope."
-        )
+def certify_pdf_buffer(pdf, document_type: str = "bail") -> io.BytesIO:
+    """
+    Variante en mémoire de certify_document_hestia (aucun fichier temporaire).
+
+    Args:
+        pdf: Contenu du PDF vierge (bytes, memoryview ou BytesIO)
+        document_type: Type de document ("bail", "etat_lieux", "quittance", "mandat")
+
+    Returns:
+        io.BytesIO: PDF certifié, position au début
+
+    Raises:
+        Les mêmes exceptions que certify_document_hestia
+    """
+    with open_pdf_stream(pdf) as source:
+        output = io.BytesIO()
+        _certify_stream(source, output, document_type)
+
+    output.seek(0)
+    logger.info(f"✅ Certification Hestia réussie ({output.getbuffer().nbytes} octets)")
+    return output
+
 
-    if isinstance(password, str):
-        password = password.encode("utf-8")
+def _certify_stream(source, output, document_type):
+    logger.info(f"🔐 Début de la certification Hestia pour {document_type}")
 
-    # Charger le certificat eIDAS
-    signer = signers.SimpleSigner.load_pkcs12(pfx_file=cert_path, passphrase=password)
+    # Certificat eIDAS AATL (CertEurope en production), déchiffré une fois par process
+    signing_context = get_signing_context()
+    signer = signing_context.get_certification_signer()
 
     # TSA Hestia (horodatage certification) - Service interne
     try:
@@ -273,7 +260,7 @@ def certify_document_hestia(
         timestamper = None
 
     # ValidationContext pour PAdES B-LT
-    validation_context = get_hestia_validation_context()
+    validation_context = signing_context.build_validation_context()
 
     # Métadonnées de certification avec PAdES B-LT
     signature_meta = signers.PdfSignatureMetadata(
@@ -295,29 +282,24 @@ def certify_document_hestia(
         # permettant la validation à long terme (5-10 ans)
     )
 
-    # Signer avec certification
-    with open(source_path, "rb") as inf:
-        with open(output_path, "wb") as outf:
-            pdf_signer = signers.PdfSigner(
-                signature_meta=signature_meta,
-                signer=signer,
-                timestamper=timestamper,
-                # Pas de stamp_style (certification invisible)
-            )
+    pdf_signer = signers.PdfSigner(
+        signature_meta=signature_meta,
+        signer=signer,
+        timestamper=timestamper,
+        # Pas de stamp_style (certification invisible)
+    )
 
-            writer = IncrementalPdfFileWriter(inf)
-            pdf_signer.sign_pdf(writer, output=outf)
+    # Signer avec certification
+    writer = IncrementalPdfFileWriter(source)
+    pdf_signer.sign_pdf(writer, output=output)
 
-    logger.info(f"✅ Certification Hestia réussie : {output_path}")
     logger.info("✅ DocMDP activé (niveau FILL_FORMS)")
     logger.info("✅ Ruban vert Adobe immédiat (certificat AATL)")
 
-    return output_path
-
 
 def generate_user_signer(user):
     """
-    Génère un certificat auto-signé dynamique pour un utilisateur.
+    Génère le certificat dynamique d'un utilisateur (signé par le CA Hestia).
 
     Ce certificat est utilisé pour les signatures d'approbation (approval signatures)
     après la certification Hestia. Il contient l'identité de l'utilisateur.
@@ -326,195 +308,25 @@ def generate_user_signer(user):
         user: Instance de Personne (Bailleur ou Locataire)
 
     Returns:
-        SimpleSigner: Signer PyHanko avec certificat auto-signé
+        SimpleSigner: Signer PyHanko avec certificat utilisateur
 
     Example:
         >>> signer = generate_user_signer(bailleur)
-        >>> # signer contient un certificat X.509 auto-signé avec:
+        >>> # signer contient un certificat X.509 avec:
         >>> # CN=Jean Dupont, O=Hestia User, emailAddress=jean@example.com
 
     Note:
-        - Certificat auto-signé (pas besoin d'AC)
-        - Gratuit (0€ par utilisateur)
-        - Généré à la volée lors de chaque signature
-        - Valide 1 an (renouvellement automatique)
-        - Clé RSA 2048 bits + SHA-256
+        - Clé RSA 2048 bits prise dans un pool pré-généré (user_signer_pool)
+        - Certificat émis en process, CA Hestia chargé une fois par process
+        - Fallback auto-signé si le CA est indisponible
+        - Valide 1 an + SHA-256
     """
-    import subprocess
-    import tempfile
-
-    logger.info(f"🔑 Génération certificat auto-signé pour {user.email}")
-
-    # Créer fichier temporaire PKCS#12
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".pfx", delete=False) as tmpfile:
-        pfx_path = tmpfile.name
+    logger.info(f"🔑 Génération certificat utilisateur pour {user.email}")
 
     try:
-        # Générer clé + certificat avec OpenSSL (plus simple que cryptography)
-        password = f"temp_user_{user.id}"
-
-        # 1. Générer clé privée
-        key_path = pfx_path.replace(".pfx", "_key.pem")
-        subprocess.run(
-            ["openssl", "genrsa", "-out", key_path, "2048"],
-            check=True,
-            capture_output=True,
-        )
-
-        # 2. Créer fichier de configuration OpenSSL avec extensions
-        config_path = pfx_path.replace(".pfx", "_config.cnf")
-        with open(config_path, "w") as f:
-            f.write(f"""[req]
-default_bits = 2048
-prompt = no
-default_md = sha256
-distinguished_name = dn
-x509_extensions = v3_usr
-
-[dn]
-O=Hestia User
-CN={user.firstName} {user.lastName}
-emailAddress={user.email}
-
-[v3_usr]
-subjectKeyIdentifier = hash
-authorityKeyIdentifier = keyid:always,issuer
-basicConstraints = critical,CA:FALSE
-keyUsage = critical,digitalSignature,nonRepudiation
-extendedKeyUsage = emailProtection
-""")
-
-        # 3. Générer CSR (Certificate Signing Request)
-        csr_path = pfx_path.replace(".pfx", "_csr.pem")
-        subprocess.run(
-            [
-                "openssl",
-                "req",
-                "-new",
-                "-key",
-                key_path,
-                "-out",
-                csr_path,
-                "-config",
-                config_path,
-            ],
-            check=True,
-            capture_output=True,
-        )
-
-        # 4. Signer le CSR avec le CA Hestia
-        ca_cert_path = settings.CA_CERT_PATH
-        ca_key_path = settings.CA_KEY_PATH
-        ca_password = settings.PASSWORD_CERT_CA
-
-        cert_path = pfx_path.replace(".pfx", "_cert.pem")
-
-        if os.path.exists(ca_cert_path) and os.path.exists(ca_key_path):
-            # Signer avec le CA Hestia
-            subprocess.run(
-                [
-                    "openssl",
-                    "x509",
-                    "-req",
-                    "-in",
-                    csr_path,
-                    "-CA",
-                    ca_cert_path,
-                    "-CAkey",
-                    ca_key_path,
-                    "-CAcreateserial",
-                    "-out",
-                    cert_path,
-                    "-days",
-                    "365",
-                    "-sha256",
-                    "-extfile",
-                    config_path,
-                    "-extensions",
-                    "v3_usr",
-                    "-passin",
-                    f"pass:{ca_password}",
-                ],
-                check=True,
-                capture_output=True,
-            )
-            logger.info(f"✅ Certificat signé par CA Hestia pour {user.email}")
-        else:
-            # Fallback : Certificat auto-signé (si CA pas disponible)
-            subprocess.run(
-                [
-                    "openssl",
-                    "req",
-                    "-new",
-                    "-x509",
-                    "-key",
-                    key_path,
-                    "-out",
-                    cert_path,
-                    "-days",
-                    "365",
-                    "-config",
-                    config_path,
-                ],
-                check=True,
-                capture_output=True,
-            )
-            logger.warning(
-                f"⚠️ Certificat auto-signé (CA Hestia indisponible) pour {user.email}"
-            )
-
-        # 5. Créer PKCS#12 avec la chaîne complète
-        pkcs12_cmd = [
-            "openssl",
-            "pkcs12",
-            "-export",
-            "-out",
-            pfx_path,
-            "-inkey",
-            key_path,
-            "-in",
-            cert_path,
-            "-password",
-            f"pass:{password}",
-        ]
-
-        # Ajouter le certificat CA à la chaîne si disponible
-        if os.path.exists(ca_cert_path):
-            pkcs12_cmd.extend(["-certfile", ca_cert_path])
-
-        subprocess.run(pkcs12_cmd, check=True, capture_output=True)
-
-        # 6. Charger avec PyHanko
-        signer = signers.SimpleSigner.load_pkcs12(
-            pfx_file=pfx_path, passphrase=password.encode("utf-8")
-        )
-
-        logger.info(f"✅ Certificat utilisateur généré pour {user.email}")
-        logger.info(f"   CN={user.firstName} {user.lastName}")
-        logger.info(f"   Email={user.email}")
-        logger.info("   Validité=1 an")
-
-        # Nettoyer fichiers temporaires
-        os.remove(key_path)
-        os.remove(cert_path)
-        os.remove(csr_path)
-        os.remove(config_path)
-        os.remove(pfx_path)
-
-        return signer
-
+        return build_user_signer(user)
     except Exception as e:
         logger.error(f"❌ Erreur génération certificat utilisateur : {e}")
-        # Nettoyer en cas d'erreur
-        for f in [
-            pfx_path,
-            pfx_path.replace(".pfx", "_key.pem"),
-            pfx_path.replace(".pfx", "_cert.pem"),
-            pfx_path.replace(".pfx", "_csr.pem"),
-            pfx_path.replace(".pfx", "_config.cnf"),
-        ]:
-            if os.path.exists(f):
-                os.remove(f)
         raise
 
 
@@ -570,6 +382,87 @@ def sign_user_with_metadata(
         - Incremental update (ajoute une couche sans modifier les précédentes)
         - Les métadonnées sont sauvegardées dans le journal de preuves
     """
+    # w+b : le PDF pré-signé est relu pour le DSS après insertion du CMS
+    with open(source_path, "rb") as inf:
+        with open(output_path, "w+b") as outf:
+            signature_timestamp, signature_cms, tsa_info = _sign_user_stream(
+                inf, outf, user, field_name, signature_bytes, request
+            )
+
+    logger.info(f"✅ Signature utilisateur réussie : {output_path}")
+
+    _record_signature_metadata(
+        source_path,
+        output_path,
+        field_name,
+        request,
+        document,
+        signature_request,
+        signature_timestamp,
+        signature_cms=signature_cms,
+        tsa_info=tsa_info,
+    )
+    return output_path
+
+
+def sign_user_pdf_buffer(
+    pdf,
+    user,
+    field_name: str,
+    signature_bytes: bytes,
+    request=None,
+    document=None,
+    signature_request=None,
+    pdf_hash_before: Optional[str] = None,
+) -> io.BytesIO:
+    """
+    Variante en mémoire de sign_user_with_metadata (aucun fichier temporaire).
+
+    Args:
+        pdf: Contenu du PDF source (bytes, memoryview ou BytesIO)
+        pdf_hash_before: SHA-256 du PDF source s'il est déjà connu
+            (calculé au téléchargement), recalculé sinon
+        Autres arguments : voir sign_user_with_metadata
+
+    Returns:
+        io.BytesIO: PDF signé, position au début
+    """
+    with open_pdf_stream(pdf) as source:
+        output = io.BytesIO()
+        signature_timestamp, signature_cms, tsa_info = _sign_user_stream(
+            source, output, user, field_name, signature_bytes, request
+        )
+        output.seek(0)
+        logger.info(
+            f"✅ Signature utilisateur réussie ({output.getbuffer().nbytes} octets)"
+        )
+
+        # CMS et jeton TSA capturés pendant la signature : pas de relecture
+        _record_signature_metadata(
+            source,
+            output,
+            field_name,
+            request,
+            document,
+            signature_request,
+            signature_timestamp,
+            pdf_hash_before=pdf_hash_before,
+            signature_cms=signature_cms,
+            tsa_info=tsa_info,
+        )
+
+    output.seek(0)
+    return output
+
+
+def _sign_user_stream(source, output, user, field_name, signature_bytes, request):
+    """
+    Applique la signature d'approbation.
+
+    Returns:
+        tuple: (instant de signature, CMS embarqué, jeton TSA ou None), le jeton
+            au format de tsa_timestamp_from_cms
+    """
     from django.utils import timezone
 
     logger.info(f"✍️ Début signature utilisateur pour {user.email}")
@@ -643,26 +536,74 @@ def sign_user_with_metadata(
     logger.info(f"📊 Métadonnées capturées : {json.dumps(metadata, indent=2)}")
 
     # Signer avec certificat auto-signé
-    with open(source_path, "rb") as inf:
-        with open(output_path, "wb") as outf:
-            pdf_signer = signers.PdfSigner(
-                signature_meta=signature_meta,
-                signer=signer,
-                stamp_style=stamp_style,
-                timestamper=timestamper,
-            )
+    pdf_signer = signers.PdfSigner(
+        signature_meta=signature_meta,
+        signer=signer,
+        stamp_style=stamp_style,
+        timestamper=timestamper,
+    )
 
-            writer = IncrementalPdfFileWriter(inf)
-            pdf_signer.sign_pdf(writer, output=outf, existing_fields_only=True)
+    writer = IncrementalPdfFileWriter(source)
+    signature_cms = asyncio.run(
+        _sign_and_capture_cms(pdf_signer, writer, output, signature_timestamp)
+    )
 
-    logger.info(f"✅ Signature utilisateur réussie : {output_path}")
     logger.info("✅ Tampon visuel appliqué avec signature manuscrite")
+    tsa_info = timestamper.last_token_info if timestamper else None
+    return signature_timestamp, signature_cms, tsa_info
 
-    # Sauvegarder métadonnées en DB (si document ET signature_request fournis)
+
+async def _sign_and_capture_cms(pdf_signer, writer, output, signing_time):
+    """
+    Signature en deux temps (signature interrompue de pyHanko) : condensat du
+    document, CMS, puis insertion. Retourne le CMS embarqué dans le PDF.
+    """
+    prep_digest, tbs_document, output = (
+        await pdf_signer.async_digest_doc_for_signing(
+            writer, existing_fields_only=True, output=output
+        )
+    )
+    signature_cms = await pdf_signer.signer.async_sign(
+        prep_digest.document_digest,
+        tbs_document.md_algorithm,
+        use_pades=tbs_document.use_pades,
+        timestamper=tbs_document.timestamper,
+        signed_attr_settings=PdfCMSSignedAttributes(
+            signing_time=signing_time,
+            cades_signed_attrs=pdf_signer.signature_meta.cades_signed_attr_spec,
+        ),
+    )
+    await PdfTBSDocument.async_finish_signing(
+        output,
+        prep_digest,
+        signature_cms,
+        post_sign_instr=tbs_document.post_sign_instructions,
+        validation_context=tbs_document.validation_context,
+    )
+    return signature_cms
+
+
+def _record_signature_metadata(
+    source,
+    signed,
+    field_name,
+    request,
+    document,
+    signature_request,
+    signature_timestamp,
+    pdf_hash_before=None,
+    signature_cms=None,
+    tsa_info=None,
+):
+    """Sauvegarde les métadonnées en DB (si document ET signature_request fournis)."""
     if document and signature_request:
         try:
-            # Calculer hash PDF AVANT signature
-            pdf_hash_before = calculate_pdf_hash(source_path)
+            # Calculer hash PDF AVANT signature (sauf s'il est déjà connu)
+            if pdf_hash_before is None:
+                pdf_hash_before = calculate_pdf_hash(source)
+
+            # Hash APRÈS signature (sans copie si le PDF signé est en mémoire)
+            pdf_hash_after = calculate_pdf_hash(signed)
 
             # Préparer métadonnées HTTP
             http_metadata = {}
@@ -677,11 +618,14 @@ def sign_user_with_metadata(
             save_signature_metadata(
                 document=document,
                 signature_request=signature_request,
-                pdf_path=output_path,
+                pdf_path=signed,
                 field_name=field_name,
                 http_metadata=http_metadata,
                 pdf_hash_before=pdf_hash_before,
                 signature_timestamp=signature_timestamp,
+                signature_cms=signature_cms,
+                pdf_hash_after=pdf_hash_after,
+                tsa_info=tsa_info,
             )
 
             logger.info("✅ Métadonnées sauvegardées en DB (SignatureMetadata)")
@@ -695,15 +639,13 @@ def sign_user_with_metadata(
     elif document and not signature_request:
         logger.warning("⚠️ signature_request manquant, métadonnées non sauvegardées")
 
-    return output_path
 
-
-def calculate_pdf_hash(pdf_path: str) -> str:
+def calculate_pdf_hash(pdf_path) -> str:
     """
     Calcule le hash SHA-256 d'un PDF.
 
     Args:
-        pdf_path: Chemin du PDF
+        pdf_path: Chemin du PDF, ou son contenu (bytes, memoryview, BytesIO)
 
     Returns:
         str: Hash SHA-256 en hexadécimal
@@ -711,95 +653,196 @@ def calculate_pdf_hash(pdf_path: str) -> str:
     import hashlib
 
     sha256 = hashlib.sha256()
-    with open(pdf_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
+    if isinstance(pdf_path, io.BytesIO):
+        # Hash direct du buffer, sans copie
+        with pdf_path.getbuffer() as view:
+            sha256.update(view)
+        return sha256.hexdigest()
+
+    with open_pdf_stream(pdf_path) as f:
+        for chunk in iter(lambda: f.read(65536), b""):
             sha256.update(chunk)
     return sha256.hexdigest()
 
 
+def load_signature_cms(pdf_path, field_name: str):
+    """
+    Charge la structure CMS SignedData (/Contents) d'un champ de signature PDF.
+
+    Args:
+        pdf_path: Chemin du PDF signé, ou son contenu en mémoire
+        field_name: Nom du champ de signature
+
+    Returns:
+        asn1crypto.cms.ContentInfo ou None
+    """
+    from asn1crypto import cms
+    from pyhanko.pdf_utils.reader import PdfFileReader
+    from pyhanko.sign.fields import enumerate_sig_fields
+
+    with open_pdf_stream(pdf_path) as f:
+        reader = PdfFileReader(f)
+
+        # enumerate_sig_fields retourne tuples: (name, field_ref, sig_ref)
+        for sig_field_name, field_ref, sig_obj_ref in enumerate_sig_fields(reader):
+            if sig_field_name != field_name:
+                continue
+
+            # Résoudre la référence pour obtenir l'objet champ
+            field_obj = reader.get_object(sig_obj_ref)
+
+            if field_obj is None or "/V" not in field_obj:
+                logger.warning(f"Champ {field_name} trouvé mais pas encore signé")
+                continue
+
+            # L'objet signature est dans /V
+            sig_obj = field_obj["/V"]
+
+            if "/Contents" not in sig_obj:
+                logger.warning(f"Champ {field_name} signé mais /Contents manquant")
+                continue
+
+            return cms.ContentInfo.load(sig_obj["/Contents"])
+
+    logger.warning(f"Champ de signature '{field_name}' non trouvé dans le PDF")
+    return None
+
+
+def certificate_from_cms(content_info):
+    """
+    Certificat X.509 du signataire (premier certificat de la structure CMS).
+
+    Args:
+        content_info: asn1crypto.cms.ContentInfo (SignedData)
+
+    Returns:
+        Certificate object ou None
+    """
+    from cryptography import x509
+    from cryptography.hazmat.backends import default_backend
+
+    if content_info["content_type"].native != "signed_data":
+        return None
+
+    signed_data = content_info["content"]
+
+    # Extraire les certificats
+    has_certs = "certificates" in signed_data and signed_data["certificates"]
+    if not has_certs:
+        return None
+
+    # Premier certificat = signataire
+    cert_choice = signed_data["certificates"][0]
+
+    # CertificateChoices, extraire certificat
+    if cert_choice.name != "certificate":
+        return None
+
+    # Charger avec cryptography
+    return x509.load_der_x509_certificate(cert_choice.chosen.dump(), default_backend())
+
+
+def tsa_timestamp_from_cms(content_info) -> Optional[tuple]:
+    """
+    Timestamp TSA d'une structure CMS SignedData.
+
+    Le timestamp TSA est stocké dans les attributs non signés (unsigned attributes)
+    de la structure CMS SignedData, conformément à RFC 3161.
+
+    Args:
+        content_info: asn1crypto.cms.ContentInfo (SignedData)
+
+    Returns:
+        tuple: (tsa_timestamp_datetime, tsa_response_bytes, serial_number) ou None
+    """
+    from asn1crypto import cms
+
+    if content_info["content_type"].native != "signed_data":
+        logger.warning(
+            f"Type de contenu inattendu: {content_info['content_type'].native}"
+        )
+        return None
+
+    signed_data = content_info["content"]
+    signer_infos = signed_data["signer_infos"]
+
+    if not signer_infos:
+        logger.warning("Aucun signer_info trouvé")
+        return None
+
+    signer_info = signer_infos[0]
+
+    # Accéder aux attributs non signés
+    # (asn1crypto utilise [] pas .get())
+    # Vérifier si 'unsigned_attrs' existe dans la structure
+    try:
+        unsigned_attrs = signer_info["unsigned_attrs"]
+    except (KeyError, TypeError):
+        logger.info("⚠️ Aucun attribut non signé (pas de timestamp TSA)")
+        return None
+
+    if not unsigned_attrs:
+        logger.info("⚠️ Attributs non signés vides (pas de timestamp TSA)")
+        return None
+
+    # Chercher l'attribut timestamp TSA
+    # OID pour timestamp-token: 1.2.840.113549.1.9.16.2.14
+    for attr in unsigned_attrs:
+        if attr["type"].dotted == "1.2.840.113549.1.9.16.2.14":
+            # Extraire le token timestamp
+            ts_token_bytes = attr["values"][0].dump()
+            ts_content_info = cms.ContentInfo.load(ts_token_bytes)
+
+            if ts_content_info["content_type"].native != "signed_data":
+                continue
+
+            ts_signed_data = ts_content_info["content"]
+
+            # Extraire TSTInfo (encapsulated content)
+            encap_content = ts_signed_data["encap_content_info"]
+            if encap_content["content_type"].native != "tst_info":
+                continue
+
+            # .parsed retourne déjà un objet TSTInfo parsé
+            tst_info = encap_content["content"].parsed
+
+            # Extraire les informations du timestamp
+            gen_time = tst_info["gen_time"].native  # datetime object
+            serial_number = tst_info["serial_number"].native
+            policy_oid = tst_info["policy"].dotted
+
+            logger.info("✅ Timestamp TSA extrait:")
+            logger.info(f"   Date/heure: {gen_time}")
+            logger.info(f"   Numéro de série: {serial_number}")
+            logger.info(f"   Policy OID: {policy_oid}")
+
+            return (gen_time, ts_token_bytes, serial_number)
+
+    logger.info("⚠️ Attribut timestamp TSA non trouvé dans unsigned_attrs")
+    return None
+
+
 def extract_certificate_from_pdf(
-    pdf_path: str, field_name: str
+    pdf_path, field_name: str
 ) -> Optional["x509.Certificate"]:
     """
     Extrait le certificat X.509 d'un champ de signature PDF.
 
     Args:
-        pdf_path: Chemin du PDF signé
+        pdf_path: Chemin du PDF signé, ou son contenu en mémoire
         field_name: Nom du champ de signature
 
     Returns:
         Certificate object ou None
     """
     try:
-        from asn1crypto import cms
-        from cryptography import x509
-        from cryptography.hazmat.backends import default_backend
-        from pyhanko.pdf_utils.reader import PdfFileReader
-        from pyhanko.sign.fields import enumerate_sig_fields
-
-        with open(pdf_path, "rb") as f:
-            reader = PdfFileReader(f)
-
-            # enumerate_sig_fields retourne tuples: (name, field_ref, sig_ref)
-            sig_fields = list(enumerate_sig_fields(reader))
-
-            for sig_tuple in sig_fields:
-                # Décomposer le tuple
-                sig_field_name, field_ref, sig_obj_ref = sig_tuple
-
-                # Vérifier si c'est le bon champ
-                if sig_field_name == field_name:
-                    # Résoudre la référence pour obtenir l'objet champ
-                    field_obj = reader.get_object(sig_obj_ref)
-
-                    if field_obj is None or "/V" not in field_obj:
-                        logger.warning(
-                            f"Champ {field_name} trouvé mais pas encore signé"
-                        )
-                        continue
-
-                    # L'objet signature est dans /V
-                    sig_obj = field_obj["/V"]
-
-                    if "/Contents" not in sig_obj:
-                        logger.warning(
-                            f"Champ {field_name} signé mais /Contents manquant"
-                        )
-                        continue
-
-                    # Extraire le certificat depuis /Contents (structure CMS)
-                    contents = sig_obj["/Contents"]
-
-                    # Parser le CMS pour extraire le certificat
-                    content_info = cms.ContentInfo.load(contents)
-
-                    # Accéder à la structure SignedData
-                    if content_info["content_type"].native == "signed_data":
-                        signed_data = content_info["content"]
-
-                        # Extraire les certificats
-                        has_certs = (
-                            "certificates" in signed_data
-                            and signed_data["certificates"]
-                        )
-                        if has_certs:
-                            # Premier certificat = signataire
-                            cert_choice = signed_data["certificates"][0]
-
-                            # CertificateChoices, extraire certificat
-                            if cert_choice.name == "certificate":
-                                cert_asn1 = cert_choice.chosen
-                                cert_bytes = cert_asn1.dump()
-
-                                # Charger avec cryptography
-                                cert = x509.load_der_x509_certificate(
-                                    cert_bytes, default_backend()
-                                )
-                                logger.info(f"✅ Certificat extrait: {field_name}")
-                                return cert
-
-        logger.warning(f"Aucun certificat trouvé pour champ {field_name}")
-        return None
+        content_info = load_signature_cms(pdf_path, field_name)
+        cert = certificate_from_cms(content_info) if content_info else None
+        if cert is None:
+            logger.warning(f"Aucun certificat trouvé pour champ {field_name}")
+        else:
+            logger.info(f"✅ Certificat extrait: {field_name}")
+        return cert
 
     except Exception as e:
         logger.error(f"Erreur extraction certificat : {e}")
@@ -809,15 +852,12 @@ def extract_certificate_from_pdf(
         return None
 
 
-def extract_tsa_timestamp_from_pdf(pdf_path: str, field_name: str) -> Optional[tuple]:
+def extract_tsa_timestamp_from_pdf(pdf_path, field_name: str) -> Optional[tuple]:
     """
     Extrait le timestamp TSA d'un champ de signature PDF.
 
-    Le timestamp TSA est stocké dans les attributs non signés (unsigned attributes)
-    de la structure CMS SignedData, conformément à RFC 3161.
-
     Args:
-        pdf_path: Chemin du PDF signé
+        pdf_path: Chemin du PDF signé, ou son contenu en mémoire
         field_name: Nom du champ de signature
 
     Returns:
@@ -833,108 +873,10 @@ def extract_tsa_timestamp_from_pdf(pdf_path: str, field_name: str) -> Optional[t
         ...     print(f"Timestamp: {timestamp}, Serial: {serial}")
     """
     try:
-        from asn1crypto import cms
-        from pyhanko.pdf_utils.reader import PdfFileReader
-        from pyhanko.sign.fields import enumerate_sig_fields
-
         logger.info(f"🔍 Extraction timestamp TSA pour champ: {field_name}")
 
-        with open(pdf_path, "rb") as f:
-            reader = PdfFileReader(f)
-
-            # Parcourir tous les champs de signature
-            for sig_field_name, field_ref, sig_obj_ref in enumerate_sig_fields(reader):
-                if sig_field_name == field_name:
-                    field_obj = reader.get_object(sig_obj_ref)
-
-                    if field_obj is None or "/V" not in field_obj:
-                        logger.warning(
-                            f"Champ {field_name} trouvé mais pas encore signé"
-                        )
-                        return None
-
-                    sig_obj = field_obj["/V"]
-
-                    if "/Contents" not in sig_obj:
-                        logger.warning(
-                            f"Champ {field_name} signé mais /Contents manquant"
-                        )
-                        return None
-
-                    # Extraire la structure CMS SignedData
-                    contents = sig_obj["/Contents"]
-                    content_info = cms.ContentInfo.load(contents)
-
-                    if content_info["content_type"].native != "signed_data":
-                        logger.warning(
-                            f"Type de contenu inattendu: {content_info['content_type'].native}"
-                        )
-                        return None
-
-                    signed_data = content_info["content"]
-                    signer_infos = signed_data["signer_infos"]
-
-                    if not signer_infos:
-                        logger.warning("Aucun signer_info trouvé")
-                        return None
-
-                    signer_info = signer_infos[0]
-
-                    # Accéder aux attributs non signés
-                    # (asn1crypto utilise [] pas .get())
-                    # Vérifier si 'unsigned_attrs' existe dans la structure
-                    try:
-                        unsigned_attrs = signer_info["unsigned_attrs"]
-                    except (KeyError, TypeError):
-                        logger.info("⚠️ Aucun attribut non signé (pas de timestamp TSA)")
-                        return None
-
-                    if not unsigned_attrs:
-                        logger.info(
-                            "⚠️ Attributs non signés vides (pas de timestamp TSA)"
-                        )
-                        return None
-
-                    # Chercher l'attribut timestamp TSA
-                    # OID pour timestamp-token: 1.2.840.113549.1.9.16.2.14
-                    for attr in unsigned_attrs:
-                        if attr["type"].dotted == "1.2.840.113549.1.9.16.2.14":
-                            # Extraire le token timestamp
-                            ts_token_bytes = attr["values"][0].dump()
-                            ts_content_info = cms.ContentInfo.load(ts_token_bytes)
-
-                            if ts_content_info["content_type"].native != "signed_data":
-                                continue
-
-                            ts_signed_data = ts_content_info["content"]
-
-                            # Extraire TSTInfo (encapsulated content)
-                            encap_content = ts_signed_data["encap_content_info"]
-                            if encap_content["content_type"].native != "tst_info":
-                                continue
-
-                            # .parsed retourne déjà un objet TSTInfo parsé
-                            tst_info = encap_content["content"].parsed
-
-                            # Extraire les informations du timestamp
-                            gen_time = tst_info["gen_time"].native  # datetime object
-                            serial_number = tst_info["serial_number"].native
-                            policy_oid = tst_info["policy"].dotted
-
-                            logger.info("✅ Timestamp TSA extrait:")
-                            logger.info(f"   Date/heure: {gen_time}")
-                            logger.info(f"   Numéro de série: {serial_number}")
-                            logger.info(f"   Policy OID: {policy_oid}")
-
-                            return (gen_time, ts_token_bytes, serial_number)
-
-                    logger.info(
-                        "⚠️ Attribut timestamp TSA non trouvé dans unsigned_attrs"
-                    )
-                    return None
-
-        logger.warning(f"Champ de signature '{field_name}' non trouvé dans le PDF")
-        return None
+        content_info = load_signature_cms(pdf_path, field_name)
+        return tsa_timestamp_from_cms(content_info) if content_info else None
 
     except Exception as e:
         logger.error(f"❌ Erreur extraction timestamp TSA : {e}")
@@ -947,23 +889,33 @@ def extract_tsa_timestamp_from_pdf(pdf_path: str, field_name: str) -> Optional[t
 def save_signature_metadata(
     document,
     signature_request,
-    pdf_path: str,
+    pdf_path,
     field_name: str,
     http_metadata: Dict,
     pdf_hash_before: str,
     signature_timestamp,
+    signature_cms=None,
+    pdf_hash_after: Optional[str] = None,
+    tsa_info: Optional[tuple] = None,
 ):
     """
     Sauvegarde les métadonnées d'une signature en base de données.
 
+    Le certificat et le jeton TSA viennent de la signature elle-même
+    (signature_cms, tsa_info). À défaut, le CMS est relu dans le PDF par champ.
+
     Args:
         document: Instance du document (Bail/EtatLieux/Quittance)
         signature_request: Instance de SignatureRequest (contient OTP)
-        pdf_path: Chemin du PDF signé
+        pdf_path: Chemin du PDF signé, ou son contenu en mémoire
         field_name: Nom du champ de signature
         http_metadata: Dict avec ip_address, user_agent, referer
         pdf_hash_before: Hash SHA-256 du PDF avant signature
         signature_timestamp: datetime de signature (utilisé pour otp_validated_at)
+        signature_cms: asn1crypto.cms.ContentInfo de la signature (optionnel)
+        pdf_hash_after: Hash SHA-256 du PDF signé, s'il est déjà connu
+        tsa_info: Jeton TSA émis à la signature, au format de
+            tsa_timestamp_from_cms (lu dans le CMS sinon)
 
     Returns:
         Instance de SignatureMetadata créée
@@ -983,14 +935,20 @@ def save_signature_metadata(
     logger.info(f"💾 Sauvegarde métadonnées signature pour {signer.email}")
 
     # Calculer hash après signature
-    pdf_hash_after = calculate_pdf_hash(pdf_path)
+    if pdf_hash_after is None:
+        pdf_hash_after = calculate_pdf_hash(pdf_path)
+
+    # Structure CMS de la signature (recherchée par champ si non fournie)
+    if signature_cms is None:
+        logger.info(f"🔍 Relecture du CMS depuis le PDF pour {field_name}")
+        signature_cms = load_signature_cms(pdf_path, field_name)
 
-    # Extraire certificat du PDF
-    cert = extract_certificate_from_pdf(pdf_path, field_name)
+    cert = certificate_from_cms(signature_cms) if signature_cms else None
 
     if not cert:
-        logger.error(f"❌ Impossible d'extraire certificat depuis {pdf_path}")
-        raise ValueError(f"Impossible d'extraire certificat depuis {pdf_path}")
+        source = pdf_path if isinstance(pdf_path, str) else "le PDF en mémoire"
+        logger.error(f"❌ Impossible d'extraire certificat depuis {source}")
+        raise ValueError(f"Impossible d'extraire certificat depuis {source}")
 
     # Extraire infos du certificat
     cert_pem = cert.public_bytes(serialization.Encoding.PEM).decode()
@@ -1022,9 +980,9 @@ def save_signature_metadata(
     issuer_cn = issuer_attrs_cn[0].value if issuer_attrs_cn else "Unknown"
     issuer_dn = f"CN={issuer_cn}"
 
-    # Extraire le timestamp TSA du PDF
-    logger.info("🔍 Extraction du timestamp TSA depuis le PDF...")
-    tsa_info = extract_tsa_timestamp_from_pdf(pdf_path, field_name)
+    # Timestamp TSA (attributs non signés du CMS, sauf s'il est déjà connu)
+    if tsa_info is None:
+        tsa_info = tsa_timestamp_from_cms(signature_cms)
 
     tsa_timestamp_str = ""
     tsa_response_bytes = None
@@ -1318,12 +1276,12 @@ def generate_proof_journal(document, output_path: Optional[str] = None) -> Dict:
     return journal
 
 
-def is_document_certified(pdf_path: str) -> bool:
+def is_document_certified(pdf_path) -> bool:
     """
     Vérifie si un PDF a déjà été certifié par Hestia.
 
     Args:
-        pdf_path: Chemin du PDF à vérifier
+        pdf_path: Chemin du PDF à vérifier, ou son contenu en mémoire
 
     Returns:
         bool: True si le PDF contient une certification Hestia, False sinon
@@ -1335,7 +1293,7 @@ def is_document_certified(pdf_path: str) -> bool:
     try:
         from pyhanko.pdf_utils.reader import PdfFileReader
 
-        with open(pdf_path, "rb") as f:
+        with open_pdf_stream(pdf_path) as f:
             reader = PdfFileReader(f)
             sig_fields = reader.root.get("/AcroForm", {}).get("/Fields", [])
 
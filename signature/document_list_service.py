@@ -1,21 +1,90 @@
 """
-Service pour générer la liste des documents à signer
+Service pour générer la liste des documents à signer, et listes des
+documents par type (bail, avenant, état des lieux) pour la page documents
+d'une location (location/services/document_index.py).
+
+Les documents uploadés (table bail_document) sont lus via DocumentIndex :
+une requête pour tous les baux, avenants et locataires concernés.
 """
 
-from typing import Any, Dict, List
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List
+
+from django.db.models import Q
 
+from backend.pdf_utils import get_static_pdf_iframe_url
 from bail.models import Avenant, Bail, Document, DocumentType
-from bail.views import get_static_pdf_iframe_url
 from etat_lieux.models import EtatLieux
+from signature.document_status import DocumentStatus
+
+# Documents rattachés au locataire, affichés avec le bail
+LOCATAIRE_BAIL_DOCUMENT_TYPES = [
+    DocumentType.ATTESTATION_MRH,
+    DocumentType.CAUTION_SOLIDAIRE,
+]
+
+
+class DocumentIndex:
+    """
+    Documents uploadés d'un ensemble de baux, avenants et locataires,
+    groupés par propriétaire. Triés par type puis du plus récent au plus ancien.
+    """
+
+    def __init__(self, documents: Iterable[Document] = ()):
+        self.by_bail = defaultdict(list)
+        self.by_avenant = defaultdict(list)
+        self.by_locataire = defaultdict(list)
+        for doc in documents:
+            if doc.bail_id:
+                self.by_bail[doc.bail_id].append(doc)
+            if doc.avenant_id:
+                self.by_avenant[doc.avenant_id].append(doc)
+            if doc.locataire_id:
+                self.by_locataire[doc.locataire_id].append(doc)
+
+    @classmethod
+    def load(cls, bail_ids=(), avenant_ids=(), locataire_ids=()) -> "DocumentIndex":
+        """Charge les documents des propriétaires donnés en une seule requête."""
+        query = Q()
+        if bail_ids:
+            query |= Q(bail_id__in=list(bail_ids))
+        if avenant_ids:
+            query |= Q(avenant_id__in=list(avenant_ids))
+        if locataire_ids:
+            query |= Q(locataire_id__in=list(locataire_ids))
+        if not query:
+            return cls()
+        return cls(Document.objects.filter(query).order_by("type_document", "-created_at"))
+
+    @staticmethod
+    def _filter(documents, types=None, exclude=None):
+        return [
+            doc
+            for doc in documents
+            if (types is None or doc.type_document in types)
+            and (exclude is None or doc.type_document not in exclude)
+        ]
 
+    def for_bail(self, bail_id, types=None, exclude=None) -> List[Document]:
+        return self._filter(self.by_bail.get(bail_id, []), types, exclude)
 
-def get_bail_documents_list(bail: Bail, request) -> List[Dict[str, Any]]:
+    def for_avenant(self, avenant_id, types=None, exclude=None) -> List[Document]:
+        return self._filter(self.by_avenant.get(avenant_id, []), types, exclude)
+
+    def for_locataire(self, locataire_id, types=None, exclude=None) -> List[Document]:
+        return self._filter(self.by_locataire.get(locataire_id, []), types, exclude)
+
+
+def get_bail_documents_list(
+    bail: Bail, request, index: DocumentIndex | None = None
+) -> List[Dict[str, Any]]:
     """
     Retourne la liste des documents associés à un bail
 
     Args:
         bail: Instance de Bail
         request: HttpRequest (optionnel pour S3/MinIO, requis pour fichiers locaux)
+        index: Documents déjà chargés (défaut: chargés pour ce bail)
 
     Returns:
         Liste de dictionnaires avec name, description, url, type, required
@@ -47,10 +116,10 @@ def get_bail_documents_list(bail: Bail, request) -> List[Dict[str, Any]]:
         }
     )
 
+    index = index or DocumentIndex.load(bail_ids=[bail.id])
+
     # 3. Diagnostics techniques
-    diagnostics = Document.objects.filter(
-        bail=bail, type_document=DocumentType.DIAGNOSTIC
-    )
+    diagnostics = index.for_bail(bail.id, [DocumentType.DIAGNOSTIC])
     for doc in diagnostics:
         documents_list.append(
             {
@@ -63,9 +132,7 @@ def get_bail_documents_list(bail: Bail, request) -> List[Dict[str, Any]]:
         )
 
     # 4. Permis de louer
-    permis = Document.objects.filter(
-        bail=bail, type_document=DocumentType.PERMIS_DE_LOUER
-    )
+    permis = index.for_bail(bail.id, [DocumentType.PERMIS_DE_LOUER])
     for doc in permis:
         documents_list.append(
             {
@@ -78,9 +145,7 @@ def get_bail_documents_list(bail: Bail, request) -> List[Dict[str, Any]]:
         )
 
     # 5. Extraits du règlement de copropriété
-    reglement_copro = Document.objects.filter(
-        bail=bail, type_document=DocumentType.REGLEMENT_COPROPRIETE
-    )
+    reglement_copro = index.for_bail(bail.id, [DocumentType.REGLEMENT_COPROPRIETE])
     for doc in reglement_copro:
         documents_list.append(
             {
@@ -148,13 +213,16 @@ def get_etat_lieux_documents_list(
     return documents_list
 
 
-def get_avenant_documents_list(avenant: Avenant, request) -> List[Dict[str, Any]]:
+def get_avenant_documents_list(
+    avenant: Avenant, request, index: DocumentIndex | None = None
+) -> List[Dict[str, Any]]:
     """
     Retourne la liste des documents associés à un avenant
 
     Args:
         avenant: Instance de Avenant
         request: HttpRequest (optionnel pour S3/MinIO, requis pour fichiers locaux)
+        index: Documents déjà chargés (défaut: chargés pour cet avenant)
 
     Returns:
         Liste de dictionnaires avec name, description, url, type, required
@@ -173,10 +241,10 @@ def get_avenant_documents_list(avenant: Avenant, request) -> List[Dict[str, Any]
             }
         )
 
+    index = index or DocumentIndex.load(avenant_ids=[avenant.id])
+
     # 2. Diagnostics techniques (liés directement à l'avenant)
-    diagnostics = Document.objects.filter(
-        avenant=avenant, type_document=DocumentType.DIAGNOSTIC
-    )
+    diagnostics = index.for_avenant(avenant.id, [DocumentType.DIAGNOSTIC])
     for doc in diagnostics:
         documents_list.append(
             {
@@ -189,9 +257,7 @@ def get_avenant_documents_list(avenant: Avenant, request) -> List[Dict[str, Any]
         )
 
     # 3. Permis de louer (liés directement à l'avenant)
-    permis = Document.objects.filter(
-        avenant=avenant, type_document=DocumentType.PERMIS_DE_LOUER
-    )
+    permis = index.for_avenant(avenant.id, [DocumentType.PERMIS_DE_LOUER])
     for doc in permis:
         documents_list.append(
             {
@@ -204,3 +270,218 @@ def get_avenant_documents_list(avenant: Avenant, request) -> List[Dict[str, Any]
         )
 
     return documents_list
+
+
+# ============================================
+# PAGE DOCUMENTS D'UNE LOCATION
+# ============================================
+
+
+def _latest_pdf_url(document) -> str | None:
+    """URL du PDF le plus récent (None si DRAFT sans PDF)."""
+    if document.latest_pdf:
+        return document.latest_pdf.url
+    if document.pdf:
+        return document.pdf.url
+    return None
+
+
+def list_bail_entries(
+    bail: Bail,
+    request,
+    index: DocumentIndex,
+    locataires,
+    avenants: List[Avenant],
+    is_locataire: bool,
+) -> List[Dict[str, Any]]:
+    """
+    Entrées de la page documents d'une location pour un bail : bail, annexes,
+    documents des locataires (MRH, caution) et avenants.
+
+    Args:
+        bail: Instance de Bail annotée par annotate_date_signature
+        request: HttpRequest (URLs absolues des documents statiques)
+        index: Documents uploadés du bail, de ses avenants et des locataires
+        locataires: Locataires de la location
+        avenants: Avenants du bail, triés par numéro
+        is_locataire: Masquer les brouillons (vue locataire)
+    """
+    # Filtrer les brouillons pour les locataires
+    if is_locataire and bail.status == DocumentStatus.DRAFT:
+        return []
+
+    # Date du bail pour les annexes
+    date_signature = bail.annotated_date_signature
+    bail_date = (
+        date_signature.isoformat() if date_signature else bail.created_at.isoformat()
+    )
+    locataires_names = ", ".join(
+        [f"{loc.firstName} {loc.lastName}" for loc in locataires]
+    )
+
+    entries = [
+        {
+            "id": f"bail-{bail.id}",
+            "type": "bail",
+            "nom": f"Bail - {locataires_names}",
+            "date": bail_date,
+            "url": _latest_pdf_url(bail),
+            # Utiliser le label de l'enum directement (source unique de vérité)
+            "status": bail.get_status_display(),
+            "location_id": str(bail.location_id),
+            "bail_id": str(bail.id),  # Pour reprendre le DRAFT
+        }
+    ]
+
+    # Annexes seulement si le bail est SIGNING ou SIGNED
+    if not bail.is_locked:
+        return entries
+
+    # Notice d'information (toujours statique, via méthode du modèle)
+    entries.append(
+        {
+            "id": f"notice-{bail.id}",
+            "type": "annexe_bail",
+            "nom": "Notice d'information",
+            "date": bail_date,
+            "url": bail.get_notice_information_url(request),
+            "status": "Annexe - Bail",
+        }
+    )
+
+    # Documents annexes du bail (diagnostics, permis de louer)
+    documents_bail = index.for_bail(bail.id, exclude=LOCATAIRE_BAIL_DOCUMENT_TYPES)
+    diagnostic_count = sum(
+        1 for doc in documents_bail if doc.type_document == DocumentType.DIAGNOSTIC
+    )
+    diagnostic_index = 1
+    for doc in documents_bail:
+        doc_nom = doc.get_type_document_display()
+
+        # Si diagnostics techniques et plusieurs, ajouter numérotation
+        if doc.type_document == DocumentType.DIAGNOSTIC and diagnostic_count > 1:
+            doc_nom = f"{doc_nom} - {diagnostic_index}"
+            diagnostic_index += 1
+
+        entries.append(
+            {
+                "id": f"doc-{doc.id}",
+                "type": "annexe_bail",
+                "nom": doc_nom,
+                "date": bail_date,
+                "url": doc.file.url,
+                "status": "Annexe - Bail",
+            }
+        )
+
+    # Documents des locataires (MRH, caution)
+    for locataire in locataires:
+        for doc in index.for_locataire(locataire.id, LOCATAIRE_BAIL_DOCUMENT_TYPES):
+            if doc.type_document == DocumentType.ATTESTATION_MRH:
+                doc_type, doc_status = "assurance_bail", "Assurance"
+            else:  # CAUTION_SOLIDAIRE
+                doc_type, doc_status = "caution_bail", "Caution - Bail"
+
+            entries.append(
+                {
+                    "id": f"loc-doc-{doc.id}",
+                    "type": doc_type,
+                    "nom": (
+                        f"{doc.get_type_document_display()} - "
+                        f"{locataire.firstName} {locataire.lastName}"
+                    ),
+                    "date": bail_date,
+                    "url": doc.file.url,
+                    "status": doc_status,
+                }
+            )
+
+    for avenant in avenants:
+        entries.extend(list_avenant_entries(avenant, index, is_locataire))
+
+    return entries
+
+
+def list_avenant_entries(
+    avenant: Avenant, index: DocumentIndex, is_locataire: bool
+) -> List[Dict[str, Any]]:
+    """Entrées de la page documents d'une location pour un avenant et ses annexes."""
+    # Filtrer les brouillons pour les locataires
+    if is_locataire and avenant.status == DocumentStatus.DRAFT:
+        return []
+
+    avenant_date = avenant.created_at.isoformat()
+    entries = [
+        {
+            "id": f"avenant-{avenant.id}",
+            "type": "avenant",
+            "nom": f"Avenant n°{avenant.numero}",
+            "date": avenant_date,
+            "url": _latest_pdf_url(avenant),
+            "status": avenant.get_status_display(),
+            "avenant_id": str(avenant.id),
+            "bail_id": str(avenant.bail_id),
+        }
+    ]
+
+    # Annexes de l'avenant (diagnostics, permis de louer) si SIGNING ou SIGNED
+    if avenant.is_locked:
+        for doc in index.for_avenant(avenant.id):
+            entries.append(
+                {
+                    "id": f"avenant-doc-{doc.id}",
+                    "type": "annexe_bail",
+                    "nom": doc.get_type_document_display(),
+                    "date": avenant_date,
+                    "url": doc.file.url,
+                    "status": f"Annexe - Avenant n°{avenant.numero}",
+                }
+            )
+
+    return entries
+
+
+def list_etat_lieux_entries(
+    etat: EtatLieux, request, is_locataire: bool
+) -> List[Dict[str, Any]]:
+    """Entrées de la page documents d'une location pour un état des lieux."""
+    # Filtrer les brouillons pour les locataires
+    if is_locataire and etat.status == DocumentStatus.DRAFT:
+        return []
+
+    is_entree = etat.type_etat_lieux == "entree"
+    type_label = "d'entrée" if is_entree else "de sortie"
+    # Date de l'EDL pour les annexes
+    edl_date = (
+        etat.date_etat_lieux.isoformat()
+        if etat.date_etat_lieux
+        else etat.created_at.isoformat()
+    )
+
+    entries = [
+        {
+            "id": f"etat-{etat.id}",
+            "type": "etat_lieux_entree" if is_entree else "etat_lieux_sortie",
+            "nom": f"État des lieux {type_label}",
+            "date": edl_date,
+            "url": _latest_pdf_url(etat),
+            "status": etat.get_status_display(),
+            "location_id": str(etat.location_id),  # Pour reprendre le DRAFT
+            "etat_lieux_id": str(etat.id),  # Pour édition directe
+        }
+    ]
+
+    # Grille de vétusté seulement si l'EDL est SIGNING ou SIGNED
+    if etat.is_locked:
+        entries.append(
+            {
+                "id": f"grille-edl-{etat.id}",
+                "type": "annexe_edl",
+                "nom": "Grille de vétusté",
+                "date": edl_date,
+                "url": etat.get_grille_vetuste_url(request),
+                "status": f"Annexe - EDL {'Entrée' if is_entree else 'Sortie'}",
+            }
+        )
+
+    return entries
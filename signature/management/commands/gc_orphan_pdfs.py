@@ -0,0 +1,103 @@
+"""
+Management command pour supprimer du stockage les PDF de documents signables
+qui ne sont plus référencés (rendus remplacés par une nouvelle génération).
+
+Un PDF est conservé s'il est référencé par le champ pdf ou latest_pdf d'un
+document signable (Bail, Avenant, EtatLieux, InsuranceQuotation). Les
+fichiers récents sont ignorés : un rendu en cours d'enregistrement n'est pas
+encore référencé.
+
+Usage:
+    python manage.py gc_orphan_pdfs --dry-run
+    python manage.py gc_orphan_pdfs
+    python manage.py gc_orphan_pdfs --min-age-hours=48
+"""
+
+import posixpath
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from signature.models_base import SignableDocumentMixin
+
+PDF_FIELDS = ("pdf", "latest_pdf")
+
+
+def signable_models():
+    return [
+        model
+        for model in apps.get_models()
+        if issubclass(model, SignableDocumentMixin) and not model._meta.abstract
+    ]
+
+
+def referenced_pdf_names(models):
+    """Noms de fichiers référencés par les documents signables."""
+    names = set()
+    for model in models:
+        for field in PDF_FIELDS:
+            names.update(
+                model.objects.exclude(**{field: ""})
+                .exclude(**{f"{field}__isnull": True})
+                .values_list(field, flat=True)
+                .iterator()
+            )
+    return names
+
+
+class Command(BaseCommand):
+    help = "Supprime les PDF de documents signables qui ne sont plus référencés"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Lister les fichiers orphelins sans les supprimer",
+        )
+        parser.add_argument(
+            "--min-age-hours",
+            type=int,
+            default=24,
+            help="Âge minimum d'un fichier orphelin pour être supprimé (default: 24)",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        cutoff = timezone.now() - timedelta(hours=options["min_age_hours"])
+
+        models = signable_models()
+        pdf_field = SignableDocumentMixin._meta.get_field("pdf")
+        storage = pdf_field.storage
+        directory = pdf_field.upload_to.rstrip("/")
+
+        referenced = referenced_pdf_names(models)
+        _, files = storage.listdir(directory)
+        self.stdout.write(
+            f"📄 {len(files)} fichier(s) dans {directory}/, {len(referenced)} référencé(s) "
+            f"par {', '.join(model.__name__ for model in models)}"
+        )
+
+        deleted = skipped_recent = 0
+        for filename in files:
+            name = posixpath.join(directory, filename)
+            if name in referenced:
+                continue
+
+            if storage.get_modified_time(name) > cutoff:
+                skipped_recent += 1
+                continue
+
+            if dry_run:
+                self.stdout.write(f"   🗑️ {name}")
+            else:
+                storage.delete(name)
+            deleted += 1
+
+        verb = "à supprimer" if dry_run else "supprimé(s)"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {deleted} PDF orphelin(s) {verb}, {skipped_recent} récent(s) conservé(s)"
+            )
+        )
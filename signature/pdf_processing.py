@@ -1,25 +1,34 @@
 """
 Traitement générique des PDF pour la signature électronique
+
+Le pipeline travaille en mémoire (BytesIO) : rendu → champs de signature →
+certification → signatures, chaque étape ajoutant une révision incrémentale
+pyHanko au buffer, qui est ensuite envoyé tel quel au stockage.
 """
 
 import base64
+import hashlib
 import logging
 import os
-
-from django.core.files.base import File
+from functools import cache
 
 from algo.signature.main import (
-    add_signature_fields_dynamic,
-    get_named_dest_coordinates,
-    sign_pdf,
+    add_signature_fields_to_buffer,
+    find_signature_markers,
+    get_signature_field_coordinates,
 )
-from backend.storage_utils import get_local_file_path, save_file_to_storage
+from backend.pdf_rendering import STYLESHEETS, render_pdf
+from backend.storage_utils import read_storage_object, save_stream_to_storage
 from signature.document_status import DocumentStatus
 from signature.document_types import SignableDocumentType
 from signature.services import send_document_signed_emails, send_signature_confirmation_email
 
 logger = logging.getLogger(__name__)
 
+# À incrémenter quand le PDF change sans que le HTML change (injection des
+# champs de signature, certification, rendu WeasyPrint...)
+RENDER_FINGERPRINT_VERSION = 1
+
 
 def process_signature_generic(signature_request, signature_data_url, request=None):
     """
@@ -30,6 +39,8 @@ def process_signature_generic(signature_request, signature_data_url, request=Non
         signature_data_url: Image de signature en base64
         request: Django HttpRequest (pour capturer métadonnées IP/user-agent)
     """
+    from signature.certification_flow import sign_user_pdf_buffer
+
     try:
         # Récupérer le document signable
         document = signature_request.get_document()
@@ -69,48 +80,38 @@ def process_signature_generic(signature_request, signature_data_url, request=Non
             .replace(".pdf", "")
         )
         signed_filename = f"{base_name}_signed.pdf"
-        final_tmp_path = f"/tmp/{base_name}_signed_temp.pdf"
 
-        # Utiliser le helper pour gérer R2/local storage
-        # IMPORTANT : Tout le traitement doit être dans le with pour que le fichier temporaire existe
-        with get_local_file_path(source_field) as source_path:
-            logger.info(f"Fichier source téléchargé: {source_path}")
+        # Lecture depuis le stockage (ou le cache local), hash calculé au passage
+        source_pdf, source_hash = read_storage_object(source_field)
+        logger.info(
+            f"PDF source chargé: {source_field.name} ({source_pdf.getbuffer().nbytes} octets)"
+        )
 
-            logger.info(
-                f"Appel de sign_pdf avec: source={source_path}, output={final_tmp_path}, field={field_name}"
-            )
-            sign_pdf(
-                source_path=source_path,
-                output_path=final_tmp_path,
-                user=signing_person,
-                field_name=field_name,
-                signature_bytes=signature_bytes,
-                request=request,
-                document=document,
-                signature_request=signature_request,  # Métadonnées OTP extraites depuis ici
-            )
-            logger.info("sign_pdf terminé avec succès")
+        logger.info(f"Signature en mémoire, champ: {field_name}")
+        signed_pdf = sign_user_pdf_buffer(
+            source_pdf,
+            user=signing_person,
+            field_name=field_name,
+            signature_bytes=signature_bytes,
+            request=request,
+            document=document,
+            signature_request=signature_request,  # Métadonnées OTP extraites depuis ici
+            pdf_hash_before=source_hash,
+        )
+        logger.info("Signature terminée avec succès")
 
         # Supprimer l'ancien fichier latest_pdf si existant
         if document.latest_pdf and document.latest_pdf.name:
             document.latest_pdf.delete(save=False)
 
-        # Sauvegarder le PDF signé dans latest_pdf
-        with open(final_tmp_path, "rb") as f:
-            document.latest_pdf.save(signed_filename, File(f), save=True)
+        # Sauvegarder le PDF signé dans latest_pdf (buffer envoyé tel quel,
+        # gardé en cache local pour la signature suivante)
+        save_stream_to_storage(
+            document.latest_pdf, signed_filename, signed_pdf, cache_locally=True
+        )
 
-        # Vérifier que le fichier a été sauvegardé avant de nettoyer
-        if document.latest_pdf and document.latest_pdf.name:
-            # Nettoyer le fichier temporaire seulement si la sauvegarde a réussi
-            try:
-                os.remove(final_tmp_path)
-                logger.info(f"Fichier temporaire supprimé: {final_tmp_path}")
-            except OSError as e:
-                logger.warning(
-                    f"Impossible de supprimer le fichier temporaire {final_tmp_path}: {e}"
-                )
-        else:
-            logger.error("Échec de la sauvegarde du PDF, fichier temporaire conservé")
+        if not (document.latest_pdf and document.latest_pdf.name):
+            logger.error("Échec de la sauvegarde du PDF signé")
             return False
 
         logger.info(f"PDF signé avec succès pour {document.get_document_name()}")
@@ -286,14 +287,17 @@ def process_signature_generic(signature_request, signature_data_url, request=Non
         return False
 
 
-def prepare_pdf_with_signature_fields_generic(pdf_field, document):
+def add_signature_fields_for_document(pdf, document):
     """
-    Version générique pour préparer un PDF avec les champs de signature
-    Fonctionne avec n'importe quel document signable (bail, état des lieux, etc.)
+    Ajoute au PDF en mémoire les champs de signature de tous les signataires
+    du document (mandataire, bailleurs, locataires).
 
     Args:
-        pdf_field: Soit un FieldFile Django (document.pdf), soit un chemin string (/tmp/xxx.pdf)
+        pdf: Contenu du PDF (bytes, memoryview ou BytesIO)
         document: Instance du document signable (Bail, EtatLieux, etc.) qui a une relation 'location'
+
+    Returns:
+        io.BytesIO: PDF avec les champs de signature, position au début
     """
     try:
         # Récupérer la location du document
@@ -313,61 +317,22 @@ def prepare_pdf_with_signature_fields_generic(pdf_field, document):
         ]
         locataires = list(location.locataires.all())
 
-        # Déterminer si c'est un FieldFile (depuis S3) ou un chemin local (string)
-        is_local_path = isinstance(pdf_field, str)
+        all_fields = []
 
-        if is_local_path:
-            # Cas 1: Fichier temporaire local (string path)
-            # Travailler directement sur le fichier sans télécharger depuis S3
-            pdf_path = pdf_field
-            logger.info(
-                f"Préparation des champs de signature (fichier local): {pdf_path}"
-            )
-        else:
-            # Cas 2: FieldFile depuis S3 - télécharger d'abord
-            logger.info(f"Téléchargement du PDF depuis S3: {pdf_field.name}")
-
-        # Utiliser context manager seulement si c'est un FieldFile
-        from contextlib import nullcontext
-
-        context_manager = (
-            nullcontext(pdf_field) if is_local_path else get_local_file_path(pdf_field)
-        )
-
-        with context_manager as pdf_path:
-            all_fields = []
+        # Une seule passe sur le PDF pour tous les signataires
+        markers = find_signature_markers(pdf)
 
-            # Ajouter le champ pour le mandataire (si présent) - EN PREMIER
-            if mandataire and mandataire.signataire:
-                person = mandataire.signataire
-                page, rect, field_name = get_named_dest_coordinates(
-                    pdf_path, person, "mandataire"
-                )
-                if rect is None:
-                    logger.warning(
-                        f"Aucun champ de signature trouvé pour le mandataire {person.email}"
-                    )
-                else:
-                    all_fields.append(
-                        {
-                            "field_name": field_name,
-                            "rect": rect,
-                            "person": person,
-                            "page": page,
-                        }
-                    )
-
-            # Ajouter les champs pour les bailleurs signataires
-            for person in bailleur_signataires:
-                page, rect, field_name = get_named_dest_coordinates(
-                    pdf_path, person, "bailleur"
+        # Ajouter le champ pour le mandataire (si présent) - EN PREMIER
+        if mandataire and mandataire.signataire:
+            person = mandataire.signataire
+            page, rect, field_name = get_signature_field_coordinates(
+                markers, person, "mandataire"
+            )
+            if rect is None:
+                logger.warning(
+                    f"Aucun champ de signature trouvé pour le mandataire {person.email}"
                 )
-                if rect is None:
-                    logger.warning(
-                        f"Aucun champ de signature trouvé pour {person.email}"
-                    )
-                    continue
-
+            else:
                 all_fields.append(
                     {
                         "field_name": field_name,
@@ -377,46 +342,237 @@ def prepare_pdf_with_signature_fields_generic(pdf_field, document):
                     }
                 )
 
-            # Ajouter les champs pour les locataires
-            for person in locataires:
-                page, rect, field_name = get_named_dest_coordinates(
-                    pdf_path, person, "locataire"
+        # Ajouter les champs pour les bailleurs signataires
+        for person in bailleur_signataires:
+            page, rect, field_name = get_signature_field_coordinates(
+                markers, person, "bailleur"
+            )
+            if rect is None:
+                logger.warning(
+                    f"Aucun champ de signature trouvé pour {person.email}"
                 )
-                if rect is None:
-                    logger.warning(
-                        f"Aucun champ de signature trouvé pour {person.email}"
-                    )
-                    continue
+                continue
+
+            all_fields.append(
+                {
+                    "field_name": field_name,
+                    "rect": rect,
+                    "person": person,
+                    "page": page,
+                }
+            )
 
-                all_fields.append(
-                    {
-                        "field_name": field_name,
-                        "rect": rect,
-                        "person": person,
-                        "page": page,
-                    }
+        # Ajouter les champs pour les locataires
+        for person in locataires:
+            page, rect, field_name = get_signature_field_coordinates(
+                markers, person, "locataire"
+            )
+            if rect is None:
+                logger.warning(
+                    f"Aucun champ de signature trouvé pour {person.email}"
                 )
+                continue
+
+            all_fields.append(
+                {
+                    "field_name": field_name,
+                    "rect": rect,
+                    "person": person,
+                    "page": page,
+                }
+            )
 
-            if not all_fields:
-                raise ValueError("Aucun champ de signature trouvé dans le PDF")
-
-            # Ajouter les champs de signature au PDF (modifie le fichier in-place)
-            add_signature_fields_dynamic(pdf_path, all_fields)
-            logger.info(f"Ajouté {len(all_fields)} champs de signature au PDF")
-
-            # Re-uploader vers S3 uniquement si c'est un FieldFile
-            if not is_local_path:
-                save_file_to_storage(
-                    pdf_field, pdf_path, filename=pdf_field.name, save=True
-                )
-                logger.info("PDF avec champs de signature uploadé vers S3")
-            else:
-                logger.info("Fichier local modifié in-place (pas d'upload S3)")
+        if not all_fields:
+            raise ValueError("Aucun champ de signature trouvé dans le PDF")
 
-        return True
+        # Révision incrémentale ajoutée au buffer
+        buffer = add_signature_fields_to_buffer(pdf, all_fields)
+        logger.info(f"Ajouté {len(all_fields)} champs de signature au PDF")
+        return buffer
 
     except Exception as e:
         logger.error(
             f"Erreur lors de la préparation du PDF avec champs de signature: {e}"
         )
         raise
+
+
+def prepare_pdf_with_signature_fields_generic(pdf_field, document):
+    """
+    Version générique pour préparer un PDF avec les champs de signature
+    Fonctionne avec n'importe quel document signable (bail, état des lieux, etc.)
+
+    Args:
+        pdf_field: Soit un FieldFile Django (document.pdf), soit un chemin string (/tmp/xxx.pdf)
+        document: Instance du document signable (Bail, EtatLieux, etc.) qui a une relation 'location'
+    """
+    if isinstance(pdf_field, str):
+        # Fichier local modifié in-place
+        with open(pdf_field, "rb") as f:
+            buffer = add_signature_fields_for_document(f.read(), document)
+        with open(pdf_field, "wb") as f:
+            f.write(buffer.getbuffer())
+        logger.info(f"Champs de signature ajoutés (fichier local): {pdf_field}")
+    else:
+        source, _ = read_storage_object(pdf_field)
+        buffer = add_signature_fields_for_document(source, document)
+        save_stream_to_storage(pdf_field, pdf_field.name, buffer, save=True)
+        logger.info("PDF avec champs de signature uploadé vers le stockage")
+
+    return True
+
+
+def finalize_generated_pdf(
+    pdf_bytes, document, document_type, pdf_filename, fingerprint=""
+):
+    """
+    Pipeline commun après le rendu WeasyPrint d'un document signable :
+    champs de signature → certification Hestia → upload dans document.pdf.
+
+    La certification reste optionnelle (mode dev sans certificat) : ses erreurs
+    sont loggées sans interrompre la génération. Les erreurs de stockage, elles,
+    remontent à l'appelant (le worker PDF peut ainsi réessayer).
+
+    Args:
+        pdf_bytes: PDF brut généré par WeasyPrint
+        document: Document signable (Bail, EtatLieux, Avenant...)
+        document_type: Valeur de SignableDocumentType (pour la certification)
+        pdf_filename: Nom du fichier enregistré dans document.pdf
+        fingerprint: Empreinte du rendu, enregistrée avec document.pdf
+            uniquement si la certification a réussi (un PDF non certifié
+            n'est jamais réutilisé)
+
+    Returns:
+        tuple[bytes, bool]: Contenu final du PDF (certifié si possible) et
+        succès de la certification
+    """
+    from signature.certification_flow import certify_pdf_buffer
+
+    # 1. Ajouter les champs de signature (en mémoire)
+    pdf_buffer = add_signature_fields_for_document(pdf_bytes, document)
+
+    # 2. Certifier avec Hestia (certify=True + DocMDP)
+    certified = False
+    try:
+        pdf_buffer = certify_pdf_buffer(pdf_buffer, document_type=document_type)
+        certified = True
+        logger.info(f"✅ {document_type} {document.id} certifié Hestia avec succès")
+    except FileNotFoundError as e:
+        logger.warning(f"⚠️ Certificat Hestia AATL manquant (mode dev) : {e}")
+        logger.warning("⚠️ PDF non certifié, continuons quand même")
+    except ValueError as e:
+        logger.warning(f"⚠️ PASSWORD_CERT_SERVER manquant : {e}")
+        logger.warning("⚠️ PDF non certifié, continuons quand même")
+    except Exception as e:
+        logger.error(f"❌ Erreur certification Hestia : {e}")
+        logger.error("⚠️ PDF non certifié, continuons quand même")
+
+    # 3. Envoyer le buffer tel quel dans document.pdf (lu par la première signature)
+    # L'empreinte est enregistrée avec document.pdf (même save())
+    document.pdf_fingerprint = fingerprint if certified else ""
+    save_stream_to_storage(document.pdf, pdf_filename, pdf_buffer, cache_locally=True)
+
+    return pdf_buffer.getvalue(), certified
+
+
+@cache
+def _stylesheets_digest():
+    """Empreinte des feuilles communes (hors HTML), calculée une fois par process."""
+    digest = hashlib.sha256()
+    for path in STYLESHEETS:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def compute_render_fingerprint(html, document_type, resources=()):
+    """
+    Empreinte d'un rendu : deux rendus de même empreinte produisent le même PDF.
+
+    Le HTML rendu contient tout le contexte résolu par le template (sorties de
+    BailMapping, présence des annexes, parties et marqueurs de signature...).
+
+    Args:
+        html: HTML rendu par le template
+        document_type: Valeur de SignableDocumentType
+        resources: Empreintes des ressources servies hors HTML (photos EDL)
+
+    Returns:
+        str: SHA-256 hexadécimal
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{RENDER_FINGERPRINT_VERSION}:{document_type}:".encode())
+    digest.update(_stylesheets_digest().encode())
+    digest.update(html.encode("utf-8"))
+    for resource in resources:
+        digest.update(b"\0")
+        digest.update(resource.encode() if isinstance(resource, str) else resource)
+    return digest.hexdigest()
+
+
+def can_reuse_rendered_pdf(document, fingerprint):
+    """Le PDF actuel du document correspond-il déjà à ce rendu ?"""
+    if not document.pdf or document.pdf_fingerprint != fingerprint:
+        return False
+    try:
+        return document.pdf.storage.exists(document.pdf.name)
+    except Exception as e:
+        logger.warning(f"⚠️ Impossible de vérifier {document.pdf.name} : {e}")
+        return False
+
+
+def delete_superseded_pdf(document, previous_name):
+    """Supprime le PDF remplacé d'un brouillon (aucune signature ne le référence)."""
+    if not previous_name or previous_name == document.pdf.name:
+        return
+    if document.status != DocumentStatus.DRAFT:
+        # Laissé à gc_orphan_pdfs
+        return
+    try:
+        document.pdf.storage.delete(previous_name)
+        logger.info(f"🗑️ PDF remplacé supprimé : {previous_name}")
+    except Exception as e:
+        logger.warning(f"⚠️ PDF remplacé non supprimé ({previous_name}) : {e}")
+
+
+def render_signable_pdf(
+    document,
+    document_type,
+    html,
+    pdf_filename,
+    base_url=None,
+    url_fetcher=None,
+    resources=(),
+):
+    """
+    Rendu WeasyPrint puis finalize_generated_pdf, sauf si le document a déjà
+    un PDF pour exactement ce rendu (nouvelle génération d'un brouillon
+    inchangé) : le PDF certifié existant est alors réutilisé tel quel.
+
+    Args:
+        document: Document signable (Bail, EtatLieux, Avenant...)
+        document_type: Valeur de SignableDocumentType
+        html: HTML rendu par le template
+        pdf_filename: Nom du fichier enregistré dans document.pdf
+        base_url: URL de base des ressources du template
+        url_fetcher: url_fetcher spécifique au document (photos EDL)
+        resources: Empreintes des ressources servies par url_fetcher
+
+    Returns:
+        bytes | None: Contenu du nouveau PDF, None si le PDF existant est réutilisé
+    """
+    fingerprint = compute_render_fingerprint(html, document_type, resources)
+    if can_reuse_rendered_pdf(document, fingerprint):
+        logger.info(
+            f"♻️ {document_type} {document.id} inchangé, PDF réutilisé : {document.pdf.name}"
+        )
+        return None
+
+    previous_name = document.pdf.name if document.pdf else None
+    pdf_bytes = render_pdf(html, base_url=base_url, url_fetcher=url_fetcher)
+
+    content, _ = finalize_generated_pdf(
+        pdf_bytes, document, document_type, pdf_filename, fingerprint=fingerprint
+    )
+
+    delete_superseded_pdf(document, previous_name)
+    return content
@@ -0,0 +1,252 @@
+"""
+Registre process-wide du contexte de signature Hestia.
+
+Avant : chaque certification déchiffrait hestia_server.pfx (load_pkcs12) et
+chaque certification / signature utilisateur relisait et parsait tous les
+trust roots PEM pour construire son ValidationContext.
+
+Ici, le signer de certification, les trust roots (AATL, CA, TSA), le CA
+des certificats utilisateurs et le répondeur TSA sont chargés une fois par
+process, puis rechargés à chaud si l'un des fichiers de certificats change
+sur disque (vérifié au plus toutes les SIGNING_CONTEXT_RELOAD_INTERVAL
+secondes).
+
+Le ValidationContext lui-même reste construit par signature (peu coûteux à
+partir des certificats déjà parsés) : PyHanko y fige l'instant de validation.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from pyhanko.keys import load_cert_from_pemder
+from pyhanko.sign import signers
+from pyhanko_certvalidator import ValidationContext
+
+logger = logging.getLogger(__name__)
+
+
+def _watched_files():
+    """Fichiers dont la modification déclenche un rechargement."""
+    server_cert_path = settings.SERVER_CERT_PATH
+    return [
+        server_cert_path,
+        server_cert_path.replace(".pfx", ".pem"),
+        settings.CA_CERT_PATH,
+        settings.CA_KEY_PATH,
+        settings.TSA_CERT_PATH,
+        settings.TSA_KEY_PATH,
+    ]
+
+
+def _files_fingerprint(paths):
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            fingerprint.append((path, None, None))
+    return tuple(fingerprint)
+
+
+class SigningContext:
+    """Certificats Hestia chargés, prêts à signer."""
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.loaded_at = datetime.now(tz=timezone.utc)
+        self.signer = None
+        # (classe d'exception, message) rejoué à chaque certification
+        self.signer_error = None
+        self.trust_roots = []
+        self.tsa_ready = False
+        self.errors = []
+
+    @property
+    def ready(self):
+        return self.signer is not None and bool(self.trust_roots) and self.tsa_ready
+
+    def get_certification_signer(self):
+        """
+        Returns:
+            SimpleSigner: Signer du certificat AATL Hestia
+
+        Raises:
+            FileNotFoundError: Si le certificat Hestia AATL est introuvable
+            ValueError: Si PASSWORD_CERT_SERVER n'est pas défini
+        """
+        if self.signer is None:
+            error_class, message = self.signer_error
+            raise error_class(message)
+        return self.signer
+
+    def build_validation_context(self):
+        """ValidationContext PAdES B-LT (None si aucun trust root)."""
+        if not self.trust_roots:
+            return None
+        # allow_fetching=False car certificats auto-signés (pas de CRL/OCSP externes)
+        return ValidationContext(trust_roots=self.trust_roots, allow_fetching=False)
+
+    def status(self):
+        signing_cert = self.signer.signing_cert if self.signer else None
+        return {
+            "ready": self.ready,
+            "loaded_at": self.loaded_at.isoformat(),
+            "certification_signer": signing_cert is not None,
+            "certification_cert_expires_at": (
+                signing_cert.not_valid_after.isoformat() if signing_cert else None
+            ),
+            "trust_roots": len(self.trust_roots),
+            "tsa": self.tsa_ready,
+            "errors": self.errors,
+        }
+
+
+def load_signing_context(fingerprint):
+    """Charge et valide les certificats Hestia (appelé au démarrage et au reload)."""
+    context = SigningContext(fingerprint)
+    now = datetime.now(tz=timezone.utc)
+
+    # 1. Signer de certification (certificat eIDAS AATL)
+    cert_path = settings.SERVER_CERT_PATH
+    password = settings.PASSWORD_CERT_SERVER
+
+    if not os.path.exists(cert_path):
+        context.signer_error = (
+            FileNotFoundError,
+            f"Certificat Hestia AATL introuvable : {cert_path}\n"
+            "Générez un certificat de test avec : bash scripts/generate_test_seal_cert.sh\n"
+            "Ou installez le certificat CertEurope eIDAS (350€/an) en production.",
+        )
+    elif not password:
+        context.signer_error = (
+            ValueError,
+            "Variable d'environnement PASSWORD_CERT_SERVER non définie.\n"
+            "Pour test : PASSWORD_CERT_SERVER=XXXX!\n"
+            "Pour prod : Utiliser le mot de passe du certificat CertEurope.",
+        )
+    else:
+        try:
+            context.signer = signers.SimpleSigner.load_pkcs12(
+                pfx_file=cert_path, passphrase=password.encode("utf-8")
+            )
+        except Exception as e:
+            logger.error(f"❌ Chargement {cert_path} impossible : {e}")
+
+        if context.signer is None:
+            context.signer_error = (
+                RuntimeError,
+                "PKCS#12 Hestia illisible (mot de passe incorrect ?)",
+            )
+        elif context.signer.signing_cert.not_valid_after < now:
+            context.errors.append("Certificat Hestia AATL expiré")
+
+    if context.signer_error:
+        context.errors.append(context.signer_error[1].split("\n")[0])
+
+    # 2. Trust roots : AATL Hestia, CA Hestia, TSA Hestia
+    for path, name in [
+        (cert_path.replace(".pfx", ".pem"), "Certificat AATL Hestia"),
+        (settings.CA_CERT_PATH, "CA Hestia"),
+        (settings.TSA_CERT_PATH, "Certificat TSA Hestia"),
+    ]:
+        if not os.path.exists(path):
+            continue
+        try:
+            cert = load_cert_from_pemder(path)
+        except Exception as e:
+            logger.warning(f"⚠️ Impossible de charger {name}: {e}")
+            context.errors.append(f"{name} illisible")
+            continue
+        if cert.not_valid_after < now:
+            context.errors.append(f"{name} expiré")
+        context.trust_roots.append(cert)
+
+    if not context.trust_roots:
+        logger.warning("⚠️ Aucun certificat trouvé pour ValidationContext")
+        logger.warning("⚠️ PAdES B-LT désactivé, utilisation de PAdES B-T")
+
+    # 3. CA des certificats utilisateurs : relu au prochain certificat émis
+    from signature.user_signer_pool import reset_user_ca
+
+    reset_user_ca()
+
+    # 4. Répondeur TSA (clé TSA déchiffrée une fois)
+    from tsa.responder import get_tsa_responder, reset_tsa_responder
+
+    reset_tsa_responder()
+    try:
+        get_tsa_responder()
+        context.tsa_ready = True
+    except Exception as e:
+        logger.warning(f"⚠️ TSA non disponible : {e}")
+        context.errors.append("TSA Hestia indisponible")
+
+    logger.info(
+        f"✅ Contexte de signature chargé : signer={context.signer is not None}, "
+        f"{len(context.trust_roots)} trust roots, TSA={context.tsa_ready}"
+    )
+    return context
+
+
+class SigningContextRegistry:
+    """Contexte de signature du process, rechargé si les fichiers changent."""
+
+    def __init__(self, reload_interval):
+        self.reload_interval = reload_interval
+        self._context = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        context = self._context
+        if context is not None and now - self._last_check < self.reload_interval:
+            return context
+
+        with self._lock:
+            if self._context is not None and now - self._last_check < self.reload_interval:
+                return self._context
+
+            fingerprint = _files_fingerprint(_watched_files())
+            if self._context is None or fingerprint != self._context.fingerprint:
+                if self._context is not None:
+                    logger.info("🔄 Certificats modifiés sur disque, rechargement")
+                self._context = load_signing_context(fingerprint)
+            self._last_check = now
+            return self._context
+
+    def reload(self):
+        with self._lock:
+            self._context = load_signing_context(_files_fingerprint(_watched_files()))
+            self._last_check = time.monotonic()
+            return self._context
+
+
+_registry = SigningContextRegistry(settings.SIGNING_CONTEXT_RELOAD_INTERVAL)
+
+
+def get_signing_context() -> SigningContext:
+    """Retourne le contexte de signature du process (chargé au premier appel)."""
+    return _registry.get()
+
+
+def warm_up_signing_context():
+    """Charge les certificats au démarrage du worker (sans bloquer le boot)."""
+    try:
+        context = get_signing_context()
+    except Exception as e:
+        logger.error(f"❌ Chargement du contexte de signature impossible : {e}")
+        return None
+    if not context.ready:
+        logger.warning(f"⚠️ Contexte de signature incomplet : {context.errors}")
+    return context
+
+
+def check_signing_readiness():
+    """Statut de readiness (signer de certification, trust roots, TSA)."""
+    return get_signing_context().status()
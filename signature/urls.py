@@ -0,0 +1,14 @@
+from django.urls import path
+
+from . import views
+
+app_name = "signature"
+
+urlpatterns = [
+    path("ready/", views.signing_readiness_view, name="signing_readiness"),
+    path(
+        "user_signer_metrics/",
+        views.get_user_signer_metrics_view,
+        name="user_signer_metrics",
+    ),
+]
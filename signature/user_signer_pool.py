@@ -0,0 +1,340 @@
+"""
+Pool de clés RSA pré-générées pour les signatures utilisateurs.
+
+generate_user_signer() était dominé par 5 sous-process openssl par signature
+(genrsa, req, x509 -req, pkcs12 -export). Ici :
+- un thread de fond maintient N clés RSA 2048 prêtes par process worker
+- le certificat utilisateur est émis en process avec cryptography, contre
+  la clé CA Hestia chargée et déchiffrée une seule fois
+- le SimpleSigner PyHanko est construit directement, sans fichier PKCS#12
+
+Les clés ne sont jamais partagées entre process : le pool est vidé après un
+fork (gunicorn, workers PDF), chaque process régénère les siennes.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from asn1crypto import keys as asn1_keys
+from asn1crypto import x509 as asn1_x509
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+from django.conf import settings
+from pyhanko.sign import signers
+from pyhanko_certvalidator.registry import SimpleCertificateStore
+
+logger = logging.getLogger(__name__)
+
+USER_KEY_SIZE = 2048
+USER_CERT_VALIDITY_DAYS = 365
+
+
+def generate_user_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=USER_KEY_SIZE)
+
+
+def _percentile(sorted_values, percentile):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percentile / 100))
+    return sorted_values[index]
+
+
+class UserSignerMetrics:
+    """Métriques du process : profondeur du pool, refill, latence p50/p99."""
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._refills = deque(maxlen=window)
+        self.pool_hits = 0
+        self.pool_misses = 0
+
+    def record_signer(self, seconds, pool_hit):
+        with self._lock:
+            self._latencies.append(seconds)
+            if pool_hit:
+                self.pool_hits += 1
+            else:
+                self.pool_misses += 1
+
+    def record_refill(self):
+        with self._lock:
+            self._refills.append(time.monotonic())
+
+    def snapshot(self, pool_depth):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            since = time.monotonic() - 60
+            refills_last_minute = sum(1 for t in self._refills if t >= since)
+            hits, misses = self.pool_hits, self.pool_misses
+
+        p50 = _percentile(latencies, 50)
+        p99 = _percentile(latencies, 99)
+        return {
+            "pid": os.getpid(),
+            "pool_depth": pool_depth,
+            "pool_hits": hits,
+            "pool_misses": misses,
+            "refill_rate_per_minute": refills_last_minute,
+            "signer_latency_ms": {
+                "p50": round(p50 * 1000, 1) if p50 is not None else None,
+                "p99": round(p99 * 1000, 1) if p99 is not None else None,
+                "samples": len(latencies),
+            },
+        }
+
+
+class UserKeyPool:
+    """
+    Réserve de clés RSA alimentée par un thread de fond.
+
+    acquire() ne bloque jamais sur le thread : si le pool est vide, la clé
+    est générée de façon synchrone (comptée comme "miss").
+    """
+
+    def __init__(self, size, metrics):
+        self.size = size
+        self.metrics = metrics
+        self._keys = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def __len__(self):
+        return len(self._keys)
+
+    def acquire(self):
+        """
+        Returns:
+            tuple: (clé RSA, True si elle venait du pool)
+        """
+        self._ensure_filler()
+
+        with self._lock:
+            key = self._keys.popleft() if self._keys else None
+
+        self._wakeup.set()
+        if key is not None:
+            return key, True
+        return generate_user_key(), False
+
+    def _ensure_filler(self):
+        with self._lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+
+            # Nouveau process (fork) : ne jamais réutiliser les clés du parent
+            self._keys.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._fill_loop, name="user-key-pool", daemon=True
+            )
+            self._thread.start()
+
+    def _fill_loop(self):
+        while True:
+            while len(self._keys) < self.size:
+                key = generate_user_key()
+                with self._lock:
+                    self._keys.append(key)
+                self.metrics.record_refill()
+
+            self._wakeup.wait()
+            self._wakeup.clear()
+
+
+_metrics = UserSignerMetrics()
+_key_pool = UserKeyPool(settings.USER_SIGNER_KEY_POOL_SIZE, _metrics)
+
+_ca_lock = threading.Lock()
+_ca_cache = None
+
+
+def get_user_ca():
+    """
+    Charge le certificat et la clé du CA Hestia (une fois par process).
+
+    Seul un chargement réussi est mis en cache : un CA absent ou illisible
+    est retenté à l'appel suivant. Après rotation, reset_user_ca().
+
+    Returns:
+        tuple | None: (certificat CA, clé privée CA), ou None si le CA est
+        indisponible (fallback certificat auto-signé)
+    """
+    global _ca_cache
+
+    with _ca_lock:
+        if _ca_cache is not None:
+            return _ca_cache
+
+        ca_cert_path = settings.CA_CERT_PATH
+        ca_key_path = settings.CA_KEY_PATH
+        if not (os.path.exists(ca_cert_path) and os.path.exists(ca_key_path)):
+            return None
+
+        try:
+            with open(ca_cert_path, "rb") as f:
+                ca_cert = x509.load_pem_x509_certificate(f.read())
+            with open(ca_key_path, "rb") as f:
+                password = settings.PASSWORD_CERT_CA
+                ca_key = serialization.load_pem_private_key(
+                    f.read(), password=password.encode() if password else None
+                )
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"⚠️ CA Hestia illisible, certificat auto-signé : {e}")
+            return None
+
+        _ca_cache = (ca_cert, ca_key)
+        logger.info("🔑 CA Hestia chargé pour les certificats utilisateurs")
+        return _ca_cache
+
+
+def reset_user_ca():
+    """Oublie le CA chargé : relu au prochain certificat émis (rotation)."""
+    global _ca_cache
+
+    with _ca_lock:
+        _ca_cache = None
+
+
+def authority_key_identifier(ca_cert):
+    """
+    AuthorityKeyIdentifier pointant sur le SubjectKeyIdentifier du CA.
+
+    Le SKI d'un CA n'est pas forcément le SHA-1 de sa clé : le recalculer
+    depuis la clé publique casserait la construction de chaîne des
+    validateurs stricts. Clé publique seulement si le CA n'a pas de SKI.
+    """
+    try:
+        ski = ca_cert.extensions.get_extension_for_class(x509.SubjectKeyIdentifier)
+    except x509.ExtensionNotFound:
+        public_key = ca_cert.public_key()
+        return x509.AuthorityKeyIdentifier.from_issuer_public_key(public_key)
+    return x509.AuthorityKeyIdentifier.from_issuer_subject_key_identifier(ski.value)
+
+
+def issue_user_certificate(user, private_key, ca=None):
+    """
+    Émet le certificat X.509 d'un signataire (mêmes subject/extensions que
+    l'ancienne section openssl v3_usr).
+
+    Args:
+        user: Personne (firstName, lastName, email)
+        private_key: Clé RSA du signataire
+        ca: (certificat CA, clé CA) ou None pour un certificat auto-signé
+
+    Returns:
+        cryptography.x509.Certificate
+    """
+    subject = x509.Name(
+        [
+            x509.NameAttribute(NameOID.ORGANIZATION_NAME, "Hestia User"),
+            x509.NameAttribute(NameOID.COMMON_NAME, f"{user.firstName} {user.lastName}"),
+            x509.NameAttribute(NameOID.EMAIL_ADDRESS, user.email),
+        ]
+    )
+    public_key = private_key.public_key()
+
+    if ca:
+        ca_cert, ca_key = ca
+        issuer = ca_cert.subject
+        signing_key = ca_key
+        authority_key_id = authority_key_identifier(ca_cert)
+    else:
+        issuer = subject
+        signing_key = private_key
+        authority_key_id = x509.AuthorityKeyIdentifier.from_issuer_public_key(
+            public_key
+        )
+
+    now = datetime.now(tz=timezone.utc)
+    return (
+        x509.CertificateBuilder()
+        .subject_name(subject)
+        .issuer_name(issuer)
+        .public_key(public_key)
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + timedelta(days=USER_CERT_VALIDITY_DAYS))
+        .add_extension(x509.SubjectKeyIdentifier.from_public_key(public_key), critical=False)
+        .add_extension(authority_key_id, critical=False)
+        .add_extension(x509.BasicConstraints(ca=False, path_length=None), critical=True)
+        .add_extension(
+            x509.KeyUsage(
+                digital_signature=True,
+                content_commitment=True,  # nonRepudiation
+                key_encipherment=False,
+                data_encipherment=False,
+                key_agreement=False,
+                key_cert_sign=False,
+                crl_sign=False,
+                encipher_only=False,
+                decipher_only=False,
+            ),
+            critical=True,
+        )
+        .add_extension(
+            x509.ExtendedKeyUsage([ExtendedKeyUsageOID.EMAIL_PROTECTION]),
+            critical=False,
+        )
+        .sign(signing_key, hashes.SHA256())
+    )
+
+
+def build_user_signer(user):
+    """
+    Construit le SimpleSigner PyHanko d'un signataire à partir d'une clé du pool.
+
+    Returns:
+        SimpleSigner: Signer avec certificat utilisateur (+ CA Hestia en chaîne)
+    """
+    start = time.perf_counter()
+
+    private_key, pool_hit = _key_pool.acquire()
+    ca = get_user_ca()
+    if ca is None:
+        logger.warning(
+            f"⚠️ Certificat auto-signé (CA Hestia indisponible) pour {user.email}"
+        )
+    certificate = issue_user_certificate(user, private_key, ca)
+
+    cert_registry = SimpleCertificateStore()
+    if ca:
+        cert_registry.register(
+            asn1_x509.Certificate.load(ca[0].public_bytes(serialization.Encoding.DER))
+        )
+
+    signer = signers.SimpleSigner(
+        signing_cert=asn1_x509.Certificate.load(
+            certificate.public_bytes(serialization.Encoding.DER)
+        ),
+        signing_key=asn1_keys.PrivateKeyInfo.load(
+            private_key.private_bytes(
+                serialization.Encoding.DER,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        ),
+        cert_registry=cert_registry,
+    )
+
+    elapsed = time.perf_counter() - start
+    _metrics.record_signer(elapsed, pool_hit)
+    logger.info(
+        f"✅ Signer utilisateur prêt en {elapsed * 1000:.1f} ms "
+        f"({'pool' if pool_hit else 'génération synchrone'}, profondeur {len(_key_pool)})"
+    )
+    return signer
+
+
+def get_user_signer_metrics():
+    """Métriques du pool pour le process courant."""
+    return _metrics.snapshot(pool_depth=len(_key_pool))
@@ -7,6 +7,9 @@ import logging
 from django.contrib.auth import get_user_model
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
 
 from authentication.utils import get_tokens_for_user, set_refresh_token_cookie
 from bail.models import Avenant
@@ -29,6 +32,8 @@ from .services import (
     send_signature_email,
     verify_signature_order,
 )
+from .signing_context import check_signing_readiness
+from .user_signer_pool import get_user_signer_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -547,3 +552,36 @@ def cancel_signature_generic(request, document_id, document_model):
             {"error": str(e)},
             status=500,
         )
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])  # Admin seulement
+def get_user_signer_metrics_view(request):
+    """
+    Métriques du pool de clés utilisateurs (process worker qui répond)
+
+    GET /api/signature/user_signer_metrics/
+    """
+    return Response({"success": True, "metrics": get_user_signer_metrics()})
+
+
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])  # Sonde de readiness (load balancer)
+def signing_readiness_view(request):
+    """
+    Readiness du contexte de signature (certificat AATL, trust roots, TSA)
+
+    GET /api/signature/ready/
+    → 200 si le worker peut certifier/horodater, 503 sinon
+    """
+    readiness = check_signing_readiness()
+    return Response(
+        {
+            "success": readiness["ready"],
+            "ready": readiness["ready"],
+            "certification_signer": readiness["certification_signer"],
+            "trust_roots": readiness["trust_roots"],
+            "tsa": readiness["tsa"],
+        },
+        status=200 if readiness["ready"] else 503,
+    )
@@ -0,0 +1,154 @@
+"""
+Serveur Mila local (login + tarification MRH) pour les tests.
+
+Compte les logins et les connexions TCP ouvertes : permet de vérifier que
+les workers partagent le token et que la session réutilise ses connexions.
+
+Usage:
+    with MilaStubServer() as stub:
+        with override_settings(MILA_API_URL=stub.url, ...):
+            MilaMRHClient().get_quotation(...)
+        assert stub.login_count == 1
+"""
+
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from partenaires.services.mila.auth import MilaAuthClient
+from partenaires.services.mila.client import MilaMRHClient
+
+DEFAULT_FORMULAS = [
+    {
+        "product_label": "MRH Locataire",
+        "product_composition_label": label,
+        "pricing_annual_amount": amount,
+    }
+    for label, amount in (
+        ("Formule Essentielle", 89.0),
+        ("Formule Confort", 119.0),
+        ("Formule Sérénité", 159.0),
+    )
+]
+
+
+class _MilaStubHandler(BaseHTTPRequestHandler):
+    # Keep-alive : une connexion sert plusieurs requêtes
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.stub.lock:
+            self.server.stub.connection_count += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path == MilaAuthClient.AUTH_ENDPOINT:
+            self._send_json(*stub.login(payload))
+        elif self.path == MilaMRHClient.QUOTATION_ENDPOINT:
+            self._send_json(*stub.quote(self.headers.get("Authorization", "")))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+
+class MilaStubServer:
+    """
+    API Mila simulée dans un thread, sur un port libre de 127.0.0.1.
+
+    Args:
+        username / password: Identifiants acceptés par le login
+        token_lifetime: jwt_token_expiration_delay_seconds retourné
+        login_delay: Latence (s) du login, pour rendre visibles les stampedes
+        formulas: Réponse de compute-pricing
+    """
+
+    def __init__(
+        self,
+        username="stub-user",
+        password="stub-password",
+        token_lifetime=3600,
+        login_delay=0.0,
+        formulas=None,
+    ):
+        self.username = username
+        self.password = password
+        self.token_lifetime = token_lifetime
+        self.login_delay = login_delay
+        self.formulas = DEFAULT_FORMULAS if formulas is None else formulas
+
+        self.lock = threading.Lock()
+        self.login_count = 0
+        self.quotation_count = 0
+        self.connection_count = 0
+        self.valid_tokens = set()
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _MilaStubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def login(self, payload):
+        time.sleep(self.login_delay)
+        if (payload.get("username"), payload.get("password")) != (
+            self.username,
+            self.password,
+        ):
+            return 401, {"error": "invalid credentials"}
+
+        token = secrets.token_hex(16)
+        with self.lock:
+            self.login_count += 1
+            self.valid_tokens.add(token)
+        return 200, {
+            "jwt_token": token,
+            "jwt_token_expiration_delay_seconds": self.token_lifetime,
+        }
+
+    def quote(self, authorization):
+        token = authorization.removeprefix("Bearer ")
+        with self.lock:
+            if token not in self.valid_tokens:
+                return 401, {"error": "invalid token"}
+            self.quotation_count += 1
+        return 200, self.formulas
+
+    def revoke_tokens(self):
+        """Invalide tous les tokens émis (rotation côté Mila)."""
+        with self.lock:
+            self.valid_tokens.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
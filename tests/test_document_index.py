@@ -0,0 +1,71 @@
+"""
+Tests de l'index des documents de location (location/services/document_index.py) :
+nombre de requêtes constant et cache invalidé par les modifications.
+
+Usage:
+    pytest tests/test_document_index.py -v
+"""
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from location.factories import BailFactory, LocataireFactory, LocationFactory
+from location.services.document_index import (
+    LocationDocumentIndex,
+    get_location_documents_list,
+)
+from signature.document_status import DocumentStatus
+
+pytestmark = pytest.mark.usefixtures("locmem_cache")
+
+
+def _count_index_queries(location, request):
+    with CaptureQueriesContext(connection) as queries:
+        documents = LocationDocumentIndex([location.id]).list_documents(
+            location.id, request, is_locataire=False
+        )
+    return len(queries), documents
+
+
+@pytest.mark.django_db
+class TestLocationDocumentIndex:
+    def test_query_count_does_not_grow_with_baux(self):
+        request = RequestFactory().get("/")
+        location = LocationFactory(locataires=[LocataireFactory()])
+        BailFactory(location=location, status=DocumentStatus.SIGNED)
+
+        small_count, small = _count_index_queries(location, request)
+
+        for _ in range(4):
+            BailFactory(location=location, status=DocumentStatus.SIGNED)
+        large_count, large = _count_index_queries(location, request)
+
+        assert len([d for d in large if d["type"] == "bail"]) == 5
+        assert len(large) > len(small)
+        assert large_count == small_count
+
+    def test_listing_is_cached_until_location_changes(self):
+        request = RequestFactory().get("/")
+        location = LocationFactory(locataires=[LocataireFactory()])
+        BailFactory(location=location)
+
+        first = get_location_documents_list(location, request, is_locataire=False)
+        with CaptureQueriesContext(connection) as queries:
+            cached = get_location_documents_list(location, request, is_locataire=False)
+        assert cached == first
+        # Seule la requête de version est exécutée
+        assert len(queries) == 1
+
+        BailFactory(location=location)
+        refreshed = get_location_documents_list(location, request, is_locataire=False)
+        assert len([d for d in refreshed if d["type"] == "bail"]) == 2
+
+    def test_drafts_are_hidden_from_locataires(self):
+        request = RequestFactory().get("/")
+        location = LocationFactory(locataires=[LocataireFactory()])
+        BailFactory(location=location, status=DocumentStatus.DRAFT)
+
+        assert get_location_documents_list(location, request, is_locataire=True) == []
+        assert get_location_documents_list(location, request, is_locataire=False)
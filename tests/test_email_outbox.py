@@ -0,0 +1,171 @@
+"""
+Tests de l'outbox email (mise en file transactionnelle, envoi par lots,
+retry) et du cache des squelettes MJML.
+
+Usage:
+    pytest tests/test_email_outbox.py -v
+"""
+
+import email
+import os
+import re
+import smtplib
+
+import mrml
+import pytest
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.template.loader import render_to_string
+
+from core.email_service import EmailService
+from core import mjml_cache
+from core.mjml_cache import get_mjml_skeleton
+from email_outbox.broker import claim_batch
+from email_outbox.models import OutboxEmail, OutboxEmailStatus
+from email_outbox.worker import deliver_batch, run_worker
+
+CONTEXT = {
+    "prenom": "Camille <b>",
+    "document_type": "bail",
+    "adresse": "12 rue des Lilas",
+    "role": "locataire",
+    "otp": "123456",
+    "signature_url": "https://hestia.software/signature/abc?a=1&b=2",
+    "frontend_url": "https://hestia.software",
+    "logo_url": "https://hestia.software/logo.png",
+    "current_year": "2025",
+}
+
+
+class RecordingBackend(BaseEmailBackend):
+    """Backend qui compte les ouvertures de connexion et simule des refus."""
+
+    def __init__(self, failures=None, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures or {}
+        self.is_open = False
+        self.opens = 0
+        self.sent = []
+
+    def open(self):
+        if self.is_open:
+            return False
+        self.is_open = True
+        self.opens += 1
+        return True
+
+    def close(self):
+        self.is_open = False
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            error = self.failures.get(message.to[0])
+            if error:
+                raise error
+            self.sent.append(message)
+        return len(email_messages)
+
+
+def _normalize(html):
+    return re.sub(r"\s*(<[^>]*>)\s*", r"\1", re.sub(r"\s+", " ", html)).strip()
+
+
+class TestMjmlSkeleton:
+    @pytest.mark.parametrize(
+        "template_path",
+        [
+            "emails/common/otp_signature.mjml",
+            "emails/common/post_signature.mjml",
+            "emails/bailleur/bail/demande_signature.mjml",
+        ],
+    )
+    def test_skeleton_matches_render_then_compile(self, template_path):
+        skeleton = get_mjml_skeleton(template_path)
+
+        assert skeleton is not None
+        assert skeleton is get_mjml_skeleton(template_path)
+        expected = mrml.to_html(render_to_string(template_path, CONTEXT)).content
+        assert _normalize(skeleton.render(CONTEXT)) == _normalize(expected)
+
+
+    def test_skeleton_is_recompiled_when_the_file_changes(self, tmp_path, monkeypatch):
+        template = tmp_path / "edited.mjml"
+        template.write_text("<mjml><mj-body><mj-text>v1 {{ prenom }}</mj-text></mj-body></mjml>")
+        monkeypatch.setattr(mjml_cache, "_template_file", lambda path: str(template))
+
+        first = get_mjml_skeleton("tests/edited.mjml")
+        assert get_mjml_skeleton("tests/edited.mjml") is first
+
+        template.write_text("<mjml><mj-body><mj-text>v2 {{ prenom }}</mj-text></mj-body></mjml>")
+        os.utime(template, ns=(0, os.stat(template).st_mtime_ns + 10**9))
+
+        assert "v2 Camille" in get_mjml_skeleton("tests/edited.mjml").render(CONTEXT)
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+    def _send(self, to="locataire@example.com"):
+        return EmailService.send(
+            to=to,
+            subject="Code de signature",
+            template="common/otp_signature",
+            context=dict(CONTEXT),
+        )
+
+    def test_send_is_enqueued_with_the_transaction(self, settings):
+        settings.EMAIL_OUTBOX_ENABLED = True
+
+        with transaction.atomic():
+            assert self._send() is True
+            transaction.set_rollback(True)
+        assert OutboxEmail.objects.count() == 0
+
+        self._send()
+        queued = OutboxEmail.objects.get()
+        assert queued.status == OutboxEmailStatus.PENDING
+        assert queued.to == ["locataire@example.com"]
+        assert "123456" in queued.html_body
+
+    def test_batch_shares_one_connection_and_isolates_failures(self, settings):
+        settings.EMAIL_OUTBOX_ENABLED = True
+        for to in ["a@example.com", "refused@example.com", "later@example.com", "b@example.com"]:
+            self._send(to)
+        connection = RecordingBackend(
+            failures={
+                "refused@example.com": smtplib.SMTPRecipientsRefused(
+                    {"refused@example.com": (550, b"No such user")}
+                ),
+                "later@example.com": smtplib.SMTPDataError(451, b"Try again later"),
+            }
+        )
+
+        assert deliver_batch(claim_batch("w1", size=10), connection) == 2
+
+        assert connection.opens == 1
+        statuses = {queued.to[0]: queued.status for queued in OutboxEmail.objects.all()}
+        assert statuses == {
+            "a@example.com": OutboxEmailStatus.SENT,
+            "b@example.com": OutboxEmailStatus.SENT,
+            "refused@example.com": OutboxEmailStatus.FAILED,
+            "later@example.com": OutboxEmailStatus.PENDING,
+        }
+        # Erreur 4xx replanifiée avec backoff : pas re-réservée immédiatement
+        assert claim_batch("w1") == []
+
+    def test_file_backend_writes_one_eml_per_email(self, settings, tmp_path):
+        settings.EMAIL_OUTBOX_ENABLED = True
+        settings.EMAIL_BACKEND = "email_outbox.backends.EmlFileBackend"
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+        self._send("a@example.com")
+        self._send("b@example.com")
+
+        sent = run_worker("w1", should_stop=lambda: False, exit_when_empty=True)
+
+        assert sent == 2
+        messages = [
+            email.message_from_bytes(path.read_bytes()) for path in tmp_path.glob("*.eml")
+        ]
+        assert sorted(message["To"] for message in messages) == [
+            "a@example.com",
+            "b@example.com",
+        ]
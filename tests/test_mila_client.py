@@ -0,0 +1,70 @@
+"""
+Tests du client Mila contre le serveur local (tests/mila_stub_server.py) :
+token partagé entre workers et connexions keep-alive réutilisées.
+
+Usage:
+    pytest tests/test_mila_client.py -v
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.test import override_settings
+
+from partenaires.services.mila.auth import MilaAuthClient
+from partenaires.services.mila.client import MilaMRHClient
+from partenaires.services.mila.http import reset_mila_session
+from partenaires.services.mila.types import RealEstateLotType
+from tests.mila_stub_server import MilaStubServer
+
+
+@pytest.fixture
+def stub(locmem_cache):
+    with MilaStubServer(login_delay=0.2) as server:
+        with override_settings(
+            MILA_API_URL=server.url,
+            MILA_API_USERNAME=server.username,
+            MILA_API_PASSWORD=server.password,
+        ):
+            reset_mila_session()
+            yield server
+            reset_mila_session()
+
+
+def _quote(client):
+    return client.get_quotation(
+        address_line1="12 rue de la Paix",
+        postal_code="75002",
+        city="Paris",
+        lot_type=RealEstateLotType.APARTMENT,
+        surface=45,
+        main_rooms=2,
+        floor=3,
+    )
+
+
+class TestMilaClient:
+    def test_workers_share_a_single_login(self, stub):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            tokens = list(pool.map(lambda _: MilaAuthClient().get_token(), range(8)))
+
+        assert len(set(tokens)) == 1
+        assert stub.login_count == 1
+
+    def test_quotations_reuse_the_pooled_connection(self, stub):
+        for _ in range(5):
+            result = _quote(MilaMRHClient())
+            assert result.has_results
+
+        assert stub.quotation_count == 5
+        assert stub.login_count == 1
+        assert stub.connection_count == 1
+
+    def test_revoked_token_is_refreshed_once(self, stub):
+        _quote(MilaMRHClient())
+        stub.revoke_tokens()
+
+        result = _quote(MilaMRHClient())
+
+        assert result.has_results
+        assert stub.login_count == 2
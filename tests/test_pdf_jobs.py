@@ -0,0 +1,165 @@
+"""
+Tests du broker de jobs PDF (file en base, dédoublonnage, retry).
+
+Usage:
+    pytest tests/test_pdf_jobs.py -v
+"""
+
+import uuid
+from datetime import timedelta
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+from django.utils import timezone
+
+from pdf_jobs import worker
+from pdf_jobs.broker import (
+    claim_next_job,
+    enqueue_pdf_job,
+    requeue_stale_jobs,
+    retry_failed_jobs,
+)
+from pdf_jobs.models import PdfJob, PdfJobStatus
+from signature.document_types import SignableDocumentType
+
+BASE_URL = "http://testserver/api/bail/generate-bail/"
+
+
+@pytest.fixture
+def pipeline_calls(monkeypatch):
+    """Remplace le pipeline bail par un faux pipeline piloté par le test."""
+    calls = {"count": 0, "errors": []}
+
+    def fake_pipeline(document_id, base_url, user):
+        calls["count"] += 1
+        if calls["errors"]:
+            raise calls["errors"].pop(0)
+        return {"bailId": str(document_id), "pdfUrl": "https://cdn/bail.pdf"}
+
+    monkeypatch.setitem(
+        worker.PDF_JOB_PIPELINES, SignableDocumentType.BAIL.value, fake_pipeline
+    )
+    return calls
+
+
+@pytest.mark.django_db
+class TestPdfJobBroker:
+    def test_enqueue_is_deduplicated_per_document(self, user):
+        document_id = uuid.uuid4()
+
+        job, created = enqueue_pdf_job("bail", document_id, BASE_URL, user)
+        again, created_again = enqueue_pdf_job("bail", document_id, BASE_URL, user)
+
+        assert created is True
+        assert created_again is False
+        assert again.id == job.id
+        assert PdfJob.objects.count() == 1
+
+    def test_finished_job_allows_new_enqueue(self, user, pipeline_calls):
+        document_id = uuid.uuid4()
+        enqueue_pdf_job("bail", document_id, BASE_URL, user)
+        worker.process_job(claim_next_job("w1"))
+
+        _, created = enqueue_pdf_job("bail", document_id, BASE_URL, user)
+
+        assert created is True
+
+    def test_success_stores_result(self, user, pipeline_calls):
+        job, _ = enqueue_pdf_job("bail", uuid.uuid4(), BASE_URL, user)
+
+        assert worker.process_job(claim_next_job("w1")) is True
+
+        job.refresh_from_db()
+        assert job.status == PdfJobStatus.SUCCEEDED
+        assert job.result["pdfUrl"] == "https://cdn/bail.pdf"
+        assert job.attempts == 1
+
+    def test_transient_storage_error_is_retried_with_backoff(
+        self, user, pipeline_calls
+    ):
+        pipeline_calls["errors"].append(
+            EndpointConnectionError(endpoint_url="https://r2.example.com")
+        )
+        job, _ = enqueue_pdf_job("bail", uuid.uuid4(), BASE_URL, user)
+
+        assert worker.process_job(claim_next_job("w1")) is False
+
+        job.refresh_from_db()
+        assert job.status == PdfJobStatus.PENDING
+        assert job.available_at > timezone.now()
+        # Pas encore disponible (backoff)
+        assert claim_next_job("w1") is None
+
+        PdfJob.objects.filter(id=job.id).update(available_at=timezone.now())
+        assert worker.process_job(claim_next_job("w1")) is True
+        job.refresh_from_db()
+        assert job.status == PdfJobStatus.SUCCEEDED
+        assert job.attempts == 2
+
+    def test_s3_throttling_is_transient(self, user, pipeline_calls):
+        pipeline_calls["errors"].append(
+            ClientError(
+                {
+                    "Error": {"Code": "SlowDown"},
+                    "ResponseMetadata": {"HTTPStatusCode": 503},
+                },
+                "PutObject",
+            )
+        )
+        job, _ = enqueue_pdf_job("bail", uuid.uuid4(), BASE_URL, user)
+        worker.process_job(claim_next_job("w1"))
+
+        job.refresh_from_db()
+        assert job.status == PdfJobStatus.PENDING
+
+    def test_non_transient_error_fails_immediately(self, user, pipeline_calls):
+        pipeline_calls["errors"].append(ValueError("Template invalide"))
+        job, _ = enqueue_pdf_job("bail", uuid.uuid4(), BASE_URL, user)
+
+        worker.process_job(claim_next_job("w1"))
+
+        job.refresh_from_db()
+        assert job.status == PdfJobStatus.FAILED
+        assert "Template invalide" in job.error
+
+    def test_stale_running_job_is_requeued(self, user):
+        job, _ = enqueue_pdf_job("bail", uuid.uuid4(), BASE_URL, user)
+        claim_next_job("w1")
+        PdfJob.objects.filter(id=job.id).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+
+        assert requeue_stale_jobs(timeout=60) == 1
+
+        job.refresh_from_db()
+        assert job.status == PdfJobStatus.PENDING
+        assert job.locked_by == ""
+
+    def test_retry_skips_jobs_whose_document_has_an_active_job(self, user):
+        document_id = uuid.uuid4()
+        failed, _ = enqueue_pdf_job("bail", document_id, BASE_URL, user)
+        PdfJob.objects.filter(id=failed.id).update(status=PdfJobStatus.FAILED)
+        active, _ = enqueue_pdf_job("bail", document_id, BASE_URL, user)
+        other, _ = enqueue_pdf_job("bail", uuid.uuid4(), BASE_URL, user)
+        PdfJob.objects.filter(id=other.id).update(status=PdfJobStatus.FAILED)
+
+        requeued, conflicts = retry_failed_jobs(PdfJob.objects.all())
+
+        assert requeued == 1
+        assert conflicts == [failed]
+        failed.refresh_from_db()
+        other.refresh_from_db()
+        assert failed.status == PdfJobStatus.FAILED
+        assert other.status == PdfJobStatus.PENDING
+
+
+@pytest.mark.django_db
+def test_job_status_is_private(authenticated_client, django_user_model):
+    other = django_user_model.objects.create_user(
+        username="other", email="other@example.com", password="x"
+    )
+    job, _ = enqueue_pdf_job("bail", uuid.uuid4(), BASE_URL, other)
+
+    response = authenticated_client.get(f"/api/pdf_jobs/{job.id}/")
+
+    assert response.status_code == 404
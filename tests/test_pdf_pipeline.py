@@ -0,0 +1,115 @@
+"""
+Tests du pipeline PDF en mémoire (algo.signature.main, signature.certification_flow).
+
+Usage:
+    pytest tests/test_pdf_pipeline.py -v
+"""
+
+import io
+import uuid
+from types import SimpleNamespace
+
+import fitz
+from PIL import Image
+from pyhanko.pdf_utils.reader import PdfFileReader
+from pyhanko.sign.fields import enumerate_sig_fields
+
+from algo.signature.main import (
+    add_signature_fields_to_buffer,
+    find_signature_markers,
+    get_signature_field_coordinates,
+)
+from signature import certification_flow
+from signature.certification_flow import (
+    calculate_pdf_hash,
+    certificate_from_cms,
+    extract_certificate_from_pdf,
+    sign_user_pdf_buffer,
+)
+
+
+def _pdf_bytes(text):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 200), text, fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _signature_png():
+    output = io.BytesIO()
+    Image.new("RGBA", (200, 100), (0, 0, 0, 255)).save(output, format="PNG")
+    return output.getvalue()
+
+
+class TestPdfPipeline:
+    def test_signature_fields_added_in_memory(self):
+        locataire = SimpleNamespace(id=uuid.uuid4(), full_name="Marie Curie")
+        pdf_bytes = _pdf_bytes(f"ID_SIGNATURE_LOC_{locataire.id}")
+
+        markers = find_signature_markers(io.BytesIO(pdf_bytes))
+        page, rect, field_name = get_signature_field_coordinates(
+            markers, locataire, "locataire"
+        )
+        buffer = add_signature_fields_to_buffer(
+            pdf_bytes, [{"field_name": field_name, "rect": rect, "page": page}]
+        )
+
+        # Révision incrémentale : le PDF d'origine reste intact en tête
+        assert buffer.tell() == 0
+        assert buffer.getvalue().startswith(pdf_bytes)
+        names = [name for name, *_ in enumerate_sig_fields(PdfFileReader(buffer))]
+        assert names == [field_name]
+
+    def test_hash_is_identical_for_path_and_buffer(self, tmp_path):
+        pdf_bytes = _pdf_bytes("Bail")
+        path = tmp_path / "bail.pdf"
+        path.write_bytes(pdf_bytes)
+
+        assert calculate_pdf_hash(str(path)) == calculate_pdf_hash(io.BytesIO(pdf_bytes))
+        assert calculate_pdf_hash(pdf_bytes) == calculate_pdf_hash(str(path))
+
+    def test_signature_metadata_captured_without_rereading_pdf(self, monkeypatch):
+        user = SimpleNamespace(
+            id=uuid.uuid4(),
+            full_name="Marie Curie",
+            firstName="Marie",
+            lastName="Curie",
+            email="marie@example.com",
+        )
+        pdf_bytes = _pdf_bytes(f"ID_SIGNATURE_LOC_{user.id}")
+        page, rect, field_name = get_signature_field_coordinates(
+            find_signature_markers(pdf_bytes), user, "locataire"
+        )
+        source = add_signature_fields_to_buffer(
+            pdf_bytes, [{"field_name": field_name, "rect": rect, "page": page}]
+        )
+
+        saved = {}
+        monkeypatch.setattr(
+            certification_flow, "save_signature_metadata", lambda **kw: saved.update(kw)
+        )
+
+        def reparse(*args):
+            raise AssertionError("Le PDF signé ne doit pas être relu")
+
+        monkeypatch.setattr(certification_flow, "load_signature_cms", reparse)
+
+        signed = sign_user_pdf_buffer(
+            source,
+            user,
+            field_name,
+            _signature_png(),
+            document=object(),
+            signature_request=object(),
+            pdf_hash_before="0" * 64,
+        )
+
+        # Le CMS capturé est bien celui embarqué dans le PDF
+        monkeypatch.undo()
+        assert certificate_from_cms(saved["signature_cms"]) == (
+            extract_certificate_from_pdf(signed, field_name)
+        )
+        assert saved["pdf_hash_before"] == "0" * 64
+        assert saved["pdf_hash_after"] == calculate_pdf_hash(signed)
+        assert saved["pdf_path"] is signed
@@ -0,0 +1,89 @@
+"""
+Tests du url_fetcher du rendu PDF partagé (backend.pdf_rendering).
+
+Usage:
+    pytest tests/test_pdf_rendering.py -v
+"""
+
+from backend.pdf_rendering import PdfResourceFetcher, ResourceCache
+from backend.pdf_utils import get_logo_pdf_base64_data_uri
+
+FONTS_CSS_URL = "https://fonts.googleapis.com/css2?family=Playfair+Display:ital@1"
+
+
+class CountingFetcher:
+    def __init__(self):
+        self.urls = []
+
+    def __call__(self, url, timeout=10, ssl_context=None):
+        self.urls.append(url)
+        return {"string": b"@font-face {}", "mime_type": "text/css"}
+
+
+class TestPdfResourceFetcher:
+    def test_font_stylesheet_fetched_once_per_process(self):
+        cache = ResourceCache(max_entries=8)
+        fallback = CountingFetcher()
+
+        for _ in range(3):
+            fetcher = PdfResourceFetcher("https://api.hestia.software/bail/", cache, fallback)
+            assert fetcher(FONTS_CSS_URL)["string"] == b"@font-face {}"
+
+        assert fallback.urls == [FONTS_CSS_URL]
+
+    def test_uncached_urls_go_to_document_fetcher(self):
+        fallback = CountingFetcher()
+        fetcher = PdfResourceFetcher(None, ResourceCache(max_entries=8), fallback)
+
+        fetcher("edl-photo://42")
+        fetcher("edl-photo://42")
+
+        assert fallback.urls == ["edl-photo://42", "edl-photo://42"]
+
+    def test_static_assets_read_from_disk_without_loopback(self):
+        fallback = CountingFetcher()
+        fetcher = PdfResourceFetcher(
+            "https://api.hestia.software/api/bail/generate/", ResourceCache(8), fallback
+        )
+
+        response = fetcher("https://api.hestia.software/static/images/logo.svg")
+
+        assert response["string"].startswith(b"<?xml")
+        assert fallback.urls == []
+
+    def test_same_origin_urls_without_local_file_use_fallback(self):
+        fallback = CountingFetcher()
+        fetcher = PdfResourceFetcher(
+            "https://api.hestia.software/api/bail/generate/", ResourceCache(8), fallback
+        )
+        urls = [
+            "https://api.hestia.software/api/bail/",
+            "https://api.hestia.software/static/images/missing.svg",
+            "https://api.hestia.software/static/../backend/settings.py",
+        ]
+
+        for url in urls:
+            # Jamais lue sur disque hors STATIC_ROOT
+            assert fetcher(url)["string"] == b"@font-face {}"
+
+        assert fallback.urls == urls
+
+    def test_media_files_read_from_media_root(self, settings, tmp_path):
+        settings.MEDIA_URL = "/media/"
+        settings.MEDIA_ROOT = str(tmp_path)
+        (tmp_path / "bails").mkdir()
+        (tmp_path / "bails" / "plan.png").write_bytes(b"PNG")
+        fallback = CountingFetcher()
+        fetcher = PdfResourceFetcher(
+            "https://api.hestia.software/api/bail/generate/", ResourceCache(8), fallback
+        )
+
+        response = fetcher("https://api.hestia.software/media/bails/plan.png")
+
+        assert response == {"string": b"PNG", "filename": "plan.png"}
+        assert fallback.urls == []
+        fetcher("https://api.hestia.software/media/../secret.txt")
+        assert fallback.urls == ["https://api.hestia.software/media/../secret.txt"]
+
+    def test_logo_data_uri_memoised(self):
+        assert get_logo_pdf_base64_data_uri() is get_logo_pdf_base64_data_uri()
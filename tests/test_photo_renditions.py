@@ -0,0 +1,96 @@
+"""
+Tests des renditions de photos d'état des lieux (etat_lieux.photo_renditions).
+
+Usage:
+    pytest tests/test_photo_renditions.py -v
+"""
+
+import io
+import uuid
+
+from PIL import Image
+
+from etat_lieux.photo_derivation import derive_photo_files
+from etat_lieux.photo_renditions import load_photo_renditions, make_rendition
+
+
+def _jpeg(width, height):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), "white").save(output, format="JPEG")
+    return output.getvalue()
+
+
+class FakeStorage:
+    def __init__(self, files):
+        self.files = files
+        self.opened = []
+
+    def open(self, name, mode="rb"):
+        self.opened.append(name)
+        return io.BytesIO(self.files[name])
+
+
+class FakeImage:
+    def __init__(self, name, storage):
+        self.name = name
+        self.storage = storage
+
+    def __bool__(self):
+        return bool(self.name)
+
+
+class FakePhoto:
+    def __init__(self, name, storage):
+        self.pk = uuid.uuid4()
+        self.image = FakeImage(name, storage)
+
+
+class TestPhotoRenditions:
+    def test_rendition_is_downscaled_to_print_size(self, settings):
+        settings.EDL_PHOTO_RENDITION_MAX_PX = 640
+
+        data = make_rendition(_jpeg(4000, 3000))
+
+        with Image.open(io.BytesIO(data)) as image:
+            assert image.size == (640, 480)
+            assert image.format == "JPEG"
+
+    def test_upload_derivation_applies_exif_orientation(self, settings):
+        settings.EDL_PHOTO_RENDITION_MAX_PX = 640
+        settings.EDL_PHOTO_PREVIEW_MAX_PX = 320
+        # Photo paysage prise téléphone tourné (orientation EXIF 6 = 90°)
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        output = io.BytesIO()
+        Image.new("RGB", (4000, 3000), "white").save(output, format="JPEG", exif=exif)
+
+        derived = derive_photo_files(output.getvalue())
+
+        assert (derived["width"], derived["height"]) == (3000, 4000)
+        with Image.open(io.BytesIO(derived["print"])) as image:
+            assert image.size == (480, 640)
+        with Image.open(io.BytesIO(derived["preview"])) as image:
+            assert image.format == "WEBP" and image.size == (240, 320)
+
+    def test_renditions_are_cached_per_photo(self, locmem_cache):
+        storage = FakeStorage({"a.jpg": _jpeg(1200, 900), "b.png": _jpeg(800, 600)})
+        photos = [FakePhoto("a.jpg", storage), FakePhoto("b.png", storage)]
+
+        first = load_photo_renditions(photos)
+        second = load_photo_renditions(photos)
+
+        assert len(first) == len(second) == 2
+        # Deuxième génération servie entièrement depuis le cache
+        assert sorted(storage.opened) == ["a.jpg", "b.png"]
+
+    def test_url_fetcher_serves_renditions(self, locmem_cache):
+        storage = FakeStorage({"a.jpg": _jpeg(1200, 900)})
+        photo = FakePhoto("a.jpg", storage)
+        broken = FakePhoto("missing.jpg", storage)
+
+        renditions = load_photo_renditions([photo, broken])
+
+        assert renditions.url(broken) is None
+        fetched = renditions.url_fetcher(renditions.url(photo))
+        assert fetched["mime_type"] == "image/jpeg"
+        assert fetched["string"].startswith(b"\xff\xd8")
@@ -0,0 +1,116 @@
+"""
+Tests de l'import des prix par lots (rent_control.price_import).
+
+Usage:
+    pytest tests/test_price_import.py -v
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.core.management import call_command
+
+from rent_control.choices import Region
+from rent_control.management.commands.constants import DEFAULT_YEAR
+from rent_control.models import RentControlArea, RentPrice
+from rent_control.price_import import diff_prices, normalize_frame, split_unmatched
+
+
+def _row(zone_id="1", room_count="2", furnished=False, reference_price=20.0):
+    return {
+        "zone_id": zone_id,
+        "property_type": None,
+        "room_count": room_count,
+        "construction_period": "avant 1946",
+        "furnished": furnished,
+        "reference_price": reference_price,
+        "min_price": 14.0,
+        "max_price": 24.0,
+    }
+
+
+class TestPriceImport:
+    def test_frame_is_normalized_for_the_database(self):
+        frame = normalize_frame([_row(zone_id=3, room_count=4, reference_price="20,456")])
+
+        row = frame.to_dict("records")[0]
+        assert row["zone_id"] == "3"
+        assert row["room_count"] == "4"
+        assert row["property_type"] is None
+        assert row["reference_price"] == Decimal("20.46")
+
+    def test_unknown_zones_are_set_aside(self):
+        frame = normalize_frame([_row("1"), _row("9")])
+
+        matched, unmatched = split_unmatched(frame, {"1": [10, 11]})
+
+        assert matched["zone_id"].tolist() == ["1"]
+        assert unmatched["zone_id"].tolist() == ["9"]
+
+    def test_diff_against_loaded_prices(self):
+        loaded = normalize_frame(
+            [_row("1"), _row("1", furnished=True), _row("2", reference_price=18.0)]
+        )
+        parsed = normalize_frame(
+            [_row("1"), _row("2", reference_price=19.0), _row("3")]
+        )
+
+        diff = diff_prices(parsed, loaded)
+
+        assert diff["added"]["zone_id"].tolist() == ["3"]
+        assert diff["removed"]["furnished"].tolist() == [True]
+        changed = diff["changed"].to_dict("records")[0]
+        assert changed["reference_price"] == Decimal("19.00")
+        assert changed["reference_price_actuel"] == Decimal("18.00")
+        assert diff["unchanged"] == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("locmem_cache")
+class TestImportPricesCommand:
+    @pytest.fixture
+    def paris_price(self):
+        area = RentControlArea.objects.create(
+            region=Region.PARIS,
+            zone_id="1",
+            reference_year=DEFAULT_YEAR,
+            geometry=MultiPolygon(Polygon.from_bbox((2.0, 48.0, 3.0, 49.0)), srid=4326),
+        )
+        price = RentPrice.objects.create(
+            reference_year=DEFAULT_YEAR,
+            room_count="1",
+            construction_period="avant 1946",
+            furnished=False,
+            reference_price=Decimal("30.00"),
+            min_price=Decimal("21.00"),
+            max_price=Decimal("36.00"),
+        )
+        price.areas.add(area)
+        return price
+
+    def _import(self, errors, *args):
+        # Une seule combinaison KML lue, l'autre en échec
+        result = {
+            "region": Region.PARIS,
+            "frame": normalize_frame([_row("1")]),
+            "errors": errors,
+            "seconds": 0.1,
+        }
+        with patch(
+            "rent_control.management.commands.import_prices.parse_regions",
+            return_value=[result],
+        ):
+            call_command("import_prices", "--region", Region.PARIS, *args)
+
+    def test_incomplete_source_keeps_current_prices(self, paris_price):
+        self._import(["https://kml.example/1.kml: timeout"])
+
+        assert list(RentPrice.objects.all()) == [paris_price]
+
+    def test_allow_partial_writes_the_rows_read(self, paris_price):
+        self._import(["https://kml.example/1.kml: timeout"], "--allow-partial")
+
+        assert not RentPrice.objects.filter(id=paris_price.id).exists()
+        assert RentPrice.objects.get().room_count == "2"
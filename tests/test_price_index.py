@@ -0,0 +1,164 @@
+"""
+Tests de l'index des prix de référence (rent_control.price_index).
+
+Usage:
+    pytest tests/test_price_index.py -v
+"""
+
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.gis.geos import MultiPolygon, Polygon
+
+from rent_control.choices import Region
+from rent_control.models import RentControlArea, RentPrice
+from rent_control.price_index import (
+    IndexedRentPrice,
+    build_area_entry,
+    find_price,
+    find_price_conflicts,
+    get_area_options,
+)
+from rent_control.signals import bulk_rent_data_import
+from rent_control.utils import get_rent_price_for_bien
+
+def _price(id, property_type="appartement", room_count="2", furnished=False):
+    return {
+        "id": id,
+        "reference_year": 2025,
+        "property_type": property_type,
+        "room_count": room_count,
+        "construction_period": "avant 1946",
+        "furnished": furnished,
+        "reference_price": Decimal("20.00"),
+        "min_price": Decimal("14.00"),
+        "max_price": Decimal("24.00"),
+    }
+
+
+class TestPriceIndexEntry:
+    def test_property_type_is_discriminant_outside_single_grids(self):
+        entry = build_area_entry(
+            Region.BORDEAUX, [_price(1, "appartement"), _price(2, "maison")]
+        )
+
+        price = find_price(entry, False, "2", "avant 1946", "maison")
+
+        assert price["id"] == 2
+        assert entry["options"]["property_types"] == ["appartement", "maison"]
+
+    def test_ambiguous_combination_raises_like_the_orm(self):
+        # À Paris le type de bien est ignoré : deux lignes pour la même clé
+        entry = build_area_entry(
+            Region.PARIS, [_price(1, "appartement"), _price(2, "maison")]
+        )
+
+        with pytest.raises(ValueError, match="Plusieurs prix trouvés"):
+            find_price(entry, False, "2", "avant 1946", "appartement")
+        with pytest.raises(ValueError, match="Aucun prix trouvé"):
+            find_price(entry, True, "2", "avant 1946", "appartement")
+
+    def test_unknown_furnished_state_matches_no_price(self):
+        entry = build_area_entry(Region.PARIS, [_price(1)])
+
+        with pytest.raises(ValueError, match="Aucun prix trouvé"):
+            find_price(entry, None, "2", "avant 1946", "appartement")
+
+    def test_conflicts_are_reported_per_area(self):
+        entries = {
+            7: build_area_entry(Region.PARIS, [_price(1), _price(2, "maison")]),
+            8: build_area_entry(Region.PARIS, [_price(3)]),
+        }
+
+        conflicts = find_price_conflicts(entries)
+
+        assert conflicts == [
+            {
+                "area_id": 7,
+                "region": Region.PARIS,
+                "key": (False, "2", "avant 1946", None),
+                "price_ids": [1, 2],
+            }
+        ]
+
+
+@pytest.fixture
+def area():
+    return RentControlArea.objects.create(
+        region=Region.BORDEAUX,
+        zone_id="1",
+        reference_year=2025,
+        geometry=MultiPolygon(Polygon.from_bbox((0.0, 0.0, 1.0, 1.0)), srid=4326),
+    )
+
+
+def _create_price(area, furnished=False):
+    price = RentPrice.objects.create(
+        **{
+            key: value
+            for key, value in _price(None, furnished=furnished).items()
+            if key != "id"
+        }
+    )
+    price.areas.add(area)
+    return price
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("locmem_cache")
+class TestPriceIndexInvalidation:
+    def test_admin_edits_invalidate_the_area_entry(
+        self, area, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            price = _create_price(area)
+        assert get_area_options(area.id)["furnished_options"] == [False]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            price.furnished = True
+            price.save()
+        assert get_area_options(area.id)["furnished_options"] == [True]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            price.delete()
+        assert get_area_options(area.id)["furnished_options"] == []
+
+    def test_bulk_import_leaves_the_rebuild_to_the_caller(
+        self, area, django_capture_on_commit_callbacks
+    ):
+        assert get_area_options(area.id)["furnished_options"] == []
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            with bulk_rent_data_import():
+                _create_price(area)
+
+        assert callbacks == []
+        assert get_area_options(area.id)["furnished_options"] == []
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("locmem_cache")
+class TestRentPriceForBien:
+    def _bien(self, meuble):
+        return SimpleNamespace(
+            meuble=meuble,
+            nombre_pieces_principales=2,
+            periode_construction="avant 1946",
+            type_bien="appartement",
+        )
+
+    def test_returns_the_indexed_price(self, area):
+        price = _create_price(area)
+
+        rent_price = get_rent_price_for_bien(self._bien(False), area.id)
+
+        assert isinstance(rent_price, IndexedRentPrice)
+        assert rent_price.id == price.id
+        assert rent_price.max_price == Decimal("24.00")
+
+    def test_unknown_furnished_state_raises(self, area):
+        _create_price(area)
+
+        with pytest.raises(ValueError, match="Aucun prix trouvé"):
+            get_rent_price_for_bien(self._bien(None), area.id)
@@ -0,0 +1,80 @@
+"""
+Tests des statistiques de profil (GET /api/auth/profile/stats/) :
+nombre de requêtes constant quelle que soit la taille du portefeuille.
+
+Usage:
+    pytest tests/test_profile_stats.py -v
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from bail.models import BailSignatureRequest
+from location.factories import (
+    BailFactory,
+    BailleurFactory,
+    BienFactory,
+    LocataireFactory,
+    LocationFactory,
+)
+from signature.document_status import DocumentStatus
+
+URL = "/api/auth/profile/stats/"
+
+
+def _add_portfolio(bailleur, locataire, size):
+    """Ajoute `size` biens au bailleur et `size` locations au locataire."""
+    for _ in range(size):
+        bien = BienFactory(bailleurs=[bailleur])
+        BailFactory(location__bien=bien, status=DocumentStatus.SIGNED)
+        BailFactory(location__bien=bien)
+
+        bail = BailFactory(
+            location=LocationFactory(locataires=[locataire]),
+            status=DocumentStatus.SIGNING,
+        )
+        BailSignatureRequest.objects.create(
+            bail=bail, locataire=locataire, order=1, signed=False
+        )
+
+
+def _count_queries(client):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(URL)
+    assert response.status_code == 200
+    return len(queries), response.json()
+
+
+@pytest.mark.django_db
+class TestProfileStats:
+    def test_query_count_does_not_grow_with_portfolio(self, authenticated_client, user):
+        bailleur = BailleurFactory(personne__email=user.email)
+        locataire = LocataireFactory(email=user.email)
+
+        _add_portfolio(bailleur, locataire, size=1)
+        # Premier appel : index des zones d'encadrement construit une fois par process
+        _count_queries(authenticated_client)
+        small_count, small = _count_queries(authenticated_client)
+
+        _add_portfolio(bailleur, locataire, size=5)
+        large_count, large = _count_queries(authenticated_client)
+
+        assert len(small["biens"]) == 1
+        assert len(large["biens"]) == 6
+        assert len(large["locations"]) == 6
+        assert large_count == small_count
+
+    def test_stats_are_computed_per_bien_and_location(self, authenticated_client, user):
+        bailleur = BailleurFactory(personne__email=user.email)
+        locataire = LocataireFactory(email=user.email)
+        _add_portfolio(bailleur, locataire, size=1)
+
+        _, data = _count_queries(authenticated_client)
+
+        bien = data["biens"][0]
+        assert bien["nombre_baux"] == 2
+        assert bien["baux_actifs"] == 1
+        location = data["locations"][0]
+        assert location["status"] == DocumentStatus.SIGNING
+        assert location["signatures_completes"] is False
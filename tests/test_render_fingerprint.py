@@ -0,0 +1,122 @@
+"""
+Tests de la réutilisation des PDF de brouillons inchangés
+(signature.pdf_processing.render_signable_pdf).
+
+Usage:
+    pytest tests/test_render_fingerprint.py -v
+"""
+
+import io
+import uuid
+from types import SimpleNamespace
+
+from signature import certification_flow, pdf_processing
+from signature.document_status import DocumentStatus
+from signature.pdf_processing import compute_render_fingerprint, render_signable_pdf
+
+
+class FakeStorage:
+    def __init__(self):
+        self.files = set()
+
+    def exists(self, name):
+        return name in self.files
+
+    def delete(self, name):
+        self.files.discard(name)
+
+
+class FakeFieldFile:
+    def __init__(self, storage):
+        self.storage = storage
+        self.name = None
+
+    def __bool__(self):
+        return bool(self.name)
+
+
+def _document():
+    storage = FakeStorage()
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        status=DocumentStatus.DRAFT,
+        pdf=FakeFieldFile(storage),
+        pdf_fingerprint="",
+    )
+
+
+class TestRenderFingerprint:
+    def test_fingerprint_covers_html_type_and_resources(self):
+        fingerprint = compute_render_fingerprint("<p>Bail</p>", "bail")
+
+        assert fingerprint == compute_render_fingerprint("<p>Bail</p>", "bail")
+        assert fingerprint != compute_render_fingerprint("<p>Bail </p>", "bail")
+        assert fingerprint != compute_render_fingerprint("<p>Bail</p>", "avenant")
+        assert fingerprint != compute_render_fingerprint("<p>Bail</p>", "bail", ["photos"])
+
+    def test_unchanged_draft_reuses_pdf_and_changed_draft_replaces_it(self, monkeypatch):
+        renders = []
+        monkeypatch.setattr(
+            pdf_processing, "render_pdf", lambda html, **kw: renders.append(html) or b"%PDF"
+        )
+
+        def finalize(pdf_bytes, document, document_type, pdf_filename, fingerprint=""):
+            document.pdf.name = f"signed_documents/{pdf_filename}"
+            document.pdf.storage.files.add(document.pdf.name)
+            document.pdf_fingerprint = fingerprint
+            return b"%PDF-certified", True
+
+        monkeypatch.setattr(pdf_processing, "finalize_generated_pdf", finalize)
+        document = _document()
+        storage = document.pdf.storage
+
+        assert render_signable_pdf(document, "bail", "<p>v1</p>", "a.pdf") == b"%PDF-certified"
+        assert render_signable_pdf(document, "bail", "<p>v1</p>", "b.pdf") is None
+        assert document.pdf.name == "signed_documents/a.pdf"
+
+        render_signable_pdf(document, "bail", "<p>v2</p>", "c.pdf")
+
+        assert renders == ["<p>v1</p>", "<p>v2</p>"]
+        # Le rendu remplacé du brouillon ne reste pas orphelin
+        assert storage.files == {"signed_documents/c.pdf"}
+        assert document.pdf_fingerprint == compute_render_fingerprint("<p>v2</p>", "bail")
+
+    def test_uncertified_pdf_is_regenerated(self, monkeypatch):
+        renders = []
+        monkeypatch.setattr(
+            pdf_processing, "render_pdf", lambda html, **kw: renders.append(html) or b"%PDF"
+        )
+        monkeypatch.setattr(
+            pdf_processing,
+            "add_signature_fields_for_document",
+            lambda pdf_bytes, document: io.BytesIO(pdf_bytes),
+        )
+
+        def save(field_file, filename, source, **kwargs):
+            field_file.name = f"signed_documents/{filename}"
+            field_file.storage.files.add(field_file.name)
+
+        monkeypatch.setattr(pdf_processing, "save_stream_to_storage", save)
+
+        def certify_fails(pdf_buffer, document_type):
+            raise RuntimeError("HSM indisponible")
+
+        monkeypatch.setattr(certification_flow, "certify_pdf_buffer", certify_fails)
+        document = _document()
+
+        assert render_signable_pdf(document, "bail", "<p>v1</p>", "a.pdf") == b"%PDF"
+        assert document.pdf.name == "signed_documents/a.pdf"
+        assert document.pdf_fingerprint == ""
+
+        # La certification fonctionne de nouveau : le brouillon inchangé est
+        # régénéré au lieu de resservir le PDF non certifié
+        monkeypatch.setattr(
+            certification_flow,
+            "certify_pdf_buffer",
+            lambda pdf_buffer, document_type: io.BytesIO(b"%PDF-certified"),
+        )
+
+        assert render_signable_pdf(document, "bail", "<p>v1</p>", "b.pdf") == b"%PDF-certified"
+        assert renders == ["<p>v1</p>", "<p>v1</p>"]
+        assert document.pdf_fingerprint == compute_render_fingerprint("<p>v1</p>", "bail")
+        assert render_signable_pdf(document, "bail", "<p>v1</p>", "c.pdf") is None
@@ -0,0 +1,107 @@
+"""
+Tests de l'index spatial des zones d'encadrement (rent_control.spatial_index).
+
+L'index en mémoire doit donner exactement la même zone que le chemin PostGIS,
+y compris les règles ACCEPTED/WHITELIST de Grenoble et Montpellier.
+
+Usage:
+    pytest tests/test_rent_control_index.py -v
+"""
+
+import pytest
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.core.cache import cache
+
+from algo.encadrement_loyer.grenoble.main import ACCEPTED_ZONE
+from rent_control.choices import Region
+from rent_control.models import RentControlArea
+from rent_control.spatial_index import (
+    INDEX_VERSION_CACHE_KEY,
+    build_rent_control_index,
+    find_rent_control_area_postgis,
+    get_index_version,
+)
+
+YEAR = 2025
+
+
+def _square(x, y, size=1.0):
+    return MultiPolygon(
+        Polygon.from_bbox((x, y, x + size, y + size)), srid=4326
+    )
+
+
+def _area(region, zone_id, geometry):
+    return RentControlArea.objects.create(
+        region=region, zone_id=zone_id, reference_year=YEAR, geometry=geometry
+    )
+
+
+@pytest.fixture
+def areas():
+    return {
+        "paris": _area(Region.PARIS, "1", _square(2.0, 48.0)),
+        # Grenoble : périmètre ACCEPTED + zones 1 (whitelist) et c (hors whitelist)
+        "grenoble_accepted": _area(Region.GRENOBLE, ACCEPTED_ZONE, _square(5.0, 45.0, 2)),
+        "grenoble_1": _area(Region.GRENOBLE, "1", _square(5.0, 45.0)),
+        "grenoble_c": _area(Region.GRENOBLE, "c", _square(6.0, 46.0)),
+        # Zone Grenoble whitelistée mais hors périmètre ACCEPTED
+        "grenoble_outside": _area(Region.GRENOBLE, "2", _square(8.0, 45.0)),
+    }
+
+
+@pytest.mark.django_db
+class TestRentControlAreaIndex:
+    POINTS = [
+        (2.5, 48.5),  # Paris
+        (5.5, 45.5),  # Grenoble zone 1 + ACCEPTED
+        (6.5, 46.5),  # Grenoble zone c + ACCEPTED → pas encadré
+        (8.5, 45.5),  # Grenoble zone 2 sans ACCEPTED → pas encadré
+        (0.0, 0.0),  # Hors zone
+    ]
+
+    def test_same_result_as_postgis(self, areas):
+        index = build_rent_control_index(YEAR)
+
+        expected = [find_rent_control_area_postgis(lng, lat, YEAR) for lng, lat in self.POINTS]
+        assert [a.id if a else None for a in index.lookup_many(self.POINTS)] == [
+            a.id if a else None for a in expected
+        ]
+        assert [a.id if a else None for a in expected] == [
+            areas["paris"].id,
+            areas["grenoble_1"].id,
+            None,
+            None,
+            None,
+        ]
+
+    def test_other_years_are_not_indexed(self, areas):
+        RentControlArea.objects.create(
+            region=Region.PARIS,
+            zone_id="1",
+            reference_year=YEAR - 1,
+            geometry=_square(0.0, 0.0),
+        )
+
+        index = build_rent_control_index(YEAR)
+
+        assert len(index) == len(areas)
+        assert index.lookup(0.5, 0.5) is None
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("locmem_cache")
+class TestRentControlAreaSignals:
+    def test_admin_edits_bump_the_index_version(
+        self, areas, django_capture_on_commit_callbacks
+    ):
+        version = get_index_version()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            areas["paris"].geometry = _square(3.0, 48.0)
+            areas["paris"].save()
+        assert cache.get(INDEX_VERSION_CACHE_KEY) == version + 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            areas["grenoble_c"].delete()
+        assert cache.get(INDEX_VERSION_CACHE_KEY) == version + 2
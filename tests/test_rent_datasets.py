@@ -0,0 +1,38 @@
+"""
+Tests du chargement COPY des versions de données d'encadrement
+(rent_control.datasets).
+
+Usage:
+    pytest tests/test_rent_datasets.py -v
+"""
+
+from decimal import Decimal
+
+from rent_control.datasets import CopyStream
+
+
+class TestCopyStream:
+    def test_rows_are_encoded_in_copy_text_format(self):
+        stream = CopyStream(
+            [
+                (1, "PARIS", None, True, Decimal("25.30")),
+                (2, "tab\there\\", "ligne\nsuivante", False, Decimal("0.00")),
+            ]
+        )
+
+        content = stream.read()
+
+        assert content.decode().splitlines() == [
+            "1\tPARIS\t\\N\tt\t25.30",
+            "2\ttab\\there\\\\\tligne\\nsuivante\tf\t0.00",
+        ]
+        assert stream.count == 2
+        assert stream.read() == b""
+
+    def test_reads_are_bounded_by_the_requested_size(self):
+        stream = CopyStream((index, "x" * 100) for index in range(1000))
+
+        chunks = iter(lambda: stream.read(8192), b"")
+
+        assert all(len(chunk) <= 8192 for chunk in chunks)
+        assert stream.count == 1000
@@ -0,0 +1,71 @@
+"""
+Tests de la localisation des marqueurs de signature (algo.signature.main).
+
+Usage:
+    pytest tests/test_signature_markers.py -v
+"""
+
+import uuid
+from types import SimpleNamespace
+
+import fitz
+import pytest
+
+from algo.signature.main import (
+    find_signature_markers,
+    get_signature_field_coordinates,
+)
+
+
+def _person(name):
+    return SimpleNamespace(id=uuid.uuid4(), full_name=name)
+
+
+def _pdf(tmp_path, pages):
+    doc = fitz.open()
+    for lines in pages:
+        page = doc.new_page()
+        for y, text in lines:
+            page.insert_text((72, y), text, fontsize=8)
+    path = tmp_path / "doc.pdf"
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+class TestSignatureMarkers:
+    def test_all_signers_found_in_one_pass(self, tmp_path):
+        bailleur, locataire = _person("Jean Dupont"), _person("Marie Curie")
+        path = _pdf(
+            tmp_path,
+            [
+                [(100, "Page de garde")],
+                [
+                    (200, f"ID_SIGNATURE_BAILLEUR_{bailleur.id}"),
+                    (500, f"ID_SIGNATURE_LOC_{locataire.id}"),
+                ],
+            ],
+        )
+
+        markers = find_signature_markers(path)
+
+        page, rect, field_name = get_signature_field_coordinates(
+            markers, locataire, "locataire"
+        )
+        assert page == 1
+        assert field_name.endswith("marie-curie")
+        # Repère PDF (origine en bas) : champ sous le marqueur
+        anchor = fitz.open(path)[1].search_for(f"ID_SIGNATURE_LOC_{locataire.id}")[0]
+        assert rect.x0 == pytest.approx(anchor.x0)
+        assert rect.y1 == pytest.approx(842 - anchor.y0)
+
+        page, rect, _ = get_signature_field_coordinates(markers, bailleur, "locataire")
+        assert page is None and rect is None
+
+    def test_duplicate_marker_on_same_page_is_rejected(self, tmp_path):
+        locataire = _person("Marie Curie")
+        marker = f"ID_SIGNATURE_LOC_{locataire.id}"
+        path = _pdf(tmp_path, [[(200, marker), (400, marker)]])
+
+        with pytest.raises(ValueError, match="Plusieurs marqueurs"):
+            find_signature_markers(path)
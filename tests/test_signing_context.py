@@ -0,0 +1,105 @@
+"""
+Tests du registre de contexte de signature (signature.signing_context).
+
+Usage:
+    pytest tests/test_signing_context.py -v
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.serialization import pkcs12
+from cryptography.x509.oid import NameOID
+
+from signature.signing_context import SigningContextRegistry
+
+
+def _self_signed(common_name):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    now = datetime.now(tz=timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=30))
+        .sign(key, hashes.SHA256())
+    )
+    return key, cert
+
+
+@pytest.fixture
+def cert_dir(tmp_path, settings):
+    """hestia_server.pfx/.pem + CA, sans TSA."""
+    key, cert = _self_signed("Hestia Server Test")
+    (tmp_path / "hestia_server.pfx").write_bytes(
+        pkcs12.serialize_key_and_certificates(
+            b"hestia",
+            key,
+            cert,
+            None,
+            serialization.BestAvailableEncryption(b"secret"),
+        )
+    )
+    (tmp_path / "hestia_server.pem").write_bytes(
+        cert.public_bytes(serialization.Encoding.PEM)
+    )
+    _, ca_cert = _self_signed("Hestia CA Test")
+    (tmp_path / "ca.pem").write_bytes(ca_cert.public_bytes(serialization.Encoding.PEM))
+
+    settings.SERVER_CERT_PATH = str(tmp_path / "hestia_server.pfx")
+    settings.PASSWORD_CERT_SERVER = "secret"
+    settings.CA_CERT_PATH = str(tmp_path / "ca.pem")
+    settings.TSA_CERT_PATH = str(tmp_path / "absent_tsa.pem")
+    settings.TSA_KEY_PATH = str(tmp_path / "absent_tsa.key")
+    return tmp_path
+
+
+class TestSigningContextRegistry:
+    def test_loads_once_and_reuses_signer(self, cert_dir):
+        registry = SigningContextRegistry(reload_interval=0)
+
+        first = registry.get()
+        second = registry.get()
+
+        assert second is first
+        assert first.get_certification_signer() is not None
+        assert len(first.trust_roots) == 2
+        # ValidationContext construit par signature (instant de validation à jour)
+        assert first.build_validation_context() is not first.build_validation_context()
+
+    def test_hot_reload_when_certificate_changes(self, cert_dir):
+        registry = SigningContextRegistry(reload_interval=0)
+        first = registry.get()
+
+        _, ca_cert = _self_signed("Hestia CA Renouvelé")
+        ca_path = cert_dir / "ca.pem"
+        ca_path.write_bytes(ca_cert.public_bytes(serialization.Encoding.PEM))
+        stat = os.stat(ca_path)
+        os.utime(ca_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        reloaded = registry.get()
+
+        assert reloaded is not first
+        assert "Hestia CA Renouvelé" in [
+            c.subject.native["common_name"] for c in reloaded.trust_roots
+        ]
+
+    def test_missing_password_is_reported_and_not_ready(self, cert_dir, settings):
+        settings.PASSWORD_CERT_SERVER = None
+        context = SigningContextRegistry(reload_interval=0).get()
+
+        with pytest.raises(ValueError):
+            context.get_certification_signer()
+
+        status = context.status()
+        assert status["ready"] is False
+        assert status["certification_signer"] is False
+        assert status["tsa"] is False
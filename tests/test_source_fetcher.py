@@ -0,0 +1,153 @@
+"""
+Tests du téléchargement des sources de prix (algo/encadrement_loyer/fetch.py)
+et de l'analyse incrémentale des KML DRIHL.
+
+Usage:
+    pytest tests/test_source_fetcher.py -v
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from algo.encadrement_loyer.fetch import SourceFetcher, SourceUnavailable
+from algo.encadrement_loyer.ile_de_france.main import parse_kml
+from algo.encadrement_loyer.pays_basques.combinaison import get_prices_pays_basque
+
+KML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://www.opengis.net/kml/2.2"><Document>
+  <Placemark><ExtendedData>
+    <Data name="idZone"><value>3</value></Data>
+    <Data name="ref"><value>25.3</value></Data>
+  </ExtendedData></Placemark>
+  <Placemark><ExtendedData>
+    <Data name="idZone"><value>7</value></Data>
+    <Data name="ref"><value>31.1</value></Data>
+  </ExtendedData></Placemark>
+  <Placemark><name>sans donnees</name></Placemark>
+</Document></kml>"""
+
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.hits += 1
+        # Les premières requêtes échouent (503), puis le KML est servi
+        if server.hits <= server.failures:
+            self.send_response(503)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(KML)))
+        self.end_headers()
+        self.wfile.write(KML)
+
+
+@pytest.fixture
+def flaky_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FlakyHandler)
+    server.hits = 0
+    server.failures = 2
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server, path="/grille.kml"):
+    host, port = server.server_address
+    return f"http://{host}:{port}{path}"
+
+
+class TestSourceFetcher:
+    def test_retries_then_serves_reruns_from_disk(self, flaky_server, tmp_path):
+        fetcher = SourceFetcher(cache_dir=tmp_path, backoff=0)
+
+        assert fetcher.fetch("GET", _url(flaky_server)) == KML
+        assert flaky_server.hits == 3
+
+        # Relance hors ligne : réponse relue depuis le cache disque
+        offline = SourceFetcher(cache_dir=tmp_path, offline=True)
+        assert offline.fetch("GET", _url(flaky_server)) == KML
+        assert flaky_server.hits == 3
+
+    def test_offline_miss_and_exhausted_retries_raise(self, flaky_server, tmp_path):
+        offline = SourceFetcher(cache_dir=tmp_path, offline=True)
+        with pytest.raises(SourceUnavailable):
+            offline.fetch("GET", _url(flaky_server))
+
+        flaky_server.failures = 10
+        fetcher = SourceFetcher(cache_dir=tmp_path, retries=1, backoff=0)
+        results = fetcher.fetch_many([("GET", _url(flaky_server), None)])
+        assert isinstance(results[0], SourceUnavailable)
+
+    def test_stale_or_refreshed_responses_are_downloaded_again(
+        self, flaky_server, tmp_path
+    ):
+        flaky_server.failures = 0
+        SourceFetcher(cache_dir=tmp_path).fetch("GET", _url(flaky_server))
+        path = next(p for p in tmp_path.rglob("*") if p.is_file())
+        # Réponse vieille de deux heures
+        os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+        SourceFetcher(cache_dir=tmp_path, max_age=86400).fetch("GET", _url(flaky_server))
+        assert flaky_server.hits == 1
+
+        SourceFetcher(cache_dir=tmp_path, max_age=3600).fetch("GET", _url(flaky_server))
+        assert flaky_server.hits == 2
+
+        SourceFetcher(cache_dir=tmp_path, refresh=True).fetch("GET", _url(flaky_server))
+        assert flaky_server.hits == 3
+
+        # Hors ligne : le cache est servi quel que soit son âge
+        os.utime(path, (time.time() - 7200, time.time() - 7200))
+        offline = SourceFetcher(cache_dir=tmp_path, max_age=60, offline=True)
+        assert offline.fetch("GET", _url(flaky_server)) == KML
+        assert flaky_server.hits == 3
+
+    def test_cache_key_includes_the_body(self, tmp_path):
+        fetcher = SourceFetcher(cache_dir=tmp_path)
+
+        assert fetcher._cache_path("POST", "http://x", {"a": 1}) != fetcher._cache_path(
+            "POST", "http://x", {"a": 2}
+        )
+
+
+class TestParseKml:
+    def test_placemarks_are_indexed_by_zone(self):
+        data = parse_kml(KML)
+
+        assert list(data) == ["3", "7"]
+        assert data["7"]["ref"] == "31.1"
+
+
+class _FailingFirstFetcher:
+    """fetch_many dont la première requête échoue."""
+
+    def fetch_many(self, requests):
+        response = json.dumps({"samples": [{"cells": [{"value": 12.5}]}]}).encode()
+        return [SourceUnavailable("503")] + [response] * (len(requests) - 1)
+
+
+class TestPaysBasquePrices:
+    def test_failed_combinations_are_collected(self):
+        errors = []
+
+        results = get_prices_pays_basque(_FailingFirstFetcher(), errors=errors)
+
+        assert len(errors) == 1
+        assert "Requête échouée (503)" in errors[0]
+        assert len(results) == 191
+        assert set(map(tuple, results.values())) == {(12.5,)}
+
+    def test_failed_combination_raises_without_error_list(self):
+        with pytest.raises(SourceUnavailable):
+            get_prices_pays_basque(_FailingFirstFetcher())
@@ -0,0 +1,75 @@
+"""
+Tests du registre compilé des steps (location/serializers/step_registry.py) :
+mêmes résultats que le recalcul à partir de get_step_config().
+
+Usage:
+    pytest tests/test_step_registry.py -v
+"""
+
+import pytest
+
+from location.models import Bien, RentTerms
+from location.serializers.france import (
+    FranceAvenantSerializer,
+    FranceBailSerializer,
+    FranceEtatLieuxSerializer,
+    FranceMRHSerializer,
+    FranceQuittanceSerializer,
+)
+from location.services.form_handlers.form_step_filter import FormStepFilter
+
+SERIALIZERS = [
+    FranceAvenantSerializer,
+    FranceBailSerializer,
+    FranceEtatLieuxSerializer,
+    FranceMRHSerializer,
+    FranceQuittanceSerializer,
+]
+
+
+@pytest.mark.parametrize("serializer_class", SERIALIZERS)
+class TestStepRegistry:
+    def test_registry_matches_the_step_config(self, serializer_class):
+        steps = serializer_class.get_step_config()
+        registry = serializer_class.get_step_registry()
+
+        assert list(registry.steps) == steps
+        for step in steps:
+            assert serializer_class.get_step_config_by_id(step["id"]) is next(
+                s for s in steps if s["id"] == step["id"]
+            )
+        assert serializer_class.get_step_config_by_id("inconnue") is None
+
+        expected_mappings = {}
+        for step in steps:
+            expected_mappings.update(step.get("fields", {}))
+        assert serializer_class.get_all_field_mappings() == expected_mappings
+
+    def test_filtered_steps_are_json_safe(self, serializer_class):
+        registry = serializer_class.get_step_registry()
+
+        steps = FormStepFilter().filter_steps(
+            list(registry.steps), {}, set(), serializer_class
+        )
+
+        assert [step["id"] for step in steps] == [s["id"] for s in registry.steps]
+        for step in steps:
+            assert "fields" not in step
+        # Copie : une modification de la réponse ne touche pas le registre
+        steps[0]["available_choices"] = ["entree"]
+        assert "available_choices" not in registry.payloads[steps[0]["id"]]
+
+
+class TestModelMappings:
+    def test_extract_model_data_reads_the_mapped_paths(self):
+        field_to_path = FranceBailSerializer.get_field_to_step_mapping(Bien)
+        assert field_to_path["superficie"] == "bien.caracteristiques.superficie"
+
+        data = FranceBailSerializer.extract_model_data(
+            Bien,
+            {"bien": {"caracteristiques": {"superficie": 42, "type_bien": None}}},
+        )
+        assert data == {"superficie": 42}
+        assert "superficie" not in FranceBailSerializer.get_field_to_step_mapping(
+            RentTerms
+        )
@@ -0,0 +1,156 @@
+"""
+Tests du moteur TSA natif (tsa.responder).
+
+Génère une clé et un certificat TSA jetables, puis vérifie que les tokens
+sont acceptés par `openssl ts -verify` (byte-level, comme en production).
+
+Usage:
+    pytest tests/test_tsa_responder.py -v
+"""
+
+import hashlib
+import itertools
+import shutil
+import subprocess
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from asn1crypto import tsp
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+
+from tsa.responder import TSA_POLICY_OID, TimeStampResponse, TsaResponder
+
+DATA = b"Contenu du PDF a horodater"
+
+
+class FakeSerialAllocator:
+    def __init__(self):
+        self._counter = itertools.count(255)
+
+    def next_serial(self):
+        return next(self._counter)
+
+
+@pytest.fixture(scope="module")
+def tsa_files(tmp_path_factory):
+    """Clé chiffrée + certificat TSA auto-signé (EKU timeStamping critique)."""
+    tmp_dir = tmp_path_factory.mktemp("tsa")
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Hestia TSA Test")])
+    now = datetime.now(tz=timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=30))
+        .add_extension(
+            x509.ExtendedKeyUsage([ExtendedKeyUsageOID.TIME_STAMPING]), critical=True
+        )
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_path = tmp_dir / "tsa.pem"
+    key_path = tmp_dir / "tsa.key"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.BestAvailableEncryption(b"secret"),
+        )
+    )
+    return cert_path, key_path
+
+
+@pytest.fixture
+def responder(tsa_files):
+    cert_path, key_path = tsa_files
+    return TsaResponder(cert_path, key_path, "secret", FakeSerialAllocator())
+
+
+def build_request(hash_algorithm="sha256", policy=None):
+    req = {
+        "version": "v1",
+        "message_imprint": {
+            "hash_algorithm": {"algorithm": hash_algorithm},
+            "hashed_message": hashlib.new(hash_algorithm, DATA).digest(),
+        },
+        "nonce": 123456789,
+        "cert_req": True,
+    }
+    if policy:
+        req["req_policy"] = policy
+    return tsp.TimeStampReq(req).dump()
+
+
+def test_token_contains_expected_tst_info(responder):
+    response = tsp.TimeStampResp.load(responder.respond(build_request()))
+
+    assert response["status"]["status"].native == "granted"
+    tst_info = response["time_stamp_token"]["content"]["encap_content_info"][
+        "content"
+    ].parsed
+    assert tst_info["policy"].native == TSA_POLICY_OID
+    assert tst_info["nonce"].native == 123456789
+    assert tst_info["serial_number"].native == 255
+    assert tst_info["ordering"].native is True
+    assert tst_info["message_imprint"]["hashed_message"].native == (
+        hashlib.sha256(DATA).digest()
+    )
+
+
+def test_serials_are_unique(responder):
+    serials = {
+        tsp.TimeStampResp.load(responder.respond(build_request()))[
+            "time_stamp_token"
+        ]["content"]["encap_content_info"]["content"].parsed["serial_number"].native
+        for _ in range(5)
+    }
+    assert len(serials) == 5
+
+
+@pytest.mark.parametrize(
+    "request_data, failure",
+    [
+        (b"not a TimeStampReq", "bad_data_format"),
+        (build_request(hash_algorithm="md5"), "bad_alg"),
+        (build_request(policy="1.2.3.4.99"), "unaccepted_policy"),
+    ],
+)
+def test_invalid_requests_are_rejected(responder, request_data, failure):
+    response = TimeStampResponse.load(responder.respond(request_data))
+
+    assert response["status"]["status"].native == "rejection"
+    assert failure in response["status"]["fail_info"].native
+
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="openssl absent")
+def test_openssl_ts_verify_accepts_token(responder, tsa_files, tmp_path):
+    cert_path, _ = tsa_files
+    data_path = tmp_path / "data.bin"
+    req_path = tmp_path / "request.tsq"
+    resp_path = tmp_path / "response.tsr"
+    data_path.write_bytes(DATA)
+    req_path.write_bytes(build_request())
+    resp_path.write_bytes(responder.respond(req_path.read_bytes()))
+
+    result = subprocess.run(
+        [
+            "openssl", "ts", "-verify",
+            "-in", str(resp_path),
+            "-data", str(data_path),
+            "-CAfile", str(cert_path),
+            "-untrusted", str(cert_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "Verification: OK" in result.stdout
@@ -0,0 +1,206 @@
+"""
+Tests du pool de signers utilisateurs (signature.user_signer_pool).
+
+Vérifie que le certificat émis en process garde le subject et les extensions
+de l'ancienne génération openssl (section v3_usr), signé par un CA jetable.
+
+Usage:
+    pytest tests/test_user_signer_pool.py -v
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+
+from signature import user_signer_pool
+from signature.user_signer_pool import (
+    UserKeyPool,
+    UserSignerMetrics,
+    authority_key_identifier,
+    build_user_signer,
+    get_user_signer_metrics,
+    issue_user_certificate,
+)
+
+USER = SimpleNamespace(firstName="Jean", lastName="Dupont", email="jean@example.com")
+
+
+@pytest.fixture(scope="module")
+def ca_files(tmp_path_factory):
+    """CA Hestia jetable avec clé chiffrée (comme en production)."""
+    tmp_dir = tmp_path_factory.mktemp("ca")
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Hestia CA Test")])
+    now = datetime.now(tz=timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=30))
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .add_extension(
+            x509.SubjectKeyIdentifier.from_public_key(key.public_key()), critical=False
+        )
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_path = tmp_dir / "ca.pem"
+    key_path = tmp_dir / "ca.key"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.BestAvailableEncryption(b"secret"),
+        )
+    )
+    return cert, str(cert_path), str(key_path)
+
+
+@pytest.fixture
+def hestia_ca(ca_files, settings, monkeypatch):
+    cert, cert_path, key_path = ca_files
+    settings.CA_CERT_PATH = cert_path
+    settings.CA_KEY_PATH = key_path
+    settings.PASSWORD_CERT_CA = "secret"
+    monkeypatch.setattr(user_signer_pool, "_ca_cache", None)
+    yield cert
+    user_signer_pool._ca_cache = None
+
+
+class TestIssueUserCertificate:
+    def test_subject_and_extensions_match_openssl_profile(self, hestia_ca):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        cert = issue_user_certificate(USER, key, user_signer_pool.get_user_ca())
+
+        assert cert.subject.rfc4514_string() == (
+            "1.2.840.113549.1.9.1=jean@example.com,CN=Jean Dupont,O=Hestia User"
+        )
+        assert cert.issuer == hestia_ca.subject
+        hestia_ca.public_key().verify(
+            cert.signature,
+            cert.tbs_certificate_bytes,
+            padding.PKCS1v15(),
+            cert.signature_hash_algorithm,
+        )
+
+        basic = cert.extensions.get_extension_for_class(x509.BasicConstraints)
+        assert basic.critical and basic.value.ca is False
+
+        key_usage = cert.extensions.get_extension_for_class(x509.KeyUsage)
+        assert key_usage.critical
+        assert key_usage.value.digital_signature
+        assert key_usage.value.content_commitment
+        assert not key_usage.value.key_encipherment
+
+        eku = cert.extensions.get_extension_for_class(x509.ExtendedKeyUsage)
+        assert list(eku.value) == [ExtendedKeyUsageOID.EMAIL_PROTECTION]
+
+        aki = cert.extensions.get_extension_for_class(x509.AuthorityKeyIdentifier)
+        ca_ski = hestia_ca.extensions.get_extension_for_class(x509.SubjectKeyIdentifier)
+        assert aki.value.key_identifier == ca_ski.value.digest
+
+    def test_authority_key_id_reuses_the_ca_subject_key_id(self):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "CA SKI libre")])
+        now = datetime.now(tz=timezone.utc)
+        builder = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - timedelta(days=1))
+            .not_valid_after(now + timedelta(days=30))
+        )
+        # SKI qui n'est pas le SHA-1 de la clé (ex: méthode 2 de la RFC 7093)
+        with_ski = builder.add_extension(
+            x509.SubjectKeyIdentifier(b"\x01" * 8), critical=False
+        ).sign(key, hashes.SHA256())
+        without_ski = builder.sign(key, hashes.SHA256())
+
+        assert authority_key_identifier(with_ski).key_identifier == b"\x01" * 8
+        assert authority_key_identifier(without_ski).key_identifier == (
+            x509.SubjectKeyIdentifier.from_public_key(key.public_key()).digest
+        )
+
+    def test_self_signed_fallback_without_ca(self):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        cert = issue_user_certificate(USER, key, None)
+
+        assert cert.issuer == cert.subject
+
+
+class TestUserCa:
+    def test_missing_ca_is_not_cached(self, ca_files, settings, monkeypatch, tmp_path):
+        cert, cert_path, key_path = ca_files
+        monkeypatch.setattr(user_signer_pool, "_ca_cache", None)
+        settings.CA_CERT_PATH = str(tmp_path / "absent.pem")
+        settings.CA_KEY_PATH = key_path
+        settings.PASSWORD_CERT_CA = "secret"
+
+        assert user_signer_pool.get_user_ca() is None
+
+        # CA déployé ensuite : chargé sans redémarrage
+        settings.CA_CERT_PATH = cert_path
+        ca_cert, _ = user_signer_pool.get_user_ca()
+        assert ca_cert == cert
+
+    def test_reset_reloads_the_ca(self, hestia_ca):
+        first = user_signer_pool.get_user_ca()
+        assert user_signer_pool.get_user_ca() is first
+
+        user_signer_pool.reset_user_ca()
+
+        reloaded = user_signer_pool.get_user_ca()
+        assert reloaded is not first
+        assert reloaded[0] == hestia_ca
+
+
+class TestBuildUserSigner:
+    def test_signer_carries_user_cert_and_ca_chain(self, hestia_ca):
+        signer = build_user_signer(USER)
+
+        assert signer.signing_cert.subject.native["common_name"] == "Jean Dupont"
+        registry_subjects = [c.subject.native["common_name"] for c in signer.cert_registry]
+        assert registry_subjects == ["Hestia CA Test"]
+
+        metrics = get_user_signer_metrics()
+        assert metrics["signer_latency_ms"]["samples"] >= 1
+
+
+class TestUserKeyPool:
+    def test_pool_refills_in_background(self):
+        metrics = UserSignerMetrics()
+        pool = UserKeyPool(size=2, metrics=metrics)
+
+        _, first_hit = pool.acquire()
+        assert first_hit is False  # pool vide au premier appel
+
+        for _ in range(100):
+            if len(pool) == 2:
+                break
+            time.sleep(0.05)
+
+        _, hit = pool.acquire()
+        assert hit is True
+        assert metrics.snapshot(len(pool))["refill_rate_per_minute"] >= 2
+
+    def test_pool_is_discarded_after_fork(self, monkeypatch):
+        pool = UserKeyPool(size=0, metrics=UserSignerMetrics())
+        pool._ensure_filler()
+        pool._keys.append("cle_du_parent")
+
+        monkeypatch.setattr(user_signer_pool.os, "getpid", lambda: -1)
+        pool._ensure_filler()
+
+        assert len(pool) == 0
@@ -0,0 +1,175 @@
+"""
+Tests de la vérification de zones par lot (rent_control.zone_batch).
+
+Usage:
+    pytest tests/test_zone_batch.py -v
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.contrib.gis.geos import MultiPolygon, Polygon
+
+from rent_control import views
+from rent_control.choices import Region
+from rent_control.models import Commune, RentControlArea, RentPrice
+from rent_control.zone_batch import (
+    consume_zone_batch_budget,
+    iter_zone_batch,
+    resolve_zone_batch,
+)
+from rent_control.zone_status import empty_zone_status, rebuild_commune_zone_status
+
+YEAR = 2025
+BATCH_URL = "/api/rent_control/check-zone/batch/"
+
+def _square(x, y):
+    return MultiPolygon(Polygon.from_bbox((x, y, x + 1, y + 1)), srid=4326)
+
+
+@pytest.fixture
+def paris():
+    area = RentControlArea.objects.create(
+        region=Region.PARIS, zone_id="1", reference_year=YEAR, geometry=_square(2.0, 48.0)
+    )
+    for room_count in ("1", "2"):
+        price = RentPrice.objects.create(
+            property_type="appartement",
+            room_count=room_count,
+            construction_period="avant 1946",
+            furnished=False,
+            reference_price=Decimal("30.00"),
+            min_price=Decimal("21.00"),
+            max_price=Decimal("36.00"),
+        )
+        price.areas.add(area)
+    Commune.objects.create(
+        code_insee="75056", nom="Paris", departement_code="75", geometry=_square(2.0, 48.0)
+    )
+    rebuild_commune_zone_status()
+    return area
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("locmem_cache")
+class TestResolveZoneBatch:
+    def test_set_based_queries_whatever_the_batch_size(
+        self, paris, settings, django_assert_max_num_queries
+    ):
+        settings.RENT_CONTROL_INDEX_ENABLED = False
+        settings.ZONE_STATUS_BAN_FALLBACK = False
+        items = [{"id": i, "lat": 48.5, "lng": 2.5} for i in range(50)]
+
+        # Jointure zones + chargement zones + jointure communes
+        # + index des prix (2 requêtes si la zone n'est pas encore en cache)
+        with django_assert_max_num_queries(5):
+            results = resolve_zone_batch(items, YEAR)
+
+        assert len(results) == 50
+        assert {r["areaId"] for r in results} == {paris.id}
+        assert results[0]["options"]["room_counts"] == ["1", "2"]
+
+    def test_rent_price_and_unknown_points(self, paris, settings):
+        settings.RENT_CONTROL_INDEX_ENABLED = False
+        settings.ZONE_STATUS_BAN_FALLBACK = False
+        items = [
+            {
+                "id": "a",
+                "lat": 48.5,
+                "lng": 2.5,
+                "room_count": 2,
+                "construction_period": "avant 1946",
+                "furnished": False,
+            },
+            {"id": "b", "lat": 0.5, "lng": 0.5},
+        ]
+
+        inside, outside = resolve_zone_batch(items, YEAR)
+
+        assert inside["rentPrice"] == {
+            "referencePrice": 30.0,
+            "minPrice": 21.0,
+            "maxPrice": 36.0,
+        }
+        assert outside["id"] == "b"
+        assert outside["areaId"] is None and outside["options"] == {}
+        assert "error" in outside
+
+    def test_invalid_item_gets_an_error_line(self, paris, settings):
+        settings.RENT_CONTROL_INDEX_ENABLED = False
+        settings.ZONE_STATUS_BAN_FALLBACK = False
+        items = [
+            {
+                "id": "a",
+                "lat": 48.5,
+                "lng": 2.5,
+                "room_count": "deux",
+                "construction_period": "avant 1946",
+                "furnished": False,
+            },
+            {"id": "b", "lat": 48.5, "lng": 2.5},
+        ]
+
+        invalid, valid = resolve_zone_batch(items, YEAR)
+
+        assert invalid["id"] == "a" and "error" in invalid
+        assert valid["areaId"] == paris.id
+
+    def test_ban_fallback_is_bounded_per_chunk(self, paris, settings, monkeypatch):
+        settings.RENT_CONTROL_INDEX_ENABLED = False
+        settings.ZONE_STATUS_BAN_FALLBACK = True
+        settings.ZONE_BATCH_BAN_FALLBACK_MAX = 2
+        calls = []
+
+        def check_zone_status_via_ban(lat, lng):
+            calls.append((lat, lng))
+            return {**empty_zone_status(), "is_zone_tendue": True}
+
+        monkeypatch.setattr(views, "check_zone_status_via_ban", check_zone_status_via_ban)
+        items = [{"id": i, "lat": 0.5, "lng": 0.5} for i in range(5)]
+
+        results = list(iter_zone_batch(items, YEAR))
+
+        assert len(calls) == 2
+        assert [r["zoneTendue"] for r in results] == [True, True, False, False, False]
+        assert all("error" in r for r in results[2:])
+
+    def test_failed_chunk_does_not_abort_the_stream(self, settings, monkeypatch):
+        settings.ZONE_BATCH_CHUNK_SIZE = 2
+
+        def resolve(items, year, max_ban_fallback=None):
+            if items[0]["id"] == 0:
+                raise RuntimeError("base indisponible")
+            return [{"id": item["id"]} for item in items]
+
+        monkeypatch.setattr("rent_control.zone_batch.resolve_zone_batch", resolve)
+        items = [{"id": i, "lat": 48.5, "lng": 2.5} for i in range(3)]
+
+        results = list(iter_zone_batch(items, YEAR))
+
+        assert [r["id"] for r in results] == [0, 1, 2]
+        assert "error" in results[0] and "error" in results[1]
+        assert "error" not in results[2]
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("locmem_cache")
+class TestCheckZoneBatchView:
+    @pytest.mark.parametrize(
+        "body",
+        [
+            {"items": [{"lat": 48.5, "lng": 2.5}], "year": "2025bis"},
+            {"items": [{"lat": 148.5, "lng": 2.5}]},
+            {"items": [{"lat": "nan", "lng": 2.5}]},
+        ],
+    )
+    def test_invalid_batch_is_rejected_before_debiting_the_budget(
+        self, authenticated_client, user, settings, body
+    ):
+        settings.ZONE_BATCH_POINTS_BUDGET = 1
+
+        response = authenticated_client.post(BATCH_URL, body, format="json")
+
+        assert response.status_code == 400
+        # Budget intact : le point disponible peut encore être consommé
+        assert consume_zone_batch_budget(user.id, 1) == (True, 0)
@@ -0,0 +1,103 @@
+"""
+Tests de la résolution locale du statut réglementaire (rent_control.zone_status).
+
+Usage:
+    pytest tests/test_zone_status.py -v
+"""
+
+import pytest
+from django.contrib.gis.geos import MultiPolygon, Polygon
+
+from rent_control import views
+from rent_control.models import Commune, CommuneZoneStatus, PermisDeLouer, ZoneTendue
+from rent_control.zone_status import get_zone_status, rebuild_commune_zone_status
+
+
+@pytest.fixture
+def communes():
+    lille = Commune.objects.create(
+        code_insee="59350",
+        nom="Lille",
+        departement_code="59",
+        geometry=MultiPolygon(Polygon.from_bbox((3.0, 50.6, 3.1, 50.7)), srid=4326),
+    )
+    Commune.objects.create(
+        code_insee="59009",
+        nom="Villeneuve-d'Ascq",
+        departement_code="59",
+        geometry=MultiPolygon(Polygon.from_bbox((3.1, 50.6, 3.2, 50.7)), srid=4326),
+    )
+    ZoneTendue.objects.create(
+        departements="Nord", communes="Lille", code_insee="59350"
+    )
+    # Permis de louer recherché par nom (insensible à la casse)
+    PermisDeLouer.objects.create(raw_data="", villes="LILLE")
+    rebuild_commune_zone_status()
+    return lille
+
+
+@pytest.mark.django_db
+class TestZoneStatus:
+    def test_rebuild_precomputes_flags_per_insee(self, communes):
+        status = CommuneZoneStatus.objects.get(commune_id="59350")
+        assert status.is_zone_tendue and status.is_permis_de_louer
+        assert not status.is_zone_tres_tendue
+
+        other = CommuneZoneStatus.objects.get(commune_id="59009")
+        assert not other.is_zone_tendue and not other.is_permis_de_louer
+
+    def test_point_resolved_locally_in_one_query(
+        self, communes, django_assert_num_queries
+    ):
+        with django_assert_num_queries(1):
+            status = get_zone_status(50.65, 3.05)
+
+        assert status["source"] == "local"
+        assert status["citycode"] == "59350"
+        assert status["is_zone_tendue"] is True
+        assert status["is_permis_de_louer"] is True
+
+    def test_ban_fallback_outside_known_communes(self, communes, settings, monkeypatch):
+        settings.ZONE_STATUS_BAN_FALLBACK = True
+        monkeypatch.setattr(
+            views,
+            "check_zone_status_via_ban",
+            lambda lat, lng: {"is_zone_tendue": True, "citycode": "97411"},
+        )
+
+        status = get_zone_status(-21.0, 55.5)
+
+        assert status["source"] == "ban"
+        assert status["citycode"] == "97411"
+
+    def test_no_fallback_returns_error(self, communes, settings):
+        settings.ZONE_STATUS_BAN_FALLBACK = False
+
+        status = get_zone_status(0.0, 0.0)
+
+        assert status["is_zone_tendue"] is False
+        assert "error" in status
+
+
+@pytest.mark.django_db
+class TestZoneStatusSignals:
+    def test_admin_edits_refresh_the_affected_communes(
+        self, communes, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            permis = PermisDeLouer.objects.create(
+                raw_data="", villes="villeneuve-d'ascq"
+            )
+        assert CommuneZoneStatus.objects.get(commune_id="59009").is_permis_de_louer
+
+        # Renommage : l'ancienne commune perd le flag, la nouvelle le gagne
+        with django_capture_on_commit_callbacks(execute=True):
+            permis.villes = "Roubaix"
+            permis.save()
+        assert not CommuneZoneStatus.objects.get(
+            commune_id="59009"
+        ).is_permis_de_louer
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ZoneTendue.objects.get(code_insee="59350").delete()
+        assert not CommuneZoneStatus.objects.get(commune_id="59350").is_zone_tendue
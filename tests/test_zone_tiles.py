@@ -0,0 +1,104 @@
+"""
+Tests des tuiles des zones d'encadrement (rent_control/tiles.py).
+
+Usage:
+    pytest tests/test_zone_tiles.py -v
+"""
+
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from rent_control import tiles
+from rent_control.spatial_index import (
+    INDEX_VERSION_CACHE_KEY,
+    invalidate_rent_control_index,
+)
+from rent_control.tiles import (
+    InvalidTile,
+    geojson_precision,
+    get_tiles_version,
+    get_zone_tile,
+    simplify_tolerance,
+    validate_tile,
+)
+
+pytestmark = pytest.mark.usefixtures("locmem_cache")
+
+
+class TestTileGrid:
+    def test_tiles_outside_the_grid_are_rejected(self):
+        validate_tile(3, 7, 7, "geojson")
+
+        for z, x, y, fmt in [(3, 8, 0, "geojson"), (-1, 0, 0, "mvt"), (30, 0, 0, "mvt")]:
+            with pytest.raises(InvalidTile):
+                validate_tile(z, x, y, fmt)
+        with pytest.raises(InvalidTile):
+            validate_tile(0, 0, 0, "png")
+
+    def test_simplification_follows_the_zoom(self):
+        assert simplify_tolerance(11, "geojson") == simplify_tolerance(10, "geojson") / 2
+        # Un demi-pixel au zoom 0 : ~78 km en Web Mercator
+        assert simplify_tolerance(0, "mvt") == pytest.approx(78271.5, rel=1e-3)
+        assert geojson_precision(0) < geojson_precision(12) <= 7
+
+
+class TestZoneTileCache:
+    def test_tile_is_rendered_once_per_zones_version(self):
+        rendered = []
+
+        def render(region, year, z, x, y):
+            rendered.append((region, year, z, x, y))
+            return b'{"type":"FeatureCollection","features":[]}'
+
+        with patch.dict(tiles.RENDERERS, {"geojson": render}):
+            get_zone_tile("PARIS", 2025, 12, 2074, 1409, "geojson")
+            get_zone_tile("PARIS", 2025, 12, 2074, 1409, "geojson")
+            assert len(rendered) == 1
+
+            # Zones réimportées : nouvelle version, tuile recalculée
+            invalidate_rent_control_index()
+            get_zone_tile("PARIS", 2025, 12, 2074, 1409, "geojson")
+            assert len(rendered) == 2
+
+    def test_evicted_version_is_never_reused(self):
+        first = get_tiles_version()
+        assert get_tiles_version() == first
+
+        invalidate_rent_control_index()
+        second = get_tiles_version()
+        # Version évincée du cache : ni 0, ni une version déjà servie
+        cache.delete(INDEX_VERSION_CACHE_KEY)
+        third = get_tiles_version()
+
+        assert len({first, second, third}) == 3
+        assert third > second
+
+
+@pytest.mark.django_db
+class TestZoneTileView:
+    URL = "/api/rent_control/tiles/PARIS/12/2074/1409.geojson"
+
+    def _render(self, region, year, z, x, y):
+        return b'{"type":"FeatureCollection","features":[]}'
+
+    def test_known_version_is_revalidated_with_etag(self, client):
+        with patch.dict(tiles.RENDERERS, {"geojson": self._render}):
+            response = client.get(self.URL)
+            assert response.status_code == 200
+            assert response["ETag"]
+
+            response = client.get(self.URL, HTTP_IF_NONE_MATCH=response["ETag"])
+            assert response.status_code == 304
+
+    def test_unknown_version_is_served_without_etag(self, client):
+        with (
+            patch.dict(tiles.RENDERERS, {"geojson": self._render}),
+            patch("rent_control.views.get_tiles_version", return_value=None),
+        ):
+            response = client.get(self.URL, HTTP_IF_NONE_MATCH='"None-PARIS"')
+
+        assert response.status_code == 200
+        assert not response.has_header("ETag")
+        assert "no-cache" in response["Cache-Control"]
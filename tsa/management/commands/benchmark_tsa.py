@@ -0,0 +1,117 @@
+"""
+Management command pour comparer les moteurs TSA (natif vs openssl ts -reply).
+
+Usage:
+    python manage.py benchmark_tsa
+    python manage.py benchmark_tsa --count=500 --skip-openssl
+"""
+
+import hashlib
+import os
+import secrets
+import subprocess
+import tempfile
+import time
+
+from asn1crypto import tsp
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tsa.responder import get_tsa_responder
+from tsa.services import generate_timestamp_token_openssl, validate_tsa_response
+
+
+def build_timestamp_request() -> bytes:
+    """TimeStampReq SHA-256 sur des données aléatoires, comme PyHanko."""
+    return tsp.TimeStampReq(
+        {
+            "version": "v1",
+            "message_imprint": {
+                "hash_algorithm": {"algorithm": "sha256"},
+                "hashed_message": hashlib.sha256(secrets.token_bytes(64)).digest(),
+            },
+            "nonce": secrets.randbits(63),
+            "cert_req": True,
+        }
+    ).dump()
+
+
+class Command(BaseCommand):
+    help = "Benchmark tokens/seconde du TSA natif vs openssl, et vérification openssl ts -verify"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=200,
+            help="Nombre de tokens générés par moteur (default: 200)",
+        )
+        parser.add_argument(
+            "--skip-openssl",
+            action="store_true",
+            help="Ne pas mesurer le moteur openssl (sous-process)",
+        )
+        parser.add_argument(
+            "--ca-file",
+            default=settings.TSA_CERT_PATH,
+            help="Racine de confiance pour openssl ts -verify (default: TSA_CERT_PATH)",
+        )
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        requests = [build_timestamp_request() for _ in range(count)]
+
+        # 1. Moteur natif (chargement de la clé mesuré à part)
+        start = time.perf_counter()
+        responder = get_tsa_responder()
+        load_time = time.perf_counter() - start
+        self.stdout.write(f"🔑 Chargement clé TSA : {load_time * 1000:.1f} ms (une fois)")
+
+        start = time.perf_counter()
+        responses = [responder.respond(req) for req in requests]
+        native_rate = count / (time.perf_counter() - start)
+        self.stdout.write(f"⚡ Natif   : {native_rate:8.1f} tokens/s")
+
+        # 2. Moteur openssl historique
+        if not options["skip_openssl"]:
+            start = time.perf_counter()
+            for req in requests:
+                generate_timestamp_token_openssl(req)
+            openssl_rate = count / (time.perf_counter() - start)
+            self.stdout.write(f"🐢 OpenSSL : {openssl_rate:8.1f} tokens/s")
+            self.stdout.write(f"📈 Gain    : ×{native_rate / openssl_rate:.1f}")
+
+        # 3. Vérification byte-level par openssl ts -verify
+        for response in responses:
+            validate_tsa_response(response)
+        self.verify_with_openssl(requests[0], responses[0], options["ca_file"])
+        self.verify_with_openssl(requests[-1], responses[-1], options["ca_file"])
+        self.stdout.write(self.style.SUCCESS("✅ openssl ts -verify : OK"))
+
+    def verify_with_openssl(self, request_data, response_data, ca_file):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            req_path = os.path.join(tmp_dir, "request.tsq")
+            resp_path = os.path.join(tmp_dir, "response.tsr")
+            with open(req_path, "wb") as f:
+                f.write(request_data)
+            with open(resp_path, "wb") as f:
+                f.write(response_data)
+
+            result = subprocess.run(
+                [
+                    "openssl", "ts", "-verify",
+                    "-in", resp_path,
+                    "-queryfile", req_path,
+                    "-CAfile", ca_file,
+                    "-untrusted", settings.TSA_CERT_PATH,
+                ],
+                capture_output=True,
+                text=True,
+                timeout=10,
+            )
+
+        if result.returncode != 0 or "Verification: OK" not in result.stdout:
+            raise CommandError(
+                f"openssl ts -verify a rejeté le token natif : "
+                f"{result.stderr or result.stdout}"
+            )
@@ -55,6 +55,25 @@ class TsaSerial(models.Model):
         obj = cls.objects.create()
         return obj.pk
 
+    @classmethod
+    def allocate_block(cls, size: int) -> list[int]:
+        """
+        Réserve un bloc de numéros de série en un seul INSERT multi-lignes.
+
+        Même garantie d'unicité que get_next_serial() (séquence PostgreSQL),
+        mais un aller-retour DB pour `size` timestamps au lieu d'un par token.
+        Les serials non consommés d'un bloc (arrêt du worker) sont perdus :
+        RFC 3161 n'exige que l'unicité, pas la continuité.
+
+        Args:
+            size: Nombre de serials à réserver
+
+        Returns:
+            list[int]: Serials uniques, par ordre croissant
+        """
+        objs = cls.objects.bulk_create([cls() for _ in range(size)])
+        return sorted(obj.pk for obj in objs)
+
     def __str__(self):
         timestamp = self.created_at.strftime('%Y-%m-%d %H:%M:%S')
         return f"TSA Serial #{self.pk} - {timestamp}"
@@ -0,0 +1,302 @@
+"""
+Moteur TSA RFC 3161 natif (en process).
+
+Remplace l'appel `openssl ts -reply` par requête : la clé TSA est chargée et
+déchiffrée une seule fois par process, les serials sont réservés par blocs
+dans TsaSerial, et la TimeStampResp est signée directement avec cryptography.
+
+Le token produit reprend la configuration de certificates/hestia_tsa.cnf
+(policy, accuracy, ordering, tsa_name, signer_digest) pour rester
+vérifiable par `openssl ts -verify` comme par PyHanko.
+"""
+
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+from asn1crypto import algos, cms, core, pem, tsp, x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+from django.conf import settings
+from pyhanko.sign.general import as_signing_certificate, simple_cms_attribute
+
+logger = logging.getLogger(__name__)
+
+# Mêmes valeurs que certificates/hestia_tsa.cnf
+TSA_POLICY_OID = "1.2.3.4.1"
+TSA_SIGNER_DIGEST = "sha256"
+TSA_ACCEPTED_DIGESTS = {"sha1", "sha256", "sha384", "sha512"}
+TSA_ACCURACY = {"seconds": 1, "millis": 500, "micros": 100}
+
+
+class TimeStampResponse(tsp.TimeStampResp):
+    """
+    TimeStampResp avec timeStampToken OPTIONNEL (RFC 3161 §2.4.2).
+
+    asn1crypto le déclare obligatoire et ne sait donc ni encoder ni relire
+    une réponse "rejection" (statut seul).
+    """
+
+    _fields = [
+        ("status", tsp.PKIStatusInfo),
+        ("time_stamp_token", cms.ContentInfo, {"optional": True}),
+    ]
+
+
+class SerialBlockAllocator:
+    """
+    Distribue des serials TSA réservés par blocs (TsaSerial.allocate_block).
+
+    Thread-safe. Le bloc en cours est abandonné après un fork : un process
+    enfant ne doit jamais réutiliser les serials réservés par son parent.
+    """
+
+    def __init__(self, block_size):
+        self.block_size = block_size
+        self._serials = deque()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def next_serial(self) -> int:
+        from .models import TsaSerial
+
+        with self._lock:
+            if self._pid != os.getpid():
+                self._serials.clear()
+                self._pid = os.getpid()
+
+            if not self._serials:
+                self._serials.extend(TsaSerial.allocate_block(self.block_size))
+                logger.info(
+                    f"📝 Bloc de serials TSA réservé : "
+                    f"{self._serials[0]}-{self._serials[-1]}"
+                )
+
+            return self._serials.popleft()
+
+
+class TsaResponder:
+    """
+    Répondeur RFC 3161 : TimeStampReq (DER) → TimeStampResp (DER).
+
+    Les requêtes invalides produisent une réponse "rejection" avec le
+    PKIFailureInfo adéquat, comme le ferait openssl ts -reply.
+    """
+
+    def __init__(self, cert_path, key_path, password, serial_allocator):
+        with open(cert_path, "rb") as f:
+            cert_data = f.read()
+        with open(key_path, "rb") as f:
+            key_data = f.read()
+
+        self.cert = x509.Certificate.load(_pem_to_der(cert_data))
+        self.private_key = serialization.load_pem_private_key(
+            key_data, password=password.encode() if password else None
+        )
+        self.serial_allocator = serial_allocator
+
+        # Attributs constants pré-calculés une fois, figés en DER : asn1crypto
+        # ne ré-sérialise pas un objet parsé (gain ×2 sur chaque token)
+        self._tsa_name = _freeze(
+            x509.GeneralName(name="directory_name", value=self.cert.subject)
+        )
+        self._signing_certificate_attr = _freeze(
+            simple_cms_attribute(
+                "signing_certificate", as_signing_certificate(self.cert)
+            )
+        )
+        self._signer_identifier = _freeze(
+            cms.SignerIdentifier(
+                {
+                    "issuer_and_serial_number": cms.IssuerAndSerialNumber(
+                        {
+                            "issuer": self.cert.issuer,
+                            "serial_number": self.cert.serial_number,
+                        }
+                    )
+                }
+            )
+        )
+        self._digest_algorithm = _freeze(
+            algos.DigestAlgorithm({"algorithm": TSA_SIGNER_DIGEST})
+        )
+
+        if isinstance(self.private_key, rsa.RSAPrivateKey):
+            self._signature_algorithm = _freeze(
+                algos.SignedDigestAlgorithm({"algorithm": "rsassa_pkcs1v15"})
+            )
+        elif isinstance(self.private_key, ec.EllipticCurvePrivateKey):
+            self._signature_algorithm = _freeze(
+                algos.SignedDigestAlgorithm({"algorithm": f"{TSA_SIGNER_DIGEST}_ecdsa"})
+            )
+        else:
+            raise ValueError(
+                f"Type de clé TSA non supporté : {type(self.private_key).__name__}"
+            )
+
+    def respond(self, request_data: bytes) -> bytes:
+        """
+        Génère la TimeStampResp pour une TimeStampReq.
+
+        Args:
+            request_data: TimeStampReq encodée en DER
+
+        Returns:
+            bytes: TimeStampResp encodée en DER (granted ou rejection)
+        """
+        try:
+            req = tsp.TimeStampReq.load(request_data)
+            message_imprint = req["message_imprint"]
+            hash_algorithm = message_imprint["hash_algorithm"]["algorithm"].native
+            req_policy = req["req_policy"].native
+            nonce = req["nonce"].native
+            cert_req = req["cert_req"].native
+        except Exception as e:
+            logger.warning(f"⚠️ Requête TSA illisible : {e}")
+            return self._rejection("bad_data_format", "Malformed TimeStampReq")
+
+        if hash_algorithm not in TSA_ACCEPTED_DIGESTS:
+            return self._rejection("bad_alg", f"Unsupported digest: {hash_algorithm}")
+
+        if req_policy is not None and req_policy != TSA_POLICY_OID:
+            return self._rejection("unaccepted_policy", f"Unknown policy: {req_policy}")
+
+        # clock_precision_digits = 0 → précision à la seconde
+        gen_time = datetime.now(tz=timezone.utc).replace(microsecond=0)
+
+        tst_info_args = {
+            "version": "v1",
+            "policy": TSA_POLICY_OID,
+            "message_imprint": message_imprint,
+            "serial_number": self.serial_allocator.next_serial(),
+            "gen_time": gen_time,
+            "accuracy": TSA_ACCURACY,
+            "ordering": True,
+            "tsa": self._tsa_name,
+        }
+        if nonce is not None:
+            tst_info_args["nonce"] = nonce
+        tst_info_data = tsp.TSTInfo(tst_info_args).dump()
+
+        token = cms.ContentInfo(
+            {
+                "content_type": "signed_data",
+                "content": self._build_signed_data(tst_info_data, gen_time, cert_req),
+            }
+        )
+        return TimeStampResponse(
+            {"status": {"status": "granted"}, "time_stamp_token": token}
+        ).dump()
+
+    def _build_signed_data(self, tst_info_data, gen_time, cert_req):
+        digest = hashes.Hash(hashes.SHA256())
+        digest.update(tst_info_data)
+
+        signed_attrs = cms.CMSAttributes(
+            [
+                simple_cms_attribute("content_type", "tst_info"),
+                simple_cms_attribute(
+                    "signing_time", cms.Time({"utc_time": core.UTCTime(gen_time)})
+                ),
+                self._signing_certificate_attr,
+                simple_cms_attribute("message_digest", digest.finalize()),
+            ]
+        )
+
+        # Figé en DER avant insertion dans le SET signer_infos : sinon asn1crypto
+        # ré-encode tout le SignerInfo à chaque tri DER du SET (×3 plus lent)
+        signer_info = _freeze(
+            cms.SignerInfo(
+                {
+                    "version": "v1",
+                    "sid": self._signer_identifier,
+                    "digest_algorithm": self._digest_algorithm,
+                    "signature_algorithm": self._signature_algorithm,
+                    "signed_attrs": signed_attrs,
+                    "signature": self._sign(signed_attrs.dump()),
+                }
+            )
+        )
+
+        signed_data = {
+            # v3 obligatoire pour un EncapsulatedContentInfo de type tst_info
+            "version": "v3",
+            "digest_algorithms": [self._digest_algorithm],
+            "encap_content_info": {
+                "content_type": "tst_info",
+                "content": cms.ParsableOctetString(tst_info_data),
+            },
+            "signer_infos": [signer_info],
+        }
+        # RFC 3161 §2.4.1 : certificat TSA inclus seulement si certReq
+        if cert_req:
+            signed_data["certificates"] = [self.cert]
+
+        return cms.SignedData(signed_data)
+
+    def _sign(self, data: bytes) -> bytes:
+        if isinstance(self.private_key, rsa.RSAPrivateKey):
+            return self.private_key.sign(data, padding.PKCS1v15(), hashes.SHA256())
+        return self.private_key.sign(data, ec.ECDSA(hashes.SHA256()))
+
+    def _rejection(self, failure_info, text):
+        return TimeStampResponse(
+            {
+                "status": {
+                    "status": "rejection",
+                    "status_string": [text],
+                    "fail_info": {failure_info},
+                }
+            }
+        ).dump()
+
+
+def _freeze(asn1_value):
+    """Recharge une valeur asn1crypto depuis son DER (contenu mis en cache)."""
+    return asn1_value.__class__.load(asn1_value.dump())
+
+
+def _pem_to_der(data: bytes) -> bytes:
+    if pem.detect(data):
+        _, _, der_bytes = pem.unarmor(data)
+        return der_bytes
+    return data
+
+
+_responder = None
+_responder_lock = threading.Lock()
+
+
+def get_tsa_responder() -> TsaResponder:
+    """
+    Retourne le répondeur TSA du process (clé chargée et déchiffrée une fois).
+
+    Raises:
+        FileNotFoundError: Si le certificat ou la clé TSA est absent
+    """
+    global _responder
+
+    if _responder is None:
+        with _responder_lock:
+            if _responder is None:
+                _responder = TsaResponder(
+                    cert_path=settings.TSA_CERT_PATH,
+                    key_path=settings.TSA_KEY_PATH,
+                    password=settings.PASSWORD_CERT_TSA,
+                    serial_allocator=SerialBlockAllocator(
+                        settings.TSA_SERIAL_BLOCK_SIZE
+                    ),
+                )
+                logger.info("🔑 Clé TSA chargée (moteur natif)")
+
+    return _responder
+
+
+def reset_tsa_responder() -> None:
+    """Oublie le répondeur courant (rechargement des fichiers TSA)."""
+    global _responder
+
+    with _responder_lock:
+        _responder = None
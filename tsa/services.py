@@ -26,6 +26,7 @@ from django.conf import settings
 from pyhanko.sign import timestamps
 
 from .models import TsaSerial
+from .responder import TimeStampResponse, get_tsa_responder
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +43,73 @@ def generate_timestamp_token(tsa_request_data: bytes) -> bytes:
     Cette fonction est la logique métier du TSA, extraite du view HTTP
     pour permettre des appels directs depuis le code Python.
 
+    Moteur selon settings.TSA_ENGINE :
+    - "native" (défaut) : signature en process (tsa.responder), clé TSA
+      chargée une fois par worker, serials réservés par blocs
+    - "openssl" : sous-process `openssl ts -reply` (historique)
+
+    Args:
+        tsa_request_data: Requête TSA binaire (TimeStampReq)
+
+    Returns:
+        bytes: Réponse TSA binaire (TimeStampResp)
+
+    Raises:
+        TsaError: Si la génération échoue
+        ValueError: Si la requête est invalide
+    """
+    if settings.TSA_ENGINE == "openssl":
+        return generate_timestamp_token_openssl(tsa_request_data)
+
+    if not tsa_request_data:
+        raise ValueError("Empty TSA request")
+
+    try:
+        responder = get_tsa_responder()
+        tsa_response_data = responder.respond(tsa_request_data)
+    except Exception as e:
+        raise TsaError(f"TSA internal error: {str(e)}")
+
+    validate_tsa_response(tsa_response_data)
+    return tsa_response_data
+
+
+def validate_tsa_response(tsa_response_data: bytes) -> None:
+    """
+    Vérifie que la réponse TSA contient un timestamp valide
+    (pas juste une erreur ASN.1 de 55 bytes).
+
+    Raises:
+        TsaError: Si le statut n'est pas granted ou si le token est absent
+    """
+    try:
+        tsa_response = TimeStampResponse.load(tsa_response_data)
+
+        # Vérifier le statut de la réponse
+        status = tsa_response['status']['status'].native
+        if status != 'granted' and status != 'granted_with_mods':
+            error_msg = f"TSA request failed with status: {status}"
+            if tsa_response['status']['status_string']:
+                error_msg += f" - {tsa_response['status']['status_string'].native}"
+            raise TsaError(error_msg)
+
+        # Vérifier que le token existe
+        if not tsa_response['time_stamp_token']:
+            raise TsaError("TSA response missing time_stamp_token")
+
+        logger.debug(f"✅ Timestamp TSA validé (status: {status})")
+
+    except Exception as parse_error:
+        raise TsaError(f"Invalid TSA response: {str(parse_error)}")
+
+
+def generate_timestamp_token_openssl(tsa_request_data: bytes) -> bytes:
+    """
+    Génère un token d'horodatage TSA via `openssl ts -reply` (sous-process).
+
+    Moteur historique, conservé en repli (TSA_ENGINE=openssl) et comme
+    référence pour le benchmark (manage.py benchmark_tsa).
+
     Args:
         tsa_request_data: Requête TSA binaire (TimeStampReq)
 
@@ -53,8 +121,8 @@ def generate_timestamp_token(tsa_request_data: bytes) -> bytes:
         ValueError: Si la requête est invalide
 
     Example:
-        >>> from tsa.services import generate_timestamp_token
-        >>> tsa_response = generate_timestamp_token(tsq_bytes)
+        >>> from tsa.services import generate_timestamp_token_openssl
+        >>> tsa_response = generate_timestamp_token_openssl(tsq_bytes)
         >>> # tsa_response contient le token RFC 3161
 
     Note:
@@ -179,28 +247,7 @@ def generate_timestamp_token(tsa_request_data: bytes) -> bytes:
 
             logger.info(f"✅ Token TSA généré : {len(tsa_response_data)} bytes")
 
-            # Vérifier que la réponse TSA contient un timestamp valide
-            # (pas juste une erreur ASN.1 de 55 bytes)
-            try:
-                from asn1crypto.tsp import TimeStampResp
-                tsa_response = TimeStampResp.load(tsa_response_data)
-
-                # Vérifier le statut de la réponse
-                status = tsa_response['status']['status'].native
-                if status != 'granted' and status != 'granted_with_mods':
-                    error_msg = f"TSA request failed with status: {status}"
-                    if tsa_response['status']['status_string']:
-                        error_msg += f" - {tsa_response['status']['status_string'].native}"
-                    raise TsaError(error_msg)
-
-                # Vérifier que le token existe
-                if not tsa_response['time_stamp_token']:
-                    raise TsaError("TSA response missing time_stamp_token")
-
-                logger.info(f"✅ Timestamp TSA validé (status: {status})")
-
-            except Exception as parse_error:
-                raise TsaError(f"Invalid TSA response: {str(parse_error)}")
+            validate_tsa_response(tsa_response_data)
 
             return tsa_response_data
 
@@ -237,9 +284,29 @@ class InternalTimeStamper(timestamps.TimeStamper):
         - Compatible avec PdfSigner et PdfTimeStamper de PyHanko
         - Même interface que HTTPTimeStamper (duck typing)
         - Zéro overhead réseau (appel Python direct)
-        - Thread-safe (via PostgreSQL serial atomique)
+        - Thread-safe (serials TsaSerial réservés par blocs, voir tsa.responder)
+        - last_token_info : dernier jeton émis, archivé sans relire le PDF
     """
 
+    # (gen_time, jeton DER, numéro de série), cf. tsa_timestamp_from_cms
+    last_token_info = None
+
+    async def async_timestamp(self, message_digest, md_algorithm):
+        """
+        Horodate un condensat et conserve le jeton émis (last_token_info).
+
+        Le jeton factice de l'estimation de taille passe aussi par ici, mais
+        toujours avant celui de la signature : le dernier est le bon.
+        """
+        token = await super().async_timestamp(message_digest, md_algorithm)
+        tst_info = token["content"]["encap_content_info"]["content"].parsed
+        self.last_token_info = (
+            tst_info["gen_time"].native,
+            token.dump(),
+            tst_info["serial_number"].native,
+        )
+        return token
+
     async def async_request_tsa_response(self, req):
         """
         Génère une réponse TSA pour une requête donnée.